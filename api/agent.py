@@ -0,0 +1,251 @@
+"""
+Agente de host para la agregación de flotas.
+
+Se ejecuta en cada máquina con bots y expone por HTTP el estado, las
+posiciones y las señales de los bots locales (config/bots_config.json o
+BOTS_CONFIG_PATH) y su inicio y parada. La API central lo registra en la
+sección 'fleet' de api_config.json y lo consulta con FleetService.
+
+Las solicitudes deben incluir el token compartido en el encabezado
+X-Agent-Token (variable AGENT_TOKEN o 'agent.token'); sin token configurado
+el agente no arranca. Las lecturas admiten If-None-Match, de modo que las
+revalidaciones de la API central sin cambios se responden con 304.
+
+Con supervisor.mode 'embedded' los procesos de los bots dependen del agente
+y se detienen con él; con 'process' el agente usa (y arranca si hace falta)
+el proceso supervisor y los bots sobreviven a sus reinicios.
+
+El agente se sirve con gunicorn (un worker con hilos: el estado de los bots
+vive en un solo proceso) y por defecto solo escucha en 127.0.0.1. El token
+viaja en claro sobre HTTP: para exponerlo a otros hosts configure TLS
+('agent.certfile' y 'agent.keyfile') o limite el acceso a una red privada.
+
+Uso:
+    $ AGENT_TOKEN=... python -m api.agent [--host 127.0.0.1] [--port 5101]
+"""
+
+import os
+import sys
+import json
+import hmac
+import socket
+import logging
+import argparse
+from flask import Flask, Blueprint, jsonify, request
+from gunicorn.app.base import BaseApplication
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Raíz del proyecto (configuración por defecto)
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _load_config():
+    try:
+        with open(os.path.join(REPO_ROOT, 'config', 'api_config.json'), 'r') as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+def create_app(config, bot_service, token):
+    """
+    Crea la aplicación del agente.
+
+    Args:
+        config (dict): Configuración de la API.
+        bot_service (BotService): Servicio de los bots de este host.
+        token (str): Token compartido con la API central.
+
+    Returns:
+        Flask: Aplicación con el blueprint /agent.
+    """
+    from api.services.bot_service import BOT_DETAIL_FIELDS, POSITION_FIELDS, SIGNAL_FIELDS
+    from api.utils.error_handler import register_error_handlers, APIError
+    from api.utils.conditional import conditional
+    from api.utils.serialization import configure_serialization, list_response
+    from api.utils.query import parse_fields, project
+
+    agent_routes = Blueprint('agent_routes', __name__)
+    hostname = socket.gethostname()
+
+    @agent_routes.before_request
+    def check_token():
+        if request.endpoint == 'agent_routes.health':
+            return None
+        supplied = request.headers.get('X-Agent-Token', '')
+        if not hmac.compare_digest(supplied.encode('utf-8'), token.encode('utf-8')):
+            raise APIError("No autorizado", 401, {"message": "Token de agente no válido"})
+
+    def _known(bot_id):
+        if bot_id not in bot_service.bots_config:
+            raise APIError("Bot no encontrado", 404)
+
+    @agent_routes.route('/health', methods=['GET'])
+    def health():
+        """Identidad del agente (sin autenticación)."""
+        return jsonify({"success": True, "data": {"host": hostname, "pid": os.getpid(),
+                                                  "bots": len(bot_service.bots_config)}})
+
+    @agent_routes.route('/bots', methods=['GET'])
+    @conditional(lambda: bot_service.get_bots_version())
+    def list_bots():
+        """Bots del host con su estado (siempre todos los campos: la API central proyecta)."""
+        return list_response(bot_service.get_all_bots())
+
+    @agent_routes.route('/bots/<bot_id>', methods=['GET'])
+    @conditional(lambda bot_id: bot_service.get_bot_version(bot_id, parse_fields(BOT_DETAIL_FIELDS)))
+    def get_bot(bot_id):
+        _known(bot_id)
+        return jsonify({"success": True, "data": bot_service.get_bot(bot_id, parse_fields(BOT_DETAIL_FIELDS))})
+
+    @agent_routes.route('/bots/<bot_id>/positions', methods=['GET'])
+    @conditional(bot_service.get_positions_version)
+    def get_positions(bot_id):
+        _known(bot_id)
+        return list_response(bot_service.get_bot_positions(bot_id, parse_fields(POSITION_FIELDS)) or [])
+
+    @agent_routes.route('/bots/<bot_id>/signals', methods=['GET'])
+    @conditional(bot_service.get_signals_version)
+    def get_signals(bot_id):
+        _known(bot_id)
+        fields = parse_fields(SIGNAL_FIELDS)
+        since = request.args.get('since')
+        signals = bot_service.get_bot_signals(bot_id) or []
+        if since:
+            signals = [signal for signal in signals if str(signal.get("timestamp", "")) > since]
+        return list_response([project(signal, fields) for signal in signals])
+
+    @agent_routes.route('/bots/<bot_id>/<operation>', methods=['POST'])
+    def bot_action(bot_id, operation):
+        _known(bot_id)
+        if operation not in ("start", "stop"):
+            raise APIError("Operación no válida", 404)
+        if operation == "start":
+            success = bot_service.start_bot(bot_id)
+        else:
+            success = bot_service.stop_bot(bot_id)
+        status = "active" if operation == "start" else "inactive"
+        logger.info(f"Agente: {operation} del bot {bot_id} -> {'ok' if success else 'error'}")
+        return jsonify({"success": success, "data": {"status": status if success else None,
+                                                     "host": hostname}}), 200 if success else 500
+
+    app = Flask(__name__)
+    configure_serialization(app, config)
+    register_error_handlers(app)
+    app.register_blueprint(agent_routes, url_prefix='/agent')
+    return app
+
+class AgentServer(BaseApplication):
+    """Servidor gunicorn del agente con la configuración de la sección 'agent'."""
+
+    def __init__(self, options, loader):
+        """
+        Args:
+            options (dict): Ajustes de gunicorn (bind, threads, timeout...).
+            loader (callable): Prepara el worker y devuelve la aplicación WSGI.
+        """
+        self.options = options
+        self.loader = loader
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        return self.loader()
+
+def _log_config(config):
+    # Log propio: el agente puede convivir con la API en el mismo directorio
+    agent_config = config.get('agent', {})
+    return dict(config, logging=dict(config.get('logging', {}), access_file=None,
+                                     file=agent_config.get('log_file', 'agent.log')))
+
+def _load_worker(config, token):
+    """
+    Prepara el worker del agente (logging, bots y supervisor) y crea la aplicación.
+
+    Se ejecuta en el worker y no en el maestro: los hilos del supervisor
+    embebido no sobreviven al fork.
+    """
+    from api.utils.logging_config import setup_logging
+    from api.utils.metrics import metrics
+    from api.utils.event_store import configure_events
+    from api.services.bot_service import BotService
+    from api.services.supervisor import (
+        configure_supervisor, ensure_supervisor_process, start_supervisor_tasks, supervisor_config
+    )
+    setup_logging(_log_config(config))
+    # Las métricas de la API se agregan desde un directorio compartido: el agente no escribe en él
+    metrics.enabled = False
+    configure_events(config)
+
+    bot_service = BotService()
+    bot_service.configure(config)
+    configure_supervisor(config, bot_service)
+    if supervisor_config.mode == 'process' and not ensure_supervisor_process(config):
+        sys.exit(1)
+    bot_service.warmup()
+    start_supervisor_tasks()
+
+    logger.info(f"Agente listo ({len(bot_service.bots_config)} bots, supervisor {supervisor_config.mode}, "
+                f"PID {os.getpid()})")
+    return create_app(config, bot_service, token)
+
+def _worker_exit(server, worker):
+    """Detiene los bots del supervisor embebido y vacía el historial y el log."""
+    from api.utils.logging_config import stop_logging
+    from api.utils.event_store import event_store
+    from api.services.supervisor import get_supervisor, local_supervisor
+    if get_supervisor() is local_supervisor:
+        local_supervisor.shutdown()
+    event_store.stop()
+    logger.info("Agente detenido")
+    stop_logging()
+
+def main():
+    parser = argparse.ArgumentParser(description="Agente de host de la flota de bots")
+    parser.add_argument("--host", default=None, help="Dirección de escucha")
+    parser.add_argument("--port", type=int, default=None, help="Puerto de escucha")
+    args = parser.parse_args()
+
+    config = _load_config()
+    agent_config = config.get('agent', {})
+    token = os.getenv(agent_config.get('token_env', 'AGENT_TOKEN')) or agent_config.get('token')
+    host = args.host or os.getenv('AGENT_HOST', agent_config.get('host', '127.0.0.1'))
+    port = args.port or int(os.getenv('AGENT_PORT', agent_config.get('port', 5101)))
+
+    if not token:
+        from api.utils.logging_config import setup_logging, stop_logging
+        setup_logging(_log_config(config))
+        logger.error("Token de agente no configurado (AGENT_TOKEN o 'agent.token')")
+        stop_logging()
+        sys.exit(1)
+
+    options = {
+        'bind': f"{host}:{port}",
+        # Un solo worker: los bots, su supervisor y las versiones viven en un proceso
+        'workers': 1,
+        'worker_class': 'gthread',
+        'threads': int(agent_config.get('threads', 8)),
+        'timeout': int(agent_config.get('timeout_seconds', 150)),
+        'graceful_timeout': int(agent_config.get('graceful_timeout_seconds', 30)),
+        'keepalive': int(agent_config.get('keepalive_seconds', 5)),
+        'accesslog': None,
+        'errorlog': '-',
+        'loglevel': os.getenv('LOG_LEVEL', config.get('log_level', 'INFO')).lower(),
+        'proc_name': 'trading-bots-agent',
+        'worker_exit': _worker_exit,
+    }
+    if agent_config.get('certfile') and agent_config.get('keyfile'):
+        options.update(certfile=agent_config['certfile'], keyfile=agent_config['keyfile'])
+    elif host not in ('127.0.0.1', 'localhost', '::1'):
+        print(f"Aviso: el agente escucha en {host} sin TLS; el token viaja en claro "
+              f"(configure agent.certfile/agent.keyfile o use una red privada)", file=sys.stderr)
+
+    AgentServer(options, lambda: _load_worker(config, token)).run()
+
+if __name__ == '__main__':
+    # Ejecutar desde el módulo importado para que los registros usen su nombre (api.agent)
+    from api import agent
+    agent.main()
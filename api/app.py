@@ -4,43 +4,26 @@ import json
 import os
 import sys
 import logging
-from datetime import datetime
 from dotenv import load_dotenv
 from werkzeug.middleware.proxy_fix import ProxyFix
 
-# Configurar logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler('api.log')
-    ]
-)
-logger = logging.getLogger(__name__)
-
 # Cargar variables de entorno desde .env
 load_dotenv()
 
 # Añadir el directorio raíz al path para importar módulos
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-# Importar rutas y middleware
-from api.routes.bot_routes import bot_routes
-from api.routes.webhook_routes import webhook_routes
-from api.middleware.auth import auth_middleware
-from api.middleware.logging import logging_middleware, log_response
-from api.utils.error_handler import register_error_handlers, APIError
+from api.utils.logging_config import setup_logging
 
 # Cargar configuración
+config_error = None
+config_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 
+                        'config', 'api_config.json')
 try:
-    config_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 
-                            'config', 'api_config.json')
     with open(config_path, 'r') as f:
         config = json.load(f)
-    logger.info(f"Configuración cargada desde {config_path}")
 except Exception as e:
-    logger.error(f"Error al cargar la configuración: {str(e)}")
+    config_error = e
     # Configuración por defecto
     config = {
         "host": "0.0.0.0",
@@ -49,6 +32,113 @@ except Exception as e:
         "allowed_origins": ["*"]
     }
 
+# Configurar logging (una sola vez para toda la aplicación, sin E/S en los hilos de las solicitudes)
+setup_logging(config)
+logger = logging.getLogger(__name__)
+
+if config_error:
+    logger.error(f"Error al cargar la configuración: {str(config_error)}")
+else:
+    logger.info(f"Configuración cargada desde {config_path}")
+
+# Importar rutas y middleware
+from api.routes.bot_routes import bot_routes, bot_service
+from api.routes.webhook_routes import webhook_routes, webhook_queue, configure_webhooks
+from api.routes.metrics_routes import metrics_routes
+from api.routes.admin_routes import admin_routes
+from api.routes.batch_routes import batch_routes, configure_batch
+from api.routes.health_routes import health_routes, configure_health
+from api.routes.event_routes import event_routes
+from api.middleware.auth import auth_middleware, configure_auth
+from api.middleware.rate_limit import rate_limit_middleware, configure_rate_limit
+from api.middleware.logging import logging_middleware, log_response, mark_handler_start, configure_access_log
+from api.middleware.metrics import metrics_middleware, record_response, metrics_teardown
+from api.utils.error_handler import register_error_handlers, APIError
+from api.utils.metrics import metrics, configure_metrics
+from api.utils.event_store import event_store, configure_events
+from api.utils.warm_start import warm_start, configure_warm_start
+from api.utils.timing import add_server_timing, configure_timing
+from api.utils.profiler import configure_profiler
+from api.utils.serialization import configure_serialization
+from api.utils.compression import compress_response, configure_compression
+from api.utils.logging_config import restart_listener, stop_logging
+from api.utils.lifecycle import on_worker_start, on_worker_exit, run_worker_start
+from api.utils.health import health_monitor
+from api.services.supervisor import configure_supervisor, start_supervisor_tasks, stop_supervisor_tasks
+from api.services.fleet import fleet_service, configure_fleet
+
+# Configurar autenticación (caché de tokens y secreto JWT)
+configure_auth(config)
+
+# Configurar límite de solicitudes (contadores compartidos entre workers)
+configure_rate_limit(config)
+
+# Configurar access log estructurado (muestreo y solicitudes lentas)
+configure_access_log(config)
+
+# Configurar métricas (agregadas entre workers mediante un directorio compartido)
+configure_metrics(config)
+
+# Configurar historial de eventos (SQLite, escritura por lotes en segundo plano)
+configure_events(config)
+
+# Configurar medición de etapas (encabezado Server-Timing opcional)
+configure_timing(config)
+
+# Configurar perfilador bajo demanda
+configure_profiler(config)
+
+# Configurar compresión de respuestas (gzip/brotli/zstd según Accept-Encoding)
+configure_compression(config)
+
+# Configurar servicio de bots (instantánea de estado compartida)
+bot_service.configure(config)
+
+# Configurar instantánea de arranque en caliente (estado derivado de BotService)
+configure_warm_start(config)
+warm_start.register("bot_service", lambda: bot_service.export_warm_state(warm_start.max_file_bytes),
+                    bot_service.restore_warm_state)
+
+# Configurar supervisor de procesos de los bots (en proceso o en un proceso aparte)
+configure_supervisor(config, bot_service)
+
+# Configurar agentes de otros hosts (lecturas en paralelo con caché stale-while-revalidate)
+configure_fleet(config)
+
+# Configurar cola persistente de webhooks
+configure_webhooks(config)
+
+# Configurar endpoint de lotes (tamaño máximo y lecturas en paralelo)
+configure_batch(config)
+
+# Configurar comprobaciones de salud (se ejecutan en segundo plano en cada worker)
+configure_health(config, config_error)
+
+# Tareas por worker: con preload_app se ejecutan tras el fork, no en el maestro
+on_worker_start(restart_listener)
+# Restaurar la instantánea antes de precalentar: solo se recalcula lo que ha cambiado
+on_worker_start(warm_start.load)
+on_worker_start(bot_service.warmup)
+on_worker_exit(stop_logging)
+on_worker_exit(metrics.flush)
+on_worker_exit(event_store.stop)
+on_worker_exit(fleet_service.stop)
+# Registrado el último para ejecutarse el primero al salir: terminar el
+# elemento en curso mientras el logging y las métricas siguen activos
+on_worker_start(webhook_queue.start)
+on_worker_exit(webhook_queue.stop)
+# Tras el resto: la primera comprobación ya ve el consumidor de webhooks en marcha
+on_worker_start(health_monitor.start)
+on_worker_exit(health_monitor.stop)
+# Muestreo de recursos y reinicio de los bots (solo si el supervisor vive en este proceso)
+on_worker_start(start_supervisor_tasks)
+on_worker_exit(stop_supervisor_tasks)
+# Guardado periódico de la instantánea (y uno final al salir); el último
+# gancho de inicio mide el tiempo de arranque del worker
+on_worker_start(warm_start.start)
+on_worker_exit(warm_start.stop)
+on_worker_start(warm_start.ready)
+
 # Inicializar Flask
 app = Flask(__name__)
 
@@ -58,39 +148,42 @@ app.wsgi_app = ProxyFix(app.wsgi_app, x_for=1, x_proto=1, x_host=1, x_prefix=1)
 # Configurar CORS
 CORS(app, resources={r"/api/*": {"origins": config.get('allowed_origins', ['*'])}})
 
+# Configurar codificador JSON (orjson si está instalado)
+configure_serialization(app, config)
+
 # Registrar middleware
 @app.before_request
 def before_request():
+    metrics_middleware()
+    logging_middleware()
     auth_result = auth_middleware()
     if auth_result:
         return auth_result
-    logging_middleware()
+    rate_limit_middleware()
+    mark_handler_start()
 
 # Registrar after_request para logging
 @app.after_request
 def after_request(response):
+    record_response(response)
+    add_server_timing(response)
+    compress_response(response)
     return log_response(response)
 
+# Registrar teardown para métricas (solicitudes terminadas con excepción)
+app.teardown_request(metrics_teardown)
+
 # Registrar manejadores de errores
 register_error_handlers(app)
 
 # Registrar rutas
 app.register_blueprint(bot_routes, url_prefix='/api')
 app.register_blueprint(webhook_routes, url_prefix='/api')
-
-# Ruta de salud
-@app.route('/api/health', methods=['GET'])
-def health_check():
-    version = "1.0.0"
-    start_time = os.getenv('API_START_TIME', datetime.now().isoformat())
-    
-    return jsonify({
-        "success": True,
-        "status": "ok",
-        "version": version,
-        "uptime": f"Desde {start_time}",
-        "environment": os.getenv('FLASK_ENV', 'production')
-    })
+app.register_blueprint(metrics_routes, url_prefix='/api')
+app.register_blueprint(admin_routes, url_prefix='/api')
+app.register_blueprint(batch_routes, url_prefix='/api')
+app.register_blueprint(health_routes, url_prefix='/api')
+app.register_blueprint(event_routes, url_prefix='/api')
 
 # Ruta para documentación
 @app.route('/api/docs', methods=['GET'])
@@ -112,8 +205,8 @@ def not_found(e):
     }), 404
 
 if __name__ == '__main__':
-    # Registrar tiempo de inicio
-    os.environ['API_START_TIME'] = datetime.now().isoformat()
+    # Descartar métricas de ejecuciones anteriores
+    metrics.clear_directory()
     
     # Detectar si estamos detrás de un proxy
     behind_proxy = os.getenv('BEHIND_PROXY', 'false').lower() == 'true'
@@ -126,4 +219,6 @@ if __name__ == '__main__':
     debug = os.getenv('API_DEBUG', 'False').lower() == 'true'
     
     logger.info(f"Iniciando API en {host}:{port} (debug: {debug})")
+    logger.warning("Servidor de desarrollo: en producción usa 'gunicorn -c gunicorn.conf.py api.wsgi:app'")
+    run_worker_start()
     app.run(host=host, port=port, debug=debug)
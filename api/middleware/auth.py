@@ -1,101 +1,298 @@
 from flask import request, jsonify
 import os
 import jwt
+import time
+import hashlib
 import logging
+import threading
+from collections import OrderedDict
 from functools import wraps
 from datetime import datetime, timedelta
+from api.utils.timing import span
 
 # Configurar logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Rutas públicas que no requieren autenticación (búsqueda O(1))
+PUBLIC_ROUTES = frozenset([
+    '/api/health',
+    '/api/health/live',
+    '/api/health/ready',
+    '/api/docs',
+    '/api/webhooks/binance',
+    '/api/webhooks/telegram',
+    '/api/webhooks/trading-view'
+])
+
+# Prefijos públicos; str.startswith acepta una tupla y compara en C
+PUBLIC_PREFIXES = ()
+
+def is_public_route(path):
+    """
+    Indica si una ruta puede accederse sin autenticación.
+
+    Args:
+        path (str): Ruta de la solicitud.
+
+    Returns:
+        bool: True si la ruta es pública.
+    """
+    return path in PUBLIC_ROUTES or (bool(PUBLIC_PREFIXES) and path.startswith(PUBLIC_PREFIXES))
+
+class TokenCache:
+    """
+    Caché LRU de tokens JWT ya verificados.
+
+    Las entradas se indexan por el digest SHA-256 del token (nunca se guarda el
+    token en claro) y almacenan los claims decodificados hasta el primero de
+    'exp' o el TTL máximo configurado.
+    """
+
+    def __init__(self, max_entries=1024, max_ttl=300):
+        """
+        Inicializa la caché.
+
+        Args:
+            max_entries (int): Número máximo de tokens en caché (0 la desactiva).
+            max_ttl (float): Tiempo máximo en segundos que se confía en una entrada.
+        """
+        self.max_entries = max_entries
+        self.max_ttl = max_ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def digest(token):
+        """Calcula la clave de caché de un token."""
+        return hashlib.sha256(token.encode('utf-8')).digest()
+
+    def get(self, key, now=None):
+        """
+        Obtiene los claims de un token si siguen vigentes.
+
+        Args:
+            key (bytes): Digest del token.
+            now (float, optional): Marca de tiempo actual (epoch).
+
+        Returns:
+            dict: Claims del token o None si no está en caché o ha caducado.
+        """
+        if self.max_entries <= 0:
+            return None
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, claims = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return claims
+
+    def put(self, key, claims, now=None):
+        """
+        Guarda los claims de un token verificado.
+
+        Args:
+            key (bytes): Digest del token.
+            claims (dict): Claims decodificados.
+            now (float, optional): Marca de tiempo actual (epoch).
+        """
+        if self.max_entries <= 0:
+            return
+        now = time.time() if now is None else now
+        expires_at = now + self.max_ttl
+        exp = claims.get('exp')
+        if isinstance(exp, (int, float)):
+            expires_at = min(expires_at, exp)
+        if expires_at <= now:
+            return
+        with self._lock:
+            self._entries[key] = (expires_at, claims)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Vacía la caché (por ejemplo, tras rotar el secreto)."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+class JWTSecret:
+    """
+    Secreto JWT cargado una sola vez y recargado cuando se rota.
+
+    El valor se toma de la variable de entorno JWT_SECRET. Si se define
+    JWT_SECRET_FILE, el secreto se lee de ese archivo y se vuelve a cargar cuando
+    cambia su fecha de modificación (comprobada como máximo cada
+    'check_interval' segundos).
+    """
+
+    def __init__(self, check_interval=30, on_rotate=None):
+        """
+        Inicializa el secreto.
+
+        Args:
+            check_interval (float): Segundos entre comprobaciones del archivo.
+            on_rotate (callable, optional): Función llamada cuando cambia el secreto.
+        """
+        self.check_interval = check_interval
+        self.on_rotate = on_rotate
+        self._lock = threading.Lock()
+        self._value = None
+        self._file_mtime = None
+        self._next_check = 0.0
+        self.reload()
+
+    def _read(self):
+        secret_file = os.getenv('JWT_SECRET_FILE')
+        if secret_file:
+            try:
+                mtime = os.stat(secret_file).st_mtime
+                if mtime == self._file_mtime and self._value is not None:
+                    return self._value, mtime
+                with open(secret_file, 'r') as f:
+                    return f.read().strip(), mtime
+            except OSError as e:
+                logger.error(f"Error al leer JWT_SECRET_FILE {secret_file}: {str(e)}")
+        return os.getenv('JWT_SECRET', 'default_secret_key'), None
+
+    def reload(self):
+        """
+        Vuelve a leer el secreto y notifica si ha cambiado.
+
+        Returns:
+            bool: True si el secreto ha cambiado.
+        """
+        with self._lock:
+            value, mtime = self._read()
+            self._file_mtime = mtime
+            self._next_check = time.monotonic() + self.check_interval
+            changed = self._value is not None and value != self._value
+            self._value = value
+        if changed:
+            logger.info("Secreto JWT rotado; se invalida la caché de tokens")
+            if self.on_rotate:
+                self.on_rotate()
+        return changed
+
+    def get(self):
+        """
+        Devuelve el secreto vigente.
+
+        Returns:
+            str: Secreto JWT.
+        """
+        if os.getenv('JWT_SECRET_FILE') and time.monotonic() >= self._next_check:
+            self.reload()
+        return self._value
+
+# Estado del middleware (configurable mediante configure_auth)
+token_cache = TokenCache()
+jwt_secret = JWTSecret(on_rotate=token_cache.clear)
+
+def configure_auth(config):
+    """
+    Aplica la configuración de autenticación de api_config.json.
+
+    Args:
+        config (dict): Configuración de la API. Se usa la sección 'auth':
+            token_cache_size, token_cache_ttl_seconds y
+            secret_check_interval_seconds.
+    """
+    auth_config = config.get('auth', {})
+    token_cache.max_entries = int(auth_config.get('token_cache_size', token_cache.max_entries))
+    token_cache.max_ttl = float(auth_config.get('token_cache_ttl_seconds', token_cache.max_ttl))
+    jwt_secret.check_interval = float(
+        auth_config.get('secret_check_interval_seconds', jwt_secret.check_interval)
+    )
+    token_cache.clear()
+    jwt_secret.reload()
+
+def _auth_error(message, status_code=401, error="No autorizado"):
+    return jsonify({
+        "success": False,
+        "error": error,
+        "message": message
+    }), status_code
+
+@span("auth")
 def auth_middleware():
     """
     Middleware de autenticación para proteger rutas de la API.
-    
+
     Verifica que las solicitudes incluyan un token JWT válido en el encabezado
-    'Authorization' con el formato 'Bearer <token>'.
-    
+    'Authorization' con el formato 'Bearer <token>'. Los tokens ya verificados
+    se sirven desde una caché LRU sin volver a comprobar la firma.
+
     Returns:
         None si la autenticación es exitosa, o una respuesta JSON con error si falla.
     """
-    # Rutas públicas que no requieren autenticación
-    public_routes = [
-        '/api/health',
-        '/api/docs',
-        '/api/webhooks/binance',
-        '/api/webhooks/telegram',
-        '/api/webhooks/trading-view'
-    ]
-    
     # Verificar si la ruta es pública
-    if request.path in public_routes:
+    if is_public_route(request.path):
         return None
-    
+
     # Obtener token del encabezado Authorization
     auth_header = request.headers.get('Authorization', '')
-    
+
     if not auth_header.startswith('Bearer '):
         logger.warning(f"Intento de acceso sin token a {request.path}")
-        return jsonify({
-            "success": False,
-            "error": "No autorizado",
-            "message": "Se requiere token de autenticación"
-        }), 401
-    
-    token = auth_header.split(' ')[1]
-    
+        return _auth_error("Se requiere token de autenticación")
+
+    token = auth_header[7:].strip()
+
+    # Comprobar la rotación del secreto antes de la caché: al rotar se vacía
+    # y los tokens firmados con el secreto anterior dejan de aceptarse ya
+    secret = jwt_secret.get()
+
+    # Camino rápido: token ya verificado y vigente
+    now = time.time()
+    cache_key = TokenCache.digest(token)
+    payload = token_cache.get(cache_key, now)
+    if payload is not None:
+        request.user = dict(payload)
+        return None
+
     try:
-        # Verificar y decodificar el token
-        secret_key = os.getenv('JWT_SECRET', 'default_secret_key')
-        payload = jwt.decode(token, secret_key, algorithms=['HS256'])
-        
-        # Verificar expiración (opcional, JWT ya lo hace por defecto)
-        if 'exp' in payload and datetime.fromtimestamp(payload['exp']) < datetime.now():
-            logger.warning(f"Intento de acceso con token expirado a {request.path}")
-            return jsonify({
-                "success": False,
-                "error": "No autorizado",
-                "message": "Token expirado"
-            }), 401
-        
+        # Verificar y decodificar el token (jwt.decode ya valida 'exp')
+        payload = jwt.decode(token, secret, algorithms=['HS256'])
+        token_cache.put(cache_key, payload, now)
+
         # Almacenar información del usuario en el contexto de la solicitud
         # para que esté disponible en los controladores
-        request.user = payload
-        
+        request.user = dict(payload)
+
         # Autenticación exitosa
         return None
     except jwt.ExpiredSignatureError:
         logger.warning(f"Intento de acceso con token expirado a {request.path}")
-        return jsonify({
-            "success": False,
-            "error": "No autorizado",
-            "message": "Token expirado"
-        }), 401
+        return _auth_error("Token expirado")
     except jwt.InvalidTokenError:
         logger.warning(f"Intento de acceso con token inválido a {request.path}")
-        return jsonify({
-            "success": False,
-            "error": "No autorizado",
-            "message": "Token inválido"
-        }), 401
+        return _auth_error("Token inválido")
     except Exception as e:
         logger.error(f"Error en autenticación: {str(e)}")
-        return jsonify({
-            "success": False,
-            "error": "Error de servidor",
-            "message": "Error al procesar la autenticación"
-        }), 500
+        return _auth_error("Error al procesar la autenticación", 500, "Error de servidor")
 
 def generate_token(user_id, role='user', expires_in=24):
     """
     Genera un token JWT para un usuario.
-    
+
     Args:
         user_id (str): ID del usuario.
         role (str): Rol del usuario ('user', 'admin', etc.).
         expires_in (int): Tiempo de expiración en horas.
-        
+
     Returns:
         str: Token JWT generado.
     """
@@ -107,7 +304,7 @@ def generate_token(user_id, role='user', expires_in=24):
             'exp': datetime.utcnow() + timedelta(hours=expires_in),
             'iat': datetime.utcnow()
         }
-        
+
         token = jwt.encode(payload, secret_key, algorithm='HS256')
         return token
     except Exception as e:
@@ -1,62 +1,164 @@
 from flask import request
+import json
 import logging
+import random
 import time
 import uuid
-import os
-from datetime import datetime
+from datetime import datetime, timezone
 
 # Configurar logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'api.log'))
-    ]
-)
 logger = logging.getLogger(__name__)
 
+# Logger dedicado al access log estructurado (una línea JSON por solicitud)
+access_logger = logging.getLogger('api.access')
+
+class AccessLogConfig:
+    """
+    Configuración del access log: muestreo por ruta y umbral de solicitudes lentas.
+    """
+
+    def __init__(self):
+        self.enabled = True
+        self.default_sample_rate = 1.0
+        self.sample_rates = {}
+        self.slow_threshold_ms = 1000.0
+        self.always_log_errors = True
+
+    def configure(self, config):
+        """
+        Aplica la sección 'access_log' de api_config.json.
+
+        Args:
+            config (dict): Configuración de la API.
+        """
+        access_config = config.get('access_log', {})
+        self.enabled = bool(access_config.get('enabled', True))
+        self.default_sample_rate = float(access_config.get('default_sample_rate', 1.0))
+        self.sample_rates = {
+            route: float(rate) for route, rate in access_config.get('sample_rates', {}).items()
+        }
+        self.slow_threshold_ms = float(access_config.get('slow_threshold_ms', 1000))
+        self.always_log_errors = bool(access_config.get('always_log_errors', True))
+
+    def sample_rate(self, route):
+        """Devuelve la tasa de muestreo (0-1) de una plantilla de ruta."""
+        return self.sample_rates.get(route, self.default_sample_rate)
+
+access_log_config = AccessLogConfig()
+
+def configure_access_log(config):
+    """
+    Configura el access log estructurado.
+
+    Args:
+        config (dict): Configuración de la API.
+    """
+    access_log_config.configure(config)
+
+class _JSONMessage:
+    """
+    Mensaje de log que se serializa a JSON de forma perezosa.
+
+    La serialización ocurre cuando el hilo del QueueListener formatea el
+    registro, no en el hilo de la solicitud.
+    """
+
+    __slots__ = ('data',)
+
+    def __init__(self, data):
+        self.data = data
+
+    def __str__(self):
+        return json.dumps(self.data, ensure_ascii=False, separators=(',', ':'))
+
 def logging_middleware():
     """
     Middleware de logging para registrar información sobre las solicitudes.
-    
-    Registra detalles como método HTTP, ruta, dirección IP, tiempo de respuesta, etc.
+
+    Asigna un ID a la solicitud (respetando X-Request-ID si lo envía el proxy)
+    y marca su inicio para calcular la duración y el desglose por etapas.
     """
     # Generar un ID único para la solicitud
-    request_id = str(uuid.uuid4())
-    request.request_id = request_id
-    
-    # Registrar inicio de la solicitud
-    start_time = time.time()
-    
+    request.request_id = request.headers.get('X-Request-ID') or uuid.uuid4().hex
+
     # Almacenar tiempo de inicio para calcular duración
-    request.start_time = start_time
-    
-    # Registrar detalles de la solicitud
-    logger.info(f"[{request_id}] Solicitud iniciada: {request.method} {request.path} desde {request.remote_addr}")
-    
-    # Los datos de la solicitud se registrarán al finalizar en el after_request
-    
+    request.start_time = time.perf_counter()
+    request.stages = {}
+
     # No es necesario devolver nada, ya que este middleware no interrumpe el flujo
 
+def mark_handler_start():
+    """
+    Marca el final del middleware y el inicio del controlador de la ruta.
+
+    Permite separar en el access log el tiempo de middleware (auth, límites)
+    del tiempo del controlador.
+    """
+    request.handler_start = time.perf_counter()
+
+def _stage_breakdown(end):
+    """Calcula el desglose por etapas (ms) de la solicitud actual."""
+    start = getattr(request, 'start_time', end)
+    handler_start = getattr(request, 'handler_start', None)
+    stages = {}
+    if handler_start is not None:
+        stages['middleware'] = round((handler_start - start) * 1000, 3)
+        stages['handler'] = round((end - handler_start) * 1000, 3)
+    for name, duration in getattr(request, 'stages', {}).items():
+        stages[name] = round(duration * 1000, 3)
+    return stages
+
 def log_response(response):
     """
     Función para registrar información sobre la respuesta.
-    
+
+    Emite un registro JSON estructurado en el logger 'api.access'. Las
+    solicitudes se muestrean según su ruta, salvo las lentas (que siempre se
+    registran con su desglose por etapas) y, opcionalmente, las erróneas.
+
     Args:
         response: Objeto de respuesta Flask.
-        
+
     Returns:
         La misma respuesta sin modificar.
     """
-    # Calcular duración de la solicitud
-    duration = time.time() - getattr(request, 'start_time', time.time())
-    request_id = getattr(request, 'request_id', 'unknown')
-    
-    # Registrar detalles de la respuesta
-    logger.info(
-        f"[{request_id}] Solicitud completada: {request.method} {request.path} "
-        f"- Estado: {response.status_code} - Duración: {duration:.4f}s"
-    )
-    
+    request_id = getattr(request, 'request_id', None)
+    if request_id:
+        response.headers['X-Request-ID'] = request_id
+
+    if not access_log_config.enabled:
+        return response
+
+    end = time.perf_counter()
+    duration_ms = (end - getattr(request, 'start_time', end)) * 1000
+    route = request.url_rule.rule if request.url_rule else None
+    status = response.status_code
+
+    slow = duration_ms >= access_log_config.slow_threshold_ms
+    error = access_log_config.always_log_errors and status >= 400
+    if not (slow or error):
+        rate = access_log_config.sample_rate(route or request.path)
+        if rate < 1.0 and random.random() >= rate:
+            return response
+
+    user = getattr(request, 'user', None) or {}
+    record = {
+        "ts": datetime.now(timezone.utc).isoformat(),
+        "request_id": request_id,
+        "method": request.method,
+        "route": route,
+        "path": request.path,
+        "status": status,
+        "duration_ms": round(duration_ms, 3),
+        "bytes": response.content_length,
+        "client": request.remote_addr,
+        "user": user.get('sub') or user.get('user_id')
+    }
+    if slow:
+        record["slow"] = True
+        record["stages"] = _stage_breakdown(end)
+        access_logger.warning(_JSONMessage(record))
+    else:
+        access_logger.info(_JSONMessage(record))
+
     return response
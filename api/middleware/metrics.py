@@ -0,0 +1,49 @@
+from flask import request
+import time
+from api.utils.metrics import metrics
+from api.utils.warm_start import warm_start
+
+def metrics_middleware():
+    """
+    Middleware que marca el inicio de la solicitud para las métricas.
+
+    Incrementa el gauge de solicitudes en curso; record_response o
+    metrics_teardown lo decrementan al terminar.
+    """
+    request.metrics_start = time.perf_counter()
+    request.metrics_done = False
+    metrics.gauge_add("http_requests_in_flight", 1)
+
+def record_response(response):
+    """
+    Registra la latencia y el estado de la respuesta por plantilla de ruta.
+
+    Args:
+        response: Objeto de respuesta Flask.
+
+    Returns:
+        La misma respuesta sin modificar.
+    """
+    start = getattr(request, 'metrics_start', None)
+    if start is None or request.metrics_done:
+        return response
+    request.metrics_done = True
+
+    route = request.url_rule.rule if request.url_rule else "unmatched"
+    duration = time.perf_counter() - start
+    metrics.observe("http_request_duration_seconds", duration, route=route, method=request.method)
+    # Coste de la primera solicitud tras arrancar (arranque en caliente o en frío)
+    warm_start.observe_request(route, duration)
+    metrics.inc("http_requests_total", route=route, method=request.method,
+                status=str(response.status_code))
+    metrics.gauge_add("http_requests_in_flight", -1)
+    return response
+
+def metrics_teardown(exc=None):
+    """
+    Garantiza que el gauge de solicitudes en curso se decremente aunque la
+    solicitud termine con una excepción no gestionada.
+    """
+    if getattr(request, 'metrics_start', None) is not None and not request.metrics_done:
+        request.metrics_done = True
+        metrics.gauge_add("http_requests_in_flight", -1)
@@ -0,0 +1,315 @@
+"""
+Limitador de solicitudes basado en token bucket.
+
+Los contadores viven en un archivo mapeado en memoria (mmap) compartido por
+todos los workers de gunicorn, de modo que el límite de api_config.json se
+respeta globalmente y no por proceso.
+"""
+
+import os
+import stat
+import math
+import mmap
+import time
+import struct
+import hashlib
+import logging
+import threading
+from flask import request
+from api.utils.error_handler import APIError
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin bloqueo entre procesos
+    fcntl = None
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+class SharedBucketStore:
+    """
+    Tabla hash de buckets de tamaño fijo almacenada en un archivo mmap.
+
+    Cada slot guarda (hash de la clave, tokens disponibles, última recarga).
+    El acceso se serializa con un lock de hilo y un lock POSIX (lockf) sobre el
+    archivo, que es por proceso y por tanto válido también tras un fork. El
+    archivo no se abre a través de un enlace simbólico ni si pertenece a otro
+    usuario: quien pudiera escribirlo controlaría los límites de la API.
+    """
+
+    SLOT = struct.Struct('<Qdd')
+    MAX_PROBES = 16
+
+    def __init__(self, path, slots=4096):
+        """
+        Abre (o crea) el almacén compartido.
+
+        Args:
+            path (str): Ruta del archivo de contadores.
+            slots (int): Número de claves distintas que se pueden seguir a la vez.
+
+        Raises:
+            OSError: Si no se puede abrir, es un enlace simbólico, no es un
+                archivo regular o pertenece a otro usuario.
+        """
+        self.path = path
+        self.slots = slots
+        self._lock = threading.Lock()
+        size = self.SLOT.size * slots
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT | getattr(os, 'O_NOFOLLOW', 0), 0o600)
+        try:
+            info = os.fstat(self._fd)
+            if not stat.S_ISREG(info.st_mode):
+                raise OSError(f"{path} no es un archivo regular")
+            if hasattr(os, 'getuid') and info.st_uid != os.getuid():
+                raise PermissionError(f"{path} pertenece a otro usuario (uid {info.st_uid})")
+            if info.st_size < size:
+                os.ftruncate(self._fd, size)
+        except OSError:
+            os.close(self._fd)
+            raise
+        self._mm = mmap.mmap(self._fd, size)
+
+    @staticmethod
+    def _hash(key):
+        value = int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'little')
+        return value or 1
+
+    def _find_slot(self, key_hash):
+        """Devuelve (offset, existe) del slot para la clave, desalojando el más antiguo si hace falta."""
+        unpack_from = self.SLOT.unpack_from
+        oldest_offset, oldest_ts = None, None
+        for probe in range(self.MAX_PROBES):
+            offset = ((key_hash + probe) % self.slots) * self.SLOT.size
+            slot_hash, _, last = unpack_from(self._mm, offset)
+            if slot_hash == key_hash:
+                return offset, True
+            if slot_hash == 0:
+                return offset, False
+            if oldest_ts is None or last < oldest_ts:
+                oldest_offset, oldest_ts = offset, last
+        return oldest_offset, False
+
+    def consume(self, key, cost, capacity, refill_rate, now=None):
+        """
+        Intenta consumir 'cost' tokens del bucket de una clave.
+
+        Args:
+            key (str): Identificador del cliente.
+            cost (float): Tokens a consumir.
+            capacity (float): Tamaño máximo del bucket (ráfaga permitida).
+            refill_rate (float): Tokens recuperados por segundo.
+            now (float, optional): Marca de tiempo actual (epoch).
+
+        Returns:
+            tuple: (permitido, segundos hasta poder reintentar, tokens restantes).
+        """
+        now = time.time() if now is None else now
+        key_hash = self._hash(key)
+        with self._lock:
+            if fcntl:
+                fcntl.lockf(self._fd, fcntl.LOCK_EX)
+            try:
+                offset, exists = self._find_slot(key_hash)
+                if exists:
+                    _, tokens, last = self.SLOT.unpack_from(self._mm, offset)
+                    tokens = min(capacity, tokens + max(0.0, now - last) * refill_rate)
+                else:
+                    tokens = capacity
+
+                if tokens >= cost:
+                    tokens -= cost
+                    allowed, retry_after = True, 0
+                else:
+                    allowed = False
+                    retry_after = max(1, math.ceil((cost - tokens) / refill_rate))
+
+                self.SLOT.pack_into(self._mm, offset, key_hash, tokens, now)
+                return allowed, retry_after, tokens
+            finally:
+                if fcntl:
+                    fcntl.lockf(self._fd, fcntl.LOCK_UN)
+
+class RateLimiter:
+    """
+    Limitador por cliente (sujeto del JWT o IP) con pesos por ruta.
+
+    Las rutas asignadas a un bucket con nombre (sección 'buckets', p. ej. los
+    webhooks) tienen su propio límite y contador por cliente, independiente
+    del general.
+    """
+
+    def __init__(self, enabled=False, requests_per_minute=60, burst=None,
+                 route_weights=None, exempt_routes=None, store=None):
+        """
+        Inicializa el limitador.
+
+        Args:
+            enabled (bool): Si el límite está activo.
+            requests_per_minute (float): Tokens recuperados por minuto.
+            burst (float, optional): Capacidad del bucket; por defecto requests_per_minute.
+            route_weights (dict, optional): Coste por plantilla de ruta (ej. '/api/bots/<bot_id>/signals').
+            exempt_routes (list, optional): Plantillas de ruta que no consumen tokens.
+            store (SharedBucketStore, optional): Almacén de contadores.
+        """
+        # Buckets con nombre: nombre -> (solicitudes por minuto, capacidad); ruta -> nombre
+        self.buckets = {}
+        self.route_buckets = {}
+        self.enabled = enabled
+        self.requests_per_minute = float(requests_per_minute)
+        self.capacity = float(burst or requests_per_minute)
+        self.route_weights = dict(route_weights or {})
+        self.exempt_routes = frozenset(exempt_routes or [])
+        self.store = store
+        # Rutas que calculan y cobran su propio coste con check(cost=...)
+        self.deferred_routes = set()
+
+    def configure(self, config):
+        """
+        Aplica la sección 'rate_limit' de api_config.json.
+
+        Args:
+            config (dict): Configuración de la API.
+        """
+        rl_config = config.get('rate_limit', {})
+        self.enabled = bool(rl_config.get('enabled', False))
+        if os.getenv('RATE_LIMIT_ENABLED') is not None:
+            self.enabled = os.getenv('RATE_LIMIT_ENABLED').lower() in ('1', 'true', 'yes')
+        self.requests_per_minute = float(rl_config.get('requests_per_minute', 60))
+        self.capacity = float(rl_config.get('burst') or self.requests_per_minute)
+        self.route_weights = dict(rl_config.get('route_weights') or {})
+        self.exempt_routes = frozenset(rl_config.get('exempt_routes') or [])
+        self.buckets, self.route_buckets = {}, {}
+        for name, bucket in (rl_config.get('buckets') or {}).items():
+            rpm = float(bucket.get('requests_per_minute', 0))
+            if rpm <= 0:
+                logger.warning(f"Bucket de límite '{name}' sin requests_per_minute válido; sus rutas usan el general")
+                continue
+            self.buckets[name] = (rpm, float(bucket.get('burst') or rpm))
+            for rule in bucket.get('routes') or []:
+                self.route_buckets[rule] = name
+        self.store = None
+        if self.enabled and self.requests_per_minute <= 0:
+            # Sin recarga no habría tiempo de reintento posible
+            logger.warning("rate_limit.requests_per_minute debe ser mayor que 0; límite desactivado")
+            self.enabled = False
+        if self.enabled:
+            path = os.getenv('RATE_LIMIT_STORE', rl_config.get(
+                'store_path', os.path.join(REPO_ROOT, 'data', 'ratelimit.bin')
+            ))
+            self.store = SharedBucketStore(path, int(rl_config.get('slots', 4096)))
+
+    def client_key(self):
+        """
+        Obtiene la clave del cliente de la solicitud actual.
+
+        Returns:
+            str: 'user:<id>' si hay un JWT válido, o 'ip:<dirección>' en otro caso.
+        """
+        user = getattr(request, 'user', None)
+        if user:
+            subject = user.get('sub') or user.get('user_id')
+            if subject:
+                return f"user:{subject}"
+        return f"ip:{request.remote_addr}"
+
+    def route_weight(self, rule):
+        """Devuelve el coste de una plantilla de ruta (1 por defecto, 0 si está exenta)."""
+        if rule in self.exempt_routes:
+            return 0.0
+        return float(self.route_weights.get(rule, 1))
+
+    def defer(self, rule):
+        """
+        Excluye una ruta del cobro automático del middleware.
+
+        La ruta debe llamar a check(cost=...) por sí misma, por ejemplo para
+        cobrar de una vez el coste de varias operaciones.
+
+        Args:
+            rule (str): Plantilla de ruta (ej. '/api/batch').
+        """
+        self.deferred_routes.add(rule)
+
+    def check(self, cost=None, key=None):
+        """
+        Consume tokens para la solicitud actual.
+
+        Args:
+            cost (float, optional): Coste explícito; por defecto el peso de la ruta.
+            key (str, optional): Clave explícita; por defecto la del cliente actual.
+
+        Raises:
+            APIError: 429 con encabezado Retry-After si se supera el límite, o
+                413 si el coste explícito supera la capacidad del bucket (nunca
+                se podría cobrar).
+        """
+        if not self.enabled or self.store is None:
+            return
+        requests_per_minute, capacity = self.requests_per_minute, self.capacity
+        bucket = None
+        explicit = cost is not None
+        if cost is None:
+            rule = request.url_rule.rule if request.url_rule else request.path
+            if rule in self.exempt_routes or rule in self.deferred_routes:
+                return
+            cost = self.route_weight(rule)
+            bucket = self.route_buckets.get(rule)
+        key = key or self.client_key()
+        if bucket:
+            requests_per_minute, capacity = self.buckets[bucket]
+            key = f"{bucket}:{key}"
+
+        if explicit and cost > capacity:
+            # Ni con el bucket lleno alcanzaría: un 429 con Retry-After se repetiría siempre
+            raise APIError(
+                "Solicitud demasiado costosa",
+                413,
+                {"message": f"El coste de la solicitud ({cost:g}) supera la ráfaga máxima del límite ({capacity:g})",
+                 "cost": cost, "max_cost": capacity}
+            )
+
+        allowed, retry_after, _ = self.store.consume(
+            key, cost, capacity, requests_per_minute / 60.0
+        )
+        if not allowed:
+            logger.warning(f"Límite de solicitudes superado por {key} en {request.path}")
+            raise APIError(
+                "Demasiadas solicitudes",
+                429,
+                {"message": f"Límite de {int(requests_per_minute)} solicitudes por minuto superado",
+                 "retry_after": retry_after},
+                headers={"Retry-After": str(retry_after)}
+            )
+
+# Instancia global (configurable mediante configure_rate_limit)
+rate_limiter = RateLimiter()
+
+def configure_rate_limit(config):
+    """
+    Aplica la configuración de límite de solicitudes de api_config.json.
+
+    Args:
+        config (dict): Configuración de la API.
+    """
+    try:
+        rate_limiter.configure(config)
+    except OSError as e:
+        logger.error(f"No se pudo abrir el almacén de límites, límite desactivado: {str(e)}")
+        rate_limiter.enabled = False
+        rate_limiter.store = None
+
+def rate_limit_middleware():
+    """
+    Middleware que aplica el límite de solicitudes.
+
+    Debe ejecutarse después de auth_middleware para poder identificar al
+    cliente por el sujeto de su JWT.
+
+    Raises:
+        APIError: 429 si el cliente ha superado su límite.
+    """
+    rate_limiter.check()
@@ -1,11 +1,10 @@
 import os
 import json
 import logging
-import subprocess
 from datetime import datetime
+from api.services.supervisor import get_supervisor
 
 # Configurar logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class Bot:
@@ -32,7 +31,7 @@ class Bot:
         self.script_path = script_path
         self.status = status
         self.last_update = datetime.now().isoformat()
-        self.process = None
+        self.pid = None
         
     def to_dict(self):
         """
@@ -83,15 +82,11 @@ class Bot:
             if simulation:
                 cmd.extend(["--simulation", "--balance", str(balance)])
             
-            # Iniciar el proceso
-            self.process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
-            )
+            # Iniciar el proceso a través del supervisor, que lee su salida de
+            # forma continua (una tubería sin leer bloquea al bot al llenarse)
+            self.pid = get_supervisor().spawn(self.id, cmd)["pid"]
             
-            logger.info(f"Bot {self.id} iniciado con PID {self.process.pid}")
+            logger.info(f"Bot {self.id} iniciado con PID {self.pid}")
             self.status = "active"
             self.last_update = datetime.now().isoformat()
             return True
@@ -111,18 +106,13 @@ class Bot:
             return False
         
         try:
-            if self.process and self.process.poll() is None:
-                self.process.terminate()
-                self.process.wait(timeout=5)
-                
-                # Si el proceso no terminó, forzar cierre
-                if self.process.poll() is None:
-                    self.process.kill()
+            # SIGTERM y, si no termina en 5 segundos, SIGKILL
+            get_supervisor().terminate(self.id, timeout=5)
             
             logger.info(f"Bot {self.id} detenido")
             self.status = "inactive"
             self.last_update = datetime.now().isoformat()
-            self.process = None
+            self.pid = None
             return True
         except Exception as e:
             logger.error(f"Error al detener bot {self.id}: {str(e)}")
@@ -0,0 +1,64 @@
+from flask import Blueprint, jsonify, request, Response
+import logging
+from api.utils.error_handler import APIError
+from api.utils.profiler import profiler, ProfilerBusyError
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Crear blueprint
+admin_routes = Blueprint('admin_routes', __name__)
+
+def require_admin():
+    """
+    Verifica que el usuario autenticado tenga rol de administrador.
+
+    Raises:
+        APIError: 403 si el usuario no es administrador.
+    """
+    user = getattr(request, 'user', None) or {}
+    if user.get('role') != 'admin':
+        raise APIError("Prohibido", 403, {"message": "Se requiere rol de administrador"})
+
+@admin_routes.route('/admin/profile', methods=['POST'])
+def profile():
+    """
+    Ejecuta un perfilado por muestreo de todos los hilos del worker.
+
+    Parámetros de consulta:
+        seconds (float): Duración del perfilado (limitada por profiler.max_seconds).
+        top (int): Número de funciones en la tabla de funciones más costosas.
+        format (str): 'json' (por defecto) o 'collapsed' para texto compatible con flamegraph.pl.
+        idle (bool): Incluir hilos bloqueados en esperas.
+
+    Returns:
+        JSON con las pilas colapsadas y la tabla de funciones, o texto colapsado.
+    """
+    require_admin()
+
+    try:
+        seconds = float(request.args.get('seconds', 10))
+        top_n = int(request.args.get('top', 20))
+    except ValueError:
+        raise APIError("Parámetros inválidos", 400, {"message": "seconds y top deben ser numéricos"})
+    include_idle = request.args.get('idle', '0').lower() in ('1', 'true')
+
+    try:
+        result = profiler.profile(seconds, include_idle=include_idle)
+    except ProfilerBusyError as e:
+        raise APIError("Perfilado en curso", 409, {"message": str(e)})
+
+    collapsed = profiler.collapsed(result["stacks"])
+    if request.args.get('format') == 'collapsed':
+        return Response(collapsed + "\n", content_type='text/plain; charset=utf-8')
+
+    return jsonify({
+        "success": True,
+        "data": {
+            "seconds": result["seconds"],
+            "interval_ms": profiler.interval * 1000,
+            "samples": result["samples"],
+            "top": profiler.top(result["stacks"], top_n),
+            "collapsed": collapsed
+        }
+    }), 200
@@ -0,0 +1,258 @@
+from flask import Blueprint, jsonify, request, current_app
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl
+from werkzeug.datastructures import MultiDict
+from werkzeug.exceptions import HTTPException
+from api.middleware.rate_limit import rate_limiter
+from api.utils.error_handler import APIError
+from api.utils.metrics import metrics
+from api.utils.timing import span
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Crear blueprint
+batch_routes = Blueprint('batch_routes', __name__)
+
+# Plantilla completa de la ruta (el blueprint se registra con el prefijo /api)
+BATCH_RULE = '/api/batch'
+
+# Métodos admitidos en las subsolicitudes; solo las lecturas se ejecutan en paralelo
+BATCH_METHODS = ("GET", "POST")
+
+# Encabezados de la solicitud original que se propagan a cada subsolicitud
+FORWARDED_HEADERS = ("Authorization", "Accept", "Accept-Language")
+
+# Encabezados por elemento que el cliente puede enviar
+ITEM_HEADERS = ("If-None-Match", "If-Modified-Since")
+
+# Encabezados de la respuesta de cada elemento que se devuelven al cliente
+RESPONSE_HEADERS = ("ETag", "Last-Modified", "Retry-After")
+
+# La ruta cobra en el límite de solicitudes la suma de los pesos de sus elementos
+rate_limiter.defer(BATCH_RULE)
+
+class BatchConfig:
+    """Configuración del endpoint de lotes."""
+
+    def __init__(self):
+        self.max_items = 50
+        self.max_concurrency = 4
+
+    def configure(self, config):
+        """
+        Aplica la sección 'batch' de api_config.json.
+
+        Args:
+            config (dict): Configuración de la API.
+        """
+        batch_config = config.get('batch', {})
+        self.max_items = max(1, int(batch_config.get('max_items', self.max_items)))
+        self.max_concurrency = max(1, int(batch_config.get('max_concurrency', self.max_concurrency)))
+
+batch_config = BatchConfig()
+
+def configure_batch(config):
+    """
+    Configura el endpoint de lotes.
+
+    Args:
+        config (dict): Configuración de la API.
+    """
+    batch_config.configure(config)
+
+def _merge_query(path, query):
+    """
+    Separa la cadena de consulta de la ruta y la combina con 'query'.
+
+    Los parámetros de 'query' sustituyen a los del mismo nombre en la ruta;
+    una lista envía el parámetro repetido y None lo omite.
+
+    Returns:
+        tuple: (ruta sin consulta, MultiDict con los parámetros)
+    """
+    path, _, query_string = path.partition('?')
+    args = MultiDict(parse_qsl(query_string, keep_blank_values=True))
+    for name, value in (query or {}).items():
+        values = value if isinstance(value, list) else [value]
+        args.setlist(name, [str(v) for v in values if v is not None])
+    return path, args
+
+def _parse_items(body):
+    """
+    Valida el cuerpo de la solicitud y normaliza sus elementos.
+
+    Args:
+        body: Cuerpo JSON de la solicitud.
+
+    Returns:
+        list: Elementos con id, method, path (sin consulta), query (MultiDict),
+            headers y body.
+
+    Raises:
+        APIError: Si el lote no es válido (400) o es demasiado grande (413).
+    """
+    items = body.get('requests') if isinstance(body, dict) else None
+    if not isinstance(items, list) or not items:
+        raise APIError("Lote no válido", 400, {"message": "Se requiere una lista 'requests' no vacía"})
+    if len(items) > batch_config.max_items:
+        raise APIError("Lote demasiado grande", 413,
+                       {"message": f"Máximo {batch_config.max_items} solicitudes por lote"})
+
+    parsed = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            raise APIError("Lote no válido", 400, {"message": f"El elemento {index} no es un objeto"})
+        method = str(item.get('method', 'GET')).upper()
+        path = item.get('path')
+        query = item.get('query')
+        headers = item.get('headers') or {}
+        if method not in BATCH_METHODS:
+            raise APIError("Lote no válido", 400,
+                           {"message": f"Método no admitido en el elemento {index}",
+                            "allowed_methods": list(BATCH_METHODS)})
+        if not isinstance(path, str) or not path.startswith('/api/'):
+            raise APIError("Lote no válido", 400,
+                           {"message": f"El elemento {index} debe indicar una ruta '/api/...'"})
+        if query is not None and not isinstance(query, dict):
+            raise APIError("Lote no válido", 400, {"message": f"'query' del elemento {index} debe ser un objeto"})
+        if not isinstance(headers, dict):
+            raise APIError("Lote no válido", 400, {"message": f"'headers' del elemento {index} debe ser un objeto"})
+        path, query = _merge_query(path, query)
+        parsed.append({
+            "id": item.get('id', index),
+            "method": method,
+            "path": path,
+            "query": query,
+            "headers": {name: str(headers[name]) for name in ITEM_HEADERS if name in headers},
+            "body": item.get('body')
+        })
+    return parsed
+
+def _match_rule(adapter, item):
+    """Devuelve la plantilla de ruta de un elemento, o None si no existe."""
+    try:
+        rule, _ = adapter.match(item["path"], method=item["method"], return_rule=True)
+    except HTTPException:
+        return None
+    return rule.rule
+
+def _item_error(item, status, error, message, route="unmatched"):
+    """Resultado de un elemento que no se ha podido ejecutar."""
+    metrics.inc("batch_items_total", route=route, method=item["method"], status=str(status))
+    return {"id": item["id"], "status": status, "headers": {},
+            "body": {"success": False, "error": error, "message": message}}
+
+def _dispatch(app, item, forwarded, user):
+    """
+    Ejecuta una subsolicitud directamente sobre la vista, sin pasar por HTTP.
+
+    No se vuelven a ejecutar los middleware (autenticación, límite, logging):
+    la solicitud del lote ya los ha pasado. Los errores se convierten en
+    respuesta con los mismos manejadores que una solicitud normal; un
+    elemento que no se puede construir o cuya respuesta sería un flujo
+    (p. ej. logs con follow=1) obtiene un 400 sin afectar al resto del lote.
+
+    Args:
+        app: Aplicación Flask.
+        item (dict): Elemento normalizado del lote.
+        forwarded (dict): Encabezados heredados de la solicitud del lote.
+        user (dict): Usuario autenticado de la solicitud del lote.
+
+    Returns:
+        dict: Resultado del elemento (id, status, headers, body).
+    """
+    start = time.perf_counter()
+    headers = dict(forwarded, **item["headers"])
+    try:
+        context = app.test_request_context(item["path"], method=item["method"], query_string=item["query"],
+                                           headers=headers, json=item["body"])
+    except (ValueError, TypeError) as e:
+        return _item_error(item, 400, "Solicitud no válida", str(e))
+    with context:
+        request.user = user
+        try:
+            rv = app.dispatch_request()
+        except Exception as e:
+            try:
+                rv = app.handle_user_exception(e)
+            except Exception as unhandled:
+                logger.error(f"Error en subsolicitud {item['method']} {item['path']}: {str(unhandled)}")
+                rv = jsonify({"success": False, "error": "Error interno del servidor"}), 500
+        response = app.make_response(rv)
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        if response.is_streamed and not response.is_json:
+            # Un flujo abierto bloquearía el lote: se descarta sin consumirlo
+            response.close()
+            return _item_error(item, 400, "Solicitud no admitida en un lote",
+                               "Las respuestas en flujo (follow) no se pueden incluir en un lote", route)
+        status = response.status_code
+        body = response.get_json(silent=True) if status != 304 else None
+
+    metrics.observe("batch_item_duration_seconds", time.perf_counter() - start, route=route)
+    metrics.inc("batch_items_total", route=route, method=item["method"], status=str(status))
+    return {
+        "id": item["id"],
+        "status": status,
+        "headers": {name: response.headers[name] for name in RESPONSE_HEADERS if name in response.headers},
+        "body": body
+    }
+
+def _run_reads(app, items, forwarded, user):
+    """Ejecuta un grupo de lecturas independientes con concurrencia limitada."""
+    workers = min(batch_config.max_concurrency, len(items))
+    if workers <= 1:
+        return [_dispatch(app, item, forwarded, user) for item in items]
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='batch') as executor:
+        return list(executor.map(lambda item: _dispatch(app, item, forwarded, user), items))
+
+@batch_routes.route('/batch', methods=['POST'])
+def batch():
+    """
+    Ejecuta varias solicitudes a la API en una sola ida y vuelta.
+
+    Cuerpo:
+        {"requests": [{"id": "bots", "method": "GET", "path": "/api/bots",
+                       "query": {"fields": "id,status"},
+                       "headers": {"If-None-Match": "W/\\"...\\""}}, ...]}
+
+    Las lecturas (GET) consecutivas se ejecutan en paralelo, hasta
+    'max_concurrency' a la vez; cada escritura (POST) se ejecuta sola y en su
+    orden, de modo que las lecturas posteriores ven su efecto. La
+    autenticación se comprueba una vez para todo el lote y el límite de
+    solicitudes cobra la suma de los pesos de las rutas de los elementos; un
+    lote cuyo coste supera la ráfaga del límite ('burst') se rechaza con 413.
+
+    Returns:
+        JSON con un resultado por elemento, en el mismo orden.
+    """
+    items = _parse_items(request.get_json(silent=True))
+    app = current_app._get_current_object()
+    adapter = app.url_map.bind(request.host)
+
+    cost = 0.0
+    for item in items:
+        rule = _match_rule(adapter, item)
+        if rule == BATCH_RULE:
+            raise APIError("Lote no válido", 400, {"message": "Un lote no puede contener otro lote"})
+        cost += rate_limiter.route_weight(rule) if rule else 1.0
+    rate_limiter.check(cost=max(cost, 1.0))
+
+    forwarded = {name: request.headers[name] for name in FORWARDED_HEADERS if name in request.headers}
+    user = getattr(request, 'user', None)
+
+    results = []
+    with span("batch"):
+        reads = []
+        for item in items:
+            if item["method"] == "GET":
+                reads.append(item)
+                continue
+            results.extend(_run_reads(app, reads, forwarded, user))
+            reads = []
+            results.append(_dispatch(app, item, forwarded, user))
+        results.extend(_run_reads(app, reads, forwarded, user))
+
+    return jsonify({"success": True, "data": results}), 200
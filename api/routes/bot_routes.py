@@ -1,12 +1,20 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, jsonify, request, g, Response, stream_with_context
 import os
 import json
 import logging
-from api.services.bot_service import BotService
+from api.services.bot_service import (
+    BotService, BOT_FIELDS, BOT_DETAIL_FIELDS, POSITION_FIELDS, SIGNAL_FIELDS
+)
+from api.services.supervisor import get_supervisor, supervisor_config, SupervisorError
+from api.services.fleet import fleet_service, FleetError, RemoteNotFound, RemoteRejected
 from api.utils.error_handler import APIError
+from api.utils.event_store import event_store
+from api.utils.timing import span
+from api.utils.conditional import conditional
+from api.utils.serialization import list_response
+from api.utils.query import parse_fields, wants_compact, project
 
 # Configurar logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Crear blueprint
@@ -15,40 +23,151 @@ bot_routes = Blueprint('bot_routes', __name__)
 # Inicializar servicio de bots
 bot_service = BotService()
 
+def _audit(action, bot_id, result, **data):
+    """Registra en el historial una acción sobre un bot y el usuario que la pidió."""
+    user = getattr(request, 'user', None) or {}
+    event_store.record(action, bot_id, user=user.get('user_id'), result=result, **data)
+
+def _list_fields():
+    """Campos válidos de la lista de bots ('host' solo con agentes configurados)."""
+    return BOT_FIELDS + ("host",) if fleet_service.enabled else BOT_FIELDS
+
+def _fleet_bots():
+    """Bots de los agentes para la solicitud actual (la versión y la ruta usan la misma lectura)."""
+    if 'fleet_bots' not in g:
+        with span("fleet"):
+            g.fleet_bots = fleet_service.list_bots()
+    return g.fleet_bots
+
+def _bots_version():
+    fields = parse_fields(_list_fields())
+    parts, last_modified = bot_service.get_bots_version(fields)
+    if not fleet_service.enabled:
+        return parts, last_modified
+    # Sin fecha común: los agentes tienen sus propias versiones
+    _fleet_bots()
+    return (parts, fleet_service.version()), None
+
+def _remote_agent(bot_id):
+    """Agente que gestiona un bot que no es local, o None si ninguno lo conoce."""
+    if bot_id in bot_service.bots_config:
+        return None
+    return fleet_service.owner(bot_id)
+
+def _remote_read(agent, bot_id, resource, params=None):
+    """
+    Lee un recurso de un bot de otro host a través de su agente.
+
+    Returns:
+        tuple: (datos, meta de la lectura: host, estado de la copia y antigüedad).
+
+    Raises:
+        APIError: 404 si el agente ya no conoce el bot, 503 si no está disponible.
+    """
+    try:
+        with span("fleet"):
+            return fleet_service.get(agent, bot_id, resource, params)
+    except RemoteNotFound:
+        raise APIError("Bot no encontrado", 404)
+    except RemoteRejected as e:
+        raise APIError(str(e), e.status_code if 400 <= e.status_code < 500 else 502,
+                       {"host": agent.name})
+    except FleetError as e:
+        logger.warning(f"Agente {agent.name} no disponible para el bot {bot_id}: {str(e)}")
+        raise APIError("Agente no disponible", 503, {"host": agent.name})
+
+def _remote_action(agent, bot_id, operation):
+    """Inicia o detiene un bot de otro host y registra la acción en el historial."""
+    action = f"bot_{operation}"
+    try:
+        with span("fleet"):
+            result = fleet_service.action(agent, bot_id, operation)
+    except RemoteNotFound:
+        raise APIError("Bot no encontrado", 404)
+    except FleetError as e:
+        logger.error(f"Error al reenviar {operation} del bot {bot_id} al agente {agent.name}: {str(e)}")
+        _audit(action, bot_id, "error", host=agent.name)
+        raise APIError("Agente no disponible", 503, {"host": agent.name})
+    success = bool(result.get("success"))
+    _audit(action, bot_id, "ok" if success else "error", host=agent.name)
+    if not success:
+        verb = "iniciar" if operation == "start" else "detener"
+        return jsonify({"success": False, "error": f"Error al {verb} el bot", "host": agent.name}), 500
+    return jsonify({
+        "success": True,
+        "message": f"Bot {bot_id} {'iniciado' if operation == 'start' else 'detenido'} correctamente",
+        "data": {"status": "active" if operation == "start" else "inactive", "host": agent.name}
+    }), 200
+
 @bot_routes.route('/bots', methods=['GET'])
+@conditional(_bots_version)
 def get_bots():
     """
     Obtiene la lista de bots disponibles.
     
+    Con agentes configurados (sección 'fleet') incluye los bots de los demás
+    hosts con el campo 'host' y el estado de cada agente en 'hosts'.
+    
+    Parámetros de consulta:
+        fields: Campos a devolver separados por comas.
+        format: 'compact' para devolver columnas y filas.
+    
     Returns:
         JSON con la lista de bots y sus estados.
     """
+    fields = parse_fields(_list_fields())
+    compact = wants_compact()
     try:
-        # Obtener lista de bots del servicio
-        bots = bot_service.get_all_bots()
+        if not fleet_service.enabled:
+            # Obtener lista de bots del servicio
+            bots = bot_service.get_all_bots(fields)
+            with span("serialize"):
+                return list_response(bots, compact=compact, columns=fields)
+        
+        local_fields = (tuple(name for name in fields if name != "host") or ("id",)) if fields else None
+        bots = [dict(bot, host=fleet_service.local_name) for bot in bot_service.get_all_bots(local_fields)]
+        remote_bots, hosts = _fleet_bots()
+        # Los IDs locales tienen prioridad sobre los de los agentes
+        known = set(bot_service.bots_config)
+        for bot in remote_bots:
+            if bot.get("id") not in known:
+                known.add(bot.get("id"))
+                bots.append(bot)
         
-        return jsonify({"success": True, "data": bots}), 200
+        with span("serialize"):
+            bots = [project(bot, fields) for bot in bots]
+            return list_response(bots, compact=compact, columns=fields, hosts=hosts)
     except Exception as e:
         logger.error(f"Error al obtener bots: {str(e)}")
         return jsonify({"success": False, "error": "Error interno del servidor"}), 500
 
 @bot_routes.route('/bots/<bot_id>', methods=['GET'])
+@conditional(lambda bot_id: bot_service.get_bot_version(bot_id, parse_fields(BOT_DETAIL_FIELDS)))
 def get_bot(bot_id):
     """
     Obtiene información detallada de un bot específico.
     
     Args:
         bot_id (str): ID del bot a consultar.
+    
+    Parámetros de consulta:
+        fields: Campos a devolver separados por comas.
         
     Returns:
         JSON con la información del bot.
     """
+    fields = parse_fields(BOT_DETAIL_FIELDS)
+    agent = _remote_agent(bot_id)
+    if agent is not None:
+        bot_info, meta = _remote_read(agent, bot_id, "detail", {"fields": request.args.get('fields')})
+        return jsonify({"success": True, "data": bot_info, "fleet": meta}), 200
     try:
         # Obtener información del bot del servicio
-        bot_info = bot_service.get_bot(bot_id)
+        bot_info = bot_service.get_bot(bot_id, fields)
         
         if bot_info:
-            return jsonify({"success": True, "data": bot_info}), 200
+            with span("serialize"):
+                return jsonify({"success": True, "data": bot_info}), 200
         else:
             return jsonify({"success": False, "error": "Bot no encontrado"}), 404
     except Exception as e:
@@ -66,6 +185,9 @@ def start_bot(bot_id):
     Returns:
         JSON con el resultado de la operación.
     """
+    agent = _remote_agent(bot_id)
+    if agent is not None:
+        return _remote_action(agent, bot_id, "start")
     try:
         # Verificar si el bot existe
         bot_info = bot_service.get_bot(bot_id)
@@ -74,6 +196,7 @@ def start_bot(bot_id):
             
         # Iniciar el bot usando el servicio
         success = bot_service.start_bot(bot_id)
+        _audit("bot_start", bot_id, "ok" if success else "error")
         
         if success:
             return jsonify({
@@ -85,6 +208,7 @@ def start_bot(bot_id):
             return jsonify({"success": False, "error": "Error al iniciar el bot"}), 500
     except Exception as e:
         logger.error(f"Error al iniciar bot {bot_id}: {str(e)}")
+        _audit("bot_start", bot_id, "error")
         return jsonify({"success": False, "error": "Error al iniciar el bot"}), 500
 
 @bot_routes.route('/bots/<bot_id>/stop', methods=['POST'])
@@ -98,6 +222,9 @@ def stop_bot(bot_id):
     Returns:
         JSON con el resultado de la operación.
     """
+    agent = _remote_agent(bot_id)
+    if agent is not None:
+        return _remote_action(agent, bot_id, "stop")
     try:
         # Verificar si el bot existe
         bot_info = bot_service.get_bot(bot_id)
@@ -106,6 +233,7 @@ def stop_bot(bot_id):
             
         # Detener el bot usando el servicio
         success = bot_service.stop_bot(bot_id)
+        _audit("bot_stop", bot_id, "ok" if success else "error")
         
         if success:
             return jsonify({
@@ -117,22 +245,39 @@ def stop_bot(bot_id):
             return jsonify({"success": False, "error": "Error al detener el bot"}), 500
     except Exception as e:
         logger.error(f"Error al detener bot {bot_id}: {str(e)}")
+        _audit("bot_stop", bot_id, "error")
         return jsonify({"success": False, "error": "Error al detener el bot"}), 500
 
 @bot_routes.route('/bots/<bot_id>/signals', methods=['GET'])
+@conditional(bot_service.get_signals_version)
 def get_bot_signals(bot_id):
     """
     Obtiene las señales recientes generadas por un bot específico.
     
     Args:
         bot_id (str): ID del bot a consultar.
+    
+    Parámetros de consulta:
+        fields: Campos a devolver separados por comas.
+        format: 'compact' para devolver columnas y filas.
+        since: Devolver solo las señales con timestamp posterior a este
+            (mismo formato que el campo 'timestamp').
         
     Returns:
         JSON con las señales recientes del bot.
     """
+    fields = parse_fields(SIGNAL_FIELDS)
+    compact = wants_compact()
+    since = request.args.get('since')
+    agent = _remote_agent(bot_id)
+    if agent is not None:
+        signals, meta = _remote_read(agent, bot_id, "signals",
+                                     {"fields": request.args.get('fields'), "since": since})
+        with span("serialize"):
+            return list_response(signals or [], compact=compact, columns=fields, fleet=meta)
     try:
         # Verificar que el bot existe
-        if bot_id != "sol_bot_15m":
+        if bot_id not in bot_service.bots_config:
             return jsonify({"success": False, "error": "Bot no encontrado"}), 404
             
         # Obtener las señales reales del bot
@@ -142,35 +287,170 @@ def get_bot_signals(bot_id):
         if not signals:
             signals = []
         
-        return jsonify({"success": True, "data": signals}), 200
+        # Cursor de sondeo incremental: las señales se ordenan por timestamp como texto
+        if since:
+            signals = [signal for signal in signals if str(signal.get("timestamp", "")) > since]
+        
+        with span("serialize"):
+            signals = [project(signal, fields) for signal in signals]
+            return list_response(signals, compact=compact, columns=fields)
     except Exception as e:
         logger.error(f"Error al obtener señales del bot {bot_id}: {str(e)}")
         return jsonify({"success": False, "error": "Error interno del servidor"}), 500
 
 @bot_routes.route('/bots/<bot_id>/positions', methods=['GET'])
+@conditional(bot_service.get_positions_version)
 def get_bot_positions(bot_id):
     """
     Obtiene las posiciones actualmente abiertas por un bot específico.
     
     Args:
         bot_id (str): ID del bot a consultar.
+    
+    Parámetros de consulta:
+        fields: Campos a devolver separados por comas.
+        format: 'compact' para devolver columnas y filas.
         
     Returns:
         JSON con las posiciones activas del bot.
     """
+    fields = parse_fields(POSITION_FIELDS)
+    compact = wants_compact()
+    agent = _remote_agent(bot_id)
+    if agent is not None:
+        positions, meta = _remote_read(agent, bot_id, "positions", {"fields": request.args.get('fields')})
+        with span("serialize"):
+            return list_response(positions or [], compact=compact, columns=fields, fleet=meta)
     try:
         # Verificar que el bot existe
-        if bot_id != "sol_bot_15m":
+        if bot_id not in bot_service.bots_config:
             return jsonify({"success": False, "error": "Bot no encontrado"}), 404
             
         # Obtener las posiciones reales del estado del bot
-        positions = bot_service.get_bot_positions(bot_id)
+        positions = bot_service.get_bot_positions(bot_id, fields)
         
         # Si no hay posiciones, devolver una lista vacía
         if not positions:
             positions = []
         
-        return jsonify({"success": True, "data": positions}), 200
+        with span("serialize"):
+            return list_response(positions, compact=compact, columns=fields)
     except Exception as e:
         logger.error(f"Error al obtener posiciones del bot {bot_id}: {str(e)}")
         return jsonify({"success": False, "error": "Error interno del servidor"}), 500
+
+@bot_routes.route('/bots/<bot_id>/logs', methods=['GET'])
+def get_bot_logs(bot_id):
+    """
+    Obtiene la salida reciente (stdout/stderr) de un bot desde memoria.
+    
+    Args:
+        bot_id (str): ID del bot a consultar.
+    
+    Parámetros de consulta:
+        tail: Número de líneas finales (por defecto 100).
+        after: Devolver solo las líneas con secuencia mayor (el 'next' de una
+            respuesta anterior); tiene prioridad sobre tail.
+        follow: '1' para mantener la conexión abierta y enviar las líneas
+            nuevas a medida que llegan (NDJSON, una línea vacía como latido).
+        
+    Returns:
+        JSON con las líneas, el cursor 'next' y las líneas perdidas ('missed')
+        por haber salido del búfer; con follow, un flujo NDJSON.
+    """
+    if bot_id not in bot_service.bots_config:
+        return jsonify({"success": False, "error": "Bot no encontrado"}), 404
+    try:
+        tail = max(0, min(int(request.args.get('tail', 100)), supervisor_config.max_tail))
+        after = request.args.get('after')
+        after = int(after) if after is not None else None
+    except ValueError:
+        raise APIError("Parámetros inválidos", 400, {"message": "tail y after deben ser enteros"})
+    follow = request.args.get('follow', '0').lower() in ('1', 'true')
+    
+    supervisor = get_supervisor()
+    try:
+        chunk = supervisor.logs(bot_id, tail=tail, after=after, limit=supervisor_config.max_tail)
+    except SupervisorError as e:
+        logger.error(f"Error al obtener logs del bot {bot_id}: {str(e)}")
+        raise APIError("Supervisor de bots no disponible", 503)
+    
+    if not follow:
+        return list_response(chunk["lines"], next=chunk["next"], missed=chunk["missed"])
+    
+    def generate():
+        yield _ndjson_chunk(chunk)
+        try:
+            for update in supervisor.follow(bot_id, chunk["next"], timeout=supervisor_config.follow_max_seconds,
+                                            heartbeat=supervisor_config.heartbeat_seconds):
+                yield _ndjson_chunk(update) or "\n"
+        except SupervisorError as e:
+            logger.warning(f"Seguimiento de logs del bot {bot_id} interrumpido: {str(e)}")
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson',
+                    headers={"Cache-Control": "no-store", "X-Accel-Buffering": "no"})
+
+@bot_routes.route('/bots/<bot_id>/resources', methods=['GET'])
+def get_bot_resources(bot_id):
+    """
+    Obtiene el consumo de recursos muestreado del árbol de procesos de un bot.
+    
+    Args:
+        bot_id (str): ID del bot a consultar.
+    
+    Parámetros de consulta:
+        window: Segundos hacia atrás (por defecto 300).
+        format: 'compact' para devolver columnas y filas.
+        
+    Returns:
+        JSON con las muestras (cpu_percent, rss_bytes, threads, fds, read_bps,
+        write_bps, processes), su resumen en la ventana y el coste del muestreo.
+    """
+    if bot_id not in bot_service.bots_config:
+        return jsonify({"success": False, "error": "Bot no encontrado"}), 404
+    try:
+        window = float(request.args.get('window', 300))
+    except ValueError:
+        raise APIError("Parámetros inválidos", 400, {"message": "window debe ser un número de segundos"})
+    if window <= 0:
+        raise APIError("Parámetros inválidos", 400, {"message": "window debe ser positivo"})
+    
+    try:
+        result = get_supervisor().resources(bot_id, window)
+    except SupervisorError as e:
+        logger.error(f"Error al obtener recursos del bot {bot_id}: {str(e)}")
+        raise APIError("Supervisor de bots no disponible", 503)
+    
+    with span("serialize"):
+        columns = result["columns"]
+        samples = [dict(zip(columns, row)) for row in result["rows"]]
+        return list_response(samples, compact=wants_compact(), columns=columns,
+                             summary=result["summary"], sampler=result["sampler"])
+
+@bot_routes.route('/bots/<bot_id>/supervision', methods=['GET'])
+def get_bot_supervision(bot_id):
+    """
+    Obtiene el estado del reinicio automático de un bot.
+    
+    Args:
+        bot_id (str): ID del bot a consultar.
+        
+    Returns:
+        JSON con la política de supervisión, el estado ('running', 'backoff',
+        'crash_loop'...), los reinicios recientes y los eventos (caídas y
+        reinicios con su latencia desde la detección).
+    """
+    if bot_id not in bot_service.bots_config:
+        return jsonify({"success": False, "error": "Bot no encontrado"}), 404
+    try:
+        supervision = get_supervisor().supervision(bot_id)
+    except SupervisorError as e:
+        logger.error(f"Error al obtener supervisión del bot {bot_id}: {str(e)}")
+        raise APIError("Supervisor de bots no disponible", 503)
+    return jsonify({"success": True, "data": supervision})
+
+def _ndjson_chunk(chunk):
+    """Serializa un bloque de logs como NDJSON (un aviso previo si se perdieron líneas)."""
+    lines = [{"missed": chunk["missed"]}] if chunk["missed"] else []
+    lines.extend(chunk["lines"])
+    return "".join(json.dumps(line) + "\n" for line in lines)
@@ -0,0 +1,132 @@
+from flask import Blueprint, jsonify, request
+import time
+import logging
+from datetime import datetime
+from api.routes.bot_routes import bot_service
+from api.routes.admin_routes import require_admin
+from api.services.watchdog import parse_interval
+from api.utils.error_handler import APIError
+from api.utils.event_store import event_store
+from api.utils.timing import span
+from api.utils.serialization import list_response
+from api.utils.query import wants_compact
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Crear blueprint
+event_routes = Blueprint('event_routes', __name__)
+
+EVENT_FIELDS = ("id", "ts", "type", "bot_id", "data")
+MAX_LIMIT = 1000
+
+def _parse_time(name, default):
+    """
+    Lee un instante de los parámetros de consulta.
+
+    Acepta segundos epoch, fechas ISO 8601 o una antigüedad relativa ('30m', '7d').
+
+    Args:
+        name (str): Nombre del parámetro.
+        default (float): Valor si no se indica.
+
+    Returns:
+        float: Instante en segundos epoch.
+    """
+    value = request.args.get(name)
+    if value is None or value == '':
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    ago = parse_interval(value)
+    if ago is not None:
+        return time.time() - ago
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        raise APIError("Parámetros inválidos", 400,
+                       {"message": f"{name} debe ser epoch, ISO 8601 o relativo (ej. 7d)"})
+
+def _timeline(bot_id):
+    types = [kind for kind in request.args.get('type', '').split(',') if kind]
+    try:
+        limit = int(request.args.get('limit', 100))
+    except ValueError:
+        raise APIError("Parámetros inválidos", 400, {"message": "limit debe ser un entero"})
+    if not 1 <= limit <= MAX_LIMIT:
+        raise APIError("Parámetros inválidos", 400, {"message": f"limit debe estar entre 1 y {MAX_LIMIT}"})
+    since = _parse_time('since', None)
+    until = _parse_time('until', None)
+    try:
+        events, next_cursor = event_store.timeline(bot_id, types, since, until,
+                                                   request.args.get('cursor'), limit)
+    except ValueError:
+        raise APIError("Parámetros inválidos", 400, {"message": "cursor no válido"})
+    with span("serialize"):
+        return list_response(events, compact=wants_compact(), columns=EVENT_FIELDS, next=next_cursor)
+
+@event_routes.route('/events', methods=['GET'])
+def get_events():
+    """
+    Obtiene el historial de eventos de todos los bots y de la API (solo administradores).
+
+    Parámetros de consulta:
+        type: Tipos separados por comas (status, bot_start, bot_stop, restart, webhook, error...).
+        since, until: Ventana temporal (epoch, ISO 8601 o relativo como '7d').
+        cursor: Valor 'next' de la página anterior.
+        limit: Eventos por página (por defecto 100, máximo 1000).
+        format: 'compact' para devolver columnas y filas.
+
+    Returns:
+        JSON con los eventos más recientes primero y el cursor de la página siguiente.
+    """
+    require_admin()
+    return _timeline(None)
+
+@event_routes.route('/bots/<bot_id>/events', methods=['GET'])
+def get_bot_events(bot_id):
+    """
+    Obtiene la línea temporal de eventos de un bot.
+
+    Args:
+        bot_id (str): ID del bot a consultar.
+
+    Parámetros de consulta:
+        Los mismos que /events.
+
+    Returns:
+        JSON con los eventos del bot más recientes primero.
+    """
+    if bot_id not in bot_service.bots_config:
+        return jsonify({"success": False, "error": "Bot no encontrado"}), 404
+    return _timeline(bot_id)
+
+@event_routes.route('/bots/<bot_id>/uptime', methods=['GET'])
+def get_bot_uptime(bot_id):
+    """
+    Obtiene la disponibilidad de un bot a partir de su historial de estados.
+
+    Args:
+        bot_id (str): ID del bot a consultar.
+
+    Parámetros de consulta:
+        since: Inicio de la ventana (por defecto hace 24 horas).
+        until: Fin de la ventana (por defecto ahora).
+
+    Returns:
+        JSON con los segundos activos y observados, la disponibilidad, las
+        caídas y los reinicios en la ventana.
+    """
+    if bot_id not in bot_service.bots_config:
+        return jsonify({"success": False, "error": "Bot no encontrado"}), 404
+    now = time.time()
+    until = min(_parse_time('until', now), now)
+    since = _parse_time('since', until - 86400)
+    if since >= until:
+        raise APIError("Parámetros inválidos", 400, {"message": "since debe ser anterior a until"})
+
+    with span("query"):
+        result = event_store.uptime(bot_id, since, until)
+    return jsonify({"success": True, "data": result}), 200
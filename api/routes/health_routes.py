@@ -0,0 +1,195 @@
+from flask import Blueprint, jsonify
+import os
+import time
+import logging
+from datetime import datetime
+from api.routes.bot_routes import bot_service
+from api.routes.webhook_routes import webhook_queue
+from api.services.supervisor import get_supervisor, supervisor_config, SupervisorError
+from api.services.fleet import fleet_service
+from api.utils.health import health_monitor, process_start_time
+from api.utils.event_store import event_store
+from api.utils.warm_start import warm_start
+from api.utils.logging_config import get_logging_stats
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Crear blueprint
+health_routes = Blueprint('health_routes', __name__)
+
+API_VERSION = "1.0.0"
+
+class HealthConfig:
+    """Umbrales de las comprobaciones de disponibilidad."""
+
+    def __init__(self):
+        self.max_queue_depth = 1000
+        self.max_log_queue_ratio = 0.8
+        self.config_error = None
+
+    def configure(self, config, config_error=None):
+        """
+        Aplica la sección 'health' de api_config.json.
+
+        Args:
+            config (dict): Configuración de la API.
+            config_error (Exception, optional): Error al cargar api_config.json.
+        """
+        health_config = config.get('health', {})
+        self.max_queue_depth = int(health_config.get('max_queue_depth', self.max_queue_depth))
+        self.max_log_queue_ratio = float(health_config.get('max_log_queue_ratio', self.max_log_queue_ratio))
+        self.config_error = config_error
+
+health_config = HealthConfig()
+
+# Proceso supervisor (maestro de gunicorn o shell del servidor de desarrollo),
+# anotado en la primera comprobación tras el fork del worker
+_supervisor = {"pid": None}
+
+def check_config():
+    """La configuración de la API y la de los bots se han cargado."""
+    bots = len(getattr(bot_service, 'bots_config', None) or {})
+    error = health_config.config_error
+    return error is None and bots > 0, {"bots": bots, "error": str(error) if error else None}
+
+def check_state_dirs():
+    """Los directorios de los bots existen y se pueden leer."""
+    unreachable = [bot_id for bot_id, path in bot_service.get_bot_paths().items()
+                   if not (os.path.isdir(path) and os.access(path, os.R_OK | os.X_OK))]
+    return not unreachable, {"unreachable": unreachable}
+
+def check_webhook_queue():
+    """La cola de webhooks se consume, se puede escribir y no acumula retraso."""
+    depth = webhook_queue.depth()
+    writable = os.access(webhook_queue.pending_dir, os.W_OK)
+    running = webhook_queue.is_running()
+    ok = writable and running and depth["pending"] < health_config.max_queue_depth
+    return ok, dict(depth, writable=writable, consumer_running=running,
+                    max_depth=health_config.max_queue_depth)
+
+def check_logging_queue():
+    """La cola de logging no está a punto de descartar registros."""
+    stats = get_logging_stats()
+    capacity = stats["queue_capacity"]
+    usage = stats["queue_size"] / capacity if capacity > 0 else 0.0
+    return usage < health_config.max_log_queue_ratio, dict(stats, usage=round(usage, 3))
+
+def check_supervisor():
+    """El proceso padre sigue siendo el mismo (el worker no ha quedado huérfano)."""
+    parent = os.getppid()
+    if _supervisor["pid"] is None:
+        _supervisor["pid"] = parent
+    # Solo se compara con el PID registrado: en un contenedor el maestro de
+    # gunicorn puede ser legítimamente el PID 1
+    return parent == _supervisor["pid"], {"pid": parent, "expected_pid": _supervisor["pid"]}
+
+def check_bot_supervisor():
+    """El supervisor de los procesos de los bots responde."""
+    try:
+        pid = get_supervisor().ping()["pid"]
+    except SupervisorError as e:
+        return False, {"mode": supervisor_config.mode, "error": str(e)}
+    return True, {"mode": supervisor_config.mode, "pid": pid}
+
+def check_event_store():
+    """La cola del historial de eventos no está a punto de descartar eventos."""
+    stats = event_store.stats()
+    usage = stats["queued"] / event_store.max_queue if event_store.max_queue > 0 else 0.0
+    ok = not event_store.enabled or usage < health_config.max_log_queue_ratio
+    return ok, dict(stats, enabled=event_store.enabled, usage=round(usage, 3))
+
+def check_fleet():
+    """Ningún agente de la flota tiene el circuito abierto."""
+    agents = fleet_service.status()
+    unavailable = [name for name, agent in agents.items() if agent["breaker"] != "closed"]
+    return not unavailable, {"agents": agents, "unavailable": unavailable}
+
+health_monitor.register("config", check_config)
+health_monitor.register("state_dirs", check_state_dirs)
+health_monitor.register("webhook_queue", check_webhook_queue)
+health_monitor.register("logging_queue", check_logging_queue)
+health_monitor.register("supervisor", check_supervisor)
+health_monitor.register("bot_supervisor", check_bot_supervisor)
+health_monitor.register("event_store", check_event_store)
+health_monitor.register("fleet", check_fleet)
+
+def configure_health(config, config_error=None):
+    """
+    Configura las comprobaciones de salud.
+
+    Args:
+        config (dict): Configuración de la API.
+        config_error (Exception, optional): Error al cargar api_config.json.
+    """
+    health_config.configure(config, config_error)
+    health_monitor.configure(config)
+
+def _uptime():
+    started = process_start_time()
+    return started, round(time.time() - started, 1)
+
+def _no_store(response, status=200):
+    response.headers['Cache-Control'] = 'no-store'
+    return response, status
+
+@health_routes.route('/health', methods=['GET'])
+def health_check():
+    """
+    Verifica el estado de la API.
+
+    Returns:
+        JSON con el estado, la versión y el tiempo en marcha del proceso.
+    """
+    started, uptime = _uptime()
+    return jsonify({
+        "success": True,
+        "status": "ok",
+        "version": API_VERSION,
+        "uptime": f"Desde {datetime.fromtimestamp(started).isoformat()}",
+        "uptime_seconds": uptime,
+        "environment": os.getenv('FLASK_ENV', 'production')
+    })
+
+@health_routes.route('/health/live', methods=['GET'])
+def liveness():
+    """
+    Sonda de vida: el worker responde solicitudes.
+
+    No ejecuta ninguna comprobación; un fallo aquí indica que hay que
+    reiniciar el proceso.
+
+    Returns:
+        JSON con el PID, el tiempo en marcha del worker y cómo arrancó
+        (instantánea de arranque en caliente).
+    """
+    _, uptime = _uptime()
+    return _no_store(jsonify({"success": True, "status": "alive", "pid": os.getpid(),
+                              "uptime_seconds": uptime, "warm_start": warm_start.stats()}))
+
+@health_routes.route('/health/ready', methods=['GET'])
+def readiness():
+    """
+    Sonda de disponibilidad: el worker puede atender tráfico.
+
+    Devuelve el último resultado de las comprobaciones en segundo plano
+    (configuración, directorios de estado, cola de webhooks, cola de logging y
+    proceso supervisor) sin volver a ejecutarlas.
+
+    Returns:
+        JSON con el resultado de cada comprobación; 503 si alguna crítica
+        falla o los resultados están desactualizados.
+    """
+    ready, checks, age = health_monitor.status()
+    failed = [name for name, result in checks.items() if result["critical"] and not result["ok"]]
+    if age > health_monitor.stale_after:
+        failed.append("stale")
+    body = {
+        "success": ready,
+        "status": "ready" if ready else "not_ready",
+        "pid": os.getpid(),
+        "checked_seconds_ago": round(age, 3),
+        "failed": failed,
+        "checks": checks
+    }
+    return _no_store(jsonify(body), 200 if ready else 503)
@@ -0,0 +1,19 @@
+from flask import Blueprint, Response
+import logging
+from api.utils.metrics import metrics
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Crear blueprint
+metrics_routes = Blueprint('metrics_routes', __name__)
+
+@metrics_routes.route('/metrics', methods=['GET'])
+def get_metrics():
+    """
+    Expone las métricas agregadas de todos los workers.
+
+    Returns:
+        Texto en formato de exposición de Prometheus.
+    """
+    return Response(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -4,21 +4,87 @@ import json
 import logging
 import hmac
 import hashlib
+from api.utils.metrics import metrics
+from api.utils.event_store import event_store
+from api.utils.work_queue import WorkQueue
 
 # Configurar logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Crear blueprint
 webhook_routes = Blueprint('webhook_routes', __name__)
 
+# Cola persistente: los webhooks se validan y se aceptan en la solicitud y se
+# procesan en segundo plano, de modo que una recarga de la API no los pierde
+webhook_queue = WorkQueue('webhooks')
+
+def configure_webhooks(config):
+    """
+    Configura la cola de procesamiento de webhooks.
+
+    Args:
+        config (dict): Configuración de la API.
+    """
+    webhook_queue.configure(config)
+
+def _audit(source, outcome, **data):
+    """Cuenta un webhook recibido y lo registra en el historial."""
+    metrics.inc("webhooks_total", source=source, outcome=outcome)
+    event_store.record("webhook", source=source, outcome=outcome, remote_addr=request.remote_addr, **data)
+
+def _accepted(source, data):
+    """Encola un webhook validado y devuelve la respuesta 202."""
+    item_id = webhook_queue.enqueue(source, data)
+    _audit(source, "queued", id=item_id)
+    return jsonify({"success": True, "message": "Webhook aceptado", "id": item_id}), 202
+
+def process_binance(data):
+    """
+    Procesa un webhook de Binance ya validado.
+
+    Args:
+        data (dict): Cuerpo del webhook.
+    """
+    # Aquí iría la lógica para procesar el webhook
+    # Por ejemplo, actualizar el estado de un bot basado en el evento
+    logger.info(f"Webhook de Binance procesado: {data.get('event_type', 'desconocido')}")
+    metrics.inc("webhooks_total", source="binance", outcome="processed")
+
+def process_telegram(data):
+    """
+    Procesa un webhook de Telegram ya validado.
+
+    Args:
+        data (dict): Cuerpo del webhook.
+    """
+    # Aquí iría la lógica para procesar comandos de Telegram
+    # Por ejemplo, iniciar/detener bots, obtener estadísticas, etc.
+    logger.info(f"Webhook de Telegram procesado: {data.get('message', {}).get('text', 'desconocido')}")
+    metrics.inc("webhooks_total", source="telegram", outcome="processed")
+
+def process_trading_view(data):
+    """
+    Procesa un webhook de TradingView ya validado.
+
+    Args:
+        data (dict): Cuerpo del webhook.
+    """
+    # Aquí iría la lógica para procesar señales de TradingView
+    # Por ejemplo, ejecutar órdenes basadas en señales
+    logger.info(f"Webhook de TradingView procesado: {data.get('strategy', {}).get('action', 'desconocido')}")
+    metrics.inc("webhooks_total", source="trading-view", outcome="processed")
+
+webhook_queue.register("binance", process_binance)
+webhook_queue.register("telegram", process_telegram)
+webhook_queue.register("trading-view", process_trading_view)
+
 @webhook_routes.route('/webhooks/binance', methods=['POST'])
 def binance_webhook():
     """
     Recibe webhooks de Binance para actualizar el estado de los bots.
     
     Returns:
-        JSON con el resultado del procesamiento del webhook.
+        JSON con el identificador del webhook encolado (202).
     """
     try:
         # Verificar la firma del webhook (seguridad)
@@ -35,19 +101,14 @@ def binance_webhook():
             
             if not hmac.compare_digest(signature, computed_signature):
                 logger.warning("Firma de webhook inválida")
+                _audit("binance", "rejected")
                 return jsonify({"success": False, "error": "Firma inválida"}), 401
         
-        # Procesar el webhook
-        data = request.json
-        
-        # Aquí iría la lógica para procesar el webhook
-        # Por ejemplo, actualizar el estado de un bot basado en el evento
-        
-        logger.info(f"Webhook de Binance procesado: {data.get('event_type', 'desconocido')}")
-        
-        return jsonify({"success": True, "message": "Webhook procesado correctamente"}), 200
+        # Encolar el webhook para procesarlo en segundo plano
+        return _accepted("binance", request.json)
     except Exception as e:
         logger.error(f"Error al procesar webhook de Binance: {str(e)}")
+        _audit("binance", "error")
         return jsonify({"success": False, "error": "Error al procesar webhook"}), 500
 
 @webhook_routes.route('/webhooks/telegram', methods=['POST'])
@@ -56,7 +117,7 @@ def telegram_webhook():
     Recibe webhooks de Telegram para comandos de bots.
     
     Returns:
-        JSON con el resultado del procesamiento del webhook.
+        JSON con el identificador del webhook encolado (202).
     """
     try:
         # Verificar la autenticación del webhook
@@ -65,19 +126,14 @@ def telegram_webhook():
         
         if not token or token != expected_token:
             logger.warning("Token de webhook de Telegram inválido")
+            _audit("telegram", "rejected")
             return jsonify({"success": False, "error": "Token inválido"}), 401
         
-        # Procesar el webhook
-        data = request.json
-        
-        # Aquí iría la lógica para procesar comandos de Telegram
-        # Por ejemplo, iniciar/detener bots, obtener estadísticas, etc.
-        
-        logger.info(f"Webhook de Telegram procesado: {data.get('message', {}).get('text', 'desconocido')}")
-        
-        return jsonify({"success": True, "message": "Webhook procesado correctamente"}), 200
+        # Encolar el webhook para procesarlo en segundo plano
+        return _accepted("telegram", request.json)
     except Exception as e:
         logger.error(f"Error al procesar webhook de Telegram: {str(e)}")
+        _audit("telegram", "error")
         return jsonify({"success": False, "error": "Error al procesar webhook"}), 500
 
 @webhook_routes.route('/webhooks/trading-view', methods=['POST'])
@@ -86,7 +142,7 @@ def trading_view_webhook():
     Recibe webhooks de TradingView para señales de trading.
     
     Returns:
-        JSON con el resultado del procesamiento del webhook.
+        JSON con el identificador del webhook encolado (202).
     """
     try:
         # Verificar la autenticación del webhook
@@ -95,17 +151,12 @@ def trading_view_webhook():
         
         if not key or key != expected_key:
             logger.warning("Clave de webhook de TradingView inválida")
+            _audit("trading-view", "rejected")
             return jsonify({"success": False, "error": "Clave inválida"}), 401
         
-        # Procesar el webhook
-        data = request.json
-        
-        # Aquí iría la lógica para procesar señales de TradingView
-        # Por ejemplo, ejecutar órdenes basadas en señales
-        
-        logger.info(f"Webhook de TradingView procesado: {data.get('strategy', {}).get('action', 'desconocido')}")
-        
-        return jsonify({"success": True, "message": "Webhook procesado correctamente"}), 200
+        # Encolar el webhook para procesarlo en segundo plano
+        return _accepted("trading-view", request.json)
     except Exception as e:
         logger.error(f"Error al procesar webhook de TradingView: {str(e)}")
+        _audit("trading-view", "error")
         return jsonify({"success": False, "error": "Error al procesar webhook"}), 500
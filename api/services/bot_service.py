@@ -5,14 +5,31 @@ Implementa el patrón de diseño de servicios para separar la lógica de negocio
 
 import os
 import json
+import hashlib
 import logging
+import time
+import threading
 import subprocess
 from datetime import datetime
 from pathlib import Path
+from api.utils.metrics import metrics
+from api.utils.event_store import event_store
+from api.utils.timing import span
+from api.utils.query import wants, project
+from api.services.supervisor import get_supervisor, SupervisorError
 
 # Configurar logging
 logger = logging.getLogger(__name__)
 
+# Campos de cada recurso (válidos en ?fields=)
+BOT_FIELDS = ("id", "name", "symbol", "interval", "status", "last_update")
+BOT_DETAIL_FIELDS = BOT_FIELDS + ("balance", "profit_today", "profit_total",
+                                  "trades_today", "trades_total", "win_rate")
+POSITION_FIELDS = ("id", "symbol", "type", "entry_price", "current_price", "quantity",
+                   "value_usdt", "profit_loss", "profit_loss_usdt", "entry_time", "duration",
+                   "stop_loss", "take_profit", "status")
+SIGNAL_FIELDS = ("timestamp", "type", "price", "strength", "indicators", "ml_prediction", "executed")
+
 class BotService:
     """
     Servicio para gestionar los bots de trading.
@@ -21,18 +38,47 @@ class BotService:
     
     def __init__(self):
         """Inicializa el servicio de bots."""
-        self.bots_config_path = os.path.join(
+        self.bots_config_path = os.getenv('BOTS_CONFIG_PATH', os.path.join(
             os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
             'config', 'bots_config.json'
-        )
+        ))
+        # Instantánea de estado compartida por todos los bots (un solo escaneo de procesos)
+        self.status_ttl = 2.0
+        # Tiempo máximo de los scripts y espera de la condición de arranque
+        self.script_timeout = 60.0
+        self.readiness_timeout = 30.0
+        self.readiness_poll = 0.2
+        self._status_lock = threading.Lock()
+        self._status_snapshot = None
+        self._status_generation = 0
+        # Registrar los cambios de estado en el historial (solo el proceso que supervisa los bots)
+        self.record_status_events = False
+        # Caché de archivos JSON parseados: ruta -> ((mtime_ns, tamaño), contenido)
+        self._file_cache = {}
+        # Señales calculadas por bot: bot_id -> (versión de las fuentes, señales)
+        self._signals_cache = {}
         self.load_bots_config()
     
+    def configure(self, config):
+        """
+        Aplica la sección 'bot_service' de api_config.json.
+        
+        Args:
+            config (dict): Configuración de la API.
+        """
+        service_config = config.get('bot_service', {})
+        self.status_ttl = float(service_config.get('status_ttl_seconds', self.status_ttl))
+        self.script_timeout = float(service_config.get('script_timeout_seconds', self.script_timeout))
+        self.readiness_timeout = float(service_config.get('readiness_timeout_seconds', self.readiness_timeout))
+        self.readiness_poll = float(service_config.get('readiness_poll_seconds', self.readiness_poll))
+    
     def load_bots_config(self):
         """Carga la configuración de los bots desde el archivo de configuración."""
         try:
             if os.path.exists(self.bots_config_path):
                 with open(self.bots_config_path, 'r') as f:
                     self.bots_config = json.load(f)
+                self._update_config_version()
                 logger.info(f"Configuración de bots cargada desde {self.bots_config_path}")
             else:
                 logger.warning(f"Archivo de configuración no encontrado: {self.bots_config_path}")
@@ -48,22 +94,555 @@ class BotService:
                         "stop_script": "stop.sh"
                     }
                 }
+                self._update_config_version()
         except Exception as e:
             logger.error(f"Error al cargar la configuración de bots: {str(e)}")
             raise
     
-    def get_all_bots(self):
+    def _update_config_version(self):
+        """Calcula la huella de la configuración de bots (forma parte de las ETags)."""
+        self._config_version = hashlib.blake2b(
+            json.dumps(self.bots_config, sort_keys=True).encode('utf-8'), digest_size=8
+        ).hexdigest()
+    
+    def _bot_path(self, bot_id):
+        """Devuelve el directorio del bot con '~' expandido."""
+        return os.path.expanduser(self.bots_config[bot_id].get("path", ""))
+    
+    def get_bot_paths(self):
+        """
+        Devuelve el directorio de cada bot configurado.
+        
+        Returns:
+            dict: bot_id -> directorio con '~' expandido.
+        """
+        return {bot_id: self._bot_path(bot_id) for bot_id in self.bots_config}
+    
+    def _state_file(self, bot_id):
+        """Devuelve la ruta del archivo de estado del bot."""
+        return os.path.join(self._bot_path(bot_id),
+                            self.bots_config[bot_id].get("state_file", "sol_bot_15min_state.json"))
+    
+    def get_state_file(self, bot_id):
+        """
+        Devuelve la ruta del archivo de estado de un bot.
+        
+        Args:
+            bot_id (str): ID del bot.
+            
+        Returns:
+            str: Ruta con '~' expandido.
+        """
+        return self._state_file(bot_id)
+    
+    def _process_name(self, bot_id):
+        """Devuelve el nombre del script que identifica el proceso del bot."""
+        return self.bots_config[bot_id].get("process_name", "adaptive_main.py")
+    
+    def process_patterns(self):
+        """
+        Devuelve el texto que identifica el proceso de cada bot en su línea de comandos.
+        
+        Returns:
+            dict: bot_id -> patrón ('python3 <process_name>').
+        """
+        return {bot_id: f"python3 {self._process_name(bot_id)}" for bot_id in self.bots_config}
+    
+    def _run_command(self, operation, command):
+        """
+        Ejecuta un comando (sin shell) registrando su número y duración en las métricas.
+        
+        Args:
+            operation (str): Operación para la etiqueta de la métrica ('status').
+            command (list): Programa y argumentos.
+            
+        Returns:
+            tuple: (código de salida, stdout, stderr) en bytes.
+        """
+        start = time.perf_counter()
+        with span("subprocess"):
+            process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            try:
+                stdout, stderr = process.communicate(timeout=self.script_timeout)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                stdout, stderr = process.communicate()
+        metrics.observe("bot_subprocess_duration_seconds", time.perf_counter() - start, operation=operation)
+        metrics.inc("bot_subprocess_total", operation=operation,
+                    outcome="ok" if process.returncode == 0 else "error")
+        return process.returncode, stdout, stderr
+    
+    def _script_path(self, bot_id, script):
+        """
+        Devuelve la ruta de un script del bot si existe dentro de su directorio.
+        
+        Args:
+            bot_id (str): ID del bot.
+            script (str): Nombre del script (relativo al directorio del bot).
+            
+        Returns:
+            str: Ruta absoluta del script, o None si no existe o queda fuera
+            del directorio del bot.
+        """
+        bot_path = os.path.realpath(self._bot_path(bot_id))
+        path = os.path.realpath(os.path.join(bot_path, script))
+        if not path.startswith(bot_path + os.sep) or not os.path.isfile(path):
+            return None
+        return path
+    
+    def _run_script(self, operation, bot_id, script_path):
+        """
+        Ejecuta el script de inicio o parada de un bot a través del supervisor.
+        
+        El script se ejecuta como 'bash <ruta>' sin shell intermedio, en el
+        directorio del bot y con las variables 'env' de su configuración. Si
+        supera 'script_timeout_seconds' se termina todo su grupo de procesos.
+        La salida del script (y la del bot si la hereda) se lee de forma
+        continua y queda en el búfer de logs del bot.
+        
+        Args:
+            operation (str): 'start' o 'stop' (etiqueta de la métrica).
+            bot_id (str): ID del bot.
+            script_path (str): Ruta del script (ver _script_path).
+            
+        Returns:
+            dict: {'returncode', 'pid', 'timed_out', 'output'} (últimas líneas emitidas).
+        """
+        bot_config = self.bots_config[bot_id]
+        env = {str(name): str(value) for name, value in bot_config.get("env", {}).items()}
+        timeout = float(bot_config.get("script_timeout_seconds", self.script_timeout))
+        start = time.perf_counter()
+        with span("subprocess"):
+            result = get_supervisor().run(bot_id, ["bash", script_path], cwd=self._bot_path(bot_id),
+                                          env=env or None, timeout=timeout)
+        if result.get("timed_out"):
+            outcome = "timeout"
+        else:
+            outcome = "ok" if result["returncode"] == 0 else "error"
+        metrics.observe("bot_subprocess_duration_seconds", time.perf_counter() - start, operation=operation)
+        metrics.inc("bot_subprocess_total", operation=operation, outcome=outcome)
+        return result
+    
+    def _readiness_baseline(self, bot_id, readiness):
+        """Posición de partida de la condición 'log_marker' (antes de lanzar el script)."""
+        if readiness.get("type") != "log_marker":
+            return None
+        if readiness.get("path"):
+            try:
+                return os.path.getsize(os.path.join(self._bot_path(bot_id), readiness["path"]))
+            except OSError:
+                return 0
+        return get_supervisor().logs(bot_id, tail=0)["next"]
+    
+    def _check_ready(self, bot_id, readiness, started_at, baseline):
+        """
+        Comprueba una vez la condición de arranque de un bot.
+        
+        Args:
+            bot_id (str): ID del bot.
+            readiness (dict): Sección 'readiness' de la configuración del bot.
+            started_at (float): Momento (epoch) en que se lanzó el script de inicio.
+            baseline: Posición de partida de 'log_marker' (ver _readiness_baseline).
+            
+        Returns:
+            tuple: (condición cumplida, nueva posición de partida).
+        """
+        kind = readiness.get("type")
+        bot_path = self._bot_path(bot_id)
+        # Margen para la resolución de mtime de algunos sistemas de archivos
+        fresh_since = started_at - 1.0
+        try:
+            if kind == "pid_file":
+                path = os.path.join(bot_path, readiness.get("path", "bot.pid"))
+                if os.stat(path).st_mtime < fresh_since:
+                    return False, baseline
+                with open(path, 'r') as f:
+                    pid = int(f.read().strip())
+                try:
+                    os.kill(pid, 0)
+                except PermissionError:
+                    pass
+                return True, baseline
+            if kind == "state_file":
+                return os.stat(self._state_file(bot_id)).st_mtime >= fresh_since, baseline
+            if kind == "log_marker":
+                marker = readiness.get("marker", "")
+                if readiness.get("path"):
+                    with open(os.path.join(bot_path, readiness["path"]), 'rb') as f:
+                        f.seek(baseline)
+                        data = f.read()
+                    # Conservar el final por si el marcador queda partido entre lecturas
+                    found = marker.encode('utf-8') in data
+                    return found, baseline + max(0, len(data) - len(marker))
+                chunk = get_supervisor().logs(bot_id, after=baseline)
+                return any(marker in line["line"] for line in chunk["lines"]), chunk["next"]
+        except (OSError, ValueError, ProcessLookupError):
+            return False, baseline
+        logger.warning(f"Condición de arranque desconocida para {bot_id}: {kind}")
+        return True, baseline
+    
+    def _wait_ready(self, bot_id, readiness, started_at, baseline):
+        """
+        Espera a que se cumpla la condición de arranque del bot.
+        
+        Returns:
+            bool: True si se cumplió antes de 'timeout_seconds'.
+        """
+        deadline = time.monotonic() + float(readiness.get("timeout_seconds", self.readiness_timeout))
+        while True:
+            ready, baseline = self._check_ready(bot_id, readiness, started_at, baseline)
+            if ready:
+                return True
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(self.readiness_poll)
+    
+    def _read_json(self, path, kind):
+        """
+        Lee y parsea un archivo JSON del bot registrando el tiempo empleado.
+        
+        El resultado se cachea mientras no cambien la fecha de modificación ni
+        el tamaño del archivo; debe tratarse como de solo lectura.
+        
+        Args:
+            path (str): Ruta del archivo.
+            kind (str): Tipo de archivo para la etiqueta de la métrica ('state', 'signals').
+            
+        Returns:
+            Contenido parseado del archivo.
+        """
+        stat = os.stat(path)
+        version = (stat.st_mtime_ns, stat.st_size)
+        cached = self._file_cache.get(path)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        
+        with span("state_read"), metrics.time("state_file_parse_seconds", file=kind):
+            with open(path, 'r') as f:
+                data = json.load(f)
+        self._file_cache[path] = (version, data)
+        return data
+    
+    def _scan_processes(self):
+        """
+        Busca los procesos de todos los bots configurados con un único escaneo.
+        
+        En Linux lee /proc/<pid>/cmdline sin crear subprocesos; en otros
+        sistemas ejecuta una sola llamada a ps para todos los bots.
+        
+        Returns:
+            dict: Nombre de proceso -> lista de PIDs encontrados.
+        """
+        patterns = {self._process_name(bot_id): pattern
+                    for bot_id, pattern in self.process_patterns().items()}
+        found = {name: [] for name in patterns}
+        
+        if os.path.isdir('/proc'):
+            for entry in os.listdir('/proc'):
+                if not entry.isdigit():
+                    continue
+                try:
+                    with open(f'/proc/{entry}/cmdline', 'rb') as f:
+                        raw = f.read()
+                except OSError:
+                    continue
+                if not raw:
+                    continue
+                cmdline = raw.replace(b'\0', b' ').decode('utf-8', 'replace')
+                for name, pattern in patterns.items():
+                    if pattern in cmdline:
+                        found[name].append(int(entry))
+        else:
+            returncode, stdout, stderr = self._run_command("status", ["ps", "-eo", "pid=,args="])
+            for line in stdout.decode('utf-8', 'replace').splitlines():
+                pid, _, args = line.strip().partition(' ')
+                for name, pattern in patterns.items():
+                    if pattern in args and pid.isdigit():
+                        found[name].append(int(pid))
+        return found
+    
+    def get_status_snapshot(self, force=False):
+        """
+        Obtiene la instantánea de estado de todos los bots.
+        
+        La instantánea se recalcula como máximo cada 'status_ttl' segundos; las
+        solicitudes concurrentes comparten un único escaneo. La generación solo
+        aumenta cuando cambia el estado de algún bot.
+        
+        Args:
+            force (bool): Recalcular aunque la instantánea siga vigente.
+            
+        Returns:
+            dict: {'generation', 'version', 'changed_at', 'taken_at', 'statuses', 'pids'}.
+        """
+        with self._status_lock:
+            now = time.monotonic()
+            snapshot = self._status_snapshot
+            if not force and snapshot is not None and now - snapshot["monotonic"] < self.status_ttl:
+                return snapshot
+            
+            processes = self._scan_processes()
+            statuses = {}
+            pids = {}
+            for bot_id in self.bots_config:
+                bot_pids = processes.get(self._process_name(bot_id), [])
+                pids[bot_id] = bot_pids
+                statuses[bot_id] = "active" if bot_pids else "inactive"
+            
+            changed_at = snapshot["changed_at"] if snapshot else time.time()
+            if snapshot is None or snapshot["statuses"] != statuses:
+                self._status_generation += 1
+                changed_at = time.time()
+                for bot_id, status in statuses.items():
+                    previous = snapshot["statuses"].get(bot_id) if snapshot else None
+                    if previous != status:
+                        logger.info(f"Bot {bot_id}: estado {previous or 'desconocido'} -> {status}")
+                        if self.record_status_events:
+                            event_store.record("status", bot_id, **{"from": previous, "to": status})
+            
+            self._status_snapshot = {
+                "generation": self._status_generation,
+                "version": self._status_version(statuses),
+                "changed_at": changed_at,
+                "taken_at": datetime.now().isoformat(),
+                "monotonic": now,
+                "statuses": statuses,
+                "pids": pids
+            }
+            return self._status_snapshot
+    
+    @staticmethod
+    def _status_version(statuses):
+        # Huella del contenido: igual en todos los workers para el mismo estado
+        return hashlib.blake2b(repr(sorted(statuses.items())).encode('utf-8'), digest_size=8).hexdigest()
+    
+    def invalidate_status_snapshot(self):
+        """Fuerza un nuevo escaneo en la próxima consulta de estado (tras iniciar o detener un bot)."""
+        with self._status_lock:
+            if self._status_snapshot is not None:
+                self._status_snapshot = dict(self._status_snapshot, monotonic=float('-inf'))
+    
+    def warmup(self):
+        """
+        Precalienta las cachés del proceso (instantánea de estado, archivos de
+        estado y señales).
+        
+        Se ejecuta al arrancar cada worker para que la primera solicitud no
+        pague el coste del escaneo y el parseo en frío. Tras restaurar la
+        instantánea de arranque en caliente solo se recalcula lo que ha cambiado.
+        """
+        start = time.perf_counter()
+        self.get_status_snapshot(force=True)
+        for bot_id in self.bots_config:
+            state_file = self._state_file(bot_id)
+            if os.path.exists(state_file):
+                try:
+                    self._read_json(state_file, "state")
+                except Exception as e:
+                    logger.warning(f"No se pudo precargar el estado de {bot_id}: {str(e)}")
+            self.get_bot_signals(bot_id)
+        logger.info(f"Precalentamiento de BotService completado en {time.perf_counter() - start:.3f}s")
+    
+    def export_warm_state(self, max_file_bytes=None):
+        """
+        Exporta el estado derivado para la instantánea de arranque en caliente.
+        
+        Args:
+            max_file_bytes (int, optional): No incluir archivos parseados mayores.
+            
+        Returns:
+            dict: Instantánea de estado, archivos parseados con su versión
+            (mtime_ns, tamaño) y señales con las versiones de sus fuentes.
+        """
+        with self._status_lock:
+            snapshot = self._status_snapshot
+        status = None
+        if snapshot is not None:
+            status = {"config_version": self._config_version, "generation": snapshot["generation"],
+                      "changed_at": snapshot["changed_at"], "statuses": snapshot["statuses"]}
+        files = {path: [list(version), data] for path, (version, data) in list(self._file_cache.items())
+                 if max_file_bytes is None or version[1] <= max_file_bytes}
+        signals = {bot_id: [[[path, list(version) if version else None] for path, version in sources], items]
+                   for bot_id, (sources, items) in list(self._signals_cache.items())}
+        return {"status": status, "files": files, "signals": signals}
+    
+    def restore_warm_state(self, state):
+        """
+        Restaura el estado derivado de la instantánea de arranque en caliente.
+        
+        Los archivos y las señales solo se restauran si la versión de sus
+        fuentes no ha cambiado. La instantánea de estado se restaura como
+        caducada: el primer escaneo la sustituye, pero conserva 'changed_at'
+        (y con ello Last-Modified) si ningún bot ha cambiado de estado.
+        
+        Args:
+            state (dict): Resultado de export_warm_state().
+            
+        Returns:
+            dict: Entradas restauradas ('restored') y descartadas ('stale').
+        """
+        restored = stale = 0
+        for path, (version, data) in state.get("files", {}).items():
+            version = tuple(version)
+            if self._file_version(path) == version:
+                self._file_cache.setdefault(path, (version, data))
+                restored += 1
+            else:
+                stale += 1
+        for bot_id, (sources, items) in state.get("signals", {}).items():
+            sources = tuple((path, tuple(version) if version else None) for path, version in sources)
+            if bot_id in self.bots_config and self._signal_sources(bot_id) == sources:
+                self._signals_cache.setdefault(bot_id, (sources, items))
+                restored += 1
+            else:
+                stale += 1
+        status = state.get("status")
+        if status and status.get("config_version") == self._config_version:
+            with self._status_lock:
+                if self._status_snapshot is None:
+                    self._status_generation = status["generation"]
+                    self._status_snapshot = {
+                        "generation": status["generation"],
+                        "version": self._status_version(status["statuses"]),
+                        "changed_at": status["changed_at"],
+                        "taken_at": None,
+                        "monotonic": float('-inf'),
+                        "statuses": status["statuses"],
+                        "pids": {}
+                    }
+                    restored += 1
+        elif status:
+            stale += 1
+        return {"restored": restored, "stale": stale}
+    
+    def _file_version(self, path):
+        """
+        Devuelve la versión de un archivo sin leerlo.
+        
+        Args:
+            path (str): Ruta del archivo.
+            
+        Returns:
+            tuple: (mtime_ns, tamaño), o None si el archivo no existe.
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+    
+    def _latest_signal_log(self, bot_id, bot_path):
+        """Devuelve la ruta del log de simulación más reciente del bot, o None."""
+        log_dir = os.path.join(bot_path, "logs")
+        try:
+            log_files = [f for f in os.listdir(log_dir) if f.startswith(f"{bot_id}_cloud_simulation_") and f.endswith(".log")]
+        except OSError:
+            return None
+        if not log_files:
+            return None
+        # El nombre incluye la fecha, así que el mayor es el más reciente
+        return os.path.join(log_dir, max(log_files))
+    
+    def _signal_sources(self, bot_id):
+        """
+        Obtiene las versiones de todas las fuentes de señales de un bot.
+        
+        Returns:
+            tuple: ((ruta, versión), ...) de signals.json, el archivo de estado y
+            el log más reciente.
+        """
+        bot_path = self._bot_path(bot_id)
+        paths = [os.path.join(bot_path, "signals.json"), self._state_file(bot_id)]
+        latest_log = self._latest_signal_log(bot_id, bot_path)
+        if latest_log:
+            paths.append(latest_log)
+        return tuple((path, self._file_version(path)) for path in paths)
+    
+    @staticmethod
+    def _last_modified(versions):
+        mtimes = [version[0] for version in versions if version]
+        return max(mtimes) / 1e9 if mtimes else None
+    
+    def get_bots_version(self, fields=None):
+        """
+        Versión de la lista de bots para solicitudes condicionales.
+        
+        Args:
+            fields (tuple, optional): Campos pedidos; sin 'status' no se consulta
+                la instantánea de estado.
+        
+        Returns:
+            tuple: (partes de la versión, última modificación en segundos epoch).
+        """
+        if not wants(fields, "status"):
+            return ("bots", self._config_version), None
+        snapshot = self.get_status_snapshot()
+        return ("bots", self._config_version, snapshot["version"]), snapshot["changed_at"]
+    
+    def get_bot_version(self, bot_id, fields=None):
+        """
+        Versión del detalle de un bot para solicitudes condicionales.
+        
+        Args:
+            bot_id (str): ID del bot.
+            fields (tuple, optional): Campos pedidos.
+            
+        Returns:
+            tuple: (partes, última modificación), o None si el bot no existe.
+        """
+        if bot_id not in self.bots_config:
+            return None
+        if not wants(fields, "status"):
+            return ("bot", bot_id, self._config_version), None
+        snapshot = self.get_status_snapshot()
+        return (("bot", bot_id, self._config_version, snapshot["statuses"].get(bot_id)),
+                snapshot["changed_at"])
+    
+    def get_positions_version(self, bot_id):
+        """
+        Versión de las posiciones de un bot (archivo de estado).
+        
+        Args:
+            bot_id (str): ID del bot.
+            
+        Returns:
+            tuple: (partes, última modificación), o None si el bot no existe.
+        """
+        if bot_id not in self.bots_config:
+            return None
+        state_version = self._file_version(self._state_file(bot_id))
+        return ("positions", bot_id, state_version), self._last_modified([state_version])
+    
+    def get_signals_version(self, bot_id):
+        """
+        Versión de las señales de un bot (archivo de señales, estado y log).
+        
+        Args:
+            bot_id (str): ID del bot.
+            
+        Returns:
+            tuple: (partes, última modificación), o None si el bot no existe.
+        """
+        if bot_id not in self.bots_config:
+            return None
+        sources = self._signal_sources(bot_id)
+        return ("signals", bot_id, sources), self._last_modified([v for _, v in sources])
+    
+    def get_all_bots(self, fields=None):
         """
         Obtiene la lista de todos los bots disponibles.
         
+        Args:
+            fields (tuple, optional): Campos a devolver (todos si es None).
+        
         Returns:
             list: Lista de diccionarios con información de los bots.
         """
         try:
             bots_list = []
             for bot_id, bot_config in self.bots_config.items():
-                # Obtener el estado actual del bot
-                status = self.get_bot_status(bot_id)
+                # Obtener el estado actual del bot (solo si se ha pedido)
+                status = self.get_bot_status(bot_id) if wants(fields, "status") else None
                 
                 # Crear objeto de bot con información básica
                 bot_info = {
@@ -74,19 +653,20 @@ class BotService:
                     "status": status,
                     "last_update": datetime.now().isoformat()
                 }
-                bots_list.append(bot_info)
+                bots_list.append(project(bot_info, fields))
             
             return bots_list
         except Exception as e:
             logger.error(f"Error al obtener lista de bots: {str(e)}")
             raise
     
-    def get_bot(self, bot_id):
+    def get_bot(self, bot_id, fields=None):
         """
         Obtiene información detallada de un bot específico.
         
         Args:
             bot_id (str): ID del bot a consultar.
+            fields (tuple, optional): Campos a devolver (todos si es None).
             
         Returns:
             dict: Diccionario con información detallada del bot.
@@ -97,7 +677,7 @@ class BotService:
                 return None
             
             bot_config = self.bots_config[bot_id]
-            status = self.get_bot_status(bot_id)
+            status = self.get_bot_status(bot_id) if wants(fields, "status") else None
             
             # Obtener información adicional del bot (balance, ganancias, etc.)
             # En una implementación real, esto vendría del estado del bot o de una base de datos
@@ -116,7 +696,7 @@ class BotService:
                 "win_rate": 0.0  # Valor de ejemplo
             }
             
-            return bot_info
+            return project(bot_info, fields)
         except Exception as e:
             logger.error(f"Error al obtener información del bot {bot_id}: {str(e)}")
             raise
@@ -139,32 +719,55 @@ class BotService:
             bot_config = self.bots_config[bot_id]
             bot_path = os.path.expanduser(bot_config.get("path", ""))
             start_script = bot_config.get("start_script", "start.sh")
+            script_path = self._script_path(bot_id, start_script)
             
-            if not os.path.exists(os.path.join(bot_path, start_script)):
+            if script_path is None:
                 logger.error(f"Script de inicio no encontrado: {os.path.join(bot_path, start_script)}")
                 return False
             
+            readiness = bot_config.get("readiness") or {}
+            baseline = self._readiness_baseline(bot_id, readiness)
+            started_at = time.time()
+            start = time.perf_counter()
+            
             # Ejecutar script de inicio
-            command = f"cd {bot_path} && bash {start_script}"
-            process = subprocess.Popen(command, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            stdout, stderr = process.communicate()
+            result = self._run_script("start", bot_id, script_path)
             
-            if process.returncode != 0:
-                logger.error(f"Error al iniciar bot {bot_id}: {stderr.decode('utf-8')}")
+            if result["returncode"] != 0:
+                reason = "tiempo límite superado" if result.get("timed_out") else ' | '.join(result['output'])
+                logger.error(f"Error al iniciar bot {bot_id}: {reason}")
                 return False
             
+            # El script ha terminado; el bot solo cuenta como iniciado si cumple
+            # su condición de arranque a tiempo
+            if readiness:
+                ready = self._wait_ready(bot_id, readiness, started_at, baseline)
+                elapsed = time.perf_counter() - start
+                metrics.observe("bot_start_ready_seconds", elapsed, bot=bot_id,
+                                outcome="ready" if ready else "timeout")
+                if not ready:
+                    logger.error(f"Bot {bot_id} no cumplió la condición de arranque "
+                                 f"'{readiness.get('type')}' en {elapsed:.1f}s")
+                    self.invalidate_status_snapshot()
+                    return False
+                logger.info(f"Bot {bot_id} listo en {elapsed * 1000:.0f} ms")
+            
             logger.info(f"Bot {bot_id} iniciado correctamente")
+            self.invalidate_status_snapshot()
+            self._set_watch(bot_id, True)
             return True
         except Exception as e:
             logger.error(f"Error al iniciar bot {bot_id}: {str(e)}")
             raise
     
-    def stop_bot(self, bot_id):
+    def stop_bot(self, bot_id, keep_watch=False):
         """
         Detiene un bot específico.
         
         Args:
             bot_id (str): ID del bot a detener.
+            keep_watch (bool): No desactivar el reinicio automático (lo usa el
+                propio vigilante para reiniciar un bot colgado).
             
         Returns:
             bool: True si el bot se detuvo correctamente, False en caso contrario.
@@ -177,26 +780,43 @@ class BotService:
             bot_config = self.bots_config[bot_id]
             bot_path = os.path.expanduser(bot_config.get("path", ""))
             stop_script = bot_config.get("stop_script", "stop.sh")
+            script_path = self._script_path(bot_id, stop_script)
             
-            if not os.path.exists(os.path.join(bot_path, stop_script)):
+            if script_path is None:
                 logger.error(f"Script de detención no encontrado: {os.path.join(bot_path, stop_script)}")
                 return False
             
+            # Una parada a propósito no es una caída: desactivar el reinicio antes
+            if not keep_watch:
+                self._set_watch(bot_id, False)
+            
             # Ejecutar script de detención
-            command = f"cd {bot_path} && bash {stop_script}"
-            process = subprocess.Popen(command, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            stdout, stderr = process.communicate()
+            result = self._run_script("stop", bot_id, script_path)
             
-            if process.returncode != 0:
-                logger.error(f"Error al detener bot {bot_id}: {stderr.decode('utf-8')}")
+            if result["returncode"] != 0:
+                reason = "tiempo límite superado" if result.get("timed_out") else ' | '.join(result['output'])
+                logger.error(f"Error al detener bot {bot_id}: {reason}")
                 return False
             
             logger.info(f"Bot {bot_id} detenido correctamente")
+            self.invalidate_status_snapshot()
             return True
         except Exception as e:
             logger.error(f"Error al detener bot {bot_id}: {str(e)}")
             raise
     
+    def _set_watch(self, bot_id, watched):
+        """Activa o desactiva el reinicio automático del bot en el supervisor."""
+        try:
+            supervisor = get_supervisor()
+            if watched:
+                supervisor.watch(bot_id)
+            else:
+                supervisor.unwatch(bot_id)
+        except SupervisorError as e:
+            logger.warning(f"No se pudo actualizar la supervisión del bot {bot_id}: {str(e)}")
+    
+    @span("status_probe")
     def get_bot_status(self, bot_id):
         """
         Obtiene el estado actual de un bot verificando si el proceso está en ejecución.
@@ -212,43 +832,21 @@ class BotService:
                 logger.warning(f"Bot no encontrado: {bot_id}")
                 return "unknown"
             
-            bot_config = self.bots_config[bot_id]
-            
-            # Verificar si el proceso del bot está en ejecución
-            # Buscamos el proceso por nombre (adaptive_main.py para el bot SOL)
-            process_name = "adaptive_main.py"
-            if bot_id == "sol_bot_15m":
-                process_name = "adaptive_main.py"
-            # Se pueden agregar más condiciones para otros tipos de bots
-            
-            # Ejecutar comando ps para verificar si el proceso está en ejecución
-            command = f"ps aux | grep '[p]ython3 {process_name}' | wc -l"
-            process = subprocess.Popen(command, shell=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            stdout, stderr = process.communicate()
-            
-            # Convertir la salida a entero
-            try:
-                process_count = int(stdout.decode('utf-8').strip())
-            except ValueError:
-                process_count = 0
-            
-            # Si hay al menos un proceso en ejecución, el bot está activo
-            if process_count > 0:
-                logger.info(f"Bot {bot_id} está activo con {process_count} procesos en ejecución")
-                return "active"
-            else:
-                logger.info(f"Bot {bot_id} no está en ejecución")
-                return "inactive"
+            # Verificar si el proceso del bot está en ejecución usando la
+            # instantánea compartida (un escaneo para todos los bots)
+            snapshot = self.get_status_snapshot()
+            return snapshot["statuses"].get(bot_id, "inactive")
         except Exception as e:
             logger.error(f"Error al obtener estado del bot {bot_id}: {str(e)}")
             return "error"
     
-    def get_bot_positions(self, bot_id):
+    def get_bot_positions(self, bot_id, fields=None):
         """
         Obtiene las posiciones actualmente abiertas por un bot específico desde su archivo de estado.
         
         Args:
             bot_id (str): ID del bot a consultar.
+            fields (tuple, optional): Campos a devolver (todos si es None).
             
         Returns:
             list: Lista de diccionarios con información de las posiciones activas.
@@ -258,34 +856,32 @@ class BotService:
                 logger.warning(f"Bot no encontrado: {bot_id}")
                 return []
             
-            bot_config = self.bots_config[bot_id]
-            bot_path = os.path.expanduser(bot_config.get("path", ""))
-            
             # Ruta al archivo de estado del bot
-            state_file = os.path.join(bot_path, "sol_bot_15min_state.json")
+            state_file = self._state_file(bot_id)
             
             if not os.path.exists(state_file):
                 logger.warning(f"Archivo de estado no encontrado: {state_file}")
                 return []
             
             # Leer el archivo de estado
-            with open(state_file, 'r') as f:
-                state = json.load(f)
+            state = self._read_json(state_file, "state")
             
             # Verificar si hay una posición abierta
             if state.get("position", 0) <= 0:
                 logger.info(f"Bot {bot_id} no tiene posiciones abiertas")
                 return []
             
-            # Calcular la duración de la posición
+            # Calcular la duración de la posición (solo si se ha pedido)
             entry_time = state.get("entry_time", datetime.now().isoformat())
-            try:
-                entry_datetime = datetime.fromisoformat(entry_time.replace('Z', '+00:00'))
-                duration = datetime.now() - entry_datetime
-                duration_str = f"{duration.days * 24 + duration.seconds // 3600:02d}:{(duration.seconds % 3600) // 60:02d}:{duration.seconds % 60:02d}"
-            except Exception as e:
-                logger.error(f"Error al calcular duración de la posición: {str(e)}")
-                duration_str = "00:00:00"
+            duration_str = None
+            if wants(fields, "duration"):
+                try:
+                    entry_datetime = datetime.fromisoformat(entry_time.replace('Z', '+00:00'))
+                    duration = datetime.now() - entry_datetime
+                    duration_str = f"{duration.days * 24 + duration.seconds // 3600:02d}:{(duration.seconds % 3600) // 60:02d}:{duration.seconds % 60:02d}"
+                except Exception as e:
+                    logger.error(f"Error al calcular duración de la posición: {str(e)}")
+                    duration_str = "00:00:00"
             
             # Crear objeto de posición
             position = {
@@ -305,15 +901,72 @@ class BotService:
                 "status": "active"
             }
             
-            return [position]
+            return [project(position, fields)]
         except Exception as e:
             logger.error(f"Error al obtener posiciones del bot {bot_id}: {str(e)}")
             return []
             
+    @span("log_scan")
+    def _scan_log_signals(self, bot_id, bot_path):
+        """
+        Extrae las señales más recientes del último log de simulación del bot.
+        
+        Args:
+            bot_id (str): ID del bot.
+            bot_path (str): Directorio del bot.
+            
+        Returns:
+            list: Lista de diccionarios con las señales encontradas.
+        """
+        signals = []
+        
+        # Buscar el archivo de log más reciente
+        latest_log = self._latest_signal_log(bot_id, bot_path)
+        if latest_log:
+            try:
+                # Buscar líneas que contengan información de señales
+                with open(latest_log, 'r') as f:
+                    log_lines = f.readlines()
+                
+                # Procesar las últimas 1000 líneas del log en busca de señales
+                signal_lines = []
+                for line in log_lines[-1000:]:
+                    if "SIGNAL" in line or "signal" in line.lower():
+                        signal_lines.append(line)
+                
+                # Extraer información de las líneas de señales (simplificado)
+                for i, line in enumerate(signal_lines[-10:]):  # Últimas 10 señales
+                    try:
+                        # Extraer timestamp
+                        timestamp_str = line.split("[")[1].split("]")[0] if "[" in line and "]" in line else ""
+                        
+                        # Determinar tipo de señal
+                        signal_type = "BUY" if "BUY" in line or "LONG" in line else "SELL" if "SELL" in line or "SHORT" in line else "UNKNOWN"
+                        
+                        # Crear objeto de señal con información básica
+                        signal = {
+                            "timestamp": timestamp_str,
+                            "type": signal_type,
+                            "price": 0.0,  # No podemos extraer esto fácilmente del log
+                            "strength": 0.5,  # Valor por defecto
+                            "indicators": {},
+                            "ml_prediction": 0.5,  # Valor por defecto
+                            "executed": "executed" in line.lower() or "processed" in line.lower()
+                        }
+                        signals.append(signal)
+                    except Exception as e:
+                        logger.error(f"Error al procesar línea de señal: {str(e)}")
+            except Exception as e:
+                logger.error(f"Error al procesar logs: {str(e)}")
+        return signals
+    
     def get_bot_signals(self, bot_id):
         """
         Obtiene las señales recientes generadas por un bot específico desde sus logs.
         
+        El resultado se cachea mientras no cambie ninguna de sus fuentes; debe
+        tratarse como de solo lectura.
+        
         Args:
             bot_id (str): ID del bot a consultar.
             
@@ -325,11 +978,16 @@ class BotService:
                 logger.warning(f"Bot no encontrado: {bot_id}")
                 return []
             
-            bot_config = self.bots_config[bot_id]
-            bot_path = os.path.expanduser(bot_config.get("path", ""))
+            bot_path = self._bot_path(bot_id)
+            
+            # Reutilizar el resultado si ninguna fuente ha cambiado
+            sources = self._signal_sources(bot_id)
+            cached = self._signals_cache.get(bot_id)
+            if cached is not None and cached[0] == sources:
+                return cached[1]
             
             # Ruta al archivo de estado del bot
-            state_file = os.path.join(bot_path, "sol_bot_15min_state.json")
+            state_file = self._state_file(bot_id)
             signals_file = os.path.join(bot_path, "signals.json")
             
             # Lista para almacenar las señales
@@ -338,18 +996,16 @@ class BotService:
             # Verificar si existe el archivo de señales
             if os.path.exists(signals_file):
                 try:
-                    with open(signals_file, 'r') as f:
-                        signals_data = json.load(f)
-                        if isinstance(signals_data, list):
-                            signals.extend(signals_data)
+                    signals_data = self._read_json(signals_file, "signals")
+                    if isinstance(signals_data, list):
+                        signals.extend(signals_data)
                 except Exception as e:
                     logger.error(f"Error al leer archivo de señales: {str(e)}")
             
             # Si no hay archivo de señales o está vacío, intentar extraer señales del archivo de estado
             if not signals and os.path.exists(state_file):
                 try:
-                    with open(state_file, 'r') as f:
-                        state = json.load(f)
+                    state = self._read_json(state_file, "state")
                     
                     # Verificar si hay un historial de operaciones en el estado
                     trades = state.get("trades", [])
@@ -370,56 +1026,15 @@ class BotService:
             
             # Si aún no hay señales, buscar en los logs
             if not signals:
-                # Buscar archivos de log recientes
-                log_dir = os.path.join(bot_path, "logs")
-                if os.path.exists(log_dir):
-                    try:
-                        # Obtener el archivo de log más reciente
-                        log_files = [f for f in os.listdir(log_dir) if f.startswith(f"{bot_id}_cloud_simulation_") and f.endswith(".log")]
-                        if log_files:
-                            log_files.sort(reverse=True)  # Ordenar por nombre (que incluye la fecha)
-                            latest_log = os.path.join(log_dir, log_files[0])
-                            
-                            # Buscar líneas que contengan información de señales
-                            with open(latest_log, 'r') as f:
-                                log_lines = f.readlines()
-                            
-                            # Procesar las últimas 1000 líneas del log en busca de señales
-                            signal_lines = []
-                            for line in log_lines[-1000:]:
-                                if "SIGNAL" in line or "signal" in line.lower():
-                                    signal_lines.append(line)
-                            
-                            # Extraer información de las líneas de señales (simplificado)
-                            for i, line in enumerate(signal_lines[-10:]):  # Últimas 10 señales
-                                try:
-                                    # Extraer timestamp
-                                    timestamp_str = line.split("[")[1].split("]")[0] if "[" in line and "]" in line else ""
-                                    
-                                    # Determinar tipo de señal
-                                    signal_type = "BUY" if "BUY" in line or "LONG" in line else "SELL" if "SELL" in line or "SHORT" in line else "UNKNOWN"
-                                    
-                                    # Crear objeto de señal con información básica
-                                    signal = {
-                                        "timestamp": timestamp_str,
-                                        "type": signal_type,
-                                        "price": 0.0,  # No podemos extraer esto fácilmente del log
-                                        "strength": 0.5,  # Valor por defecto
-                                        "indicators": {},
-                                        "ml_prediction": 0.5,  # Valor por defecto
-                                        "executed": "executed" in line.lower() or "processed" in line.lower()
-                                    }
-                                    signals.append(signal)
-                                except Exception as e:
-                                    logger.error(f"Error al procesar línea de señal: {str(e)}")
-                    except Exception as e:
-                        logger.error(f"Error al procesar logs: {str(e)}")
+                signals.extend(self._scan_log_signals(bot_id, bot_path))
             
             # Ordenar señales por timestamp (más recientes primero)
             signals.sort(key=lambda x: x.get("timestamp", ""), reverse=True)
             
             # Limitar a las 10 señales más recientes
-            return signals[:10]
+            signals = signals[:10]
+            self._signals_cache[bot_id] = (sources, signals)
+            return signals
         except Exception as e:
             logger.error(f"Error al obtener señales del bot {bot_id}: {str(e)}")
             return []
@@ -0,0 +1,552 @@
+"""
+Agregación de bots de varios hosts a través de agentes.
+
+Cada host con bots ejecuta un agente (python -m api.agent) que expone por
+HTTP el estado, las posiciones y las señales de sus bots y permite
+iniciarlos y detenerlos. La API central registra los agentes en la sección
+'fleet' de api_config.json:
+
+    "fleet": {
+        "agents": {
+            "host-b": {"url": "http://10.0.0.12:5101", "token_env": "AGENT_TOKEN_B"}
+        }
+    }
+
+FleetService consulta los agentes en paralelo, cada uno con su tiempo límite
+y su circuit breaker, y combina sus respuestas con las de los bots locales.
+Las lecturas se sirven con stale-while-revalidate:
+
+    fresca (< fresh_seconds)     se devuelve sin contactar con el agente
+    obsoleta (< stale_seconds)   se devuelve y se refresca en segundo plano
+    sin caché o caducada         se espera al agente como mucho timeout_seconds;
+                                 si no responde a tiempo se sirve la copia
+                                 obsoleta que haya
+
+Las revalidaciones envían If-None-Match: si el agente responde 304 solo se
+renueva la antigüedad de la copia. Con el breaker abierto no se contacta con
+el agente hasta pasados breaker_reset_seconds (entonces se permite una
+prueba).
+"""
+
+import os
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+import requests
+from requests.adapters import HTTPAdapter
+from api.utils.metrics import metrics
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+class FleetError(Exception):
+    """Error al consultar un agente."""
+
+    def __init__(self, message, agent=None):
+        super().__init__(message)
+        self.agent = agent
+
+class AgentUnavailable(FleetError):
+    """El agente no ha respondido (o su breaker está abierto) y no hay copia utilizable."""
+
+class RemoteNotFound(FleetError):
+    """El agente no conoce el bot o el recurso pedido."""
+
+class RemoteRejected(FleetError):
+    """El agente ha rechazado la solicitud (4xx)."""
+
+    def __init__(self, message, agent=None, status_code=400, payload=None):
+        super().__init__(message, agent)
+        self.status_code = status_code
+        self.payload = payload
+
+class CircuitBreaker:
+    """
+    Circuit breaker de un agente: closed -> open tras 'failures' fallos
+    seguidos; open -> half_open pasados 'reset_seconds' (una sola prueba);
+    la prueba cierra el circuito si tiene éxito o lo vuelve a abrir.
+    """
+
+    def __init__(self, failures=3, reset_seconds=30.0):
+        self.failures = failures
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """
+        Indica si se puede contactar con el agente.
+
+        Returns:
+            bool: False con el circuito abierto o con una prueba en curso.
+        """
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_seconds:
+                self.state = "half_open"
+                self._probing = False
+            if self.state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        """
+        Cuenta un fallo del agente.
+
+        Returns:
+            bool: True si el circuito acaba de abrirse.
+        """
+        with self._lock:
+            self.consecutive_failures += 1
+            self._probing = False
+            if self.state == "half_open" or (self.state == "closed" and
+                                             self.consecutive_failures >= self.failures):
+                self.state = "open"
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+class Agent:
+    """Agente de un host: conexión, breaker y copias de sus respuestas."""
+
+    def __init__(self, name, url, token=None, timeout=2.0, action_timeout=120.0,
+                 breaker_failures=3, breaker_reset_seconds=30.0, pool_size=8, verify=True):
+        self.name = name
+        self.url = url.rstrip('/')
+        self.token = token
+        self.timeout = timeout
+        self.action_timeout = action_timeout
+        self.breaker = CircuitBreaker(breaker_failures, breaker_reset_seconds)
+        self.pool_size = pool_size
+        # Verificación TLS: True (CA del sistema) o ruta del certificado de la CA del agente
+        self.verify = verify
+        # Copias de las lecturas: clave -> (monotonic de la respuesta, datos, etag)
+        self._cache = {}
+        # Lecturas en curso: clave -> Future (una sola por clave)
+        self._inflight = {}
+        self._lock = threading.Lock()
+        # Se incrementa al invalidar: las lecturas iniciadas antes no guardan su respuesta
+        self.generation = 0
+        self.last_error = None
+        self.last_success = None
+        self._session = None
+
+    def session(self):
+        """Sesión HTTP con conexiones persistentes (se crea en cada proceso)."""
+        if self._session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            session.verify = self.verify
+            if self.token:
+                session.headers['X-Agent-Token'] = self.token
+            self._session = session
+        return self._session
+
+    def cached(self, key):
+        with self._lock:
+            return self._cache.get(key)
+
+    def store(self, key, data, etag, generation):
+        with self._lock:
+            if generation == self.generation:
+                self._cache[key] = (time.monotonic(), data, etag)
+
+    def invalidate(self):
+        """Descarta las copias (tras iniciar o detener un bot del host)."""
+        with self._lock:
+            self._cache.clear()
+            self.generation += 1
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+class FleetService:
+    """
+    Consulta los agentes registrados y combina sus bots con los locales.
+    """
+
+    def __init__(self):
+        self.local_name = "local"
+        self.timeout = 2.0
+        self.action_timeout = 120.0
+        self.fresh_seconds = 5.0
+        self.stale_seconds = 300.0
+        self.breaker_failures = 3
+        self.breaker_reset_seconds = 30.0
+        self.max_workers = 8
+        self.agents = {}
+        self._reset()
+
+    def _reset(self):
+        # El pool y las conexiones no sobreviven al fork de los workers
+        self._pid = os.getpid()
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        for agent in self.agents.values():
+            agent._session = None
+            agent._inflight = {}
+            agent._lock = threading.Lock()
+
+    def _check_process(self):
+        if self._pid != os.getpid():
+            self._reset()
+
+    @property
+    def enabled(self):
+        return bool(self.agents)
+
+    def configure(self, config):
+        """
+        Aplica la sección 'fleet' de api_config.json.
+
+        Args:
+            config (dict): Configuración de la API.
+        """
+        fleet_config = config.get('fleet', {})
+        self.local_name = fleet_config.get('local_name') or self.local_name
+        self.timeout = float(fleet_config.get('timeout_seconds', self.timeout))
+        self.action_timeout = float(fleet_config.get('action_timeout_seconds', self.action_timeout))
+        self.fresh_seconds = float(fleet_config.get('fresh_seconds', self.fresh_seconds))
+        self.stale_seconds = max(self.fresh_seconds,
+                                 float(fleet_config.get('stale_seconds', self.stale_seconds)))
+        self.breaker_failures = max(1, int(fleet_config.get('breaker_failures', self.breaker_failures)))
+        self.breaker_reset_seconds = float(fleet_config.get('breaker_reset_seconds', self.breaker_reset_seconds))
+        self.max_workers = max(1, int(fleet_config.get('max_workers', self.max_workers)))
+        default_token = os.getenv(fleet_config.get('token_env', 'AGENT_TOKEN'))
+
+        self.stop()
+        self.agents = {}
+        for name, agent_config in (fleet_config.get('agents') or {}).items():
+            if name == self.local_name or not agent_config.get('url'):
+                logger.error(f"Agente '{name}' ignorado: requiere 'url' y un nombre distinto del host local")
+                continue
+            token = agent_config.get('token') or os.getenv(agent_config.get('token_env') or '', default_token)
+            self.agents[name] = Agent(
+                name, agent_config['url'], token,
+                timeout=float(agent_config.get('timeout_seconds', self.timeout)),
+                action_timeout=float(agent_config.get('action_timeout_seconds', self.action_timeout)),
+                breaker_failures=self.breaker_failures,
+                breaker_reset_seconds=self.breaker_reset_seconds,
+                pool_size=self.max_workers,
+                verify=agent_config.get('ca_file') or True
+            )
+        if self.agents:
+            logger.info(f"Flota con {len(self.agents)} agentes: {', '.join(self.agents)}")
+
+    def _get_executor(self):
+        self._check_process()
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                        thread_name_prefix='fleet')
+        return self._executor
+
+    def _request(self, agent, method, path, params=None, etag=None, timeout=None, operation=False):
+        """
+        Realiza una solicitud al agente y actualiza su breaker.
+
+        Args:
+            operation (bool): La solicitud ejecuta una operación sobre un bot:
+                un 5xx con cuerpo JSON es el resultado de la operación, no un
+                fallo del agente.
+
+        Returns:
+            tuple: (código de estado, cuerpo JSON o None, ETag).
+
+        Raises:
+            AgentUnavailable: Si el agente no responde o devuelve 5xx.
+        """
+        headers = {'If-None-Match': etag} if etag else None
+        start = time.perf_counter()
+        try:
+            response = agent.session().request(method, agent.url + path, params=params, headers=headers,
+                                               timeout=timeout or agent.timeout)
+        except requests.RequestException as e:
+            outcome = "timeout" if isinstance(e, requests.Timeout) else "error"
+            self._failure(agent, outcome, start, f"{type(e).__name__}: {e}")
+            raise AgentUnavailable(f"El agente {agent.name} no responde", agent.name)
+        if response.status_code >= 500 and not (operation and self._is_json(response)):
+            self._failure(agent, "error", start, f"HTTP {response.status_code}")
+            raise AgentUnavailable(f"El agente {agent.name} devolvió {response.status_code}", agent.name)
+
+        metrics.inc("fleet_agent_requests_total", agent=agent.name, outcome=str(response.status_code))
+        metrics.observe("fleet_agent_request_seconds", time.perf_counter() - start, agent=agent.name)
+        agent.breaker.record_success()
+        agent.last_success = time.time()
+        agent.last_error = None
+        if response.status_code == 304:
+            return 304, None, etag
+        try:
+            body = response.json()
+        except ValueError:
+            body = None
+        return response.status_code, body, response.headers.get('ETag')
+
+    @staticmethod
+    def _is_json(response):
+        return response.headers.get('Content-Type', '').startswith('application/json')
+
+    def _failure(self, agent, outcome, start, error):
+        metrics.inc("fleet_agent_requests_total", agent=agent.name, outcome=outcome)
+        metrics.observe("fleet_agent_request_seconds", time.perf_counter() - start, agent=agent.name)
+        agent.last_error = error
+        if agent.breaker.record_failure():
+            logger.warning(f"Circuito abierto para el agente {agent.name} durante "
+                           f"{agent.breaker.reset_seconds:.0f}s: {error}")
+
+    def _refresh(self, agent, key, path, params):
+        """Lee un recurso del agente y guarda la copia (se ejecuta en el pool)."""
+        try:
+            generation = agent.generation
+            entry = agent.cached(key)
+            status, body, etag = self._request(agent, 'GET', path, params, etag=entry[2] if entry else None)
+            if status == 304 and entry is not None:
+                agent.store(key, entry[1], entry[2], generation)
+                return entry[1]
+            if status == 404:
+                raise RemoteNotFound(f"Recurso no encontrado en el agente {agent.name}", agent.name)
+            if status != 200 or not isinstance(body, dict):
+                message = (body or {}).get('error') if isinstance(body, dict) else None
+                raise RemoteRejected(message or f"Respuesta {status} del agente {agent.name}", agent.name,
+                                     status, body)
+            agent.store(key, body, etag, generation)
+            return body
+        finally:
+            with agent._lock:
+                agent._inflight.pop(key, None)
+
+    def _start_refresh(self, agent, key, path, params):
+        """Lanza (o reutiliza) la lectura en curso de una clave."""
+        with agent._lock:
+            future = agent._inflight.get(key)
+            if future is None:
+                future = self._get_executor().submit(self._refresh, agent, key, path, params)
+                agent._inflight[key] = future
+            return future
+
+    def _read_many(self, reads):
+        """
+        Resuelve varias lecturas a la vez aplicando stale-while-revalidate.
+
+        Args:
+            reads (list): Tuplas (agente, ruta, parámetros).
+
+        Returns:
+            list: Por cada lectura, (datos o None, meta, excepción o None); meta
+            indica el agente, el estado de la copia ('fresh', 'stale', 'error',
+            'open'), su antigüedad y el error, si lo hay.
+        """
+        self._check_process()
+        results = [None] * len(reads)
+        pending = {}
+        now = time.monotonic()
+        for index, (agent, path, params) in enumerate(reads):
+            key = (path, tuple(sorted((params or {}).items())))
+            entry = agent.cached(key)
+            age = now - entry[0] if entry else None
+            if entry is not None and age < self.fresh_seconds:
+                results[index] = (entry[1], self._meta(agent, "fresh", age), None)
+            elif not agent.breaker.allow():
+                results[index] = self._fallback(agent, entry, age, "open", "Circuito abierto")
+            elif entry is not None and age < self.stale_seconds:
+                # Servir la copia ya y revalidar en segundo plano
+                self._start_refresh(agent, key, path, params)
+                results[index] = (entry[1], self._meta(agent, "stale", age), None)
+            else:
+                pending[self._start_refresh(agent, key, path, params)] = (index, agent, entry, age)
+
+        if pending:
+            done, _ = wait(pending, timeout=max(agent.timeout for _, agent, _, _ in pending.values()))
+            for future, (index, agent, entry, age) in pending.items():
+                error = future.exception() if future in done else None
+                if future in done and error is None:
+                    results[index] = (future.result(), self._meta(agent, "fresh", 0.0), None)
+                elif isinstance(error, (RemoteNotFound, RemoteRejected)):
+                    results[index] = (None, self._meta(agent, "error", None, str(error)), error)
+                else:
+                    # Agente lento o caído: la lectura sigue en curso y actualizará la copia
+                    results[index] = self._fallback(agent, entry, age, "error",
+                                                    str(error) if error else "Tiempo de espera agotado")
+        for _, meta, _ in results:
+            metrics.inc("fleet_reads_total", agent=meta["host"], state=meta["state"])
+        return results
+
+    def _fallback(self, agent, entry, age, state, error):
+        """Copia obsoleta (aunque haya superado stale_seconds) o ningún dato."""
+        if entry is not None:
+            return entry[1], self._meta(agent, "stale", age, error), None
+        return None, self._meta(agent, state, None, error), AgentUnavailable(
+            f"El agente {agent.name} no está disponible: {error}", agent.name)
+
+    @staticmethod
+    def _meta(agent, state, age, error=None):
+        meta = {"host": agent.name, "state": state,
+                "age_seconds": round(age, 3) if age is not None else None}
+        if error:
+            meta["error"] = error
+        return meta
+
+    def _read(self, agent, path, params=None):
+        """
+        Lee un recurso de un agente.
+
+        Returns:
+            tuple: (datos, meta).
+
+        Raises:
+            RemoteNotFound, RemoteRejected: Si el agente rechaza la solicitud.
+            AgentUnavailable: Si no hay respuesta ni copia.
+        """
+        data, meta, error = self._read_many([(agent, path, params)])[0]
+        if error is not None:
+            raise error
+        return data, meta
+
+    def list_bots(self):
+        """
+        Obtiene los bots de todos los agentes.
+
+        Returns:
+            tuple: (bots con el campo 'host', meta por agente). Los bots de los
+            agentes que no responden y no tienen copia se omiten.
+        """
+        agents = list(self.agents.values())
+        results = self._read_many([(agent, '/agent/bots', None) for agent in agents])
+        bots = []
+        hosts = {}
+        for agent, (body, meta, _) in zip(agents, results):
+            hosts[agent.name] = meta
+            for bot in (body or {}).get("data", []):
+                bots.append(dict(bot, host=agent.name))
+        return bots, hosts
+
+    def version(self):
+        """
+        Parte de la versión de la lista de bots que aportan los agentes.
+
+        Returns:
+            tuple: (agente, ETag de su lista o estado) por agente.
+        """
+        parts = []
+        for agent in self.agents.values():
+            key = ('/agent/bots', ())
+            entry = agent.cached(key)
+            parts.append((agent.name, entry[2] if entry else None, agent.breaker.state))
+        return tuple(parts)
+
+    def owner(self, bot_id):
+        """
+        Busca el agente que gestiona un bot.
+
+        Args:
+            bot_id (str): ID del bot.
+
+        Returns:
+            Agent: Agente del host del bot, o None si ningún agente lo conoce.
+        """
+        if not self.enabled:
+            return None
+        bots, _ = self.list_bots()
+        for bot in bots:
+            if bot.get("id") == bot_id:
+                return self.agents[bot["host"]]
+        return None
+
+    def get(self, agent, bot_id, resource, params=None):
+        """
+        Lee un recurso de un bot remoto.
+
+        Args:
+            agent (Agent): Agente del host del bot.
+            bot_id (str): ID del bot.
+            resource (str): 'detail', 'positions' o 'signals'.
+            params (dict, optional): Parámetros de consulta (fields, since).
+
+        Returns:
+            tuple: (datos del recurso, meta de la lectura).
+        """
+        path = f"/agent/bots/{bot_id}" + ("" if resource == "detail" else f"/{resource}")
+        body, meta = self._read(agent, path, {k: v for k, v in (params or {}).items() if v is not None})
+        return body.get("data"), meta
+
+    def action(self, agent, bot_id, operation):
+        """
+        Inicia o detiene un bot remoto (sin copias ni reintentos).
+
+        Args:
+            agent (Agent): Agente del host del bot.
+            bot_id (str): ID del bot.
+            operation (str): 'start' o 'stop'.
+
+        Returns:
+            dict: Respuesta del agente.
+
+        Raises:
+            AgentUnavailable: Si el agente no responde o su breaker está abierto.
+            RemoteNotFound: Si el agente no conoce el bot.
+        """
+        self._check_process()
+        if not agent.breaker.allow():
+            raise AgentUnavailable(f"Circuito abierto para el agente {agent.name}", agent.name)
+        try:
+            status, body, _ = self._request(agent, 'POST', f"/agent/bots/{bot_id}/{operation}",
+                                            timeout=agent.action_timeout, operation=True)
+        finally:
+            # El estado del host cambia: la siguiente lectura debe ir al agente
+            agent.invalidate()
+        if status == 404:
+            raise RemoteNotFound(f"Bot no encontrado en el agente {agent.name}", agent.name)
+        return body or {"success": False, "error": f"Respuesta {status} del agente {agent.name}"}
+
+    def status(self):
+        """
+        Estado de los agentes (comprobación de salud).
+
+        Returns:
+            dict: Por agente, URL, estado del breaker, fallos seguidos y último error.
+        """
+        return {name: {"url": agent.url, "breaker": agent.breaker.state,
+                       "consecutive_failures": agent.breaker.consecutive_failures,
+                       "last_success": agent.last_success, "last_error": agent.last_error}
+                for name, agent in self.agents.items()}
+
+    def stop(self):
+        """Cierra el pool y las conexiones de este proceso."""
+        if self._pid != os.getpid():
+            self._reset()
+            return
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        for agent in self.agents.values():
+            agent.close()
+
+# Servicio global
+fleet_service = FleetService()
+
+def configure_fleet(config):
+    """
+    Configura la agregación de agentes.
+
+    Args:
+        config (dict): Configuración de la API.
+    """
+    fleet_service.configure(config)
@@ -0,0 +1,712 @@
+"""
+Supervisor de los procesos de los bots.
+
+Los scripts de inicio y parada y los procesos de los bots se lanzan desde aquí
+con stdout/stderr conectados a OutputPump, de modo que las tuberías siempre se
+drenan (un bot nunca se bloquea al escribir) y su salida reciente puede
+consultarse desde la API.
+
+El dueño de las tuberías debe vivir más que cualquier worker: si el proceso
+que lee la salida de un bot termina, el bot recibe SIGPIPE en su siguiente
+escritura. Por eso hay dos modos ('supervisor.mode' o BOT_SUPERVISOR_MODE):
+
+    embedded   el supervisor vive en el propio proceso de la API (servidor de
+               desarrollo, un único proceso)
+    process    el supervisor es un proceso aparte que escucha en un socket
+               Unix y los workers usan SupervisorClient; gunicorn.conf.py lo
+               arranca si no está en marcha y sobrevive a las recargas y al
+               reciclado de workers
+
+Uso del proceso independiente:
+    python -m api.services.supervisor [--socket RUTA]
+    python -m api.services.supervisor --stop
+"""
+
+import os
+import sys
+import json
+import time
+import signal
+import socket
+import logging
+import argparse
+import tempfile
+import threading
+import subprocess
+import socketserver
+
+from api.utils.output_pump import OutputPump
+from api.utils.resources import ResourceSampler
+from api.services.watchdog import BotWatchdog
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Raíz del proyecto (configuración por defecto del proceso independiente)
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DEFAULT_SOCKET = os.path.join(tempfile.gettempdir(), 'trading-bots-supervisor.sock')
+
+# Segundos que run() espera a que se lean las últimas líneas tras terminar el comando
+OUTPUT_GRACE_SECONDS = 0.5
+
+# Líneas de salida devueltas por run() (para los mensajes de error)
+RUN_OUTPUT_LINES = 20
+
+# Segundos entre SIGTERM y SIGKILL al grupo de un comando que supera su tiempo límite
+KILL_GRACE_SECONDS = 2.0
+
+class SupervisorConfig:
+    """Configuración del supervisor y de la lectura de logs desde la API."""
+
+    def __init__(self):
+        self.mode = 'embedded'
+        self.socket = DEFAULT_SOCKET
+        self.max_tail = 1000
+        self.follow_max_seconds = 300.0
+        self.heartbeat_seconds = 10.0
+
+    def configure(self, config):
+        """
+        Aplica la sección 'supervisor' de api_config.json.
+
+        Args:
+            config (dict): Configuración de la API.
+        """
+        supervisor_config = config.get('supervisor', {})
+        self.mode = os.getenv('BOT_SUPERVISOR_MODE', supervisor_config.get('mode', self.mode))
+        self.socket = os.getenv('BOT_SUPERVISOR_SOCKET', supervisor_config.get('socket') or DEFAULT_SOCKET)
+        self.max_tail = int(supervisor_config.get('max_tail_lines', self.max_tail))
+        self.follow_max_seconds = float(supervisor_config.get('follow_max_seconds', self.follow_max_seconds))
+        self.heartbeat_seconds = float(supervisor_config.get('follow_heartbeat_seconds', self.heartbeat_seconds))
+
+supervisor_config = SupervisorConfig()
+
+class SupervisorError(Exception):
+    """Error devuelto por el supervisor."""
+
+class SupervisorUnavailable(SupervisorError):
+    """No se pudo contactar con el proceso supervisor."""
+
+class Supervisor:
+    """
+    Lanza y vigila los procesos de los bots en el proceso actual.
+
+    Cada bot tiene como mucho un proceso principal (spawn) y puede ejecutar
+    comandos de corta duración (run); la salida de todos ellos va al búfer
+    del bot en OutputPump y su consumo de recursos lo muestrea ResourceSampler.
+    Con un BotService configurado, BotWatchdog reinicia los bots que caen.
+    """
+
+    def __init__(self, pump=None, sampler=None):
+        """
+        Inicializa el supervisor.
+
+        Args:
+            pump (OutputPump, optional): Lector de salida a utilizar.
+            sampler (ResourceSampler, optional): Muestreador de recursos a utilizar.
+        """
+        self.pump = pump or OutputPump()
+        self.sampler = sampler or ResourceSampler()
+        # Los procesos lanzados con spawn() se muestrean aunque no coincidan con el patrón
+        self.sampler.extra_roots = self._running_pids
+        self.watchdog = None
+        self._processes = {}
+        self._lock = threading.Lock()
+
+    def configure(self, config, bot_service=None):
+        """
+        Aplica las secciones 'supervisor', 'resources' y 'supervision' de api_config.json.
+
+        Args:
+            config (dict): Configuración de la API.
+            bot_service (BotService, optional): Servicio de los bots; permite
+                identificar sus procesos y reiniciarlos si caen.
+        """
+        self.pump.configure(config)
+        self.sampler.configure(config)
+        if bot_service is not None:
+            self.sampler.set_patterns(bot_service.process_patterns())
+            # El vigilante escanea los procesos periódicamente: sus cambios van al historial
+            bot_service.record_status_events = True
+            if self.watchdog is None:
+                self.watchdog = BotWatchdog(bot_service)
+            self.watchdog.configure(config)
+
+    def start(self):
+        """Arranca las tareas en segundo plano (muestreo de recursos y reinicios)."""
+        self.sampler.start()
+        if self.watchdog is not None:
+            self.watchdog.start()
+
+    def stop(self):
+        """Detiene las tareas en segundo plano."""
+        if self.watchdog is not None:
+            self.watchdog.stop()
+        self.sampler.stop()
+
+    def _watchdog(self):
+        if self.watchdog is None:
+            raise SupervisorError("Supervisión de bots no configurada")
+        return self.watchdog
+
+    def watch(self, bot_id):
+        """
+        Indica que un bot se ha iniciado y debe reiniciarse si cae.
+
+        Args:
+            bot_id (str): ID del bot.
+        """
+        self._watchdog().watch(bot_id)
+        return {}
+
+    def unwatch(self, bot_id):
+        """
+        Indica que un bot se detiene a propósito.
+
+        Args:
+            bot_id (str): ID del bot.
+        """
+        self._watchdog().unwatch(bot_id)
+        return {}
+
+    def supervision(self, bot_id):
+        """
+        Estado de supervisión de un bot (ver BotWatchdog.status).
+
+        Args:
+            bot_id (str): ID del bot.
+
+        Returns:
+            dict: Política, estado y eventos recientes.
+        """
+        return self._watchdog().status(bot_id)
+
+    def _running_pids(self):
+        with self._lock:
+            processes = dict(self._processes)
+        return {bot_id: [process.pid] for bot_id, process in processes.items() if process.poll() is None}
+
+    def _popen(self, bot_id, command, cwd=None, env=None):
+        # Solo listas de argumentos: nada se interpreta por un shell, ni
+        # siquiera lo que llega por el socket
+        if (not isinstance(command, (list, tuple)) or not command
+                or not all(isinstance(arg, str) for arg in command)):
+            raise SupervisorError("El comando debe ser una lista de argumentos (sin shell)")
+        # Sesión propia: las señales del terminal de la API no llegan a los bots
+        # y el grupo de procesos (PGID = PID) puede terminarse de una vez
+        process = subprocess.Popen(
+            list(command), cwd=cwd,
+            env=dict(os.environ, **env) if env else None,
+            stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            start_new_session=True
+        )
+        closed = self.pump.attach(bot_id, process)
+        return process, closed
+
+    def ping(self):
+        """
+        Comprueba que el supervisor responde.
+
+        Returns:
+            dict: {'pid'} del proceso supervisor.
+        """
+        return {"pid": os.getpid()}
+
+    def run(self, bot_id, command, cwd=None, env=None, timeout=None):
+        """
+        Ejecuta un comando hasta que termina (scripts de inicio y parada).
+
+        Solo se espera al proceso, no al cierre de sus tuberías: un script que
+        deja el bot en segundo plano sin redirigir su salida termina igualmente
+        y la salida del bot sigue llegando al búfer.
+
+        Args:
+            bot_id (str): Bot al que se atribuye la salida.
+            command (list): Lista de argumentos (se ejecuta directamente, sin shell).
+            cwd (str, optional): Directorio de trabajo.
+            env (dict, optional): Variables de entorno añadidas.
+            timeout (float, optional): Segundos máximos; al superarlos se
+                termina todo el grupo de procesos del comando.
+
+        Returns:
+            dict: {'returncode', 'pid', 'timed_out', 'output'} con las últimas
+            líneas emitidas.
+
+        Raises:
+            SupervisorError: Si el comando no es una lista de argumentos.
+        """
+        after = self.pump.buffer(bot_id).last_seq
+        process, closed = self._popen(bot_id, command, cwd, env)
+        timed_out = False
+        try:
+            returncode = process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            timed_out = True
+            logger.warning(f"Comando del bot {bot_id} sin terminar tras {timeout}s, terminando su grupo")
+            returncode = self._kill_group(process)
+        closed.wait(OUTPUT_GRACE_SECONDS)
+        lines = self.pump.read(bot_id, after=after, limit=self.pump.max_lines)["lines"]
+        return {
+            "returncode": returncode,
+            "pid": process.pid,
+            "timed_out": timed_out,
+            "output": [line["line"] for line in lines[-RUN_OUTPUT_LINES:]]
+        }
+
+    @staticmethod
+    def _kill_group(process):
+        """Termina el grupo de procesos de un comando (SIGTERM y después SIGKILL)."""
+        for sig in (signal.SIGTERM, signal.SIGKILL):
+            try:
+                os.killpg(process.pid, sig)
+            except ProcessLookupError:
+                pass
+            try:
+                return process.wait(KILL_GRACE_SECONDS)
+            except subprocess.TimeoutExpired:
+                continue
+        return process.wait()
+
+    def spawn(self, bot_id, command, cwd=None, env=None):
+        """
+        Lanza el proceso principal de un bot.
+
+        Args:
+            bot_id (str): ID del bot.
+            command (list): Lista de argumentos (se ejecuta directamente, sin shell).
+            cwd (str, optional): Directorio de trabajo.
+            env (dict, optional): Variables de entorno añadidas.
+
+        Returns:
+            dict: {'pid'} del proceso lanzado.
+
+        Raises:
+            SupervisorError: Si el bot ya tiene un proceso en ejecución o el
+                comando no es una lista de argumentos.
+        """
+        with self._lock:
+            current = self._processes.get(bot_id)
+            if current is not None and current.poll() is None:
+                raise SupervisorError(f"El bot {bot_id} ya está en ejecución (PID {current.pid})")
+            process, _ = self._popen(bot_id, command, cwd, env)
+            self._processes[bot_id] = process
+        logger.info(f"Bot {bot_id} lanzado con PID {process.pid}")
+        return {"pid": process.pid}
+
+    def terminate(self, bot_id, timeout=5.0):
+        """
+        Detiene el proceso principal de un bot (SIGTERM y, si no termina, SIGKILL).
+
+        Args:
+            bot_id (str): ID del bot.
+            timeout (float): Segundos de espera antes de forzar el cierre.
+
+        Returns:
+            dict: {'pid', 'returncode'}, o {} si el bot no tenía proceso.
+        """
+        with self._lock:
+            process = self._processes.pop(bot_id, None)
+        if process is None:
+            return {}
+        if process.poll() is None:
+            process.terminate()
+            try:
+                process.wait(timeout)
+            except subprocess.TimeoutExpired:
+                logger.warning(f"Bot {bot_id} no terminó en {timeout}s, forzando cierre")
+                process.kill()
+                process.wait()
+        logger.info(f"Bot {bot_id} detenido (PID {process.pid}, código {process.returncode})")
+        return {"pid": process.pid, "returncode": process.returncode}
+
+    def status(self):
+        """
+        Estado de los procesos principales lanzados con spawn().
+
+        Returns:
+            dict: bot_id -> {'pid', 'running', 'returncode'}.
+        """
+        with self._lock:
+            processes = dict(self._processes)
+        return {
+            bot_id: {"pid": process.pid, "running": process.poll() is None,
+                     "returncode": process.returncode}
+            for bot_id, process in processes.items()
+        }
+
+    def logs(self, bot_id, tail=None, after=None, limit=1000):
+        """
+        Lee la salida conservada de un bot.
+
+        Args:
+            bot_id (str): ID del bot.
+            tail (int, optional): Últimas N líneas.
+            after (int, optional): Solo las líneas posteriores a esta secuencia.
+            limit (int): Máximo de líneas devueltas.
+
+        Returns:
+            dict: {'lines', 'next', 'missed'}.
+        """
+        return self.pump.read(bot_id, tail=tail, after=after, limit=limit)
+
+    def follow(self, bot_id, after, timeout=300.0, heartbeat=10.0, limit=1000):
+        """
+        Genera las líneas nuevas de un bot a medida que llegan.
+
+        Args:
+            bot_id (str): ID del bot.
+            after (int): Secuencia a partir de la que se lee.
+            timeout (float): Segundos totales de seguimiento.
+            heartbeat (float): Segundos sin líneas tras los que se genera un
+                bloque vacío (permite detectar que el lector se ha ido).
+            limit (int): Máximo de líneas por bloque.
+
+        Yields:
+            dict: {'lines', 'next', 'missed'}.
+        """
+        buffer = self.pump.buffer(bot_id)
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            if buffer.wait(after, min(heartbeat, remaining)):
+                chunk = self.pump.read(bot_id, after=after, limit=limit)
+                after = chunk["next"]
+                yield chunk
+            else:
+                yield {"lines": [], "next": after, "missed": 0}
+
+    def resources(self, bot_id, window=None):
+        """
+        Consumo de recursos muestreado de un bot.
+
+        Args:
+            bot_id (str): ID del bot.
+            window (float, optional): Segundos hacia atrás.
+
+        Returns:
+            dict: {'columns', 'rows', 'summary', 'sampler'} (ver ResourceSampler.series).
+        """
+        return self.sampler.series(bot_id, window)
+
+    def shutdown(self):
+        """Detiene las tareas en segundo plano, los procesos principales y el lector de salida."""
+        self.stop()
+        for bot_id in list(self.status()):
+            try:
+                self.terminate(bot_id)
+            except Exception as e:
+                logger.error(f"Error al detener bot {bot_id}: {str(e)}")
+        self.pump.stop()
+
+# Operaciones expuestas por el socket: nombre -> respuesta en streaming
+OPERATIONS = {
+    "ping": False, "run": False, "spawn": False, "terminate": False, "status": False,
+    "logs": False, "follow": True, "resources": False, "watch": False, "unwatch": False,
+    "supervision": False, "shutdown": False,
+}
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Atiende una solicitud JSON por conexión (una línea de petición)."""
+
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline())
+            op = request.pop("op")
+            if op not in OPERATIONS:
+                raise SupervisorError(f"Operación desconocida: {op}")
+            if op == "shutdown":
+                self._send({"ok": True, "result": {}})
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+                return
+            if OPERATIONS[op]:
+                for chunk in getattr(self.server.supervisor, op)(**request):
+                    self._send(dict(chunk, ok=True))
+                return
+            result = getattr(self.server.supervisor, op)(**request)
+        except (BrokenPipeError, ConnectionResetError):
+            return
+        except Exception as e:
+            logger.warning(f"Error en solicitud al supervisor: {str(e)}")
+            self._send({"ok": False, "error": str(e)})
+            return
+        self._send({"ok": True, "result": result})
+
+    def _send(self, message):
+        self.wfile.write(json.dumps(message).encode('utf-8') + b'\n')
+        self.wfile.flush()
+
+class SupervisorServer(socketserver.ThreadingUnixStreamServer):
+    """Servidor del socket Unix del proceso supervisor."""
+
+    daemon_threads = True
+
+    def __init__(self, path, supervisor):
+        """
+        Crea el socket (solo accesible por el usuario actual).
+
+        Args:
+            path (str): Ruta del socket.
+            supervisor (Supervisor): Supervisor que atiende las operaciones.
+
+        Raises:
+            SupervisorError: Si ya hay otro supervisor escuchando en la ruta.
+        """
+        if os.path.exists(path):
+            if SupervisorClient(path).is_running():
+                raise SupervisorError(f"Ya hay un supervisor escuchando en {path}")
+            os.remove(path)
+        self.supervisor = supervisor
+        super().__init__(path, _RequestHandler)
+        os.chmod(path, 0o600)
+
+class SupervisorClient:
+    """
+    Cliente del proceso supervisor con la misma interfaz que Supervisor.
+
+    Cada operación abre una conexión al socket Unix (unas decenas de
+    microsegundos), así que el cliente puede compartirse entre hilos.
+    """
+
+    def __init__(self, path, connect_timeout=2.0):
+        """
+        Inicializa el cliente.
+
+        Args:
+            path (str): Ruta del socket del supervisor.
+            connect_timeout (float): Segundos máximos para conectar.
+        """
+        self.path = path
+        self.connect_timeout = connect_timeout
+
+    def _open(self, op, args, timeout):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.settimeout(self.connect_timeout)
+            sock.connect(self.path)
+            sock.sendall(json.dumps(dict(args, op=op)).encode('utf-8') + b'\n')
+            sock.settimeout(timeout)
+        except OSError as e:
+            sock.close()
+            raise SupervisorUnavailable(f"Supervisor no disponible en {self.path}: {str(e)}")
+        return sock
+
+    @staticmethod
+    def _message(line):
+        if not line:
+            raise SupervisorUnavailable("El supervisor cerró la conexión")
+        message = json.loads(line)
+        if not message.get("ok"):
+            raise SupervisorError(message.get("error", "Error desconocido"))
+        return message
+
+    def _call(self, op, read_timeout=None, **args):
+        sock = self._open(op, args, read_timeout)
+        try:
+            with sock.makefile('rb') as reader:
+                return self._message(reader.readline())["result"]
+        except OSError as e:
+            raise SupervisorUnavailable(f"Error de comunicación con el supervisor: {str(e)}")
+        finally:
+            sock.close()
+
+    def is_running(self):
+        """True si hay un supervisor respondiendo en el socket."""
+        try:
+            self.ping()
+            return True
+        except SupervisorError:
+            return False
+
+    def ping(self):
+        return self._call("ping", read_timeout=self.connect_timeout)
+
+    def run(self, bot_id, command, cwd=None, env=None, timeout=None):
+        # Margen para la terminación del grupo y la lectura de la última salida
+        read_timeout = None
+        if timeout:
+            read_timeout = timeout + 2 * KILL_GRACE_SECONDS + OUTPUT_GRACE_SECONDS + self.connect_timeout
+        return self._call("run", read_timeout=read_timeout, bot_id=bot_id, command=command, cwd=cwd,
+                          env=env, timeout=timeout)
+
+    def spawn(self, bot_id, command, cwd=None, env=None):
+        return self._call("spawn", bot_id=bot_id, command=command, cwd=cwd, env=env)
+
+    def terminate(self, bot_id, timeout=5.0):
+        return self._call("terminate", bot_id=bot_id, timeout=timeout)
+
+    def status(self):
+        return self._call("status", read_timeout=self.connect_timeout)
+
+    def logs(self, bot_id, tail=None, after=None, limit=1000):
+        return self._call("logs", read_timeout=self.connect_timeout, bot_id=bot_id, tail=tail,
+                          after=after, limit=limit)
+
+    def follow(self, bot_id, after, timeout=300.0, heartbeat=10.0, limit=1000):
+        sock = self._open("follow", {"bot_id": bot_id, "after": after, "timeout": timeout,
+                                     "heartbeat": heartbeat, "limit": limit},
+                          heartbeat + self.connect_timeout)
+        try:
+            with sock.makefile('rb') as reader:
+                for line in reader:
+                    yield self._message(line)
+        except OSError as e:
+            raise SupervisorUnavailable(f"Error de comunicación con el supervisor: {str(e)}")
+        finally:
+            sock.close()
+
+    def resources(self, bot_id, window=None):
+        return self._call("resources", read_timeout=self.connect_timeout, bot_id=bot_id, window=window)
+
+    def watch(self, bot_id):
+        return self._call("watch", read_timeout=self.connect_timeout, bot_id=bot_id)
+
+    def unwatch(self, bot_id):
+        return self._call("unwatch", read_timeout=self.connect_timeout, bot_id=bot_id)
+
+    def supervision(self, bot_id):
+        return self._call("supervision", read_timeout=self.connect_timeout, bot_id=bot_id)
+
+    def shutdown(self):
+        return self._call("shutdown", read_timeout=self.connect_timeout)
+
+# Supervisor en el propio proceso (modo 'embedded' y proceso independiente)
+local_supervisor = Supervisor()
+_supervisor = local_supervisor
+
+def configure_supervisor(config, bot_service=None):
+    """
+    Elige el supervisor según el modo configurado.
+
+    Args:
+        config (dict): Configuración de la API.
+        bot_service (BotService, optional): Servicio de los bots (solo se usa
+            en modo 'embedded'; el proceso supervisor crea el suyo).
+    """
+    global _supervisor
+    supervisor_config.configure(config)
+    if supervisor_config.mode == 'process':
+        _supervisor = SupervisorClient(supervisor_config.socket)
+        logger.info(f"Supervisor de bots en proceso aparte ({supervisor_config.socket})")
+    else:
+        local_supervisor.configure(config, bot_service)
+        _supervisor = local_supervisor
+
+def get_supervisor():
+    """
+    Devuelve el supervisor configurado.
+
+    Returns:
+        Supervisor | SupervisorClient: Supervisor local o cliente del proceso supervisor.
+    """
+    return _supervisor
+
+def start_supervisor_tasks():
+    """Arranca las tareas en segundo plano del supervisor si vive en este proceso."""
+    if _supervisor is local_supervisor:
+        local_supervisor.start()
+
+def stop_supervisor_tasks():
+    """Detiene las tareas en segundo plano del supervisor si vive en este proceso."""
+    if _supervisor is local_supervisor:
+        local_supervisor.stop()
+
+def ensure_supervisor_process(config, timeout=5.0):
+    """
+    Arranca el proceso supervisor si no hay ninguno escuchando.
+
+    El proceso se lanza en su propia sesión para que sobreviva a la API.
+
+    Args:
+        config (dict): Configuración de la API.
+        timeout (float): Segundos máximos de espera a que responda.
+
+    Returns:
+        bool: True si el supervisor está disponible.
+    """
+    supervisor_config.configure(config)
+    path = supervisor_config.socket
+    client = SupervisorClient(path)
+    if client.is_running():
+        return True
+    subprocess.Popen(
+        [sys.executable, '-m', 'api.services.supervisor', '--socket', path],
+        cwd=REPO_ROOT, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL, start_new_session=True
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if client.is_running():
+            return True
+        time.sleep(0.05)
+    logger.error(f"El supervisor de bots no respondió en {path}")
+    return False
+
+def _load_config():
+    try:
+        with open(os.path.join(REPO_ROOT, 'config', 'api_config.json'), 'r') as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+def main():
+    parser = argparse.ArgumentParser(description="Supervisor de los procesos de los bots")
+    parser.add_argument("--socket", default=None, help="Ruta del socket Unix")
+    parser.add_argument("--stop", action="store_true", help="Detener el supervisor en marcha (y sus bots)")
+    args = parser.parse_args()
+
+    config = _load_config()
+    supervisor_config.configure(config)
+    path = args.socket or supervisor_config.socket
+    if args.stop:
+        try:
+            SupervisorClient(path).shutdown()
+        except SupervisorError as e:
+            print(str(e))
+            sys.exit(1)
+        return
+
+    from api.utils.logging_config import setup_logging, stop_logging
+    from api.services.bot_service import BotService
+    from api.utils.metrics import metrics
+    from api.utils.event_store import event_store, configure_events
+    setup_logging(config)
+    metrics.configure(config)
+    configure_events(config)
+    bot_service = BotService()
+    bot_service.configure(config)
+    local_supervisor.configure(config, bot_service)
+    try:
+        server = SupervisorServer(path, local_supervisor)
+    except SupervisorError as e:
+        logger.error(str(e))
+        sys.exit(1)
+
+    def _stop(signum, frame):
+        threading.Thread(target=server.shutdown, daemon=True).start()
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+
+    logger.info(f"Supervisor de bots escuchando en {path} (PID {os.getpid()})")
+    local_supervisor.start()
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        local_supervisor.shutdown()
+        metrics.flush()
+        event_store.stop()
+        logger.info("Supervisor de bots detenido")
+        stop_logging()
+
+if __name__ == '__main__':
+    # Ejecutar desde el módulo importado y no desde __main__: BotService usa
+    # get_supervisor() de api.services.supervisor y debe ver el mismo supervisor
+    from api.services import supervisor
+    supervisor.main()
@@ -0,0 +1,397 @@
+"""
+Reinicio automático de los bots caídos.
+
+Cada bot puede declarar una política de supervisión en bots_config.json:
+
+    "supervision": {
+        "restart": true,
+        "backoff_initial_seconds": 1,
+        "backoff_max_seconds": 300,
+        "backoff_multiplier": 2,
+        "jitter": 0.2,
+        "max_restarts": 5,
+        "restart_window_seconds": 600,
+        "reset_after_seconds": 300,
+        "start_grace_seconds": 15,
+        "liveness": {"type": "state_file", "max_intervals": 3}
+    }
+
+BotWatchdog comprueba cada 'check_interval_seconds' si el proceso de los
+bots que deben estar en marcha (iniciados desde la API y no detenidos) sigue
+vivo. Si ha terminado, o si la prueba de vida falla (el archivo de estado o
+un archivo de latido no se actualiza a tiempo), lo reinicia con retroceso
+exponencial y jitter. Tras 'max_restarts' reinicios en 'restart_window_seconds'
+el bot queda en 'crash_loop' y no se reinicia hasta que se inicie a mano.
+
+Los eventos de cada bot (caídas, reinicios y su latencia desde la detección)
+se conservan en memoria y se exponen en /api/bots/<id>/supervision.
+"""
+
+import os
+import time
+import random
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+from api.utils.metrics import metrics
+from api.utils.event_store import event_store
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Segundos por unidad de los intervalos de los bots ('15m', '1h', '1d'...)
+INTERVAL_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+def parse_interval(text):
+    """
+    Convierte un intervalo de velas ('15m', '4h', '1d') a segundos.
+
+    Args:
+        text (str): Intervalo del bot.
+
+    Returns:
+        float: Segundos, o None si el formato no es válido.
+    """
+    text = str(text or "").strip()
+    unit = INTERVAL_UNITS.get(text[-1:])
+    try:
+        return float(text[:-1]) * unit if unit else None
+    except ValueError:
+        return None
+
+class RestartPolicy:
+    """Política de supervisión de un bot (sección 'supervision' de su configuración)."""
+
+    def __init__(self, bot_config):
+        """
+        Lee la política de la configuración del bot.
+
+        Args:
+            bot_config (dict): Configuración del bot en bots_config.json.
+        """
+        policy = bot_config.get("supervision", {})
+        self.restart = bool(policy.get("restart", False))
+        self.backoff_initial = float(policy.get("backoff_initial_seconds", 1.0))
+        self.backoff_max = float(policy.get("backoff_max_seconds", 300.0))
+        self.backoff_multiplier = float(policy.get("backoff_multiplier", 2.0))
+        self.jitter = float(policy.get("jitter", 0.2))
+        self.max_restarts = int(policy.get("max_restarts", 5))
+        self.restart_window = float(policy.get("restart_window_seconds", 600.0))
+        self.reset_after = float(policy.get("reset_after_seconds", 300.0))
+        self.start_grace = float(policy.get("start_grace_seconds", 15.0))
+
+        liveness = policy.get("liveness") or {}
+        self.liveness_type = liveness.get("type")
+        self.liveness_path = liveness.get("path")
+        max_age = liveness.get("max_age_seconds")
+        if max_age is None and self.liveness_type:
+            interval = parse_interval(bot_config.get("interval"))
+            max_age = interval * float(liveness.get("max_intervals", 3)) if interval else None
+        self.liveness_max_age = float(max_age) if max_age is not None else None
+
+    def backoff(self, attempt):
+        """
+        Espera antes del reinicio número 'attempt' (desde 0).
+
+        Returns:
+            float: Segundos, con jitter aleatorio de ±jitter.
+        """
+        delay = min(self.backoff_max, self.backoff_initial * self.backoff_multiplier ** attempt)
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def to_dict(self):
+        """Devuelve la política como diccionario."""
+        return {
+            "restart": self.restart,
+            "backoff_initial_seconds": self.backoff_initial,
+            "backoff_max_seconds": self.backoff_max,
+            "backoff_multiplier": self.backoff_multiplier,
+            "jitter": self.jitter,
+            "max_restarts": self.max_restarts,
+            "restart_window_seconds": self.restart_window,
+            "reset_after_seconds": self.reset_after,
+            "start_grace_seconds": self.start_grace,
+            "liveness": {"type": self.liveness_type, "path": self.liveness_path,
+                         "max_age_seconds": self.liveness_max_age} if self.liveness_type else None,
+        }
+
+class _BotState:
+    """Estado de supervisión de un bot."""
+
+    def __init__(self, max_events):
+        self.desired = False
+        self.state = "stopped"
+        self.started_at = None
+        self.running_since = None
+        self.detected_at = None
+        self.reason = None
+        self.next_restart_at = None
+        self.delay = 0.0
+        self.attempt = 0
+        self.restarts = deque()
+        self.events = deque(maxlen=max_events)
+
+class BotWatchdog:
+    """Vigila los bots que deben estar en marcha y los reinicia según su política."""
+
+    def __init__(self, bot_service, check_interval=2.0, max_events=100):
+        """
+        Inicializa el vigilante.
+
+        Args:
+            bot_service (BotService): Servicio con la configuración, el estado y
+                los scripts de los bots.
+            check_interval (float): Segundos entre comprobaciones.
+            max_events (int): Eventos conservados por bot.
+        """
+        self.bot_service = bot_service
+        self.check_interval = check_interval
+        self.max_events = max_events
+        self.enabled = True
+        self._bots = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def configure(self, config):
+        """
+        Aplica la sección 'supervision' de api_config.json.
+
+        Args:
+            config (dict): Configuración de la API.
+        """
+        supervision_config = config.get('supervision', {})
+        self.enabled = bool(supervision_config.get('enabled', self.enabled))
+        self.check_interval = float(supervision_config.get('check_interval_seconds', self.check_interval))
+        self.max_events = int(supervision_config.get('max_events', self.max_events))
+
+    def _policy(self, bot_id):
+        return RestartPolicy(self.bot_service.bots_config.get(bot_id, {}))
+
+    def _bot(self, bot_id):
+        bot = self._bots.get(bot_id)
+        if bot is None:
+            bot = self._bots[bot_id] = _BotState(self.max_events)
+        return bot
+
+    def _event(self, bot_id, bot, kind, message, **fields):
+        bot.events.append(dict(fields, ts=datetime.now().isoformat(timespec='milliseconds'),
+                               type=kind, message=message))
+        log = logger.warning if kind in ("exit", "liveness", "restart_failed", "crash_loop") else logger.info
+        log(f"Bot {bot_id}: {message}")
+        event_store.record(kind, bot_id, message=message, **fields)
+
+    def watch(self, bot_id):
+        """
+        Marca un bot como iniciado: a partir de ahora se reinicia si cae.
+
+        Un inicio manual saca al bot de 'crash_loop' y reinicia el retroceso;
+        los reinicios del propio vigilante no lo hacen.
+
+        Args:
+            bot_id (str): ID del bot.
+        """
+        with self._lock:
+            bot = self._bot(bot_id)
+            if bot.state == "restarting":
+                return
+            if not bot.desired or bot.state == "crash_loop":
+                bot.attempt = 0
+                bot.restarts.clear()
+            bot.desired = True
+            bot.state = "starting"
+            bot.started_at = time.monotonic()
+            bot.running_since = None
+            bot.next_restart_at = None
+
+    def unwatch(self, bot_id):
+        """
+        Marca un bot como detenido a propósito (no se reinicia).
+
+        Args:
+            bot_id (str): ID del bot.
+        """
+        with self._lock:
+            bot = self._bot(bot_id)
+            bot.desired = False
+            bot.state = "stopped"
+            bot.next_restart_at = None
+
+    def check_once(self):
+        """Comprueba todos los bots supervisados y programa o lanza los reinicios."""
+        with self._lock:
+            watched = [bot_id for bot_id, bot in self._bots.items()
+                       if bot.desired and bot.state != "restarting"]
+        # Sin bots supervisados solo se escanea si hay que registrar sus cambios de estado
+        if not watched and not self.bot_service.record_status_events:
+            return
+        statuses = self.bot_service.get_status_snapshot(force=True)["statuses"]
+        now = time.monotonic()
+        for bot_id in watched:
+            policy = self._policy(bot_id)
+            running = statuses.get(bot_id) == "active"
+            with self._lock:
+                bot = self._bot(bot_id)
+                if not bot.desired or bot.state == "restarting":
+                    continue
+                if bot.state == "backoff":
+                    if now >= bot.next_restart_at:
+                        bot.state = "restarting"
+                        threading.Thread(target=self._restart, args=(bot_id, policy),
+                                         name=f"restart-{bot_id}", daemon=True).start()
+                    continue
+                if bot.state == "crash_loop":
+                    continue
+                if running:
+                    self._check_running(bot_id, bot, policy, now)
+                elif bot.running_since is not None or now - bot.started_at >= policy.start_grace:
+                    self._failed(bot_id, bot, policy, now, "exit", "el proceso ha terminado")
+
+    def _check_running(self, bot_id, bot, policy, now):
+        if bot.running_since is None:
+            bot.running_since = now
+            bot.state = "running"
+        elif bot.attempt and now - bot.running_since >= policy.reset_after:
+            # Estable durante reset_after: el siguiente fallo empieza de nuevo el retroceso
+            bot.attempt = 0
+        age = self._liveness_age(bot_id, policy)
+        if age is not None and age > policy.liveness_max_age and now - bot.running_since >= policy.liveness_max_age:
+            self._failed(bot_id, bot, policy, now, "liveness",
+                         f"sin actividad desde hace {age:.0f}s (máximo {policy.liveness_max_age:.0f}s)")
+
+    def _liveness_age(self, bot_id, policy):
+        """Segundos desde la última modificación del archivo de la prueba de vida."""
+        if not policy.liveness_type or policy.liveness_max_age is None:
+            return None
+        if policy.liveness_type == "heartbeat_file":
+            path = os.path.join(self.bot_service.get_bot_paths()[bot_id], policy.liveness_path or "heartbeat")
+        else:
+            path = self.bot_service.get_state_file(bot_id)
+        try:
+            return time.time() - os.stat(path).st_mtime
+        except OSError:
+            # Sin archivo todavía: cuenta desde que el bot está en marcha
+            return None
+
+    def _failed(self, bot_id, bot, policy, now, reason, message):
+        bot.running_since = None
+        bot.detected_at = now
+        bot.reason = reason
+        self._event(bot_id, bot, reason, message)
+        if not policy.restart:
+            bot.desired = False
+            bot.state = "failed"
+            return
+        self._schedule(bot_id, bot, policy, now, reason)
+
+    def _schedule(self, bot_id, bot, policy, now, reason):
+        """Programa el siguiente reinicio o deja el bot en 'crash_loop'."""
+        while bot.restarts and now - bot.restarts[0] > policy.restart_window:
+            bot.restarts.popleft()
+        if len(bot.restarts) >= policy.max_restarts:
+            bot.state = "crash_loop"
+            metrics.inc("bot_restarts_total", bot=bot_id, reason=reason, result="crash_loop")
+            self._event(bot_id, bot, "crash_loop",
+                        f"{len(bot.restarts)} reinicios en {policy.restart_window:.0f}s; "
+                        f"no se reinicia hasta un inicio manual")
+            return
+        bot.delay = policy.backoff(bot.attempt)
+        bot.next_restart_at = now + bot.delay
+        bot.state = "backoff"
+
+    def _restart(self, bot_id, policy):
+        with self._lock:
+            bot = self._bot(bot_id)
+            reason, attempt, delay, detected_at = bot.reason, bot.attempt + 1, bot.delay, bot.detected_at
+        ok = False
+        try:
+            if reason == "liveness":
+                # Proceso colgado: detenerlo antes de lanzarlo de nuevo
+                self.bot_service.stop_bot(bot_id, keep_watch=True)
+            ok = self.bot_service.start_bot(bot_id)
+            if ok and self.bot_service.record_status_events:
+                # Registrar el nuevo estado ya, sin esperar a la próxima comprobación
+                self.bot_service.get_status_snapshot(force=True)
+        except Exception as e:
+            logger.error(f"Error al reiniciar bot {bot_id}: {str(e)}")
+        latency = time.monotonic() - detected_at
+        with self._lock:
+            bot = self._bot(bot_id)
+            bot.restarts.append(time.monotonic())
+            bot.attempt = attempt
+            if not bot.desired:
+                # Detenido desde la API mientras se reiniciaba
+                return
+            metrics.inc("bot_restarts_total", bot=bot_id, reason=reason, result="ok" if ok else "error")
+            if ok:
+                metrics.observe("bot_restart_latency_seconds", latency, bot=bot_id)
+                bot.state = "starting"
+                bot.started_at = time.monotonic()
+                self._event(bot_id, bot, "restart",
+                            f"reiniciado (intento {attempt}) {latency * 1000:.0f} ms tras detectar la caída",
+                            attempt=attempt, reason=reason, delay_seconds=round(delay, 3),
+                            latency_ms=round(latency * 1000, 1))
+            else:
+                self._event(bot_id, bot, "restart_failed", f"el reinicio {attempt} ha fallado",
+                            attempt=attempt, reason=reason, delay_seconds=round(delay, 3))
+                self._schedule(bot_id, bot, policy, time.monotonic(), reason)
+
+    def status(self, bot_id):
+        """
+        Estado de supervisión de un bot.
+
+        Args:
+            bot_id (str): ID del bot.
+
+        Returns:
+            dict: Política, estado ('stopped', 'starting', 'running', 'backoff',
+            'restarting', 'crash_loop' o 'failed'), reinicios en la ventana,
+            próximo reinicio y eventos recientes.
+        """
+        policy = self._policy(bot_id)
+        now = time.monotonic()
+        with self._lock:
+            bot = self._bot(bot_id)
+            restarts = [ts for ts in bot.restarts if now - ts <= policy.restart_window]
+            return {
+                "policy": policy.to_dict(),
+                "desired": bot.desired,
+                "state": bot.state,
+                "attempt": bot.attempt,
+                "restarts_in_window": len(restarts),
+                "uptime_seconds": round(now - bot.running_since, 1) if bot.running_since is not None else None,
+                "next_restart_in": round(max(0.0, bot.next_restart_at - now), 3)
+                if bot.state == "backoff" and bot.next_restart_at is not None else None,
+                "events": list(bot.events),
+            }
+
+    def _next_wait(self):
+        """Segundos hasta la próxima comprobación (antes si vence un retroceso)."""
+        now = time.monotonic()
+        with self._lock:
+            due = [bot.next_restart_at - now for bot in self._bots.values()
+                   if bot.state == "backoff" and bot.next_restart_at is not None]
+        return max(0.0, min([self.check_interval] + due))
+
+    def _run(self):
+        while not self._stop.wait(self._next_wait()):
+            try:
+                self.check_once()
+            except Exception as e:
+                logger.error(f"Error al supervisar los bots: {str(e)}")
+
+    def start(self):
+        """Arranca el hilo de supervisión."""
+        if not self.enabled or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="bot-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Detiene el hilo de supervisión (los reinicios en curso terminan solos)."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(self.check_interval + 1)
+            self._thread = None
@@ -0,0 +1,187 @@
+"""
+Compresión de respuestas negociada con Accept-Encoding.
+
+Soporta gzip (biblioteca estándar) y, si están instalados, brotli ('br') y
+zstandard ('zstd'). Solo se comprimen los tipos de contenido textuales por
+encima de un tamaño mínimo; las respuestas en streaming se comprimen bloque a
+bloque.
+"""
+
+import gzip
+import zlib
+import logging
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # Dependencia opcional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # Dependencia opcional
+    zstandard = None
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Tipos de contenido que merece la pena comprimir
+COMPRESSIBLE_TYPES = frozenset([
+    'application/json', 'text/plain', 'text/html', 'text/css', 'application/javascript'
+])
+
+def available_encodings():
+    """Devuelve las codificaciones disponibles en este entorno."""
+    encodings = ['gzip']
+    if brotli is not None:
+        encodings.append('br')
+    if zstandard is not None:
+        encodings.append('zstd')
+    return encodings
+
+class CompressionConfig:
+    """Configuración de la compresión de respuestas."""
+
+    def __init__(self):
+        self.enabled = True
+        self.min_size = 1024
+        self.preference = ['zstd', 'br', 'gzip']
+        self.levels = {'gzip': 6, 'br': 4, 'zstd': 3}
+
+    def configure(self, config):
+        """
+        Aplica la sección 'compression' de api_config.json.
+
+        Args:
+            config (dict): Configuración de la API.
+        """
+        compression_config = config.get('compression', {})
+        self.enabled = bool(compression_config.get('enabled', self.enabled))
+        self.min_size = int(compression_config.get('min_size', self.min_size))
+        preference = compression_config.get('algorithms') or self.preference
+        available = available_encodings()
+        self.preference = [name for name in preference if name in available]
+        self.levels = dict(self.levels, **(compression_config.get('levels') or {}))
+
+compression_config = CompressionConfig()
+
+def configure_compression(config):
+    """
+    Configura la compresión de respuestas.
+
+    Args:
+        config (dict): Configuración de la API.
+    """
+    compression_config.configure(config)
+
+def choose_encoding(accept_encoding):
+    """
+    Elige la codificación según Accept-Encoding y la preferencia del servidor.
+
+    Args:
+        accept_encoding: Objeto Accept de Werkzeug (request.accept_encodings).
+
+    Returns:
+        str: Codificación elegida, o None para enviar sin comprimir.
+    """
+    best, best_quality = None, 0
+    for name in compression_config.preference:
+        quality = accept_encoding.quality(name)
+        # En caso de empate gana la preferencia del servidor (primera de la lista)
+        if quality > best_quality:
+            best, best_quality = name, quality
+    return best
+
+def compress(data, encoding):
+    """
+    Comprime un cuerpo completo.
+
+    Args:
+        data (bytes): Cuerpo sin comprimir.
+        encoding (str): 'gzip', 'br' o 'zstd'.
+
+    Returns:
+        bytes: Cuerpo comprimido.
+    """
+    level = compression_config.levels.get(encoding)
+    if encoding == 'br':
+        return brotli.compress(data, quality=level)
+    if encoding == 'zstd':
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+class _StreamCompressor:
+    """Compresor incremental con la misma interfaz para las tres codificaciones."""
+
+    def __init__(self, encoding):
+        level = compression_config.levels.get(encoding)
+        self.encoding = encoding
+        if encoding == 'br':
+            self._compressor = brotli.Compressor(quality=level)
+        elif encoding == 'zstd':
+            self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+        else:
+            self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def chunk(self, data):
+        # Vaciar tras cada bloque para que el cliente lo reciba sin esperar al final
+        if self.encoding == 'br':
+            return self._compressor.process(data) + self._compressor.flush()
+        if self.encoding == 'zstd':
+            return self._compressor.compress(data) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        if self.encoding == 'br':
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+def _compress_stream(iterable, encoding):
+    compressor = _StreamCompressor(encoding)
+    try:
+        for data in iterable:
+            if isinstance(data, str):
+                data = data.encode('utf-8')
+            compressed = compressor.chunk(data)
+            if compressed:
+                yield compressed
+        yield compressor.finish()
+    finally:
+        close = getattr(iterable, 'close', None)
+        if close is not None:
+            close()
+
+def compress_response(response):
+    """
+    Comprime la respuesta si el cliente lo admite y merece la pena.
+
+    Args:
+        response: Objeto de respuesta Flask.
+
+    Returns:
+        La misma respuesta.
+    """
+    if not compression_config.enabled or not compression_config.preference:
+        return response
+    if (response.status_code < 200 or response.status_code in (204, 304)
+            or response.direct_passthrough
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_TYPES):
+        return response
+
+    streamed = response.is_streamed
+    if not streamed and response.content_length is not None and response.content_length < compression_config.min_size:
+        return response
+
+    response.vary.add('Accept-Encoding')
+    encoding = choose_encoding(request.accept_encodings)
+    if encoding is None:
+        return response
+
+    if streamed:
+        response.response = _compress_stream(response.response, encoding)
+        response.headers.pop('Content-Length', None)
+    else:
+        response.set_data(compress(response.get_data(), encoding))
+    response.headers['Content-Encoding'] = encoding
+    return response
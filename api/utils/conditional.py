@@ -0,0 +1,86 @@
+"""
+Solicitudes condicionales (ETag / Last-Modified) para los endpoints de consulta.
+
+Cada recurso expone una versión barata de calcular (fechas de modificación de
+los archivos de estado, huella de la instantánea de estado...). Si el cliente
+envía un If-None-Match (o If-Modified-Since) que coincide, se responde 304 sin
+construir ni serializar el cuerpo.
+
+Las ETags son débiles: algunos campos se calculan en cada solicitud (por
+ejemplo la duración de una posición abierta) y no forman parte de la versión.
+"""
+
+import hashlib
+from functools import wraps
+from flask import request, make_response
+from werkzeug.http import http_date
+
+# Los clientes pueden guardar la respuesta pero deben revalidarla siempre
+CACHE_CONTROL = "private, no-cache"
+
+def make_etag(parts):
+    """
+    Calcula el valor de una ETag a partir de las partes de la versión.
+
+    Args:
+        parts: Valores (serializables con repr) que identifican la versión.
+
+    Returns:
+        str: Huella hexadecimal de 16 caracteres.
+    """
+    return hashlib.blake2b(repr(parts).encode('utf-8'), digest_size=8).hexdigest()
+
+def _is_not_modified(etag, last_modified):
+    if request.if_none_match:
+        # If-None-Match tiene prioridad sobre If-Modified-Since (RFC 9110)
+        return request.if_none_match.contains_weak(etag)
+    if last_modified is not None and request.if_modified_since is not None:
+        return int(last_modified) <= request.if_modified_since.timestamp()
+    return False
+
+def _set_validators(response, etag, last_modified):
+    response.set_etag(etag, weak=True)
+    if last_modified is not None:
+        response.headers['Last-Modified'] = http_date(int(last_modified))
+    response.headers['Cache-Control'] = CACHE_CONTROL
+    return response
+
+class conditional:
+    """
+    Decorador de rutas GET que responde 304 si la versión no ha cambiado.
+
+    La función de versión recibe los mismos argumentos que la ruta y devuelve
+    (partes, last_modified) o None si el recurso no existe (en ese caso se
+    ejecuta la ruta normalmente).
+
+    Ejemplo:
+        @conditional(bot_service.get_positions_version)
+        def get_bot_positions(bot_id):
+            ...
+    """
+
+    def __init__(self, version_func):
+        self.version_func = version_func
+
+    def __call__(self, func):
+        version_func = self.version_func
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                version = version_func(*args, **kwargs)
+            except Exception:
+                # Sin versión no hay respuesta condicional, pero la ruta sigue funcionando
+                version = None
+            if version is None:
+                return func(*args, **kwargs)
+            parts, last_modified = version
+            # La representación depende también de la consulta (?fields, ?format)
+            etag = make_etag((parts, sorted(request.args.items(multi=True))))
+            if _is_not_modified(etag, last_modified):
+                return _set_validators(make_response('', 304), etag, last_modified)
+            response = make_response(func(*args, **kwargs))
+            if response.status_code == 200:
+                _set_validators(response, etag, last_modified)
+            return response
+        return wrapper
@@ -1,9 +1,9 @@
-from flask import jsonify
+from flask import jsonify, request, has_request_context
 import logging
 import traceback
+from api.utils.event_store import event_store
 
 # Configurar logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class APIError(Exception):
@@ -14,13 +14,15 @@ class APIError(Exception):
         message (str): Mensaje de error.
         status_code (int): Código de estado HTTP.
         payload (dict): Datos adicionales para incluir en la respuesta.
+        headers (dict): Encabezados HTTP adicionales (ej. Retry-After).
     """
     
-    def __init__(self, message, status_code=500, payload=None):
+    def __init__(self, message, status_code=500, payload=None, headers=None):
         super().__init__(message)
         self.message = message
         self.status_code = status_code
         self.payload = payload
+        self.headers = headers
     
     def to_dict(self):
         """
@@ -39,6 +41,13 @@ class APIError(Exception):
             
         return response
 
+def _record_error(status_code, message):
+    """Registra un error 5xx en el historial de eventos."""
+    if status_code < 500 or not has_request_context():
+        return
+    event_store.record("error", status=status_code, method=request.method,
+                       path=request.path, message=message)
+
 def handle_api_error(error):
     """
     Manejador de errores para excepciones APIError.
@@ -51,9 +60,12 @@ def handle_api_error(error):
     """
     response = jsonify(error.to_dict())
     response.status_code = error.status_code
+    if error.headers:
+        response.headers.update(error.headers)
     
     # Registrar el error
     logger.error(f"API Error: {error.message} (Código: {error.status_code})")
+    _record_error(error.status_code, error.message)
     
     return response
 
@@ -70,6 +82,7 @@ def handle_generic_error(error):
     # Registrar el error con stack trace
     logger.error(f"Error no manejado: {str(error)}")
     logger.error(traceback.format_exc())
+    _record_error(500, str(error))
     
     # Crear respuesta
     response = jsonify({
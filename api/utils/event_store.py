@@ -0,0 +1,396 @@
+"""
+Historial de eventos de los bots y de la API en SQLite.
+
+Cada evento es una fila (ts, type, bot_id, data JSON) en una base de datos
+SQLite en modo WAL compartida por todos los procesos (workers y supervisor de
+los bots). Tipos registrados:
+
+    status                  cambio de estado de un bot (data: from, to)
+    bot_start, bot_stop     acciones desde la API (data: user, result)
+    exit, liveness, restart, restart_failed, crash_loop
+                            eventos del reinicio automático
+    webhook                 webhooks aceptados o rechazados (data: source, outcome)
+    error                   errores 5xx de la API (data: method, path, message)
+
+record() solo añade el evento a una cola en memoria: nunca bloquea al hilo
+de la solicitud. Un hilo escritor por proceso inserta los eventos por lotes
+en una sola transacción y aplica periódicamente la retención (borrado por
+tramos, vaciado incremental y checkpoint del WAL). Si la cola se llena los
+eventos se descartan y se cuentan.
+
+Las consultas (línea temporal y disponibilidad) se calculan en SQL sobre los
+índices (bot_id, ts) y (type, ts).
+"""
+
+import os
+import json
+import time
+import queue
+import sqlite3
+import logging
+import threading
+from datetime import datetime
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Raíz del proyecto (ubicación por defecto de la base de datos)
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS events ("
+    " id INTEGER PRIMARY KEY,"
+    " ts REAL NOT NULL,"
+    " type TEXT NOT NULL,"
+    " bot_id TEXT,"
+    " data TEXT)",
+    "CREATE INDEX IF NOT EXISTS idx_events_bot_ts ON events (bot_id, ts)",
+    "CREATE INDEX IF NOT EXISTS idx_events_type_ts ON events (type, ts)",
+)
+
+# Filas borradas por sentencia en la retención (transacciones cortas)
+DELETE_CHUNK = 5000
+
+# Tiempo en cada estado de un bot entre 'since' y 'until'. El estado al
+# principio de la ventana es el último cambio anterior a 'since'; cada tramo
+# dura hasta el siguiente cambio (LEAD) o hasta 'until'.
+UPTIME_SQL = """
+WITH changes AS (
+    SELECT :since AS ts,
+           (SELECT json_extract(data, '$.to') FROM events
+             WHERE bot_id = :bot_id AND type = 'status' AND ts < :since
+             ORDER BY ts DESC LIMIT 1) AS state
+    UNION ALL
+    SELECT ts, json_extract(data, '$.to') FROM events
+     WHERE bot_id = :bot_id AND type = 'status' AND ts >= :since AND ts < :until
+),
+spans AS (
+    SELECT state,
+           LAG(state) OVER (ORDER BY ts) AS previous,
+           LEAD(ts, 1, :until) OVER (ORDER BY ts) - ts AS seconds
+      FROM changes
+)
+SELECT
+    COALESCE(SUM(CASE WHEN state = 'active' THEN seconds END), 0),
+    COALESCE(SUM(CASE WHEN state IS NOT NULL THEN seconds END), 0),
+    COALESCE(SUM(CASE WHEN state = 'active' AND previous IS NOT 'active' THEN 1 END), 0),
+    COALESCE(SUM(CASE WHEN state = 'inactive' AND previous = 'active' THEN 1 END), 0),
+    MAX(CASE WHEN state = 'inactive' THEN seconds END)
+FROM spans
+"""
+
+class EventStore:
+    """Almacén de eventos con escritura por lotes en segundo plano."""
+
+    def __init__(self, path=None, batch_size=500, flush_interval=1.0, max_queue=10000,
+                 retention_days=90, type_retention_days=None, compaction_interval=3600.0):
+        """
+        Inicializa el almacén.
+
+        Args:
+            path (str, optional): Ruta de la base de datos (por defecto data/events.db).
+            batch_size (int): Eventos máximos por transacción.
+            flush_interval (float): Segundos máximos que un evento espera en la cola.
+            max_queue (int): Eventos en cola a partir de los que se descartan.
+            retention_days (float): Días que se conservan los eventos.
+            type_retention_days (dict, optional): Retención por tipo (ej. {'error': 30}).
+            compaction_interval (float): Segundos entre ejecuciones de la retención.
+        """
+        self.enabled = True
+        self.path = path or os.path.join(REPO_ROOT, 'data', 'events.db')
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.retention_days = retention_days
+        self.type_retention_days = dict(type_retention_days or {})
+        self.compaction_interval = compaction_interval
+        self._schema_ready = False
+        self._reset()
+
+    def _reset(self):
+        # Tras un fork la cola y el hilo del proceso padre no sirven
+        self._pid = os.getpid()
+        self._queue = queue.Queue(self.max_queue)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        self._stats = {"written": 0, "dropped": 0, "errors": 0, "batches": 0,
+                       "last_batch_ms": 0.0, "last_compaction": None}
+
+    def configure(self, config):
+        """
+        Aplica la sección 'events' de api_config.json.
+
+        Args:
+            config (dict): Configuración de la API.
+        """
+        events_config = config.get('events', {})
+        self.enabled = bool(events_config.get('enabled', self.enabled))
+        self.path = os.getenv('EVENTS_DB', events_config.get('path') or self.path)
+        self.batch_size = int(events_config.get('batch_size', self.batch_size))
+        self.flush_interval = float(events_config.get('flush_interval_seconds', self.flush_interval))
+        self.max_queue = int(events_config.get('max_queue', self.max_queue))
+        self.retention_days = float(events_config.get('retention_days', self.retention_days))
+        self.type_retention_days = dict(events_config.get('type_retention_days', self.type_retention_days))
+        self.compaction_interval = float(events_config.get('compaction_interval_seconds',
+                                                           self.compaction_interval))
+        self._queue = queue.Queue(self.max_queue)
+
+    def _connect(self, read_only=False):
+        if read_only and not os.path.exists(self.path):
+            return None
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5.0)
+        conn.execute("PRAGMA busy_timeout = 5000")
+        if not self._schema_ready:
+            # auto_vacuum solo tiene efecto antes de crear la primera tabla
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("PRAGMA journal_mode = WAL")
+            with conn:
+                for statement in SCHEMA:
+                    conn.execute(statement)
+            self._schema_ready = True
+        if read_only:
+            conn.execute("PRAGMA query_only = 1")
+        else:
+            # En WAL, NORMAL no pierde consistencia; solo las últimas
+            # transacciones ante un corte de energía
+            conn.execute("PRAGMA synchronous = NORMAL")
+        return conn
+
+    def _check_process(self):
+        if self._pid != os.getpid():
+            self._reset()
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name='event-writer', daemon=True)
+                    self._thread.start()
+
+    def record(self, event_type, bot_id=None, ts=None, **data):
+        """
+        Registra un evento sin bloquear (se escribe en segundo plano).
+
+        Args:
+            event_type (str): Tipo de evento.
+            bot_id (str, optional): Bot al que se refiere.
+            ts (float, optional): Momento del evento (epoch); por defecto ahora.
+            **data: Datos del evento (serializables a JSON).
+        """
+        if not self.enabled:
+            return
+        self._check_process()
+        try:
+            self._queue.put_nowait((ts or time.time(), event_type, bot_id,
+                                    json.dumps(data, default=str) if data else None))
+        except queue.Full:
+            self._stats["dropped"] += 1
+
+    def _take_batch(self, timeout):
+        try:
+            batch = [self._queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, conn, batch):
+        start = time.perf_counter()
+        try:
+            with conn:
+                conn.executemany("INSERT INTO events (ts, type, bot_id, data) VALUES (?, ?, ?, ?)", batch)
+        except sqlite3.Error as e:
+            self._stats["errors"] += 1
+            logger.error(f"Error al guardar {len(batch)} eventos: {str(e)}")
+            return
+        self._stats["written"] += len(batch)
+        self._stats["batches"] += 1
+        self._stats["last_batch_ms"] = round((time.perf_counter() - start) * 1000, 3)
+
+    def _run(self):
+        try:
+            conn = self._connect()
+        except sqlite3.Error as e:
+            logger.error(f"No se pudo abrir la base de datos de eventos {self.path}: {str(e)}")
+            self.enabled = False
+            return
+        next_compaction = time.monotonic() + min(60.0, self.compaction_interval)
+        try:
+            while True:
+                batch = self._take_batch(self.flush_interval)
+                if batch:
+                    self._write(conn, batch)
+                elif self._stop.is_set():
+                    break
+                if time.monotonic() >= next_compaction:
+                    self.compact(conn)
+                    next_compaction = time.monotonic() + self.compaction_interval
+        finally:
+            conn.close()
+
+    def compact(self, conn=None):
+        """
+        Aplica la retención: borra los eventos antiguos por tramos, devuelve
+        las páginas libres al sistema y trunca el WAL.
+
+        Args:
+            conn (sqlite3.Connection, optional): Conexión a utilizar.
+
+        Returns:
+            int: Eventos borrados.
+        """
+        own = conn is None
+        conn = conn or self._connect()
+        now = time.time()
+        deleted = 0
+        try:
+            rules = [("type NOT IN ({})".format(",".join("?" * len(self.type_retention_days))) if
+                      self.type_retention_days else "1", list(self.type_retention_days), self.retention_days)]
+            rules += [("type = ?", [kind], days) for kind, days in self.type_retention_days.items()]
+            for condition, params, days in rules:
+                cutoff = now - float(days) * 86400
+                while True:
+                    with conn:
+                        cursor = conn.execute(
+                            f"DELETE FROM events WHERE id IN (SELECT id FROM events "
+                            f"WHERE {condition} AND ts < ? LIMIT {DELETE_CHUNK})", params + [cutoff])
+                    deleted += cursor.rowcount
+                    if cursor.rowcount < DELETE_CHUNK:
+                        break
+            conn.execute("PRAGMA incremental_vacuum")
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self._stats["last_compaction"] = datetime.now().isoformat(timespec='seconds')
+            if deleted:
+                logger.info(f"Retención de eventos: {deleted} eventos borrados")
+        except sqlite3.Error as e:
+            logger.error(f"Error en la retención de eventos: {str(e)}")
+        finally:
+            if own:
+                conn.close()
+        return deleted
+
+    def stop(self, timeout=5.0):
+        """Escribe los eventos pendientes y detiene el hilo escritor de este proceso."""
+        thread = self._thread
+        if thread is None or self._pid != os.getpid():
+            return
+        self._stop.set()
+        thread.join(timeout)
+        self._thread = None
+        self._stop.clear()
+
+    def stats(self):
+        """
+        Estado del escritor de este proceso.
+
+        Returns:
+            dict: Eventos en cola, escritos, descartados, errores y duración del último lote.
+        """
+        return dict(self._stats, queued=self._queue.qsize(), path=self.path)
+
+    def _query(self, sql, params):
+        conn = self._connect(read_only=True)
+        if conn is None:
+            return []
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    def timeline(self, bot_id=None, types=None, since=None, until=None, cursor=None, limit=100):
+        """
+        Eventos más recientes primero.
+
+        Args:
+            bot_id (str, optional): Solo los eventos de este bot.
+            types (list, optional): Solo estos tipos.
+            since (float, optional): Desde este momento (epoch, incluido).
+            until (float, optional): Hasta este momento (epoch, excluido).
+            cursor (str, optional): 'next' de una página anterior.
+            limit (int): Eventos por página.
+
+        Returns:
+            tuple: (eventos como diccionarios, cursor de la página siguiente o None).
+        """
+        conditions, params = [], []
+        if bot_id is not None:
+            conditions.append("bot_id = ?")
+            params.append(bot_id)
+        if types:
+            conditions.append("type IN ({})".format(",".join("?" * len(types))))
+            params.extend(types)
+        if since is not None:
+            conditions.append("ts >= ?")
+            params.append(since)
+        if until is not None:
+            conditions.append("ts < ?")
+            params.append(until)
+        if cursor:
+            cursor_ts, _, cursor_id = cursor.partition(':')
+            conditions.append("(ts < ? OR (ts = ? AND id < ?))")
+            params.extend([float(cursor_ts), float(cursor_ts), int(cursor_id)])
+        where = " AND ".join(conditions) or "1"
+        rows = self._query(f"SELECT id, ts, type, bot_id, data FROM events WHERE {where} "
+                           f"ORDER BY ts DESC, id DESC LIMIT ?", params + [limit])
+        events = [{
+            "id": event_id,
+            "ts": datetime.fromtimestamp(ts).isoformat(timespec='milliseconds'),
+            "type": event_type,
+            "bot_id": event_bot,
+            "data": json.loads(data) if data else {},
+        } for event_id, ts, event_type, event_bot, data in rows]
+        next_cursor = f"{rows[-1][1]!r}:{rows[-1][0]}" if len(rows) == limit else None
+        return events, next_cursor
+
+    def uptime(self, bot_id, since, until):
+        """
+        Disponibilidad de un bot calculada a partir de sus cambios de estado.
+
+        Los periodos sin información (antes del primer cambio registrado) no
+        cuentan como observados.
+
+        Args:
+            bot_id (str): ID del bot.
+            since (float): Inicio de la ventana (epoch).
+            until (float): Fin de la ventana (epoch).
+
+        Returns:
+            dict: Segundos activos y observados, disponibilidad, arranques,
+            caídas, la parada más larga y los reinicios automáticos.
+        """
+        rows = self._query(UPTIME_SQL, {"bot_id": bot_id, "since": since, "until": until})
+        active, observed, starts, downs, longest_down = rows[0] if rows else (0, 0, 0, 0, None)
+        counts = dict(self._query(
+            "SELECT type, COUNT(*) FROM events WHERE bot_id = ? AND ts >= ? AND ts < ? "
+            "AND type IN ('restart', 'crash_loop', 'bot_start', 'bot_stop') GROUP BY type",
+            (bot_id, since, until)))
+        return {
+            "since": datetime.fromtimestamp(since).isoformat(timespec='seconds'),
+            "until": datetime.fromtimestamp(until).isoformat(timespec='seconds'),
+            "active_seconds": round(active, 1),
+            "observed_seconds": round(observed, 1),
+            "availability": round(active / observed, 5) if observed else None,
+            "starts": starts,
+            "downs": downs,
+            "longest_down_seconds": round(longest_down, 1) if longest_down is not None else None,
+            "restarts": counts.get("restart", 0),
+            "crash_loops": counts.get("crash_loop", 0),
+            "api_starts": counts.get("bot_start", 0),
+            "api_stops": counts.get("bot_stop", 0),
+        }
+
+# Almacén global del proceso
+event_store = EventStore()
+
+def configure_events(config):
+    """
+    Configura el almacén de eventos.
+
+    Args:
+        config (dict): Configuración de la API.
+    """
+    event_store.configure(config)
@@ -0,0 +1,164 @@
+"""
+Comprobaciones de salud ejecutadas en segundo plano.
+
+Cada worker ejecuta periódicamente las comprobaciones registradas en un hilo
+propio y guarda el último resultado. Los endpoints de salud solo leen ese
+resultado, de modo que las sondas frecuentes de un balanceador no hacen E/S ni
+lanzan procesos.
+"""
+
+import os
+import time
+import logging
+import threading
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Momento de importación: respaldo si /proc no está disponible
+_IMPORT_TIME = time.time()
+
+def process_start_time(pid=None):
+    """
+    Devuelve el momento de arranque de un proceso.
+
+    Args:
+        pid (int, optional): PID del proceso; por defecto el actual.
+
+    Returns:
+        float: Marca de tiempo (epoch) del arranque del proceso.
+    """
+    try:
+        with open(f"/proc/{pid or 'self'}/stat", 'r') as f:
+            # El nombre del proceso puede contener espacios: los campos van tras el último ')'
+            fields = f.read().rsplit(')', 1)[1].split()
+        with open('/proc/stat', 'r') as f:
+            boot_time = next(int(line.split()[1]) for line in f if line.startswith('btime '))
+        # starttime es el campo 22 (índice 19 tras el estado) en ticks desde el arranque
+        return boot_time + int(fields[19]) / os.sysconf('SC_CLK_TCK')
+    except (OSError, ValueError, IndexError, StopIteration):
+        return _IMPORT_TIME
+
+class HealthMonitor:
+    """
+    Ejecuta comprobaciones de salud registradas y cachea sus resultados.
+
+    Una comprobación es una función sin argumentos que devuelve (ok, detalle);
+    si lanza una excepción cuenta como fallida. Las comprobaciones críticas
+    determinan si el worker está listo para recibir tráfico.
+    """
+
+    def __init__(self, interval=5.0, stale_after=15.0):
+        """
+        Inicializa el monitor.
+
+        Args:
+            interval (float): Segundos entre ejecuciones de las comprobaciones.
+            stale_after (float): Antigüedad máxima de los resultados; pasado ese
+                tiempo el worker se considera no listo (hilo bloqueado o detenido).
+        """
+        self.interval = interval
+        self.stale_after = stale_after
+        self.non_critical = frozenset()
+        self._checks = []
+        self._results = None
+        self._checked_at = None
+        self._run_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def configure(self, config):
+        """
+        Aplica la sección 'health' de api_config.json.
+
+        Args:
+            config (dict): Configuración de la API.
+        """
+        health_config = config.get('health', {})
+        self.interval = max(0.5, float(health_config.get('interval_seconds', self.interval)))
+        self.stale_after = float(health_config.get('stale_after_seconds', self.interval * 3))
+        self.non_critical = frozenset(health_config.get('non_critical') or [])
+
+    def register(self, name, check):
+        """
+        Registra una comprobación.
+
+        Args:
+            name (str): Nombre de la comprobación.
+            check (callable): Función sin argumentos que devuelve (ok, detalle).
+        """
+        self._checks.append((name, check))
+
+    def run_checks(self):
+        """
+        Ejecuta todas las comprobaciones y sustituye los resultados cacheados.
+
+        Returns:
+            dict: Resultado por comprobación (ok, critical, detail, duration_ms).
+        """
+        with self._run_lock:
+            results = {}
+            for name, check in self._checks:
+                start = time.perf_counter()
+                try:
+                    ok, detail = check()
+                except Exception as e:
+                    ok, detail = False, {"error": str(e)}
+                results[name] = {
+                    "ok": bool(ok),
+                    "critical": name not in self.non_critical,
+                    "detail": detail,
+                    "duration_ms": round((time.perf_counter() - start) * 1000, 3)
+                }
+                if not ok:
+                    logger.debug(f"Comprobación de salud fallida: {name} {detail}")
+            # Se sustituye la referencia completa: los lectores nunca ven un resultado a medias
+            self._results, self._checked_at = results, time.time()
+            return results
+
+    def status(self):
+        """
+        Devuelve el último resultado de las comprobaciones.
+
+        Si aún no se han ejecutado (por ejemplo sin hilo en segundo plano) se
+        ejecutan una vez en la solicitud actual.
+
+        Returns:
+            tuple: (listo, resultados, antigüedad en segundos).
+        """
+        if self._results is None:
+            self.run_checks()
+        results, checked_at = self._results, self._checked_at
+        age = max(0.0, time.time() - checked_at)
+        ready = age <= self.stale_after and all(
+            result["ok"] for result in results.values() if result["critical"]
+        )
+        return ready, results, age
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_checks()
+            except Exception as e:
+                logger.error(f"Error al ejecutar las comprobaciones de salud: {str(e)}")
+
+    def start(self):
+        """Ejecuta las comprobaciones y arranca el hilo periódico de este proceso."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self.run_checks()
+        self._thread = threading.Thread(target=self._run, name='health-monitor', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Detiene el hilo periódico."""
+        thread = self._thread
+        if thread is None:
+            return
+        self._stop.set()
+        thread.join(self.interval)
+        self._thread = None
+
+# Instancia global (configurable mediante configure_health en health_routes)
+health_monitor = HealthMonitor()
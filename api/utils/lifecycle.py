@@ -0,0 +1,63 @@
+"""
+Ganchos de ciclo de vida de los procesos que atienden solicitudes.
+
+Con gunicorn y preload_app la aplicación se importa una sola vez en el proceso
+maestro y después se hace fork de los workers. Los hilos en segundo plano y las
+cachés por proceso deben arrancarse en cada worker, no en el maestro: los
+módulos registran aquí sus funciones y gunicorn.conf.py (o el servidor de
+desarrollo) las ejecuta en el momento adecuado.
+"""
+
+import logging
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+_start_hooks = []
+_exit_hooks = []
+
+def on_worker_start(func):
+    """
+    Registra una función a ejecutar cuando un worker está listo para atender.
+
+    Puede usarse como decorador. Las funciones se ejecutan en orden de registro.
+
+    Args:
+        func (callable): Función sin argumentos.
+
+    Returns:
+        callable: La misma función.
+    """
+    _start_hooks.append(func)
+    return func
+
+def on_worker_exit(func):
+    """
+    Registra una función a ejecutar cuando un worker termina.
+
+    Las funciones se ejecutan en orden inverso al de registro.
+
+    Args:
+        func (callable): Función sin argumentos.
+
+    Returns:
+        callable: La misma función.
+    """
+    _exit_hooks.append(func)
+    return func
+
+def run_worker_start():
+    """Ejecuta los ganchos de inicio; un fallo no impide arrancar el worker."""
+    for func in _start_hooks:
+        try:
+            func()
+        except Exception as e:
+            logger.error(f"Error en gancho de inicio {getattr(func, '__qualname__', func)}: {str(e)}")
+
+def run_worker_exit():
+    """Ejecuta los ganchos de salida en orden inverso."""
+    for func in reversed(_exit_hooks):
+        try:
+            func()
+        except Exception as e:
+            logger.error(f"Error en gancho de salida {getattr(func, '__qualname__', func)}: {str(e)}")
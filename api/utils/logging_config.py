@@ -0,0 +1,220 @@
+"""
+Configuración centralizada de logging.
+
+Los hilos de las solicitudes solo encolan registros; un único hilo
+QueueListener se encarga del formateo y de la escritura en disco, con
+rotación por tamaño o por tiempo y compresión gzip de los archivos rotados.
+
+Con varios procesos escribiendo en el mismo archivo (workers de gunicorn) la
+rotación interna no es segura: cada proceso rotaría por su cuenta. En ese caso
+('rotation': 'external') los archivos se abren con WatchedFileHandler, que
+solo añade líneas y vuelve a abrir el archivo cuando logrotate lo rota.
+"""
+
+import os
+import gzip
+import queue
+import atexit
+import shutil
+import logging
+import logging.handlers
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Formato común de todos los registros
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Ruta por defecto del archivo de log (raíz del proyecto)
+DEFAULT_LOG_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'api.log'
+)
+
+_log_queue = None
+_listener = None
+_queue_handler = None
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler que nunca bloquea ni formatea en el hilo que registra.
+
+    Si la cola está llena el registro se descarta y se contabiliza, en lugar de
+    detener la solicitud esperando al disco.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # El listener corre en el mismo proceso: no hace falta serializar el
+        # registro, así que el formateo se deja íntegramente para su hilo.
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+class _AccessLogFilter(logging.Filter):
+    """Separa los registros del access log ('api.access') del resto."""
+
+    def __init__(self, include):
+        super().__init__()
+        self.include = include
+
+    def filter(self, record):
+        return (record.name == 'api.access') == self.include
+
+def _gzip_namer(name):
+    return name + '.gz'
+
+def _gzip_rotator(source, dest):
+    with open(source, 'rb') as f_in, gzip.open(dest, 'wb') as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    os.remove(source)
+
+def _rotation_mode(log_config):
+    """Devuelve 'internal' o 'external' (LOG_ROTATION sobrescribe la configuración)."""
+    mode = os.getenv('LOG_ROTATION', log_config.get('rotation') or 'internal').lower()
+    if mode not in ('internal', 'external'):
+        logger.warning(f"logging.rotation no válido: '{mode}'; se usa 'internal'")
+        mode = 'internal'
+    return mode
+
+def _build_file_handler(log_config, path):
+    """
+    Crea el handler de archivo con rotación según la configuración.
+
+    Args:
+        log_config (dict): Sección 'logging' de api_config.json.
+        path (str): Ruta del archivo (relativa a la raíz del proyecto o absoluta).
+
+    Returns:
+        logging.Handler: Handler de archivo rotativo, o WatchedFileHandler si
+            la rotación es externa (logrotate).
+    """
+    if not os.path.isabs(path):
+        path = os.path.join(os.path.dirname(DEFAULT_LOG_FILE), path)
+    if _rotation_mode(log_config) == 'external':
+        return logging.handlers.WatchedFileHandler(path, encoding='utf-8', delay=True)
+    backup_count = int(log_config.get('backup_count', 10))
+
+    when = log_config.get('when')
+    if when:
+        handler = logging.handlers.TimedRotatingFileHandler(
+            path, when=when, interval=int(log_config.get('interval', 1)),
+            backupCount=backup_count, encoding='utf-8', delay=True
+        )
+    else:
+        handler = logging.handlers.RotatingFileHandler(
+            path, maxBytes=int(log_config.get('max_bytes', 10 * 1024 * 1024)),
+            backupCount=backup_count, encoding='utf-8', delay=True
+        )
+
+    if log_config.get('compress', True):
+        handler.namer = _gzip_namer
+        handler.rotator = _gzip_rotator
+    return handler
+
+def setup_logging(config=None, force=False):
+    """
+    Configura el logging de toda la aplicación (idempotente).
+
+    Sustituye los handlers del logger raíz por un único QueueHandler y arranca
+    el QueueListener que escribe en consola y en el archivo rotativo.
+
+    Args:
+        config (dict, optional): Configuración de la API. Se usan 'log_level'
+            y la sección 'logging' (file, rotation, max_bytes, when, interval,
+            backup_count, compress, queue_size, console, access_file).
+        force (bool): Reconfigurar aunque el logging ya esté inicializado.
+    """
+    global _log_queue, _listener, _queue_handler
+
+    if _listener is not None and not force:
+        return
+    stop_logging()
+
+    config = config or {}
+    log_config = config.get('logging', {})
+    level = os.getenv('LOG_LEVEL', config.get('log_level', 'INFO')).upper()
+
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers = []
+    if log_config.get('console', True):
+        handlers.append(logging.StreamHandler())
+    handlers.append(_build_file_handler(log_config, log_config.get('file', DEFAULT_LOG_FILE)))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    # Access log JSON en su propio archivo (una línea JSON por registro)
+    access_file = log_config.get('access_file')
+    if access_file:
+        for handler in handlers:
+            handler.addFilter(_AccessLogFilter(include=False))
+        access_handler = _build_file_handler(log_config, access_file)
+        access_handler.setFormatter(logging.Formatter('%(message)s'))
+        access_handler.addFilter(_AccessLogFilter(include=True))
+        handlers.append(access_handler)
+
+    _log_queue = queue.Queue(maxsize=int(log_config.get('queue_size', 10000)))
+    _queue_handler = NonBlockingQueueHandler(_log_queue)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_queue_handler)
+    root.setLevel(getattr(logging, level, logging.INFO))
+
+    _listener = logging.handlers.QueueListener(_log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+def stop_logging():
+    """Detiene el QueueListener vaciando la cola y cerrando los archivos."""
+    global _listener
+    if _listener is None:
+        return
+    listener, _listener = _listener, None
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
+
+def restart_listener():
+    """
+    Vuelve a arrancar el hilo del QueueListener.
+
+    Necesario en procesos hijos creados con fork, donde los hilos del proceso
+    padre no existen. Se crea una cola nueva porque la heredada puede tener
+    sus locks internos tomados en el momento del fork.
+    """
+    global _listener, _log_queue
+    if _listener is None:
+        return
+    thread = getattr(_listener, '_thread', None)
+    if thread is not None and thread.is_alive():
+        return
+    _log_queue = queue.Queue(maxsize=_log_queue.maxsize)
+    _queue_handler.queue = _log_queue
+    _listener = logging.handlers.QueueListener(
+        _log_queue, *_listener.handlers, respect_handler_level=True
+    )
+    _listener.start()
+
+def get_logging_stats():
+    """
+    Devuelve el estado de la cola de logging.
+
+    Returns:
+        dict: Tamaño actual, capacidad y registros descartados.
+    """
+    if _log_queue is None:
+        return {"queue_size": 0, "queue_capacity": 0, "dropped": 0}
+    return {
+        "queue_size": _log_queue.qsize(),
+        "queue_capacity": _log_queue.maxsize,
+        "dropped": _queue_handler.dropped
+    }
+
+atexit.register(stop_logging)
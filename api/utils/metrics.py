@@ -0,0 +1,446 @@
+"""
+Métricas de la API en formato de exposición de Prometheus.
+
+Cada proceso (worker de gunicorn) acumula sus métricas en memoria y las vuelca
+periódicamente a un archivo propio dentro de un directorio compartido. Al
+consultar /api/metrics se agregan los archivos de todos los workers: los
+contadores e histogramas se suman y los gauges solo cuentan procesos vivos.
+
+Los volcados de los procesos terminados se acumulan en metrics_dead.json y se
+eliminan, de modo que el directorio no crece con cada worker reciclado y un
+PID reutilizado no sobrescribe (ni hace retroceder) contadores anteriores.
+"""
+
+import os
+import json
+import time
+import fcntl
+import atexit
+import logging
+import tempfile
+import threading
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Buckets por defecto para latencias (segundos)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Definición de las métricas conocidas: nombre -> (tipo, ayuda, buckets)
+METRICS = {
+    "http_requests_total": ("counter", "Solicitudes HTTP atendidas por ruta, método y estado", None),
+    "http_request_duration_seconds": ("histogram", "Latencia de las solicitudes HTTP por ruta", DEFAULT_BUCKETS),
+    "http_requests_in_flight": ("gauge", "Solicitudes HTTP en curso", None),
+    "bot_subprocess_total": ("counter", "Subprocesos lanzados por BotService por operación y resultado", None),
+    "bot_subprocess_duration_seconds": ("histogram", "Duración de los subprocesos de BotService", DEFAULT_BUCKETS),
+    "state_file_parse_seconds": ("histogram", "Tiempo de lectura y parseo de archivos de estado",
+                                 (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25)),
+    "bot_start_ready_seconds": ("histogram", "Tiempo desde el inicio hasta que el bot cumple su condición de arranque",
+                                (0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 60)),
+    "bot_restarts_total": ("counter", "Reinicios automáticos de bots por motivo y resultado", None),
+    "bot_restart_latency_seconds": ("histogram", "Tiempo desde que se detecta la caída de un bot hasta reiniciarlo",
+                                    (1, 2, 5, 10, 30, 60, 120, 300, 600)),
+    "worker_startup_seconds": ("histogram", "Tiempo desde que se crea el worker hasta que está listo (start=warm|cold)",
+                               (0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 60)),
+    "worker_first_request_seconds": ("histogram", "Latencia de la primera solicitud de cada ruta en un worker",
+                                     DEFAULT_BUCKETS),
+    "fleet_agent_requests_total": ("counter", "Solicitudes a los agentes de la flota por agente y resultado", None),
+    "fleet_agent_request_seconds": ("histogram", "Latencia de las solicitudes a los agentes de la flota",
+                                    DEFAULT_BUCKETS),
+    "fleet_reads_total": ("counter", "Lecturas de la flota por agente y estado (fresh, stale, error, open)", None),
+    "webhooks_total": ("counter", "Webhooks recibidos por origen y resultado", None),
+    "batch_items_total": ("counter", "Subsolicitudes de /api/batch por ruta, método y estado", None),
+    "batch_item_duration_seconds": ("histogram", "Latencia de las subsolicitudes de /api/batch por ruta",
+                                    DEFAULT_BUCKETS),
+}
+
+# Acumulado de los procesos terminados y lock que serializa su actualización
+DEAD_FILE = 'metrics_dead.json'
+LOCK_FILE = 'metrics_dead.lock'
+
+def _labels_key(labels):
+    return tuple(sorted(labels.items()))
+
+class MetricsRegistry:
+    """
+    Registro de métricas de un proceso con volcado a un directorio compartido.
+    """
+
+    def __init__(self, directory=None, flush_interval=5.0, enabled=True):
+        """
+        Inicializa el registro.
+
+        Args:
+            directory (str, optional): Directorio compartido entre workers.
+            flush_interval (float): Segundos entre volcados a disco.
+            enabled (bool): Si se registran métricas.
+        """
+        self.enabled = enabled
+        self.directory = directory or os.path.join(tempfile.gettempdir(), 'trading-bots-api-metrics')
+        self.flush_interval = flush_interval
+        self._pid = None
+        self._reset()
+
+    def _reset(self):
+        # Tras un fork se descartan los valores heredados del proceso padre
+        # para no contarlos dos veces, y se recrea el lock por si estaba tomado.
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._gauges = {}
+        self._histograms = {}
+        self._flusher = None
+        self._flushed = False
+        self._stop = threading.Event()
+
+    def configure(self, config):
+        """
+        Aplica la sección 'metrics' de api_config.json.
+
+        Args:
+            config (dict): Configuración de la API.
+        """
+        metrics_config = config.get('metrics', {})
+        self.enabled = bool(metrics_config.get('enabled', True))
+        self.directory = os.getenv('METRICS_DIR', metrics_config.get('multiprocess_dir') or self.directory)
+        self.flush_interval = float(metrics_config.get('flush_interval_seconds', self.flush_interval))
+
+    def _check_process(self):
+        if self._pid != os.getpid():
+            self._reset()
+        if self._flusher is None:
+            with self._lock:
+                if self._flusher is None:
+                    self._flusher = threading.Thread(target=self._flush_loop, name='metrics-flusher', daemon=True)
+                    self._flusher.start()
+
+    def inc(self, name, value=1.0, **labels):
+        """Incrementa un contador."""
+        if not self.enabled:
+            return
+        self._check_process()
+        key = (name, _labels_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def gauge_add(self, name, value, **labels):
+        """Suma (o resta) un valor a un gauge."""
+        if not self.enabled:
+            return
+        self._check_process()
+        key = (name, _labels_key(labels))
+        with self._lock:
+            self._gauges[key] = self._gauges.get(key, 0.0) + value
+
+    def observe(self, name, value, **labels):
+        """Registra una observación en un histograma."""
+        if not self.enabled:
+            return
+        self._check_process()
+        buckets = METRICS[name][2] or DEFAULT_BUCKETS
+        key = (name, _labels_key(labels))
+        with self._lock:
+            entry = self._histograms.get(key)
+            if entry is None:
+                entry = self._histograms[key] = [[0] * (len(buckets) + 1), 0.0, 0]
+            counts = entry[0]
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def time(self, name, **labels):
+        """
+        Context manager que mide la duración de un bloque en un histograma.
+
+        Returns:
+            _Timer: Temporizador utilizable con 'with'.
+        """
+        return _Timer(self, name, labels)
+
+    def snapshot(self):
+        """
+        Devuelve una copia serializable de las métricas de este proceso.
+
+        Returns:
+            dict: Contadores, gauges e histogramas del proceso.
+        """
+        with self._lock:
+            return {
+                "pid": os.getpid(),
+                "counters": [[n, list(l), v] for (n, l), v in self._counters.items()],
+                "gauges": [[n, list(l), v] for (n, l), v in self._gauges.items()],
+                "histograms": [[n, list(l), list(e[0]), e[1], e[2]] for (n, l), e in self._histograms.items()]
+            }
+
+    def flush(self):
+        """Vuelca las métricas del proceso a su archivo en el directorio compartido."""
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, f"metrics_{os.getpid()}.json")
+            if not self._flushed:
+                # Volcado de un proceso anterior con el mismo PID (ya terminado)
+                if os.path.exists(path):
+                    with self._dead_lock():
+                        self._retire(path)
+                self._flushed = True
+            tmp_path = path + ".tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(self.snapshot(), f)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.error(f"Error al volcar métricas: {str(e)}")
+
+    def clear_directory(self):
+        """
+        Elimina los volcados de ejecuciones anteriores.
+
+        Debe llamarse una sola vez al arrancar el servidor (antes de crear los
+        workers) para que los contadores empiecen desde cero.
+        """
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+        for name in names:
+            if name.startswith('metrics_'):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+
+    def _dead_lock(self):
+        """Lock entre procesos (flock) sobre el acumulado de procesos terminados."""
+        return _FileLock(os.path.join(self.directory, LOCK_FILE))
+
+    def _retire(self, path):
+        """
+        Acumula el volcado de un proceso terminado en DEAD_FILE y lo elimina.
+
+        Debe llamarse con _dead_lock() tomado.
+
+        Args:
+            path (str): Archivo metrics_<pid>.json del proceso.
+        """
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except ValueError:
+            data = {}
+        dead_path = os.path.join(self.directory, DEAD_FILE)
+        snapshots = [dict(data, gauges=[])]
+        try:
+            with open(dead_path, 'r') as f:
+                snapshots.append(json.load(f))
+        except (OSError, ValueError):
+            pass
+        counters, _, histograms = _aggregate(snapshots)
+        try:
+            tmp_path = dead_path + ".tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump({
+                    "counters": [[n, [list(p) for p in l], v] for (n, l), v in counters.items()],
+                    "gauges": [],
+                    "histograms": [[n, [list(p) for p in l], e[0], e[1], e[2]] for (n, l), e in histograms.items()]
+                }, f)
+            os.replace(tmp_path, dead_path)
+            os.remove(path)
+        except OSError as e:
+            logger.error(f"Error al acumular las métricas de {path}: {str(e)}")
+
+    def _flush_loop(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def collect(self):
+        """
+        Agrega las métricas de todos los procesos.
+
+        Returns:
+            tuple: (contadores, gauges, histogramas) agregados.
+        """
+        snapshots = [self.snapshot()]
+        own_pid = os.getpid()
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            lock = self._dead_lock()
+        except OSError:
+            return _aggregate(snapshots)
+        # Con el lock tomado ningún volcado pasa al acumulado a mitad de la lectura
+        with lock:
+            try:
+                names = os.listdir(self.directory)
+            except OSError:
+                names = []
+            live = []
+            for name in names:
+                if not (name.startswith('metrics_') and name.endswith('.json')):
+                    continue
+                try:
+                    pid = int(name[8:-5])
+                except ValueError:
+                    continue
+                if pid == own_pid:
+                    continue
+                path = os.path.join(self.directory, name)
+                if _pid_alive(pid):
+                    live.append(path)
+                else:
+                    self._retire(path)
+            for path in live + [os.path.join(self.directory, DEAD_FILE)]:
+                try:
+                    with open(path, 'r') as f:
+                        snapshots.append(json.load(f))
+                except (OSError, ValueError):
+                    continue
+        return _aggregate(snapshots)
+
+    def render(self):
+        """
+        Genera el texto de exposición de Prometheus con las métricas agregadas.
+
+        Returns:
+            str: Métricas en formato text/plain version 0.0.4.
+        """
+        counters, gauges, histograms = self.collect()
+        lines = []
+        for name, (kind, help_text, buckets) in METRICS.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            if kind == "counter":
+                source = counters
+            elif kind == "gauge":
+                source = gauges
+            else:
+                source = None
+            if source is not None:
+                for (n, labels), value in sorted(source.items()):
+                    if n == name:
+                        lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+                continue
+            bounds = buckets or DEFAULT_BUCKETS
+            for (n, labels), (counts, total, count) in sorted(histograms.items()):
+                if n != name:
+                    continue
+                cumulative = 0
+                for bound, bucket_count in zip(bounds, counts):
+                    cumulative += bucket_count
+                    lines.append(f"{name}_bucket{_format_labels(labels, ('le', repr(float(bound))))} {cumulative}")
+                lines.append(f"{name}_bucket{_format_labels(labels, ('le', '+Inf'))} {count}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(total)}")
+                lines.append(f"{name}_count{_format_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+def _aggregate(snapshots):
+    """
+    Suma los volcados de varios procesos.
+
+    Args:
+        snapshots (list): Volcados con el formato de MetricsRegistry.snapshot().
+
+    Returns:
+        tuple: (contadores, gauges, histogramas) agregados.
+    """
+    counters, gauges, histograms = {}, {}, {}
+    for data in snapshots:
+        for n, l, v in data.get("counters", []):
+            key = (n, tuple(tuple(p) for p in l))
+            counters[key] = counters.get(key, 0.0) + v
+        for n, l, v in data.get("gauges", []):
+            key = (n, tuple(tuple(p) for p in l))
+            gauges[key] = gauges.get(key, 0.0) + v
+        for n, l, counts, total, count in data.get("histograms", []):
+            key = (n, tuple(tuple(p) for p in l))
+            entry = histograms.get(key)
+            if entry is None:
+                histograms[key] = [list(counts), total, count]
+            else:
+                entry[0] = [a + b for a, b in zip(entry[0], counts)]
+                entry[1] += total
+                entry[2] += count
+    return counters, gauges, histograms
+
+class _FileLock:
+    """Lock exclusivo entre procesos sobre un archivo (flock), usable con 'with'."""
+
+    __slots__ = ('path', 'file')
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'a')
+
+    def __enter__(self):
+        fcntl.flock(self.file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # Cerrar el archivo libera el flock
+        self.file.close()
+        return False
+
+class _Timer:
+    """Temporizador para MetricsRegistry.time()."""
+
+    __slots__ = ('registry', 'name', 'labels', 'start')
+
+    def __init__(self, registry, name, labels):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.registry.observe(self.name, time.perf_counter() - self.start, **self.labels)
+        return False
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(labels, extra=None):
+    pairs = list(labels)
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+def _format_value(value):
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+# Registro global del proceso
+metrics = MetricsRegistry()
+
+@atexit.register
+def _flush_on_exit():
+    # Conservar los contadores del proceso aunque termine entre dos volcados
+    if metrics.enabled and metrics._flusher is not None and metrics._pid == os.getpid():
+        metrics.flush()
+
+def configure_metrics(config):
+    """
+    Configura el registro de métricas.
+
+    Args:
+        config (dict): Configuración de la API.
+    """
+    metrics.configure(config)
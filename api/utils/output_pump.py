@@ -0,0 +1,361 @@
+"""
+Lectura continua de la salida (stdout/stderr) de los procesos de los bots.
+
+Un proceso lanzado con stdout=PIPE se bloquea en cuanto llena el búfer del
+sistema (unos 64 KB) si nadie lee la tubería. OutputPump drena todas las
+tuberías registradas desde un único hilo con selectors (E/S no bloqueante) y
+guarda las líneas en un búfer circular acotado por bot; opcionalmente también
+las escribe en un archivo rotativo por bot.
+
+Cada línea recibe un número de secuencia creciente por bot, que sirve de
+cursor para leer solo lo nuevo (tail -f) sin tocar el disco.
+"""
+
+import os
+import time
+import logging
+import selectors
+import threading
+import itertools
+import logging.handlers
+from collections import deque
+from datetime import datetime
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Bytes leídos por llamada a os.read
+READ_SIZE = 65536
+
+class LogBuffer:
+    """
+    Búfer circular de líneas de un bot, acotado en líneas y en bytes.
+
+    Lo escribe el hilo de OutputPump y lo leen los hilos de las solicitudes;
+    wait() espera a que lleguen líneas nuevas.
+    """
+
+    def __init__(self, max_lines=2000, max_bytes=1024 * 1024):
+        """
+        Inicializa el búfer.
+
+        Args:
+            max_lines (int): Líneas máximas conservadas.
+            max_bytes (int): Tamaño máximo aproximado del texto conservado.
+        """
+        self.max_lines = max_lines
+        self.max_bytes = max_bytes
+        self._lines = deque()
+        self._bytes = 0
+        self._next_seq = 1
+        self._condition = threading.Condition()
+
+    def append(self, stream, text, ts=None):
+        """
+        Añade una línea descartando las más antiguas si se superan los límites.
+
+        Args:
+            stream (str): 'stdout' o 'stderr'.
+            text (str): Línea sin salto final.
+            ts (float, optional): Momento de lectura (epoch).
+        """
+        with self._condition:
+            self._lines.append((self._next_seq, ts or time.time(), stream, text))
+            self._next_seq += 1
+            self._bytes += len(text)
+            while self._lines and (len(self._lines) > self.max_lines or self._bytes > self.max_bytes):
+                self._bytes -= len(self._lines.popleft()[3])
+            self._condition.notify_all()
+
+    @property
+    def last_seq(self):
+        """Secuencia de la última línea recibida (0 si no hay ninguna)."""
+        return self._next_seq - 1
+
+    def read(self, tail=None, after=None, limit=1000):
+        """
+        Lee líneas del búfer.
+
+        Args:
+            tail (int, optional): Devolver solo las últimas N líneas.
+            after (int, optional): Devolver solo las líneas con secuencia mayor.
+            limit (int): Máximo de líneas devueltas.
+
+        Returns:
+            tuple: (líneas como diccionarios, secuencia de la última línea
+            devuelta o del cursor si no hay nuevas, líneas perdidas entre el
+            cursor y la más antigua conservada).
+        """
+        with self._condition:
+            after = self._cursor(after)
+            if not self._lines:
+                return [], after if after is not None else self.last_seq, 0
+            first_seq = self._lines[0][0]
+            missed = 0
+            if after is not None:
+                start = max(0, after + 1 - first_seq)
+                missed = max(0, first_seq - after - 1)
+                entries = list(itertools.islice(self._lines, start, start + limit))
+            else:
+                count = min(len(self._lines), tail if tail is not None else limit, limit)
+                entries = list(itertools.islice(self._lines, len(self._lines) - count, None))
+        next_seq = entries[-1][0] if entries else (after if after is not None else self.last_seq)
+        return [_line_dict(entry) for entry in entries], next_seq, missed
+
+    def wait(self, after, timeout):
+        """
+        Espera a que haya líneas con secuencia mayor que 'after'.
+
+        Args:
+            after (int): Cursor del lector.
+            timeout (float): Segundos máximos de espera.
+
+        Returns:
+            bool: True si hay líneas nuevas.
+        """
+        with self._condition:
+            after = self._cursor(after)
+            return self._condition.wait_for(lambda: self.last_seq > after, timeout)
+
+    def _cursor(self, after):
+        # Un cursor por delante de la última línea procede de un búfer anterior
+        # (el supervisor se reinició): se lee desde el principio
+        if after is not None and after > self.last_seq:
+            return 0
+        return after
+
+def _line_dict(entry):
+    seq, ts, stream, text = entry
+    return {
+        "seq": seq,
+        "ts": datetime.fromtimestamp(ts).isoformat(timespec='milliseconds'),
+        "stream": stream,
+        "line": text
+    }
+
+class _Stream:
+    """Estado de lectura de una tubería registrada."""
+
+    def __init__(self, key, name, fileobj, group):
+        self.key = key
+        self.name = name
+        self.fileobj = fileobj
+        self.group = group
+        self.partial = b''
+
+class _StreamGroup:
+    """Tuberías de un mismo proceso; 'closed' se activa cuando todas llegan a EOF."""
+
+    def __init__(self, count):
+        self.open = count
+        self.closed = threading.Event()
+        if not count:
+            self.closed.set()
+
+class OutputPump:
+    """
+    Drena las tuberías de los procesos de los bots desde un único hilo.
+
+    Las tuberías se registran con attach(); el hilo arranca con la primera y
+    se cierra cada tubería al llegar a EOF (el proceso y todos los que la
+    heredaron han terminado).
+    """
+
+    def __init__(self, max_lines=2000, max_bytes=1024 * 1024, max_line_bytes=16384,
+                 log_dir=None, log_max_bytes=10 * 1024 * 1024, log_backup_count=5):
+        """
+        Inicializa el lector.
+
+        Args:
+            max_lines (int): Líneas conservadas en memoria por bot.
+            max_bytes (int): Bytes de texto conservados en memoria por bot.
+            max_line_bytes (int): Longitud a partir de la que se corta una línea.
+            log_dir (str, optional): Directorio de los archivos rotativos por bot
+                (sin archivos si es None).
+            log_max_bytes (int): Tamaño a partir del que se rota cada archivo.
+            log_backup_count (int): Archivos rotados que se conservan.
+        """
+        self.max_lines = max_lines
+        self.max_bytes = max_bytes
+        self.max_line_bytes = max_line_bytes
+        self.log_dir = log_dir
+        self.log_max_bytes = log_max_bytes
+        self.log_backup_count = log_backup_count
+        self._buffers = {}
+        self._sinks = {}
+        self._lock = threading.Lock()
+        self._pending = []
+        self._selector = None
+        self._thread = None
+        self._wakeup_r = self._wakeup_w = None
+        self._running = False
+
+    def configure(self, config):
+        """
+        Aplica la sección 'supervisor' de api_config.json.
+
+        Args:
+            config (dict): Configuración de la API.
+        """
+        supervisor_config = config.get('supervisor', {})
+        self.max_lines = int(supervisor_config.get('buffer_lines', self.max_lines))
+        self.max_bytes = int(supervisor_config.get('buffer_bytes', self.max_bytes))
+        self.max_line_bytes = int(supervisor_config.get('max_line_bytes', self.max_line_bytes))
+        self.log_dir = supervisor_config.get('log_dir', self.log_dir)
+        self.log_max_bytes = int(supervisor_config.get('log_max_bytes', self.log_max_bytes))
+        self.log_backup_count = int(supervisor_config.get('log_backup_count', self.log_backup_count))
+
+    def buffer(self, key):
+        """
+        Devuelve el búfer de un bot, creándolo si no existe.
+
+        Args:
+            key (str): ID del bot.
+
+        Returns:
+            LogBuffer: Búfer del bot.
+        """
+        with self._lock:
+            buffer = self._buffers.get(key)
+            if buffer is None:
+                buffer = self._buffers[key] = LogBuffer(self.max_lines, self.max_bytes)
+            return buffer
+
+    def attach(self, key, process):
+        """
+        Registra las tuberías stdout/stderr de un proceso.
+
+        Args:
+            key (str): ID del bot al que pertenece la salida.
+            process (subprocess.Popen): Proceso lanzado con stdout/stderr=PIPE.
+
+        Returns:
+            threading.Event: Se activa cuando todas las tuberías del proceso se
+            han cerrado (toda su salida está en el búfer).
+        """
+        names = [name for name in ('stdout', 'stderr') if getattr(process, name) is not None]
+        group = _StreamGroup(len(names))
+        streams = [_Stream(key, name, getattr(process, name), group) for name in names]
+        self.buffer(key)
+        for stream in streams:
+            os.set_blocking(stream.fileobj.fileno(), False)
+        with self._lock:
+            self._pending.extend(streams)
+            self._ensure_thread()
+        os.write(self._wakeup_w, b'\0')
+        return group.closed
+
+    def _ensure_thread(self):
+        if self._running:
+            return
+        self._selector = selectors.DefaultSelector()
+        self._wakeup_r, self._wakeup_w = os.pipe()
+        os.set_blocking(self._wakeup_r, False)
+        self._selector.register(self._wakeup_r, selectors.EVENT_READ, None)
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="output-pump", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while self._running:
+            for selector_key, _ in self._selector.select():
+                stream = selector_key.data
+                if stream is None:
+                    self._drain_wakeup()
+                    continue
+                try:
+                    data = os.read(stream.fileobj.fileno(), READ_SIZE)
+                except BlockingIOError:
+                    continue
+                except OSError as e:
+                    logger.warning(f"Error al leer la salida de {stream.key} ({stream.name}): {str(e)}")
+                    data = b''
+                if data:
+                    self._feed(stream, data)
+                else:
+                    self._close(stream)
+        for selector_key in list(self._selector.get_map().values()):
+            if selector_key.data is not None:
+                self._close(selector_key.data)
+        self._selector.close()
+
+    def _drain_wakeup(self):
+        try:
+            os.read(self._wakeup_r, READ_SIZE)
+        except BlockingIOError:
+            pass
+        with self._lock:
+            pending, self._pending = self._pending, []
+        for stream in pending:
+            self._selector.register(stream.fileobj, selectors.EVENT_READ, stream)
+
+    def _feed(self, stream, data):
+        lines = (stream.partial + data).split(b'\n')
+        stream.partial = lines.pop()
+        # Una línea sin salto no puede crecer sin límite
+        while len(stream.partial) > self.max_line_bytes:
+            lines.append(stream.partial[:self.max_line_bytes])
+            stream.partial = stream.partial[self.max_line_bytes:]
+        if lines:
+            self._emit(stream, lines)
+
+    def _close(self, stream):
+        if stream.partial:
+            self._emit(stream, [stream.partial])
+            stream.partial = b''
+        try:
+            self._selector.unregister(stream.fileobj)
+        except (KeyError, ValueError):
+            pass
+        stream.fileobj.close()
+        stream.group.open -= 1
+        if not stream.group.open:
+            stream.group.closed.set()
+
+    def _emit(self, stream, lines):
+        buffer = self.buffer(stream.key)
+        sink = self._sink(stream.key)
+        now = time.time()
+        for raw in lines:
+            text = raw.decode('utf-8', 'replace').rstrip('\r')
+            buffer.append(stream.name, text, now)
+            if sink is not None:
+                sink.emit(logging.makeLogRecord({"msg": f"{stream.name} {text}", "created": now}))
+
+    def _sink(self, key):
+        if not self.log_dir:
+            return None
+        sink = self._sinks.get(key)
+        if sink is None:
+            os.makedirs(self.log_dir, exist_ok=True)
+            sink = logging.handlers.RotatingFileHandler(
+                os.path.join(self.log_dir, f"{key}.log"), maxBytes=self.log_max_bytes,
+                backupCount=self.log_backup_count, encoding='utf-8', delay=True
+            )
+            sink.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+            self._sinks[key] = sink
+        return sink
+
+    def read(self, key, tail=None, after=None, limit=1000):
+        """
+        Lee la salida conservada de un bot (ver LogBuffer.read).
+
+        Returns:
+            dict: {'lines', 'next', 'missed'}.
+        """
+        lines, next_seq, missed = self.buffer(key).read(tail, after, limit)
+        return {"lines": lines, "next": next_seq, "missed": missed}
+
+    def stop(self, timeout=2.0):
+        """Detiene el hilo lector y cierra las tuberías y los archivos."""
+        with self._lock:
+            if not self._running:
+                return
+            self._running = False
+        os.write(self._wakeup_w, b'\0')
+        self._thread.join(timeout)
+        os.close(self._wakeup_r)
+        os.close(self._wakeup_w)
+        for sink in self._sinks.values():
+            sink.close()
+        self._sinks = {}
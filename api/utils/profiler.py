@@ -0,0 +1,183 @@
+"""
+Perfilador por muestreo para diagnóstico en producción.
+
+Toma instantáneas periódicas de las pilas de todos los hilos del worker
+(sys._current_frames) sin instrumentar el código, por lo que su coste es bajo
+y puede activarse bajo demanda sin reiniciar la API.
+"""
+
+import os
+import sys
+import time
+import logging
+import threading
+from collections import Counter
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Raíz del proyecto para acortar las rutas de los frames propios
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Funciones hoja que indican un hilo bloqueado esperando (no consume CPU)
+IDLE_FUNCTIONS = frozenset([
+    'wait', 'select', 'accept', 'serve_forever',
+    '_wait_for_tstate_lock', 'readinto', 'recv_into'
+])
+
+class ProfilerBusyError(Exception):
+    """Se intentó iniciar un perfilado mientras otro está en curso."""
+
+def _frame_label(code):
+    filename = code.co_filename
+    if filename.startswith(REPO_ROOT):
+        filename = os.path.relpath(filename, REPO_ROOT)
+    else:
+        filename = os.path.basename(filename)
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+class SamplingProfiler:
+    """
+    Perfilador por muestreo de todos los hilos del proceso.
+
+    Solo permite una sesión simultánea y limita su duración máxima.
+    """
+
+    def __init__(self, interval=0.005, max_seconds=30):
+        """
+        Inicializa el perfilador.
+
+        Args:
+            interval (float): Segundos entre muestras.
+            max_seconds (float): Duración máxima de una sesión.
+        """
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self._session_lock = threading.Lock()
+        self._labels = {}
+
+    def configure(self, config):
+        """
+        Aplica la sección 'profiler' de api_config.json.
+
+        Args:
+            config (dict): Configuración de la API.
+        """
+        profiler_config = config.get('profiler', {})
+        self.interval = float(profiler_config.get('interval_ms', self.interval * 1000)) / 1000
+        self.max_seconds = float(profiler_config.get('max_seconds', self.max_seconds))
+
+    def _label(self, code):
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = _frame_label(code)
+        return label
+
+    def _sample(self, own_ident, stacks, include_idle):
+        for ident, frame in sys._current_frames().items():
+            if ident == own_ident:
+                continue
+            if not include_idle and frame.f_code.co_name in IDLE_FUNCTIONS:
+                continue
+            codes = []
+            while frame is not None:
+                codes.append(frame.f_code)
+                frame = frame.f_back
+            stacks[tuple(codes)] += 1
+
+    def profile(self, seconds, include_idle=False):
+        """
+        Ejecuta una sesión de perfilado bloqueando al hilo que la llama.
+
+        Args:
+            seconds (float): Duración solicitada (se limita a max_seconds).
+            include_idle (bool): Incluir hilos bloqueados en esperas.
+
+        Returns:
+            dict: Resultado con las pilas colapsadas y los contadores por pila.
+
+        Raises:
+            ProfilerBusyError: Si ya hay una sesión en curso.
+        """
+        if not self._session_lock.acquire(blocking=False):
+            raise ProfilerBusyError("Ya hay una sesión de perfilado en curso")
+        try:
+            seconds = max(0.1, min(float(seconds), self.max_seconds))
+            own_ident = threading.get_ident()
+            stacks = Counter()
+            samples = 0
+            started = time.perf_counter()
+            deadline = started + seconds
+            next_sample = started
+            while True:
+                now = time.perf_counter()
+                if now >= deadline:
+                    break
+                if now < next_sample:
+                    time.sleep(next_sample - now)
+                self._sample(own_ident, stacks, include_idle)
+                samples += 1
+                next_sample += self.interval
+            elapsed = time.perf_counter() - started
+            logger.info(f"Perfilado completado: {samples} muestras en {elapsed:.2f}s")
+            return {"seconds": round(elapsed, 3), "samples": samples, "stacks": stacks}
+        finally:
+            self._session_lock.release()
+
+    def collapsed(self, stacks):
+        """
+        Convierte las pilas al formato colapsado (compatible con flamegraph.pl).
+
+        Args:
+            stacks (Counter): Contador de pilas (tuplas de code objects, hoja primero).
+
+        Returns:
+            str: Una línea por pila: 'raiz;...;hoja cuenta'.
+        """
+        lines = []
+        for codes, count in stacks.most_common():
+            lines.append(";".join(self._label(code) for code in reversed(codes)) + f" {count}")
+        return "\n".join(lines)
+
+    def top(self, stacks, limit=20):
+        """
+        Calcula las funciones más costosas.
+
+        Args:
+            stacks (Counter): Contador de pilas.
+            limit (int): Número de funciones a devolver.
+
+        Returns:
+            list: Funciones ordenadas por muestras propias (y después totales).
+        """
+        total_samples = sum(stacks.values()) or 1
+        own = Counter()
+        cumulative = Counter()
+        for codes, count in stacks.items():
+            own[codes[0]] += count
+            for code in set(codes):
+                cumulative[code] += count
+        result = []
+        ranked = sorted(cumulative, key=lambda code: (own[code], cumulative[code]), reverse=True)
+        for code in ranked[:limit]:
+            total = cumulative[code]
+            result.append({
+                "function": self._label(code),
+                "self": own[code],
+                "total": total,
+                "self_pct": round(own[code] * 100.0 / total_samples, 2),
+                "total_pct": round(total * 100.0 / total_samples, 2)
+            })
+        return result
+
+# Perfilador global del worker
+profiler = SamplingProfiler()
+
+def configure_profiler(config):
+    """
+    Configura el perfilador.
+
+    Args:
+        config (dict): Configuración de la API.
+    """
+    profiler.configure(config)
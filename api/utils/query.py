@@ -0,0 +1,82 @@
+"""
+Parámetros de consulta comunes a los endpoints de lectura.
+
+    ?fields=id,status      devolver solo esos campos (sparse fieldsets)
+    ?format=compact        listas en forma de columnas: nombres una vez y filas como arrays
+"""
+
+from flask import request
+from api.utils.error_handler import APIError
+
+FORMATS = ("json", "compact")
+
+def parse_fields(allowed):
+    """
+    Lee el parámetro 'fields' de la solicitud actual.
+
+    Args:
+        allowed (tuple): Campos válidos del recurso.
+
+    Returns:
+        tuple: Campos pedidos en el orden indicado (sin duplicados), o None si
+        no se ha restringido la respuesta.
+
+    Raises:
+        APIError: Si algún campo no existe (400).
+    """
+    raw = request.args.get('fields')
+    if raw is None:
+        return None
+    fields = []
+    for name in raw.split(','):
+        name = name.strip()
+        if name and name not in fields:
+            fields.append(name)
+    unknown = [name for name in fields if name not in allowed]
+    if unknown or not fields:
+        raise APIError("Campos no válidos en 'fields'", 400,
+                       {"invalid_fields": unknown, "allowed_fields": list(allowed)})
+    return tuple(fields)
+
+def wants_compact():
+    """
+    Indica si la solicitud pide el formato compacto por columnas.
+
+    Returns:
+        bool: True con ?format=compact.
+
+    Raises:
+        APIError: Si el formato no existe (400).
+    """
+    response_format = request.args.get('format', 'json')
+    if response_format not in FORMATS:
+        raise APIError("Formato no válido", 400, {"allowed_formats": list(FORMATS)})
+    return response_format == "compact"
+
+def wants(fields, name):
+    """
+    Indica si un campo forma parte de la respuesta.
+
+    Args:
+        fields (tuple): Campos pedidos, o None para todos.
+        name (str): Campo a comprobar.
+
+    Returns:
+        bool: True si hay que calcular el campo.
+    """
+    return fields is None or name in fields
+
+def project(item, fields):
+    """
+    Reduce un diccionario a los campos pedidos, en su orden.
+
+    Args:
+        item (dict): Recurso completo.
+        fields (tuple): Campos pedidos, o None para todos.
+
+    Returns:
+        dict: Recurso con solo los campos pedidos.
+    """
+    if fields is None:
+        return item
+    return {name: item.get(name) for name in fields}
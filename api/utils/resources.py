@@ -0,0 +1,382 @@
+"""
+Muestreo del consumo de recursos de los procesos de los bots.
+
+Un hilo recorre /proc a intervalo fijo, reconstruye el árbol de procesos de
+cada bot (los procesos que coinciden con su patrón, los que ha lanzado el
+supervisor y todos sus descendientes) y guarda por bot:
+
+    cpu_percent     uso de CPU del árbol (100 = un núcleo completo)
+    rss_bytes       memoria residente
+    threads         hilos
+    fds             descriptores de archivo abiertos
+    read_bps        bytes leídos del almacenamiento por segundo
+    write_bps       bytes escritos al almacenamiento por segundo
+    processes       procesos en el árbol
+
+Cada serie es un búfer circular sobre array.array de tamaño fijo: la memoria
+por bot no crece con el tiempo y no se crean objetos por muestra. El propio
+muestreo mide su coste (tiempo real y de CPU por ciclo) para comprobar que
+sigue siendo barato con cientos de bots.
+"""
+
+import os
+import time
+import array
+import logging
+import threading
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Series guardadas por bot (además de la marca de tiempo)
+RESOURCE_FIELDS = ("cpu_percent", "rss_bytes", "threads", "fds", "read_bps", "write_bps", "processes")
+
+# Series que se devuelven como enteros (se guardan como float32)
+INTEGER_FIELDS = frozenset(("rss_bytes", "threads", "fds", "processes"))
+
+try:
+    CLOCK_TICKS = os.sysconf('SC_CLK_TCK')
+    PAGE_SIZE = os.sysconf('SC_PAGE_SIZE')
+except (AttributeError, ValueError, OSError):  # Sistemas sin sysconf
+    CLOCK_TICKS, PAGE_SIZE = 100, 4096
+
+class RingSeries:
+    """Series de un bot en búferes circulares de capacidad fija."""
+
+    def __init__(self, capacity):
+        """
+        Inicializa las series.
+
+        Args:
+            capacity (int): Muestras conservadas.
+        """
+        self.capacity = capacity
+        self.ts = array.array('d', bytes(8 * capacity))
+        # float32 basta para las métricas y reduce la memoria a la mitad
+        self.values = {name: array.array('f', bytes(4 * capacity)) for name in RESOURCE_FIELDS}
+        self.count = 0
+        self.head = 0
+
+    def append(self, ts, sample):
+        """
+        Añade una muestra sobrescribiendo la más antigua si el búfer está lleno.
+
+        Args:
+            ts (float): Momento de la muestra (epoch).
+            sample (dict): Valor de cada serie; None se guarda como NaN.
+        """
+        index = self.head
+        self.ts[index] = ts
+        for name, values in self.values.items():
+            value = sample.get(name)
+            values[index] = float('nan') if value is None else value
+        self.head = (index + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def since(self, start_ts):
+        """
+        Devuelve las muestras posteriores a un momento, de la más antigua a la más reciente.
+
+        Args:
+            start_ts (float): Momento inicial (epoch).
+
+        Returns:
+            list: Filas [ts, cpu_percent, rss_bytes, ...]; NaN se convierte en None.
+        """
+        rows = []
+        for offset in range(self.count, 0, -1):
+            index = (self.head - offset) % self.capacity
+            ts = self.ts[index]
+            if ts < start_ts:
+                continue
+            row = [round(ts, 3)]
+            for name in RESOURCE_FIELDS:
+                value = self.values[name][index]
+                if value != value:
+                    row.append(None)
+                else:
+                    row.append(int(value) if name in INTEGER_FIELDS else round(value, 2))
+            rows.append(row)
+        return rows
+
+class ResourceSampler:
+    """Muestrea periódicamente los recursos del árbol de procesos de cada bot."""
+
+    def __init__(self, interval=5.0, retention=3600.0):
+        """
+        Inicializa el muestreador.
+
+        Args:
+            interval (float): Segundos entre muestras.
+            retention (float): Segundos de historia conservados por bot.
+        """
+        self.interval = interval
+        self.retention = retention
+        self.enabled = True
+        self.patterns = {}
+        self.extra_roots = None
+        self._series = {}
+        self._previous = {}
+        self._cmdlines = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._stats = {"cycles": 0, "last_ms": 0.0, "last_cpu_ms": 0.0, "total_ms": 0.0,
+                       "total_cpu_ms": 0.0, "max_ms": 0.0, "processes_scanned": 0}
+
+    @property
+    def capacity(self):
+        """Muestras conservadas por bot."""
+        return max(1, int(self.retention / self.interval))
+
+    def configure(self, config):
+        """
+        Aplica la sección 'resources' de api_config.json.
+
+        Args:
+            config (dict): Configuración de la API.
+        """
+        resources_config = config.get('resources', {})
+        self.enabled = bool(resources_config.get('enabled', self.enabled))
+        self.interval = float(resources_config.get('interval_seconds', self.interval))
+        self.retention = float(resources_config.get('retention_seconds', self.retention))
+
+    def set_patterns(self, patterns):
+        """
+        Define qué procesos pertenecen a cada bot.
+
+        Args:
+            patterns (dict): bot_id -> texto que aparece en la línea de comandos
+                del proceso principal del bot.
+        """
+        self.patterns = dict(patterns)
+
+    def _read_stat(self, pid):
+        with open(f'/proc/{pid}/stat', 'rb') as f:
+            data = f.read()
+        # El nombre del proceso puede contener espacios: los campos van tras el último ')'
+        fields = data[data.rindex(b')') + 2:].split()
+        # ppid, utime + stime, num_threads, starttime, rss (campos 4, 14, 15, 20, 22 y 24)
+        return (int(fields[1]), int(fields[11]) + int(fields[12]), int(fields[17]),
+                int(fields[19]), int(fields[21]))
+
+    def _cmdline(self, pid, starttime):
+        # La línea de comandos casi nunca cambia: se lee una vez por proceso
+        key = (pid, starttime)
+        cmdline = self._cmdlines.get(key)
+        if cmdline is None:
+            try:
+                with open(f'/proc/{pid}/cmdline', 'rb') as f:
+                    cmdline = f.read().replace(b'\0', b' ').decode('utf-8', 'replace')
+            except OSError:
+                cmdline = ''
+            self._cmdlines[key] = cmdline
+        return cmdline
+
+    @staticmethod
+    def _count_fds(pid):
+        try:
+            return len(os.listdir(f'/proc/{pid}/fd'))
+        except OSError:
+            return None
+
+    @staticmethod
+    def _read_io(pid):
+        try:
+            with open(f'/proc/{pid}/io', 'rb') as f:
+                values = dict(line.split(b':', 1) for line in f.read().splitlines() if b':' in line)
+            return int(values[b'read_bytes']), int(values[b'write_bytes'])
+        except (OSError, KeyError, ValueError):
+            return None
+
+    def _scan(self):
+        """Lee /proc/<pid>/stat de todos los procesos (necesario para conocer los hijos)."""
+        processes = {}
+        children = {}
+        for entry in os.listdir('/proc'):
+            if not entry.isdigit():
+                continue
+            pid = int(entry)
+            try:
+                stat = self._read_stat(pid)
+            except (OSError, ValueError, IndexError):
+                continue
+            processes[pid] = stat
+            children.setdefault(stat[0], []).append(pid)
+        return processes, children
+
+    def _roots(self, processes):
+        roots = {bot_id: set() for bot_id in self.patterns}
+        if self.patterns:
+            for pid, stat in processes.items():
+                cmdline = self._cmdline(pid, stat[3])
+                for bot_id, pattern in self.patterns.items():
+                    if pattern in cmdline:
+                        roots[bot_id].add(pid)
+        if self.extra_roots is not None:
+            for bot_id, pids in self.extra_roots().items():
+                roots.setdefault(bot_id, set()).update(pid for pid in pids if pid in processes)
+        return roots
+
+    def sample_once(self):
+        """Toma una muestra de todos los bots y actualiza las estadísticas del muestreo."""
+        start, cpu_start = time.perf_counter(), time.thread_time()
+        now = time.time()
+        processes, children = self._scan()
+        roots = self._roots(processes)
+
+        samples = {}
+        previous = {}
+        for bot_id, bot_roots in roots.items():
+            tree, pending = set(), list(bot_roots)
+            while pending:
+                pid = pending.pop()
+                if pid not in tree:
+                    tree.add(pid)
+                    pending.extend(children.get(pid, ()))
+
+            last = self._previous.get(bot_id)
+            per_pid = {}
+            cpu_ticks = read_bytes = write_bytes = 0
+            rss = threads = fds = 0
+            io_known = fds_known = False
+            for pid in tree:
+                _, ticks, num_threads, starttime, rss_pages = processes[pid]
+                io = self._read_io(pid)
+                per_pid[(pid, starttime)] = (ticks, io)
+                rss += rss_pages * PAGE_SIZE
+                threads += num_threads
+                count = self._count_fds(pid)
+                if count is not None:
+                    fds += count
+                    fds_known = True
+                if last is None:
+                    continue
+                # Diferencias por proceso: los que terminan no restan y los
+                # nuevos cuentan desde cero
+                old_ticks, old_io = last["pids"].get((pid, starttime), (0, None))
+                cpu_ticks += max(0, ticks - old_ticks)
+                if io is not None:
+                    io_known = True
+                    old_read, old_write = old_io or (0, 0)
+                    read_bytes += max(0, io[0] - old_read)
+                    write_bytes += max(0, io[1] - old_write)
+            previous[bot_id] = {"ts": now, "pids": per_pid}
+
+            elapsed = now - last["ts"] if last is not None else 0
+            samples[bot_id] = {
+                "cpu_percent": cpu_ticks / CLOCK_TICKS / elapsed * 100 if elapsed > 0 else None,
+                "rss_bytes": rss,
+                "threads": threads,
+                "fds": fds if fds_known else None,
+                "read_bps": read_bytes / elapsed if elapsed > 0 and io_known else None,
+                "write_bps": write_bytes / elapsed if elapsed > 0 and io_known else None,
+                "processes": len(tree),
+            }
+
+        with self._lock:
+            for bot_id, sample in samples.items():
+                series = self._series.get(bot_id)
+                if series is None or series.capacity != self.capacity:
+                    series = self._series[bot_id] = RingSeries(self.capacity)
+                series.append(now, sample)
+            self._previous = previous
+            # Olvidar las líneas de comandos de procesos que ya no existen
+            self._cmdlines = {key: value for key, value in self._cmdlines.items() if key[0] in processes}
+
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            cpu_ms = (time.thread_time() - cpu_start) * 1000
+            stats = self._stats
+            stats["cycles"] += 1
+            stats["last_ms"], stats["last_cpu_ms"] = elapsed_ms, cpu_ms
+            stats["total_ms"] += elapsed_ms
+            stats["total_cpu_ms"] += cpu_ms
+            stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+            stats["processes_scanned"] = len(processes)
+
+    def _run(self):
+        while not self._stop.is_set():
+            started = time.monotonic()
+            try:
+                self.sample_once()
+            except Exception as e:
+                logger.error(f"Error al muestrear recursos de los bots: {str(e)}")
+            self._stop.wait(max(0.0, self.interval - (time.monotonic() - started)))
+
+    def start(self):
+        """Arranca el hilo de muestreo (solo en sistemas con /proc)."""
+        if not self.enabled or (self._thread is not None and self._thread.is_alive()):
+            return
+        if not os.path.isdir('/proc'):
+            logger.warning("Muestreo de recursos desactivado: /proc no está disponible")
+            self.enabled = False
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="resource-sampler", daemon=True)
+        self._thread.start()
+        logger.info(f"Muestreo de recursos cada {self.interval}s ({self.capacity} muestras por bot)")
+
+    def stop(self):
+        """Detiene el hilo de muestreo."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(self.interval + 1)
+            self._thread = None
+
+    def stats(self):
+        """
+        Coste del propio muestreo.
+
+        Returns:
+            dict: Intervalo, ciclos, duración (real y de CPU) del último ciclo,
+            media y máximo, procesos recorridos y bots muestreados.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            bots = len(self._series)
+        cycles = stats["cycles"] or 1
+        return {
+            "enabled": self.enabled,
+            "interval_seconds": self.interval,
+            "cycles": stats["cycles"],
+            "bots": bots,
+            "processes_scanned": stats["processes_scanned"],
+            "last_ms": round(stats["last_ms"], 3),
+            "last_cpu_ms": round(stats["last_cpu_ms"], 3),
+            "avg_ms": round(stats["total_ms"] / cycles, 3),
+            "avg_cpu_ms": round(stats["total_cpu_ms"] / cycles, 3),
+            "max_ms": round(stats["max_ms"], 3),
+            # Fracción de un núcleo que consume el muestreo
+            "overhead_percent": round(stats["total_cpu_ms"] / cycles / (self.interval * 1000) * 100, 4),
+        }
+
+    def series(self, bot_id, window=None):
+        """
+        Muestras de un bot en una ventana de tiempo.
+
+        Args:
+            bot_id (str): ID del bot.
+            window (float, optional): Segundos hacia atrás (por defecto toda la historia).
+
+        Returns:
+            dict: {'columns', 'rows', 'summary', 'sampler'}; el resumen incluye
+            la media y el máximo de cada serie en la ventana.
+        """
+        start_ts = time.time() - window if window else 0.0
+        with self._lock:
+            series = self._series.get(bot_id)
+            rows = series.since(start_ts) if series is not None else []
+        summary = {}
+        for position, name in enumerate(RESOURCE_FIELDS, start=1):
+            values = [row[position] for row in rows if row[position] is not None]
+            summary[name] = {
+                "last": values[-1] if values else None,
+                "avg": round(sum(values) / len(values), 2) if values else None,
+                "max": max(values) if values else None,
+            }
+        return {
+            "columns": ("ts",) + RESOURCE_FIELDS,
+            "rows": rows,
+            "summary": summary,
+            "sampler": self.stats(),
+        }
@@ -0,0 +1,191 @@
+"""
+Serialización JSON de las respuestas.
+
+Usa orjson si está instalado (varias veces más rápido que el módulo json
+estándar) y recurre a json en otro caso. Las listas grandes se envían en
+streaming, codificadas por bloques, para no construir el cuerpo completo en
+memoria antes de empezar a responder.
+"""
+
+import logging
+from flask import current_app, jsonify
+from flask import json as flask_json
+
+try:
+    import orjson
+except ImportError:  # Dependencia opcional
+    orjson = None
+
+try:
+    from flask.json.provider import DefaultJSONProvider
+    JSONEncoder = None
+except ImportError:  # Flask < 2.2: jsonify usa la clase app.json_encoder
+    DefaultJSONProvider = None
+    from flask.json import JSONEncoder
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+class SerializationConfig:
+    """Configuración del codificador JSON y del streaming de listas."""
+
+    def __init__(self):
+        self.encoder = "auto"
+        self.stream_threshold = 500
+        self.stream_chunk = 100
+
+    def configure(self, config):
+        """
+        Aplica la sección 'serialization' de api_config.json.
+
+        Args:
+            config (dict): Configuración de la API.
+        """
+        serialization_config = config.get('serialization', {})
+        self.encoder = serialization_config.get('json_encoder', self.encoder)
+        self.stream_threshold = int(serialization_config.get('stream_threshold_items', self.stream_threshold))
+        self.stream_chunk = max(1, int(serialization_config.get('stream_chunk_items', self.stream_chunk)))
+
+serialization_config = SerializationConfig()
+
+def _orjson_option(sort_keys, pretty=False):
+    # Las fechas pasan por el 'default' de Flask (formato HTTP) como con json
+    option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+    if sort_keys:
+        option |= orjson.OPT_SORT_KEYS
+    if pretty:
+        option |= orjson.OPT_INDENT_2
+    return option
+
+OrjsonProvider = None
+OrjsonEncoder = None
+
+if DefaultJSONProvider is not None and orjson is not None:
+    class OrjsonProvider(DefaultJSONProvider):
+        """
+        Proveedor JSON de Flask basado en orjson (Flask 2.2 o posterior).
+
+        Respeta sort_keys y el modo legible en debug; los objetos que orjson no
+        sabe serializar pasan por el mismo 'default' que el proveedor estándar y,
+        si aun así falla (por ejemplo enteros de más de 64 bits), se usa json.
+        """
+
+        def dumps(self, obj, **kwargs):
+            # Argumentos propios de json.dumps (cls, indent...): usar el estándar
+            if set(kwargs) - {'default', 'separators'}:
+                return super().dumps(obj, **kwargs)
+            try:
+                return orjson.dumps(obj, default=self.default,
+                                    option=_orjson_option(self.sort_keys)).decode('utf-8')
+            except TypeError:
+                return super().dumps(obj, **kwargs)
+
+        def response(self, *args, **kwargs):
+            obj = self._prepare_response_obj(args, kwargs)
+            pretty = (self.compact is None and self._app.debug) or self.compact is False
+            try:
+                body = orjson.dumps(obj, default=self.default,
+                                    option=_orjson_option(self.sort_keys, pretty)) + b"\n"
+            except TypeError:
+                return super().response(obj)
+            return self._app.response_class(body, mimetype=self.mimetype)
+
+elif JSONEncoder is not None and orjson is not None:
+    class OrjsonEncoder(JSONEncoder):
+        """
+        Codificador JSON de Flask basado en orjson (Flask < 2.2).
+
+        jsonify y flask.json.dumps crean el codificador de app.json_encoder
+        con sort_keys e indent según la configuración y llaman a encode();
+        si orjson no puede serializar el objeto se usa el codificador estándar.
+        """
+
+        def encode(self, o):
+            try:
+                return orjson.dumps(o, default=self.default,
+                                    option=_orjson_option(self.sort_keys, self.indent is not None)).decode('utf-8')
+            except TypeError:
+                return super().encode(o)
+
+def configure_serialization(app, config):
+    """
+    Configura la serialización e instala el codificador JSON elegido en la app.
+
+    Args:
+        app: Aplicación Flask.
+        config (dict): Configuración de la API.
+    """
+    serialization_config.configure(config)
+    if serialization_config.encoder == "stdlib":
+        return
+    if OrjsonProvider is not None:
+        app.json = OrjsonProvider(app)
+    elif OrjsonEncoder is not None:
+        app.json_encoder = OrjsonEncoder
+    elif serialization_config.encoder == "orjson":
+        logger.warning("orjson no está disponible; se usa el módulo json estándar")
+
+def encoder_name():
+    """Devuelve el codificador JSON en uso ('orjson' o 'json')."""
+    if OrjsonProvider is not None and isinstance(getattr(current_app, 'json', None), OrjsonProvider):
+        return "orjson"
+    if OrjsonEncoder is not None and getattr(current_app, 'json_encoder', None) is OrjsonEncoder:
+        return "orjson"
+    return "json"
+
+def _encode_chunk(items):
+    provider = getattr(current_app, 'json', None)
+    if provider is not None:
+        return provider.dumps(items, separators=(',', ':'))
+    # Flask < 2.2: flask.json usa app.json_encoder
+    return flask_json.dumps(items, separators=(',', ':'))
+
+def list_response(items, status=200, compact=False, columns=None, **extra):
+    """
+    Construye la respuesta estándar {'success': True, 'data': [...]} para una lista.
+
+    En formato compacto los nombres de los campos se envían una sola vez:
+    {'success': True, 'columns': [...], 'rows': [[...], ...]}.
+
+    Si la lista supera 'stream_threshold_items' elementos el cuerpo se genera
+    en streaming por bloques de 'stream_chunk_items' (sin Content-Length); el
+    resultado es el mismo documento JSON.
+
+    Args:
+        items (list): Elementos de la lista (diccionarios).
+        status (int): Código de estado HTTP.
+        compact (bool): Usar el formato por columnas.
+        columns (tuple, optional): Columnas del formato compacto; por defecto
+            las claves del primer elemento.
+        **extra: Campos adicionales del objeto de respuesta.
+
+    Returns:
+        Respuesta Flask.
+    """
+    if compact:
+        if columns is None:
+            columns = tuple(items[0].keys()) if items else ()
+        extra["columns"] = list(columns)
+        items = [[item.get(name) for name in columns] for item in items]
+        key = "rows"
+    else:
+        key = "data"
+
+    if len(items) <= serialization_config.stream_threshold:
+        return jsonify(dict(extra, success=True, **{key: items})), status
+
+    chunk_size = serialization_config.stream_chunk
+    # Prefijo con los campos fijos; la lista se abre y se cierra a mano
+    head = _encode_chunk(dict(extra, success=True))[:-1]
+    app = current_app._get_current_object()
+
+    def generate():
+        with app.app_context():
+            yield f'{head},"{key}":['
+            for start in range(0, len(items), chunk_size):
+                # Cada bloque es una lista JSON; se eliminan los corchetes
+                chunk = _encode_chunk(items[start:start + chunk_size])[1:-1]
+                yield chunk if start == 0 else ',' + chunk
+            yield ']}\n'
+
+    return app.response_class(generate(), status=status, mimetype='application/json')
@@ -0,0 +1,97 @@
+"""
+Medición ligera de etapas de una solicitud.
+
+Las etapas se acumulan en request.stages (segundos por nombre) y se usan para
+el encabezado Server-Timing y para el desglose del access log de solicitudes
+lentas. Fuera de una solicitud (hilos en segundo plano) span no hace nada.
+"""
+
+import time
+from functools import wraps
+from flask import request, has_request_context
+
+class TimingConfig:
+    """Configuración del encabezado Server-Timing."""
+
+    def __init__(self):
+        self.server_timing = False
+
+    def configure(self, config):
+        """
+        Aplica la sección 'timing' de api_config.json.
+
+        Args:
+            config (dict): Configuración de la API.
+        """
+        self.server_timing = bool(config.get('timing', {}).get('server_timing', False))
+
+timing_config = TimingConfig()
+
+def configure_timing(config):
+    """
+    Configura la medición de etapas.
+
+    Args:
+        config (dict): Configuración de la API.
+    """
+    timing_config.configure(config)
+
+class span:
+    """
+    Context manager (y decorador) que mide una etapa de la solicitud actual.
+
+    Ejemplo:
+        with span("status"):
+            ...
+    """
+
+    __slots__ = ('name', 'stages', 'start')
+
+    def __init__(self, name):
+        self.name = name
+        self.stages = None
+
+    def __enter__(self):
+        if has_request_context():
+            self.stages = getattr(request, 'stages', None)
+        if self.stages is not None:
+            self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        stages = self.stages
+        if stages is not None:
+            stages[self.name] = stages.get(self.name, 0.0) + (time.perf_counter() - self.start)
+            self.stages = None
+        return False
+
+    def __call__(self, func):
+        name = self.name
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+
+def add_server_timing(response):
+    """
+    Añade el encabezado Server-Timing con las etapas medidas, si está activado.
+
+    Args:
+        response: Objeto de respuesta Flask.
+
+    Returns:
+        La misma respuesta.
+    """
+    if not timing_config.server_timing:
+        return response
+    stages = getattr(request, 'stages', None)
+    if stages is None:
+        return response
+    entries = [f"{name};dur={duration * 1000:.3f}" for name, duration in stages.items()]
+    start = getattr(request, 'start_time', None)
+    if start is not None:
+        entries.append(f"total;dur={(time.perf_counter() - start) * 1000:.3f}")
+    response.headers['Server-Timing'] = ", ".join(entries)
+    return response
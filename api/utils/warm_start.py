@@ -0,0 +1,234 @@
+"""
+Instantánea del estado derivado para arrancar en caliente.
+
+Los módulos registran secciones con una función que exporta su estado
+derivado (instantánea de estado de los bots, archivos de estado parseados,
+señales extraídas de los logs) y otra que lo restaura. Cada worker guarda la
+instantánea cada 'interval_seconds' y al terminar, en un único archivo JSON
+que se reemplaza de forma atómica.
+
+Al arrancar, el worker carga la instantánea antes de precalentar sus cachés:
+cada sección comprueba sus entradas contra la fecha de modificación y el
+tamaño actuales de los archivos y descarta las que han cambiado, de modo que
+el precalentamiento solo recalcula lo que no es válido.
+
+El arranque se mide con dos métricas etiquetadas con start="warm" o "cold":
+worker_startup_seconds (desde que se crea el proceso hasta que está listo) y
+worker_first_request_seconds (latencia de la primera solicitud de cada ruta).
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from api.utils.metrics import metrics
+from api.utils.health import process_start_time
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Raíz del proyecto (ubicación por defecto de la instantánea)
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Formato del archivo: otro valor se ignora (arranque en frío)
+SNAPSHOT_FORMAT = 1
+
+class WarmStart:
+    """Guarda y restaura las secciones registradas en un archivo local."""
+
+    def __init__(self, path=None, interval=60.0, max_age=86400.0, max_file_bytes=262144):
+        """
+        Inicializa la instantánea.
+
+        Args:
+            path (str, optional): Archivo de la instantánea (por defecto data/warm_start.json).
+            interval (float): Segundos entre guardados.
+            max_age (float): Antigüedad máxima de una instantánea utilizable.
+            max_file_bytes (int): Tamaño máximo de un archivo parseado para incluirlo.
+        """
+        self.enabled = True
+        self.path = path or os.path.join(REPO_ROOT, 'data', 'warm_start.json')
+        self.interval = interval
+        self.max_age = max_age
+        self.max_file_bytes = max_file_bytes
+        self._sections = {}
+        self._reset()
+
+    def _reset(self):
+        # Cada worker guarda y mide por su cuenta
+        self._pid = os.getpid()
+        self._thread = None
+        self._stop = threading.Event()
+        self._last_digest = None
+        self._seen_routes = set()
+        self.mode = "cold"
+        self._stats = {"loaded": False, "age_seconds": None, "load_ms": None,
+                       "sections": {}, "saves": 0, "last_save_bytes": None, "last_save_ms": None}
+
+    def configure(self, config):
+        """
+        Aplica la sección 'warm_start' de api_config.json.
+
+        Args:
+            config (dict): Configuración de la API.
+        """
+        warm_config = config.get('warm_start', {})
+        self.enabled = bool(warm_config.get('enabled', self.enabled))
+        self.path = os.getenv('WARM_START_PATH', warm_config.get('path') or self.path)
+        self.interval = float(warm_config.get('interval_seconds', self.interval))
+        self.max_age = float(warm_config.get('max_age_seconds', self.max_age))
+        self.max_file_bytes = int(warm_config.get('max_file_bytes', self.max_file_bytes))
+
+    def register(self, name, export, restore):
+        """
+        Registra una sección de la instantánea.
+
+        Args:
+            name (str): Nombre de la sección.
+            export (callable): Devuelve el estado de la sección (serializable a JSON).
+            restore (callable): Recibe ese estado, restaura lo que siga siendo
+                válido y devuelve {'restored': n, 'stale': n}.
+        """
+        self._sections[name] = (export, restore)
+
+    def load(self):
+        """Restaura las secciones registradas desde la instantánea (en cada worker, antes del precalentamiento)."""
+        if self._pid != os.getpid():
+            self._reset()
+        if not self.enabled:
+            return
+        start = time.perf_counter()
+        try:
+            with open(self.path, 'r') as f:
+                snapshot = json.load(f)
+        except FileNotFoundError:
+            logger.info("Sin instantánea de arranque en caliente: arranque en frío")
+            return
+        except (OSError, ValueError) as e:
+            logger.warning(f"Instantánea de arranque en caliente no válida ({self.path}): {str(e)}")
+            return
+
+        age = time.time() - snapshot.get("written_at", 0)
+        if snapshot.get("format") != SNAPSHOT_FORMAT or not 0 <= age <= self.max_age:
+            logger.info(f"Instantánea de arranque en caliente descartada (formato "
+                        f"{snapshot.get('format')}, antigüedad {age:.0f}s)")
+            return
+
+        sections = snapshot.get("sections", {})
+        results = {}
+        for name, (_, restore) in self._sections.items():
+            if name not in sections:
+                continue
+            try:
+                results[name] = restore(sections[name])
+            except Exception as e:
+                logger.warning(f"No se pudo restaurar la sección {name} de la instantánea: {str(e)}")
+        restored = sum(result.get("restored", 0) for result in results.values())
+        stale = sum(result.get("stale", 0) for result in results.values())
+        load_ms = round((time.perf_counter() - start) * 1000, 3)
+        self.mode = "warm" if restored else "cold"
+        self._stats.update(loaded=True, age_seconds=round(age, 1), load_ms=load_ms, sections=results)
+        logger.info(f"Instantánea de arranque en caliente cargada en {load_ms:.1f} ms "
+                    f"(antigüedad {age:.0f}s): {restored} entradas válidas, {stale} recalculadas")
+
+    def ready(self):
+        """Registra el tiempo de arranque del worker (al terminar los ganchos de inicio)."""
+        if self._pid != os.getpid():
+            self._reset()
+        metrics.observe("worker_startup_seconds", max(0.0, time.time() - process_start_time()), start=self.mode)
+
+    def observe_request(self, route, seconds):
+        """
+        Registra la latencia de la primera solicitud de cada ruta en este worker.
+
+        Args:
+            route (str): Plantilla de la ruta.
+            seconds (float): Duración de la solicitud.
+        """
+        if route in self._seen_routes and self._pid == os.getpid():
+            return
+        if self._pid != os.getpid():
+            self._reset()
+        self._seen_routes.add(route)
+        metrics.observe("worker_first_request_seconds", seconds, route=route, start=self.mode)
+
+    def save(self):
+        """
+        Escribe la instantánea si su contenido ha cambiado desde el último guardado de este worker.
+
+        Returns:
+            bool: True si se ha escrito el archivo.
+        """
+        if not self.enabled or not self._sections:
+            return False
+        start = time.perf_counter()
+        sections = {}
+        for name, (export, _) in self._sections.items():
+            try:
+                sections[name] = export()
+            except Exception as e:
+                logger.error(f"No se pudo exportar la sección {name} de la instantánea: {str(e)}")
+        body = json.dumps(sections, sort_keys=True, separators=(',', ':'), default=str)
+        digest = hashlib.blake2b(body.encode('utf-8'), digest_size=16).hexdigest()
+        if digest == self._last_digest:
+            return False
+        payload = (f'{{"format":{SNAPSHOT_FORMAT},"written_at":{time.time()!r},'
+                   f'"pid":{os.getpid()},"sections":{body}}}')
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with open(tmp_path, 'w') as f:
+                f.write(payload)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.error(f"Error al guardar la instantánea de arranque en caliente: {str(e)}")
+            return False
+        self._last_digest = digest
+        self._stats["saves"] += 1
+        self._stats["last_save_bytes"] = len(payload)
+        self._stats["last_save_ms"] = round((time.perf_counter() - start) * 1000, 3)
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.save()
+
+    def start(self):
+        """Arranca el guardado periódico en este worker."""
+        if self._pid != os.getpid():
+            self._reset()
+        if not self.enabled or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name='warm-start-writer', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Detiene el guardado periódico y guarda la instantánea final."""
+        if self._thread is not None and self._pid == os.getpid():
+            self._stop.set()
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.save()
+
+    def stats(self):
+        """
+        Estado del arranque y de los guardados de este worker.
+
+        Returns:
+            dict: Modo de arranque, resultado de la carga y últimos guardados.
+        """
+        return dict(self._stats, mode=self.mode, path=self.path)
+
+# Instantánea global
+warm_start = WarmStart()
+
+def configure_warm_start(config):
+    """
+    Configura la instantánea de arranque en caliente.
+
+    Args:
+        config (dict): Configuración de la API.
+    """
+    warm_start.configure(config)
@@ -0,0 +1,286 @@
+"""
+Cola de trabajo persistente en disco.
+
+Cada elemento es un archivo JSON en un directorio de spool compartido por
+todos los workers:
+
+    pending/      elementos en espera ('<vencimiento_ns>-<id>.json')
+    processing/   elementos reclamados ('<pid>_<nombre>')
+    failed/       elementos que agotaron los reintentos
+
+Reclamar un elemento es un rename atómico de pending/ a processing/, así que
+varios workers pueden consumir la misma cola sin coordinarse. Si un worker
+muere (o se recarga la API) con un elemento a medias, el siguiente consumidor
+que arranque lo devuelve a pending/ al comprobar que su PID ya no existe, por
+lo que ningún elemento aceptado se pierde entre recargas.
+"""
+
+import os
+import json
+import time
+import uuid
+import random
+import logging
+import threading
+
+from api.utils.metrics import _pid_alive
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+# Raíz del proyecto (directorio de spool por defecto)
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+class WorkQueue:
+    """
+    Cola persistente con un hilo consumidor por worker.
+
+    Los manejadores se registran por tipo de elemento con register(); un
+    elemento cuyo manejador lanza una excepción se reintenta con espera
+    exponencial hasta max_attempts veces.
+    """
+
+    def __init__(self, name, directory=None, poll_interval=0.5, max_attempts=5,
+                 retry_backoff=2.0, drain_timeout=20.0, fsync=False):
+        """
+        Inicializa la cola.
+
+        Args:
+            name (str): Nombre de la cola (subdirectorio del spool).
+            directory (str, optional): Directorio base del spool.
+            poll_interval (float): Segundos entre sondeos cuando la cola está vacía.
+            max_attempts (int): Intentos antes de mover un elemento a failed/.
+            retry_backoff (float): Segundos de espera base entre reintentos.
+            drain_timeout (float): Segundos máximos para terminar el elemento en
+                curso al detener el consumidor.
+            fsync (bool): Sincronizar cada elemento con el disco al encolarlo.
+        """
+        self.name = name
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.drain_timeout = drain_timeout
+        self.fsync = fsync
+        self._handlers = {}
+        self._thread = None
+        self._stop = threading.Event()
+        self._wakeup = threading.Event()
+        self._set_directory(directory or os.path.join(REPO_ROOT, 'spool'))
+
+    def _set_directory(self, base):
+        self.directory = os.path.join(base, self.name)
+        self.pending_dir = os.path.join(self.directory, 'pending')
+        self.processing_dir = os.path.join(self.directory, 'processing')
+        self.failed_dir = os.path.join(self.directory, 'failed')
+
+    def configure(self, config):
+        """
+        Aplica la sección 'work_queue' de api_config.json.
+
+        Args:
+            config (dict): Configuración de la API.
+        """
+        queue_config = config.get('work_queue', {})
+        base = os.getenv('WORK_QUEUE_DIR', queue_config.get('spool_dir') or os.path.join(REPO_ROOT, 'spool'))
+        self._set_directory(base)
+        self.poll_interval = float(queue_config.get('poll_interval_seconds', self.poll_interval))
+        self.max_attempts = int(queue_config.get('max_attempts', self.max_attempts))
+        self.retry_backoff = float(queue_config.get('retry_backoff_seconds', self.retry_backoff))
+        self.drain_timeout = float(queue_config.get('drain_timeout_seconds', self.drain_timeout))
+        self.fsync = bool(queue_config.get('fsync', self.fsync))
+
+    def register(self, kind, handler):
+        """
+        Registra el manejador de un tipo de elemento.
+
+        Args:
+            kind (str): Tipo de elemento.
+            handler (callable): Función que recibe el payload del elemento.
+        """
+        self._handlers[kind] = handler
+
+    def _ensure_dirs(self):
+        for path in (self.pending_dir, self.processing_dir, self.failed_dir):
+            os.makedirs(path, exist_ok=True)
+
+    def enqueue(self, kind, payload):
+        """
+        Añade un elemento a la cola de forma duradera.
+
+        El archivo se escribe completo antes de hacerlo visible en pending/
+        (rename atómico), de modo que al responder al cliente el elemento ya no
+        puede perderse aunque el proceso termine. Con fsync activado también
+        sobrevive a un corte de energía, a costa de un vaciado a disco por
+        elemento.
+
+        Args:
+            kind (str): Tipo de elemento (debe tener un manejador registrado).
+            payload: Datos serializables a JSON.
+
+        Returns:
+            str: Identificador del elemento.
+        """
+        self._ensure_dirs()
+        item_id = uuid.uuid4().hex
+        item = {"id": item_id, "kind": kind, "payload": payload,
+                "attempts": 0, "enqueued_at": time.time()}
+        filename = f"{time.time_ns():020d}-{item_id}.json"
+        tmp_path = os.path.join(self.directory, f".{filename}.tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(item, f)
+            if self.fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.rename(tmp_path, os.path.join(self.pending_dir, filename))
+        self._wakeup.set()
+        return item_id
+
+    def depth(self):
+        """
+        Devuelve el número de elementos en cada estado.
+
+        Returns:
+            dict: Elementos en 'pending', 'processing' y 'failed'.
+        """
+        result = {}
+        for state, path in (('pending', self.pending_dir), ('processing', self.processing_dir),
+                            ('failed', self.failed_dir)):
+            try:
+                result[state] = sum(1 for name in os.listdir(path) if name.endswith('.json'))
+            except OSError:
+                result[state] = 0
+        return result
+
+    def recover(self):
+        """
+        Devuelve a pending/ los elementos reclamados por procesos que ya no existen.
+
+        Returns:
+            int: Elementos recuperados.
+        """
+        try:
+            names = os.listdir(self.processing_dir)
+        except OSError:
+            return 0
+        recovered = 0
+        for name in names:
+            pid, _, original = name.partition('_')
+            try:
+                pid = int(pid)
+            except ValueError:
+                continue
+            if pid == os.getpid() or _pid_alive(pid):
+                continue
+            try:
+                os.rename(os.path.join(self.processing_dir, name), os.path.join(self.pending_dir, original))
+                recovered += 1
+            except OSError:
+                # Otro worker lo recuperó antes
+                continue
+        if recovered:
+            logger.warning(f"Cola {self.name}: {recovered} elementos recuperados de procesos terminados")
+        return recovered
+
+    def _claim(self):
+        try:
+            names = sorted(os.listdir(self.pending_dir))
+        except OSError:
+            return None
+        now_ns = time.time_ns()
+        for name in names:
+            if not name.endswith('.json'):
+                continue
+            # El prefijo es el instante a partir del cual puede procesarse
+            due = name.split('-', 1)[0]
+            if not due.isdigit():
+                continue
+            if int(due) > now_ns:
+                break
+            claimed = os.path.join(self.processing_dir, f"{os.getpid()}_{name}")
+            try:
+                os.rename(os.path.join(self.pending_dir, name), claimed)
+            except OSError:
+                # Reclamado por otro worker
+                continue
+            return name, claimed
+        return None
+
+    def _process(self, name, claimed):
+        try:
+            with open(claimed, 'r') as f:
+                item = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.error(f"Cola {self.name}: elemento ilegible {name}: {str(e)}")
+            os.rename(claimed, os.path.join(self.failed_dir, name))
+            return
+        handler = self._handlers.get(item.get('kind'))
+        try:
+            if handler is None:
+                raise LookupError(f"sin manejador para '{item.get('kind')}'")
+            handler(item.get('payload'))
+        except Exception as e:
+            item['attempts'] = item.get('attempts', 0) + 1
+            item['last_error'] = str(e)
+            with open(claimed, 'w') as f:
+                json.dump(item, f)
+            if item['attempts'] >= self.max_attempts or handler is None:
+                logger.error(f"Cola {self.name}: elemento {item.get('id')} descartado tras "
+                             f"{item['attempts']} intentos: {str(e)}")
+                os.rename(claimed, os.path.join(self.failed_dir, name))
+                return
+            delay = self.retry_backoff * (2 ** (item['attempts'] - 1)) * random.uniform(0.8, 1.2)
+            logger.warning(f"Cola {self.name}: reintento {item['attempts']} de {item.get('id')} "
+                           f"en {delay:.1f}s: {str(e)}")
+            retry_name = f"{time.time_ns() + int(delay * 1e9):020d}-{name.split('-', 1)[1]}"
+            os.rename(claimed, os.path.join(self.pending_dir, retry_name))
+            return
+        os.remove(claimed)
+
+    def _run(self):
+        last_recover = time.monotonic()
+        while not self._stop.is_set():
+            if time.monotonic() - last_recover > 30:
+                self.recover()
+                last_recover = time.monotonic()
+            try:
+                claimed = self._claim()
+                if claimed is not None:
+                    self._process(*claimed)
+                    continue
+            except Exception as e:
+                # Un error de E/S no debe detener el consumidor
+                logger.error(f"Cola {self.name}: error inesperado del consumidor: {str(e)}")
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+    def start(self):
+        """Recupera elementos huérfanos y arranca el hilo consumidor de este proceso."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._ensure_dirs()
+        self.recover()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=f'work-queue-{self.name}', daemon=True)
+        self._thread.start()
+
+    def is_running(self):
+        """Indica si el hilo consumidor de este proceso está activo."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def stop(self):
+        """
+        Detiene el consumidor sin reclamar nuevos elementos.
+
+        Espera como máximo drain_timeout a que termine el elemento en curso; los
+        pendientes quedan en disco para el siguiente worker.
+        """
+        thread = self._thread
+        if thread is None:
+            return
+        self._stop.set()
+        self._wakeup.set()
+        thread.join(self.drain_timeout)
+        if thread.is_alive():
+            logger.warning(f"Cola {self.name}: el elemento en curso no terminó en {self.drain_timeout}s; "
+                           "se reprocesará tras la recarga")
+        self._thread = None
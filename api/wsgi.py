@@ -0,0 +1,11 @@
+"""
+Punto de entrada WSGI para servidores de producción.
+
+Uso:
+    gunicorn -c gunicorn.conf.py api.wsgi:app
+"""
+
+from api.app import app
+
+# Alias habitual para servidores WSGI que buscan 'application'
+application = app
@@ -0,0 +1,111 @@
+"""
+Configuración de gunicorn para la Trading Bots API.
+
+Uso:
+    gunicorn -c gunicorn.conf.py api.wsgi:app
+
+Todos los valores pueden ajustarse con variables de entorno (ver .env.example).
+"""
+
+import json
+import multiprocessing
+import os
+import tempfile
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def _api_config():
+    try:
+        with open(os.path.join(BASE_DIR, 'config', 'api_config.json'), 'r') as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+_config = _api_config()
+
+# Los workers se reciclan (max_requests), así que no pueden ser dueños de los
+# procesos de los bots: estos se lanzan desde un proceso supervisor aparte
+# que on_starting arranca si no está en marcha
+os.environ.setdefault('BOT_SUPERVISOR_MODE', 'process')
+
+# Todos los workers (y, durante una recarga, los de dos maestros) escriben en
+# los mismos api.log y access.log: la rotación la hace logrotate, no cada
+# proceso por su cuenta (ver setup_https_domain.sh)
+os.environ.setdefault('LOG_ROTATION', 'external')
+
+# Dirección de escucha (mismas variables que el servidor de desarrollo)
+bind = os.getenv('GUNICORN_BIND', '{}:{}'.format(
+    os.getenv('API_HOST', _config.get('host', '0.0.0.0')),
+    os.getenv('API_PORT', _config.get('port', 5000))
+))
+
+# Modelo de workers: 'gthread' (hilos, por defecto) o un worker de bucle de
+# eventos ('gevent'/'eventlet', requieren instalar el paquete correspondiente).
+# Las solicitudes pasan la mayor parte del tiempo esperando E/S (archivos de
+# estado, subprocesos), por lo que pocos procesos con varios hilos rinden mejor
+# que muchos procesos síncronos.
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+workers = int(os.getenv('GUNICORN_WORKERS', min(4, multiprocessing.cpu_count() * 2 + 1)))
+threads = int(os.getenv('GUNICORN_THREADS', 8))
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', 1000))
+
+# Cargar la aplicación (configuración y registro de bots) una sola vez en el
+# maestro antes del fork. Los workers de bucle de eventos necesitan aplicar el
+# monkey patching antes de importar la aplicación, así que no se precargan.
+preload_app = os.getenv(
+    'GUNICORN_PRELOAD', 'false' if worker_class in ('gevent', 'eventlet') else 'true'
+).lower() == 'true'
+
+# Reciclado de workers para acotar el crecimiento de memoria
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 200))
+
+# Tiempos de espera
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 60))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+
+# Logging: el acceso lo registra la propia API (access log JSON)
+accesslog = None
+errorlog = '-'
+loglevel = os.getenv('LOG_LEVEL', _config.get('log_level', 'INFO')).lower()
+proc_name = 'trading-bots-api'
+
+# Recarga sin cortes (reload_api.sh): USR2 arranca un maestro nuevo que
+# comparte el socket; cada worker nuevo deja una marca en READY_DIR cuando ha
+# terminado de arrancar y solo entonces se detiene el maestro anterior, cuyos
+# workers terminan las solicitudes en curso durante graceful_timeout.
+pidfile = os.getenv('GUNICORN_PIDFILE', os.path.join(tempfile.gettempdir(), 'trading-bots-api.pid'))
+READY_DIR = os.getenv('GUNICORN_READY_DIR', os.path.join(tempfile.gettempdir(), 'trading-bots-api-ready'))
+
+def _ready_marker(worker):
+    return os.path.join(READY_DIR, f"{worker.ppid}.{worker.pid}")
+
+def on_starting(server):
+    """Arranca el supervisor de bots y limpia las métricas antes de crear los workers."""
+    if os.environ['BOT_SUPERVISOR_MODE'] == 'process':
+        from api.services.supervisor import ensure_supervisor_process
+        ensure_supervisor_process(_config)
+    if server.master_pid:
+        # Recarga con USR2: los contadores continúan entre versiones
+        return
+    from api.utils.metrics import metrics
+    metrics.configure(_config)
+    metrics.clear_directory()
+
+def post_worker_init(worker):
+    """Arranca hilos y precalienta cachés en cada worker ya inicializado."""
+    from api.utils.lifecycle import run_worker_start
+    run_worker_start()
+    os.makedirs(READY_DIR, exist_ok=True)
+    with open(_ready_marker(worker), 'w'):
+        pass
+
+def worker_exit(server, worker):
+    """Ejecuta los ganchos de salida del worker (volcado de métricas, colas)."""
+    from api.utils.lifecycle import run_worker_exit
+    try:
+        os.remove(_ready_marker(worker))
+    except OSError:
+        pass
+    run_worker_exit()
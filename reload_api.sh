@@ -0,0 +1,86 @@
+#!/bin/bash
+
+# Recarga la API sin cortar conexiones (gunicorn)
+#
+# 1. USR2 al maestro actual: arranca un maestro nuevo con el código actualizado
+#    que comparte el socket de escucha.
+# 2. Espera a que todos los workers nuevos hayan arrancado (marcas en READY_DIR).
+# 3. TERM al maestro anterior: sus workers dejan de aceptar conexiones y
+#    terminan las solicitudes en curso durante graceful_timeout.
+#
+# Si los workers nuevos no arrancan a tiempo se detiene el maestro nuevo y la
+# versión anterior sigue atendiendo.
+
+GREEN='\033[0;32m'
+YELLOW='\033[1;33m'
+RED='\033[0;31m'
+NC='\033[0m' # No Color
+
+TMP_DIR=${TMPDIR:-/tmp}
+PIDFILE=${GUNICORN_PIDFILE:-$TMP_DIR/trading-bots-api.pid}
+READY_DIR=${GUNICORN_READY_DIR:-$TMP_DIR/trading-bots-api-ready}
+READY_TIMEOUT=${RELOAD_READY_TIMEOUT:-60}
+DRAIN_TIMEOUT=${RELOAD_DRAIN_TIMEOUT:-60}
+
+if [ ! -f "$PIDFILE" ] || ! kill -0 "$(cat "$PIDFILE")" 2>/dev/null; then
+    echo -e "${RED}Error: no hay un maestro de gunicorn en ejecución ($PIDFILE)${NC}"
+    echo -e "${YELLOW}Inicia la API con ./start_api.sh${NC}"
+    exit 1
+fi
+
+OLD_PID=$(cat "$PIDFILE")
+WORKERS=$(pgrep -P "$OLD_PID" | wc -l)
+[ "$WORKERS" -gt 0 ] || WORKERS=1
+
+echo -e "${GREEN}=== Recargando API (maestro actual: $OLD_PID, workers: $WORKERS) ===${NC}"
+kill -USR2 "$OLD_PID"
+
+# Esperar al maestro nuevo (escribe su PID en "$PIDFILE.2" hasta que el
+# anterior termina y entonces pasa a ser el maestro principal)
+NEW_PID=""
+for _ in $(seq $((READY_TIMEOUT * 10))); do
+    NEW_PID=$(cat "$PIDFILE.2" 2>/dev/null)
+    [ -n "$NEW_PID" ] && break
+    sleep 0.1
+done
+
+if [ -z "$NEW_PID" ]; then
+    echo -e "${RED}Error: el maestro nuevo no arrancó; la versión anterior sigue activa${NC}"
+    exit 1
+fi
+
+# Esperar a que todos los workers nuevos estén listos
+READY=0
+for _ in $(seq $((READY_TIMEOUT * 10))); do
+    READY=$(ls "$READY_DIR" 2>/dev/null | grep -c "^$NEW_PID\.")
+    [ "$READY" -ge "$WORKERS" ] && break
+    if ! kill -0 "$NEW_PID" 2>/dev/null; then
+        break
+    fi
+    sleep 0.1
+done
+
+if [ "$READY" -lt "$WORKERS" ]; then
+    echo -e "${RED}Error: solo $READY de $WORKERS workers nuevos arrancaron; se cancela la recarga${NC}"
+    kill -TERM "$NEW_PID" 2>/dev/null
+    exit 1
+fi
+
+echo -e "${GREEN}Workers nuevos listos (maestro: $NEW_PID). Drenando el maestro anterior...${NC}"
+# Publicar el maestro nuevo en el PIDFILE antes de terminar el anterior: con
+# systemd (Type=forking, PIDFile=) el servicio pasa a seguir al nuevo maestro
+# en lugar de darse por terminado. El anterior no lo borra al salir porque
+# solo elimina el archivo si aún contiene su PID.
+echo "$NEW_PID" > "$PIDFILE.tmp" && mv "$PIDFILE.tmp" "$PIDFILE"
+kill -TERM "$OLD_PID"
+for _ in $(seq $((DRAIN_TIMEOUT * 10))); do
+    kill -0 "$OLD_PID" 2>/dev/null || break
+    sleep 0.1
+done
+
+if kill -0 "$OLD_PID" 2>/dev/null; then
+    echo -e "${YELLOW}Advertencia: el maestro anterior sigue activo tras ${DRAIN_TIMEOUT}s${NC}"
+    exit 1
+fi
+
+echo -e "${GREEN}Recarga completada${NC}"
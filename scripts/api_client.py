@@ -3,21 +3,41 @@
 Cliente para la API de Trading Bots
 -----------------------------------
 Este script permite interactuar con la API de Trading Bots desde la línea de comandos.
+
+Los comandos usan el SDK asíncrono (trading_bots_sdk): una sola sesión con
+conexiones persistentes, tiempos de espera y reintentos con espera
+exponencial (respetando Retry-After en las respuestas 429/503). APIClient
+expone el mismo SDK de forma síncrona para otros scripts.
+
+Uso:
+    $ python3 scripts/api_client.py status-all --workers 8
 """
 
 import argparse
+import asyncio
 import json
 import os
 import sys
-import requests
+import time
 from pathlib import Path
 
+REPO_ROOT = Path(__file__).parent.parent
+sys.path.append(str(REPO_ROOT))
+
+from trading_bots_sdk import AsyncAPIClient, APIError, SDKError
+from trading_bots_sdk.bench import LoadGenerator, DEFAULT_MIX, parse_mix, compare_results
+
 # Configuración
 # Usar variables de entorno con valores por defecto
 API_HOST = os.getenv('API_HOST', 'localhost')
 API_PORT = os.getenv('API_PORT', '5000')
 API_BASE_URL = f"http://{API_HOST}:{API_PORT}/api"
-CONFIG_FILE = Path(__file__).parent.parent / "auth_config.json"
+CONFIG_FILE = REPO_ROOT / "auth_config.json"
+
+# Tiempos de espera (conexión, lectura) en segundos y reintentos
+CONNECT_TIMEOUT = float(os.getenv('API_CONNECT_TIMEOUT', '3.05'))
+READ_TIMEOUT = float(os.getenv('API_READ_TIMEOUT', '10'))
+MAX_RETRIES = int(os.getenv('API_RETRIES', '3'))
 
 def load_config():
     """Carga la configuración desde el archivo auth_config.json"""
@@ -26,7 +46,7 @@ def load_config():
         print("Crea el archivo con el siguiente formato:")
         print('{\n    "jwt_token": "TU_TOKEN_JWT_AQUI"\n}')
         sys.exit(1)
-    
+
     try:
         with open(CONFIG_FILE, 'r') as f:
             return json.load(f)
@@ -34,208 +54,469 @@ def load_config():
         print(f"Error al leer el archivo de configuración: {e}")
         sys.exit(1)
 
-def get_headers():
-    """Obtiene los headers con el token JWT"""
+def get_token():
+    """Obtiene el token JWT de auth_config.json"""
     config = load_config()
     token = config.get('jwt_token')
-    
+
     if not token or token == "TU_TOKEN_JWT_AQUI":
         print("Error: Token JWT no configurado correctamente")
         print(f"Edita el archivo {CONFIG_FILE} y establece tu token JWT")
         sys.exit(1)
-    
-    return {
-        'Authorization': f'Bearer {token}',
-        'Content-Type': 'application/json'
-    }
 
-def check_api_health():
+    return token
+
+class APIClient:
+    """
+    Versión síncrona de AsyncAPIClient para scripts no asíncronos.
+
+    Mantiene un bucle de eventos propio durante toda la vida del cliente, de
+    modo que la sesión y sus conexiones se reutilizan entre llamadas. Cada
+    método asíncrono del SDK (list_bots, get_bot, status_all...) está
+    disponible con el mismo nombre y argumentos, pero bloquea hasta obtener el
+    resultado. No debe usarse desde varios hilos a la vez.
+    """
+
+    def __init__(self, base_url=API_BASE_URL, token=None, connect_timeout=CONNECT_TIMEOUT,
+                 read_timeout=READ_TIMEOUT, retries=MAX_RETRIES, pool_size=10):
+        """
+        Inicializa el cliente.
+
+        Args:
+            base_url (str): URL base de la API (terminada en /api).
+            token (str, optional): Token JWT; por defecto el de auth_config.json,
+                leído en la primera solicitud autenticada.
+            connect_timeout (float): Segundos máximos para establecer la conexión.
+            read_timeout (float): Segundos máximos de espera de la respuesta.
+            retries (int): Reintentos ante errores de conexión, 5xx y 429.
+            pool_size (int): Conexiones persistentes como máximo.
+        """
+        self._loop = asyncio.new_event_loop()
+        self.client = AsyncAPIClient(
+            base_url, token=token, token_file=None if token else CONFIG_FILE,
+            connect_timeout=connect_timeout, read_timeout=read_timeout,
+            retries=retries, max_connections=pool_size
+        )
+
+    def run(self, coroutine):
+        """Ejecuta una corrutina en el bucle del cliente y devuelve su resultado."""
+        return self._loop.run_until_complete(coroutine)
+
+    def __getattr__(self, name):
+        method = getattr(self.client, name)
+        if not asyncio.iscoroutinefunction(method):
+            return method
+
+        def call(*args, **kwargs):
+            return self.run(method(*args, **kwargs))
+        call.__doc__ = method.__doc__
+        return call
+
+    def close(self):
+        """Cierra las conexiones y el bucle de eventos."""
+        if not self._loop.is_closed():
+            self.run(self.client.close())
+            self._loop.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+def _print_api_error(action, error):
+    """Muestra un error del SDK con el formato del cliente"""
+    if isinstance(error, APIError) and error.status:
+        print(f"❌ Error al {action}. Código: {error.status}")
+        print(f"   Mensaje: {error.error}")
+    else:
+        print(f"❌ Error: {error}")
+
+async def check_api_health(client):
     """Verifica el estado de la API"""
     try:
-        response = requests.get(f"{API_BASE_URL}/health")
-        data = response.json()
-        
-        if response.status_code == 200 and data.get('success'):
-            print("✅ API funcionando correctamente")
-            print(f"   Versión: {data.get('version')}")
-            print(f"   Uptime: {data.get('uptime')}")
-            print(f"   Entorno: {data.get('environment')}")
-            return True
-        else:
-            print("❌ API no está respondiendo correctamente")
-            print(f"   Código: {response.status_code}")
-            print(f"   Respuesta: {data}")
-            return False
-    except Exception as e:
+        health = await client.health()
+    except SDKError as e:
         print(f"❌ Error al conectar con la API: {e}")
         return False
 
-def get_bot_status(bot_id):
+    if health.status == "ok":
+        print("✅ API funcionando correctamente")
+        print(f"   Versión: {health.version}")
+        print(f"   Uptime: {health.uptime}")
+        print(f"   Entorno: {health.environment}")
+        return True
+    print("❌ API no está respondiendo correctamente")
+    print(f"   Respuesta: {health.to_dict()}")
+    return False
+
+async def get_bot_status(client, bot_id):
     """Obtiene el estado de un bot específico"""
     try:
-        headers = get_headers()
-        response = requests.get(f"{API_BASE_URL}/bots/{bot_id}", headers=headers)
-        
-        if response.status_code == 200:
-            data = response.json()
-            if data.get('success'):
-                bot_data = data.get('data', {})
-                print(f"📊 Estado del bot {bot_id}:")
-                print(f"   Estado: {bot_data.get('status', 'Desconocido')}")
-                print(f"   Última actualización: {bot_data.get('last_update', 'Desconocido')}")
-                
-                # Mostrar métricas si están disponibles
-                metrics = bot_data.get('metrics', {})
-                if metrics:
-                    print("\n📈 Métricas:")
-                    for key, value in metrics.items():
-                        print(f"   {key}: {value}")
-                
-                # Mostrar configuración
-                config = bot_data.get('config', {})
-                if config:
-                    print("\n⚙️ Configuración:")
-                    for key, value in config.items():
-                        print(f"   {key}: {value}")
-                
-                return True
-            else:
-                print(f"❌ Error: {data.get('error', 'Error desconocido')}")
-                return False
-        else:
-            print(f"❌ Error al obtener estado del bot. Código: {response.status_code}")
-            try:
-                data = response.json()
-                print(f"   Mensaje: {data.get('error', 'No disponible')}")
-            except:
-                print(f"   Respuesta: {response.text[:100]}...")
-            return False
-    except Exception as e:
-        print(f"❌ Error: {e}")
+        bot = await client.get_bot(bot_id)
+    except SDKError as e:
+        _print_api_error("obtener estado del bot", e)
         return False
 
-def start_bot(bot_id):
+    print(f"📊 Estado del bot {bot_id}:")
+    print(f"   Estado: {bot.status or 'Desconocido'}")
+    print(f"   Última actualización: {bot.last_update or 'Desconocido'}")
+
+    # Mostrar métricas si están disponibles
+    metrics = {name: getattr(bot, name) for name in
+               ("balance", "profit_today", "profit_total", "trades_today", "trades_total", "win_rate")
+               if getattr(bot, name) is not None}
+    if metrics:
+        print("\n📈 Métricas:")
+        for key, value in metrics.items():
+            print(f"   {key}: {value}")
+    return True
+
+async def start_bot(client, bot_id):
     """Inicia un bot específico"""
     try:
-        headers = get_headers()
-        response = requests.post(f"{API_BASE_URL}/bots/{bot_id}/start", headers=headers)
-        
-        if response.status_code == 200:
-            data = response.json()
-            if data.get('success'):
-                print(f"✅ Bot {bot_id} iniciado correctamente")
-                return True
-            else:
-                print(f"❌ Error: {data.get('error', 'Error desconocido')}")
-                return False
-        else:
-            print(f"❌ Error al iniciar el bot. Código: {response.status_code}")
-            try:
-                data = response.json()
-                print(f"   Mensaje: {data.get('error', 'No disponible')}")
-            except:
-                print(f"   Respuesta: {response.text[:100]}...")
-            return False
-    except Exception as e:
-        print(f"❌ Error: {e}")
+        result = await client.start_bot(bot_id)
+    except SDKError as e:
+        _print_api_error("iniciar el bot", e)
         return False
+    print(f"✅ Bot {bot_id} iniciado correctamente" if result.success else f"❌ Error: {result.message}")
+    return bool(result.success)
 
-def stop_bot(bot_id):
+async def stop_bot(client, bot_id):
     """Detiene un bot específico"""
     try:
-        headers = get_headers()
-        response = requests.post(f"{API_BASE_URL}/bots/{bot_id}/stop", headers=headers)
-        
-        if response.status_code == 200:
-            data = response.json()
-            if data.get('success'):
-                print(f"✅ Bot {bot_id} detenido correctamente")
-                return True
-            else:
-                print(f"❌ Error: {data.get('error', 'Error desconocido')}")
-                return False
-        else:
-            print(f"❌ Error al detener el bot. Código: {response.status_code}")
-            try:
-                data = response.json()
-                print(f"   Mensaje: {data.get('error', 'No disponible')}")
-            except:
-                print(f"   Respuesta: {response.text[:100]}...")
-            return False
-    except Exception as e:
-        print(f"❌ Error: {e}")
+        result = await client.stop_bot(bot_id)
+    except SDKError as e:
+        _print_api_error("detener el bot", e)
         return False
+    print(f"✅ Bot {bot_id} detenido correctamente" if result.success else f"❌ Error: {result.message}")
+    return bool(result.success)
 
-def list_bots():
+async def list_bots(client):
     """Lista todos los bots disponibles"""
     try:
-        headers = get_headers()
-        response = requests.get(f"{API_BASE_URL}/bots", headers=headers)
-        
-        if response.status_code == 200:
-            data = response.json()
-            if data.get('success'):
-                bots = data.get('data', [])
-                if not bots:
-                    print("ℹ️ No hay bots disponibles")
-                    return True
-                
-                print(f"📋 Bots disponibles ({len(bots)}):")
-                for bot in bots:
-                    status_emoji = "🟢" if bot.get('status') == "running" else "🔴"
-                    print(f"   {status_emoji} {bot.get('id')}: {bot.get('name')} - {bot.get('status')}")
-                return True
-            else:
-                print(f"❌ Error: {data.get('error', 'Error desconocido')}")
-                return False
+        bots = await client.list_bots()
+    except SDKError as e:
+        _print_api_error("listar bots", e)
+        return False
+
+    if not bots:
+        print("ℹ️ No hay bots disponibles")
+        return True
+
+    print(f"📋 Bots disponibles ({len(bots)}):")
+    for bot in bots:
+        status_emoji = "🟢" if bot.is_active else "🔴"
+        print(f"   {status_emoji} {bot.id}: {bot.name} - {bot.status}")
+    return True
+
+async def status_all(client, workers=None):
+    """Obtiene el estado de todos los bots en paralelo"""
+    try:
+        results = await client.status_all(concurrency=workers)
+    except SDKError as e:
+        _print_api_error("listar bots", e)
+        return False
+
+    if not results:
+        print("ℹ️ No hay bots disponibles")
+        return True
+
+    ok = True
+    print(f"📋 Estado de los bots ({len(results)}):")
+    for bot_id, result in results:
+        if isinstance(result, Exception):
+            print(f"   ❌ {bot_id}: {result}")
+            ok = False
         else:
-            print(f"❌ Error al listar bots. Código: {response.status_code}")
-            try:
-                data = response.json()
-                print(f"   Mensaje: {data.get('error', 'No disponible')}")
-            except:
-                print(f"   Respuesta: {response.text[:100]}...")
-            return False
-    except Exception as e:
-        print(f"❌ Error: {e}")
+            status_emoji = "🟢" if result.is_active else "🔴"
+            print(f"   {status_emoji} {bot_id}: {result.status or 'Desconocido'} "
+                  f"(actualizado: {result.last_update or 'Desconocido'})")
+    return ok
+
+def _print_log_line(line):
+    # Las líneas de stderr se marcan con '!'
+    marker = "!" if line.stream == "stderr" else " "
+    print(f"{line.ts} {marker} {line.line}", flush=True)
+
+async def show_logs(client, bot_id, tail=100, follow=False):
+    """Muestra la salida reciente de un bot y, con follow, las líneas nuevas"""
+    try:
+        if follow:
+            async for line in client.follow_logs(bot_id, tail=tail):
+                _print_log_line(line)
+            return True
+        lines = await client.get_logs(bot_id, tail=tail)
+    except SDKError as e:
+        _print_api_error("obtener los logs del bot", e)
         return False
 
+    if not lines:
+        print(f"ℹ️ No hay salida registrada para {bot_id}")
+    for line in lines:
+        _print_log_line(line)
+    return True
+
+class StatusTable:
+    """
+    Tabla de estado y PnL que solo vuelve a dibujar las filas que cambian.
+
+    En un terminal cada bot ocupa una línea fija y se reescribe en su sitio
+    con secuencias ANSI; si la salida no es un terminal se imprime una línea
+    por cada fila que cambia.
+    """
+
+    COLUMNS = (("BOT", 18), ("ESTADO", 9), ("BALANCE", 11), ("PNL HOY", 10), ("PNL TOTAL", 10),
+               ("WIN %", 6), ("POS", 4), ("PNL ABIERTO", 12), ("CAMBIO", 8))
+    HEADER_LINES = 2
+
+    def __init__(self, out=sys.stdout):
+        self.out = out
+        self.tty = out.isatty()
+        self.rows = {}
+        self.order = []
+
+    @staticmethod
+    def _number(value, digits=2):
+        return "-" if value is None else f"{value:.{digits}f}"
+
+    def _format(self, snapshot):
+        bot = snapshot.bot
+        if snapshot.error or bot is None:
+            values = [snapshot.bot_id, "error", snapshot.error or "-"]
+        else:
+            values = [snapshot.bot_id, bot.status or "-", self._number(bot.balance),
+                      self._number(bot.profit_today), self._number(bot.profit_total),
+                      self._number(bot.win_rate, 1),
+                      "-" if snapshot.positions is None else str(len(snapshot.positions)),
+                      self._number(snapshot.open_pnl)]
+        values += [""] * (len(self.COLUMNS) - 1 - len(values)) + [time.strftime("%H:%M:%S")]
+        return " ".join(str(value)[:width].ljust(width) for value, (_, width) in zip(values, self.COLUMNS))
+
+    def start(self):
+        """Dibuja la cabecera (y limpia la pantalla en un terminal)."""
+        header = " ".join(name.ljust(width) for name, width in self.COLUMNS)
+        if self.tty:
+            self.out.write("\x1b[2J\x1b[H\x1b[?25l")
+        self.out.write(f"{header}\n{'-' * len(header)}\n")
+        self.out.flush()
+
+    def update(self, changes):
+        """
+        Aplica los cambios de watch_bots y redibuja solo las filas afectadas.
+
+        Args:
+            changes (dict): bot_id -> BotSnapshot.
+        """
+        for bot_id, snapshot in changes.items():
+            line = self._format(snapshot)
+            # La columna CAMBIO no cuenta: solo se redibuja si cambian los datos
+            if self.rows.get(bot_id, "")[:-8] == line[:-8]:
+                continue
+            self.rows[bot_id] = line
+            if bot_id not in self.order:
+                self.order.append(bot_id)
+            if self.tty:
+                row = self.HEADER_LINES + self.order.index(bot_id) + 1
+                self.out.write(f"\x1b[{row};1H\x1b[2K{line}")
+            else:
+                self.out.write(line + "\n")
+        if self.tty:
+            # Dejar el cursor bajo la tabla
+            self.out.write(f"\x1b[{self.HEADER_LINES + len(self.order) + 1};1H")
+        self.out.flush()
+
+    def finish(self):
+        """Restaura el cursor del terminal."""
+        if self.tty:
+            self.out.write("\x1b[?25h\n")
+            self.out.flush()
+
+async def watch(client, bot_ids=None, interval=2.0, max_interval=30.0):
+    """Muestra una tabla de estado y PnL que se actualiza con los cambios"""
+    table = StatusTable()
+    table.start()
+    try:
+        async for changes in client.watch_bots(bot_ids or None, interval=interval, max_interval=max_interval):
+            table.update(changes)
+    except SDKError as e:
+        _print_api_error("vigilar los bots", e)
+        return False
+    finally:
+        table.finish()
+
+def print_bench_report(result):
+    """Muestra el resumen de una prueba de carga"""
+    meta, summary = result["meta"], result["summary"]
+    mode = f"{meta['rate']} sol/s" if meta["mode"] == "rate" else f"concurrencia {meta['concurrency']}"
+    print(f"📊 {meta['base_url']} · {mode} · {meta['elapsed']} s")
+    print(f"   Solicitudes: {summary['requests']}  Rendimiento: {summary['throughput']} sol/s  "
+          f"Errores: {summary['errors']} ({summary['error_rate'] * 100:.2f}%)")
+    print(f"\n   {'OPERACIÓN':<12} {'SOL':>7} {'SOL/S':>8} {'ERR':>5} {'P50':>9} {'P90':>9} {'P99':>9} {'MAX':>9}")
+    for name, stats in list(result["endpoints"].items()) + [("total", summary)]:
+        print(f"   {name:<12} {stats['requests']:>7} {stats['throughput']:>8.1f} {stats['errors']:>5} "
+              f"{stats['p50_ms']:>7.1f}ms {stats['p90_ms']:>7.1f}ms {stats['p99_ms']:>7.1f}ms "
+              f"{stats['max_ms']:>7.1f}ms")
+    if result["errors"]:
+        print("\n   Errores:")
+        for key, count in result["errors"].items():
+            print(f"   {count:>7}  {key}")
+    print("\n   Histograma de latencias:")
+    peak = max(bucket["count"] for bucket in result["histogram"]) or 1
+    for bucket in result["histogram"]:
+        label = f"<= {bucket['le_ms']} ms" if bucket["le_ms"] is not None else "> 5000 ms"
+        print(f"   {label:>11} {bucket['count']:>7} {'█' * int(40 * bucket['count'] / peak)}")
+
+async def bench(client, args):
+    """Lanza una prueba de carga y guarda el resultado"""
+    try:
+        mix = parse_mix(args.mix) if args.mix else DEFAULT_MIX
+    except ValueError as e:
+        print(f"❌ {e}")
+        return False
+    try:
+        bot_ids = args.bots or [bot.id for bot in await client.list_bots(fields=["id"])]
+    except SDKError as e:
+        _print_api_error("listar bots", e)
+        return False
+
+    # Sin reintentos: se mide al servidor, no a la política del cliente
+    connections = args.connections or args.concurrency or 100
+    async with AsyncAPIClient(client.base_url, token=client.token, retries=0,
+                              max_connections=connections) as bench_client:
+        generator = LoadGenerator(bench_client, bot_ids, mix, duration=args.duration,
+                                  concurrency=args.concurrency, rate=args.rate)
+        result = await generator.run()
+
+    print_bench_report(result)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+        print(f"\n💾 Resultados guardados en {args.output}")
+    return True
+
+def bench_compare(before_path, after_path, threshold):
+    """Compara dos resultados guardados por 'bench --output'"""
+    try:
+        with open(before_path, 'r') as f:
+            before = json.load(f)
+        with open(after_path, 'r') as f:
+            after = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"❌ Error al leer los resultados: {e}")
+        return False
+
+    print(f"📊 {before_path} → {after_path}")
+    print(f"\n   {'ÁMBITO':<12} {'MÉTRICA':<12} {'ANTES':>10} {'DESPUÉS':>10} {'CAMBIO':>9}")
+    regressions = 0
+    for scope, metric, old, new, change, worse in compare_results(before, after):
+        flag = ""
+        if worse and abs(change) >= threshold:
+            flag = " ⚠️"
+            regressions += 1
+        print(f"   {scope:<12} {metric:<12} {old:>10.3f} {new:>10.3f} {change:>+8.1f}%{flag}")
+    if regressions:
+        print(f"\n⚠️ {regressions} métricas empeoran más de un {threshold}%")
+    return regressions == 0
+
+async def run_command(args):
+    """Ejecuta un comando con un cliente compartido por todas sus solicitudes"""
+    # 'health' no necesita token
+    token = None if args.command == "health" else get_token()
+    async with AsyncAPIClient(API_BASE_URL, token=token, connect_timeout=CONNECT_TIMEOUT,
+                              read_timeout=READ_TIMEOUT, retries=MAX_RETRIES) as client:
+        if args.command == "health":
+            return await check_api_health(client)
+        if args.command == "list":
+            return await list_bots(client)
+        if args.command == "status":
+            return await get_bot_status(client, args.bot_id)
+        if args.command == "start":
+            return await start_bot(client, args.bot_id)
+        if args.command == "stop":
+            return await stop_bot(client, args.bot_id)
+        if args.command == "status-all":
+            return await status_all(client, args.workers)
+        if args.command == "logs":
+            return await show_logs(client, args.bot_id, args.tail, args.follow)
+        if args.command == "bench":
+            return await bench(client, args)
+        if args.command == "watch":
+            return await watch(client, args.bot_ids, args.interval, args.max_interval)
+
 def main():
     parser = argparse.ArgumentParser(description="Cliente para la API de Trading Bots")
     subparsers = parser.add_subparsers(dest="command", help="Comando a ejecutar")
-    
+
     # Comando health
     health_parser = subparsers.add_parser("health", help="Verificar el estado de la API")
-    
+
     # Comando list
     list_parser = subparsers.add_parser("list", help="Listar todos los bots disponibles")
-    
+
     # Comando status
     status_parser = subparsers.add_parser("status", help="Obtener el estado de un bot")
     status_parser.add_argument("bot_id", help="ID del bot (ej: sol_bot_15m)")
-    
+
     # Comando start
     start_parser = subparsers.add_parser("start", help="Iniciar un bot")
     start_parser.add_argument("bot_id", help="ID del bot (ej: sol_bot_15m)")
-    
+
     # Comando stop
     stop_parser = subparsers.add_parser("stop", help="Detener un bot")
     stop_parser.add_argument("bot_id", help="ID del bot (ej: sol_bot_15m)")
-    
+
+    # Comando status-all
+    status_all_parser = subparsers.add_parser("status-all", help="Obtener el estado de todos los bots en paralelo")
+    status_all_parser.add_argument("--workers", type=int, default=None,
+                                   help="Solicitudes simultáneas (por defecto 10)")
+
+    # Comando logs
+    logs_parser = subparsers.add_parser("logs", help="Mostrar la salida reciente de un bot")
+    logs_parser.add_argument("bot_id", help="ID del bot (ej: sol_bot_15m)")
+    logs_parser.add_argument("-n", "--tail", type=int, default=100, help="Últimas N líneas (por defecto 100)")
+    logs_parser.add_argument("-f", "--follow", action="store_true", help="Seguir mostrando las líneas nuevas")
+
+    # Comando watch
+    watch_parser = subparsers.add_parser("watch", help="Vigilar el estado y el PnL de los bots")
+    watch_parser.add_argument("bot_ids", nargs="*", help="IDs de los bots (por defecto todos)")
+    watch_parser.add_argument("--interval", type=float, default=2.0,
+                              help="Segundos entre consultas con actividad (por defecto 2)")
+    watch_parser.add_argument("--max-interval", type=float, default=30.0,
+                              help="Segundos máximos entre consultas sin cambios (por defecto 30)")
+
+    # Comando bench (y bench compare)
+    bench_parser = subparsers.add_parser("bench", help="Prueba de carga con una mezcla de endpoints")
+    bench_parser.add_argument("--mix", default=None,
+                              help="Operaciones y pesos, ej. 'list=3,detail=3,signals=2,positions=2,webhooks=1'")
+    bench_parser.add_argument("--duration", type=float, default=10.0, help="Segundos de carga (por defecto 10)")
+    bench_parser.add_argument("--concurrency", type=int, default=None,
+                              help="Clientes simultáneos en bucle cerrado (por defecto 8)")
+    bench_parser.add_argument("--rate", type=float, default=None,
+                              help="Solicitudes por segundo (tasa fija; ignora --concurrency)")
+    bench_parser.add_argument("--connections", type=int, default=None,
+                              help="Conexiones máximas (por defecto la concurrencia, o 100 con --rate)")
+    bench_parser.add_argument("--bots", nargs="*", default=None, help="Bots a usar (por defecto todos)")
+    bench_parser.add_argument("--output", default=None, help="Archivo JSON donde guardar los resultados")
+    bench_subparsers = bench_parser.add_subparsers(dest="bench_command")
+    compare_parser = bench_subparsers.add_parser("compare", help="Comparar dos resultados guardados")
+    compare_parser.add_argument("before", help="Resultado de referencia (JSON)")
+    compare_parser.add_argument("after", help="Resultado nuevo (JSON)")
+    compare_parser.add_argument("--threshold", type=float, default=10.0,
+                                help="Variación en %% a partir de la que se marca un empeoramiento (por defecto 10)")
+
     args = parser.parse_args()
-    
-    if args.command == "health":
-        check_api_health()
-    elif args.command == "list":
-        list_bots()
-    elif args.command == "status":
-        get_bot_status(args.bot_id)
-    elif args.command == "start":
-        start_bot(args.bot_id)
-    elif args.command == "stop":
-        stop_bot(args.bot_id)
-    else:
+
+    if args.command is None:
         parser.print_help()
+        return
+    if args.command == "bench" and args.bench_command == "compare":
+        sys.exit(0 if bench_compare(args.before, args.after, args.threshold) else 1)
+    try:
+        ok = asyncio.run(run_command(args))
+    except KeyboardInterrupt:
+        ok = True
+    sys.exit(0 if ok else 1)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark del pipeline de logging
+---------------------------------
+Compara la latencia de las solicitudes cuando los registros se escriben de
+forma síncrona (FileHandler en el hilo de la solicitud) frente al pipeline
+basado en cola (QueueHandler + QueueListener).
+
+Uso:
+    $ python3 scripts/bench_logging.py --requests 5000 --io-delay-ms 0.5
+"""
+
+import argparse
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).parent.parent
+sys.path.append(str(REPO_ROOT))
+
+from api.app import app
+from api.utils import logging_config
+
+def configure_sync(log_file):
+    """Reproduce la configuración anterior: FileHandler síncrono en el logger raíz"""
+    logging_config.stop_logging()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    handler = logging.FileHandler(log_file)
+    handler.setFormatter(logging.Formatter(logging_config.LOG_FORMAT))
+    root.addHandler(handler)
+    root.setLevel(logging.INFO)
+
+def configure_queue(log_file):
+    """Configura el pipeline basado en cola"""
+    logging_config.setup_logging(
+        {"logging": {"file": log_file, "console": False}}, force=True
+    )
+
+def add_io_delay(delay_ms):
+    """Simula un disco lento añadiendo una espera a cada flush de archivo"""
+    if delay_ms <= 0:
+        return
+    original_flush = logging.FileHandler.flush
+
+    def slow_flush(self):
+        original_flush(self)
+        time.sleep(delay_ms / 1000)
+
+    logging.FileHandler.flush = slow_flush
+
+def measure(requests):
+    """Devuelve las latencias (ms) de 'requests' solicitudes a /api/health"""
+    client = app.test_client()
+    for _ in range(200):
+        client.get('/api/health')
+    latencies = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        client.get('/api/health')
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+def report(name, latencies):
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(f"{name:<10} media={statistics.mean(latencies):.3f} ms  "
+          f"p50={statistics.median(latencies):.3f} ms  p99={p99:.3f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del pipeline de logging")
+    parser.add_argument("--requests", type=int, default=5000, help="Número de solicitudes")
+    parser.add_argument("--io-delay-ms", type=float, default=0.0,
+                        help="Latencia de disco simulada por escritura (ej. 0.5 para discos de red)")
+    args = parser.parse_args()
+    add_io_delay(args.io_delay_ms)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        configure_sync(os.path.join(tmp, 'sync.log'))
+        sync = measure(args.requests)
+        configure_queue(os.path.join(tmp, 'queue.log'))
+        queued = measure(args.requests)
+        logging_config.stop_logging()
+
+    print(f"Solicitudes: {args.requests} (2 registros por solicitud, "
+          f"latencia de disco simulada {args.io_delay_ms} ms)")
+    report("síncrono", sync)
+    report("cola", queued)
+
+if __name__ == "__main__":
+    main()
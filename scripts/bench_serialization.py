@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark de serialización JSON y compresión de respuestas
+----------------------------------------------------------
+Mide, para cargas típicas de la API (lista de bots, señales, historial de
+operaciones), el tiempo de CPU de json frente a orjson, el de jsonify con el
+codificador que instala la API en la versión de Flask instalada, y los bytes
+enviados con cada codificación (identity, gzip, br, zstd) y su coste de
+compresión.
+
+Uso:
+    $ python3 scripts/bench_serialization.py --iterations 200
+"""
+
+import argparse
+import json
+import sys
+import time
+from importlib import metadata
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).parent.parent
+sys.path.append(str(REPO_ROOT))
+
+from flask import Flask, jsonify
+from api.utils.compression import available_encodings, compress, compression_config
+from api.utils.serialization import configure_serialization, encoder_name
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def make_payloads():
+    """Cargas representativas de los endpoints de la API"""
+    bots = [{
+        "id": f"bot_{i}", "name": f"Bot {i}", "symbol": "SOLUSDT", "interval": "15m",
+        "status": "active", "last_update": "2026-10-19T08:00:00.000000"
+    } for i in range(5)]
+    signal = {
+        "timestamp": "2026-10-19T08:00:00", "type": "BUY", "price": 151.23, "strength": 0.72,
+        "indicators": {"rsi": 41.2, "macd": -0.13, "ema_fast": 150.9, "ema_slow": 149.8},
+        "ml_prediction": 0.64, "executed": True
+    }
+    trade = {
+        "entry_time": "2026-10-19T08:00:00", "exit_time": "2026-10-19T09:15:00", "type": "LONG",
+        "entry_price": 150.12, "exit_price": 152.4, "position_size": 3.2, "profit_pct": 1.52,
+        "profit_usdt": 7.3, "signal_strength": 0.7, "indicators": {"rsi": 38.5, "adx": 22.1}
+    }
+    return {
+        "bots (5)": {"success": True, "data": bots},
+        "signals (10)": {"success": True, "data": [dict(signal, price=signal["price"] + i) for i in range(10)]},
+        "trades (1000)": {"success": True, "data": [dict(trade, entry_price=trade["entry_price"] + i * 0.01)
+                                                    for i in range(1000)]},
+    }
+
+def measure(func, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        result = func()
+    return (time.perf_counter() - start) / iterations * 1e6, result
+
+def flask_apps():
+    """Aplicaciones con el codificador estándar y con el que elige la API ('auto')"""
+    apps = {}
+    for encoder in ("stdlib", "auto"):
+        app = Flask(f"bench_{encoder}")
+        configure_serialization(app, {"serialization": {"json_encoder": encoder}})
+        with app.app_context():
+            apps.setdefault(encoder_name(), app)
+    return apps
+
+def measure_jsonify(app, payload, iterations):
+    with app.test_request_context():
+        return measure(lambda: jsonify(payload).get_data(), iterations)[0]
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de serialización y compresión")
+    parser.add_argument("--iterations", type=int, default=200, help="Repeticiones por medición")
+    args = parser.parse_args()
+
+    # Mismos niveles que la API
+    with open(REPO_ROOT / 'config' / 'api_config.json', 'r') as f:
+        compression_config.configure(json.load(f))
+
+    encodings = available_encodings()
+    apps = flask_apps()
+    print(f"orjson: {'sí' if orjson else 'no instalado'}; codificaciones: {', '.join(encodings)}")
+    print(f"Flask {metadata.version('flask')}: codificadores de jsonify: {', '.join(apps)}")
+    print(f"Niveles: {compression_config.levels}\n")
+
+    for name, payload in make_payloads().items():
+        stdlib_us, body = measure(lambda: json.dumps(payload, separators=(',', ':'), sort_keys=True).encode('utf-8'),
+                                  args.iterations)
+        line = f"{name:<14} json {stdlib_us:9.1f} us"
+        if orjson is not None:
+            orjson_us, _ = measure(lambda: orjson.dumps(payload, option=orjson.OPT_SORT_KEYS), args.iterations)
+            line += f" | orjson {orjson_us:9.1f} us ({stdlib_us / orjson_us:4.1f}x)"
+        print(line)
+        jsonify_us = {name: measure_jsonify(app, payload, args.iterations) for name, app in apps.items()}
+        line = f"{'':<14} jsonify " + " | ".join(f"{name} {us:9.1f} us" for name, us in jsonify_us.items())
+        if len(jsonify_us) > 1:
+            line += f" ({jsonify_us['json'] / jsonify_us['orjson']:4.1f}x)"
+        print(line)
+        print(f"{'':<14} identity {len(body):9d} B")
+        for encoding in encodings:
+            compress_us, compressed = measure(lambda: compress(body, encoding), args.iterations)
+            print(f"{'':<14} {encoding:<8} {len(compressed):9d} B ({len(compressed) * 100.0 / len(body):5.1f}%)"
+                  f"  {compress_us:9.1f} us")
+        print()
+
+if __name__ == "__main__":
+    main()
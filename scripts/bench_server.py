@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Benchmark del servidor de desarrollo frente a gunicorn
+------------------------------------------------------
+Arranca la API con el servidor de desarrollo de Flask y con gunicorn
+(gunicorn.conf.py) en puertos locales, lanza carga concurrente contra los
+endpoints reales y compara rendimiento y latencias.
+
+Uso:
+    $ python3 scripts/bench_server.py --duration 10 --concurrency 16
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import jwt
+import requests
+
+REPO_ROOT = Path(__file__).parent.parent
+
+def make_token():
+    """Genera un token de administrador firmado con el mismo secreto que la API"""
+    secret = os.getenv('JWT_SECRET', 'default_secret_key')
+    payload = {
+        'user_id': 'bench',
+        'role': 'admin',
+        'exp': datetime.now(tz=timezone.utc) + timedelta(hours=1)
+    }
+    return jwt.encode(payload, secret, algorithm='HS256')
+
+def endpoints():
+    """Endpoints reales a probar (usando el primer bot configurado)"""
+    with open(REPO_ROOT / 'config' / 'bots_config.json', 'r') as f:
+        bot_id = next(iter(json.load(f)))
+    return [
+        '/api/health',
+        '/api/bots',
+        f'/api/bots/{bot_id}',
+        f'/api/bots/{bot_id}/signals',
+        f'/api/bots/{bot_id}/positions'
+    ]
+
+def start_server(kind, port):
+    """Arranca el servidor indicado y espera a que responda"""
+    env = dict(os.environ, API_PORT=str(port), API_HOST='127.0.0.1')
+    # Sin límite de solicitudes para que el benchmark mida el servidor
+    env.setdefault('RATE_LIMIT_ENABLED', 'false')
+    if kind == 'dev':
+        cmd = [sys.executable, '-m', 'api.app']
+    else:
+        cmd = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'api.wsgi:app']
+    process = subprocess.Popen(cmd, cwd=REPO_ROOT, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f'http://127.0.0.1:{port}/api/health'
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            if requests.get(url, timeout=1).status_code == 200:
+                return process
+        except requests.RequestException:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"El servidor {kind} no arrancó en el puerto {port}")
+
+def run_load(base_url, paths, token, duration, concurrency):
+    """Lanza 'concurrency' clientes en bucle durante 'duration' segundos"""
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    stop_at = time.time() + duration
+
+    def client(index):
+        session = requests.Session()
+        session.headers['Authorization'] = f'Bearer {token}'
+        local_latencies, local_errors = [], 0
+        i = index
+        while time.time() < stop_at:
+            path = paths[i % len(paths)]
+            i += 1
+            start = time.perf_counter()
+            try:
+                response = session.get(base_url + path, timeout=10)
+                if response.status_code >= 400:
+                    local_errors += 1
+            except requests.RequestException:
+                local_errors += 1
+            local_latencies.append((time.perf_counter() - start) * 1000)
+        session.close()
+        with lock:
+            latencies.extend(local_latencies)
+            errors.append(local_errors)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, sum(errors)
+
+def summarize(name, latencies, errors, duration):
+    latencies.sort()
+
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))]
+
+    print(f"{name:<10} {len(latencies) / duration:8.1f} req/s  "
+          f"p50={pct(0.50):7.2f} ms  p90={pct(0.90):7.2f} ms  p99={pct(0.99):7.2f} ms  "
+          f"media={statistics.mean(latencies):7.2f} ms  errores={errors}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark servidor de desarrollo vs gunicorn")
+    parser.add_argument("--duration", type=float, default=10, help="Segundos de carga por servidor")
+    parser.add_argument("--concurrency", type=int, default=16, help="Clientes concurrentes")
+    parser.add_argument("--port", type=int, default=5090, help="Puerto base")
+    args = parser.parse_args()
+
+    token = make_token()
+    paths = endpoints()
+    print(f"Endpoints: {', '.join(paths)}")
+    print(f"Duración: {args.duration}s por servidor, concurrencia: {args.concurrency}")
+
+    for offset, kind in enumerate(('dev', 'gunicorn')):
+        port = args.port + offset
+        process = start_server(kind, port)
+        try:
+            latencies, errors = run_load(f'http://127.0.0.1:{port}', paths, token,
+                                         args.duration, args.concurrency)
+            summarize(kind, latencies, errors, args.duration)
+        finally:
+            process.terminate()
+            try:
+                # gunicorn espera hasta graceful_timeout a los workers
+                process.wait(timeout=60)
+            except subprocess.TimeoutExpired:
+                process.kill()
+
+if __name__ == "__main__":
+    main()
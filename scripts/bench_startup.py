@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Benchmark del arranque en frío frente al arranque en caliente
+-------------------------------------------------------------
+Genera una flota de bots sintética (archivos de estado con historial de
+operaciones y logs de simulación grandes), arranca gunicorn contra ella con y
+sin instantánea de arranque en caliente y mide:
+
+- el tiempo hasta la primera respuesta (el worker solo acepta conexiones tras
+  cargar la instantánea y precalentar sus cachés),
+- la latencia de la primera solicitud a cada endpoint,
+- lo que informa el propio worker (modo de arranque, carga de la instantánea
+  y métrica worker_startup_seconds).
+
+Uso:
+    $ python3 scripts/bench_startup.py --bots 20 --log-mb 5 --runs 3
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import jwt
+import requests
+
+REPO_ROOT = Path(__file__).parent.parent
+
+def make_token():
+    """Genera un token de administrador firmado con el mismo secreto que la API"""
+    secret = os.getenv('JWT_SECRET', 'default_secret_key')
+    payload = {
+        'user_id': 'bench',
+        'role': 'admin',
+        'exp': datetime.now(tz=timezone.utc) + timedelta(hours=1)
+    }
+    return jwt.encode(payload, secret, algorithm='HS256')
+
+def make_fleet(root, bots, trades, log_mb):
+    """
+    Crea la flota sintética: la mitad de los bots tiene historial de
+    operaciones en su estado y la otra mitad solo señales en el log.
+    """
+    config = {}
+    trade = {"entry_time": "2026-10-19T08:00:00", "type": "LONG", "entry_price": 150.12,
+             "signal_strength": 0.7, "indicators": {"rsi": 38.5, "adx": 22.1}, "ml_prediction": 0.6}
+    line = "[2026-10-19 08:00:00] INFO precio=150.12 rsi=41.2 macd=-0.13 ema_fast=150.9 ema_slow=149.8\n"
+    signal = "[2026-10-19 08:15:00] SIGNAL BUY fuerza=0.72 executed\n"
+    for i in range(bots):
+        bot_id = f"bench_bot_{i}"
+        path = root / bot_id
+        (path / "logs").mkdir(parents=True)
+        with_trades = i % 2 == 0
+        state = {"position": 1, "symbol": "SOLUSDT", "entry_price": 150.12, "position_size": 3.2,
+                 "entry_time": "2026-10-19T08:00:00",
+                 "trades": [dict(trade, entry_price=150 + n * 0.01) for n in range(trades)] if with_trades else []}
+        with open(path / "state.json", 'w') as f:
+            json.dump(state, f)
+        with open(path / "logs" / f"{bot_id}_cloud_simulation_20261019.log", 'w') as f:
+            block = (line * 99 + signal)
+            for _ in range(max(1, int(log_mb * 1024 * 1024 / len(block)))):
+                f.write(block)
+        config[bot_id] = {"name": bot_id, "symbol": "SOLUSDT", "interval": "15m", "path": str(path),
+                          "state_file": "state.json", "process_name": f"{bot_id}.py"}
+    with open(root / "bots_config.json", 'w') as f:
+        json.dump(config, f)
+    return list(config)
+
+def start_server(env, port):
+    """Arranca gunicorn y devuelve (proceso, segundos hasta la primera respuesta)"""
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'api.wsgi:app'],
+                               cwd=REPO_ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f'http://127.0.0.1:{port}/api/health/live'
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            if requests.get(url, timeout=1).status_code == 200:
+                return process, time.perf_counter() - start
+        except requests.RequestException:
+            time.sleep(0.02)
+    process.terminate()
+    raise RuntimeError(f"gunicorn no arrancó en el puerto {port}")
+
+def stop_server(process):
+    process.terminate()
+    try:
+        # Al salir el worker guarda la instantánea final
+        process.wait(timeout=60)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+def startup_seconds(metrics_text):
+    """Suma de worker_startup_seconds en la exposición de métricas"""
+    for line in metrics_text.splitlines():
+        if line.startswith("worker_startup_seconds_sum"):
+            return float(line.rsplit(" ", 1)[1])
+    return None
+
+def run_once(env, port, paths, token):
+    process, first_response = start_server(env, port)
+    try:
+        session = requests.Session()
+        session.headers['Authorization'] = f'Bearer {token}'
+        base = f'http://127.0.0.1:{port}'
+        latencies = {}
+        for name, path in paths.items():
+            start = time.perf_counter()
+            session.get(base + path, timeout=30).raise_for_status()
+            latencies[name] = (time.perf_counter() - start) * 1000
+        warm = session.get(base + '/api/health/live', timeout=5).json().get("warm_start", {})
+        startup = startup_seconds(session.get(base + '/api/metrics', timeout=5).text)
+        session.close()
+    finally:
+        stop_server(process)
+    return {"first_response": first_response * 1000, "startup": startup * 1000 if startup else None,
+            "mode": warm.get("mode"), "load_ms": warm.get("load_ms"), **latencies}
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del arranque en frío y en caliente")
+    parser.add_argument("--bots", type=int, default=20, help="Bots de la flota sintética")
+    parser.add_argument("--trades", type=int, default=200, help="Operaciones por archivo de estado")
+    parser.add_argument("--log-mb", type=float, default=5, help="Tamaño del log de cada bot (MB)")
+    parser.add_argument("--runs", type=int, default=3, help="Arranques de cada tipo")
+    parser.add_argument("--port", type=int, default=5095, help="Puerto local")
+    args = parser.parse_args()
+
+    root = Path(tempfile.mkdtemp(prefix="bench-startup-"))
+    try:
+        bot_ids = make_fleet(root, args.bots, args.trades, args.log_mb)
+        snapshot = root / "warm_start.json"
+        env = dict(os.environ, BOTS_CONFIG_PATH=str(root / "bots_config.json"), WARM_START_PATH=str(snapshot),
+                   EVENTS_DB=str(root / "events.db"), METRICS_DIR=str(root / "metrics"),
+                   GUNICORN_BIND=f'127.0.0.1:{args.port}', GUNICORN_WORKERS='1',
+                   BOT_SUPERVISOR_MODE='embedded')
+        # Sin límite de solicitudes para que el benchmark mida el servidor
+        env.setdefault('RATE_LIMIT_ENABLED', 'false')
+        paths = {"bots": "/api/bots", "detail": f"/api/bots/{bot_ids[1]}",
+                 "signals": f"/api/bots/{bot_ids[1]}/signals", "positions": f"/api/bots/{bot_ids[0]}/positions"}
+        print(f"Flota: {args.bots} bots, {args.trades} operaciones por estado, logs de {args.log_mb} MB")
+
+        results = {"frío": [], "caliente": []}
+        for _ in range(args.runs):
+            if snapshot.exists():
+                snapshot.unlink()
+            results["frío"].append(run_once(env, args.port, paths, make_token()))
+            # El arranque en frío anterior ha dejado la instantánea al salir
+            results["caliente"].append(run_once(env, args.port, paths, make_token()))
+
+        columns = ["first_response", "startup", "load_ms"] + list(paths)
+        print(f"{'arranque':<10}" + "".join(f"{name:>16}" for name in columns) + "   (mediana en ms)")
+        for kind, runs in results.items():
+            cells = []
+            for name in columns:
+                values = [run[name] for run in runs if run.get(name) is not None]
+                cells.append(f"{statistics.median(values):16.1f}" if values else f"{'-':>16}")
+            modes = ",".join(sorted({str(run['mode']) for run in runs}))
+            print(f"{kind:<10}" + "".join(cells) + f"   modo del worker: {modes}")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
@@ -93,26 +93,79 @@ echo -e "\n${GREEN}4. Configurando la API como servicio...${NC}"
 ACTUAL_USER=$(logname || echo $SUDO_USER)
 API_DIR="/home/$ACTUAL_USER/trading-bots-api"
 
-# Crear el archivo de servicio
+# gunicorn y python instalados en el entorno de la API
+GUNICORN_BIN=$(command -v gunicorn || echo /usr/local/bin/gunicorn)
+PYTHON_BIN="$(dirname "$GUNICORN_BIN")/python3"
+[ -x "$PYTHON_BIN" ] || PYTHON_BIN=$(command -v python3)
+
+# Supervisor de los bots en su propia unidad: los bots no pertenecen al grupo
+# de control de la API y sobreviven a sus recargas y reinicios
+cat > /etc/systemd/system/trading-bots-supervisor.service <<EOF
+[Unit]
+Description=Trading Bots - supervisor de procesos
+After=network.target
+
+[Service]
+User=$ACTUAL_USER
+WorkingDirectory=$API_DIR
+ExecStart=$PYTHON_BIN -m api.services.supervisor
+# TERM solo al supervisor: detiene sus bots de forma ordenada; KILL al resto si no termina
+KillMode=mixed
+TimeoutStopSec=60
+Restart=on-failure
+
+[Install]
+WantedBy=multi-user.target
+EOF
+
+# Servicio de la API. La recarga (reload_api.sh) sustituye al maestro de
+# gunicorn por uno nuevo (USR2) y termina el anterior: con Type=forking y
+# PIDFile systemd sigue al maestro nuevo en lugar de dar el servicio por caído
 cat > /etc/systemd/system/trading-bots-api.service <<EOF
 [Unit]
 Description=Trading Bots API
-After=network.target
+After=network.target trading-bots-supervisor.service
+Wants=trading-bots-supervisor.service
 
 [Service]
+Type=forking
 User=$ACTUAL_USER
 WorkingDirectory=$API_DIR
-ExecStart=/usr/bin/python3 $API_DIR/api/app.py
-Restart=always
+RuntimeDirectory=trading-bots-api
+PIDFile=/run/trading-bots-api/gunicorn.pid
+Environment="GUNICORN_PIDFILE=/run/trading-bots-api/gunicorn.pid"
+Environment="GUNICORN_READY_DIR=/run/trading-bots-api/ready"
 Environment="BEHIND_PROXY=true"
+Environment="BOT_SUPERVISOR_MODE=process"
+ExecStart=$GUNICORN_BIN -c $API_DIR/gunicorn.conf.py --daemon --error-logfile $API_DIR/gunicorn.log api.wsgi:app
+ExecReload=$API_DIR/reload_api.sh
+TimeoutStartSec=90
+TimeoutReloadSec=150
+KillMode=mixed
+Restart=on-failure
 
 [Install]
 WantedBy=multi-user.target
 EOF
 
-# Recargar systemd, habilitar y iniciar el servicio
+# Rotación de api.log y access.log: los escriben todos los workers de gunicorn
+# (WatchedFileHandler), que vuelven a abrir el archivo cuando logrotate lo mueve
+cat > /etc/logrotate.d/trading-bots-api <<EOF
+$API_DIR/api.log $API_DIR/access.log {
+    size 10M
+    rotate 10
+    compress
+    delaycompress
+    missingok
+    notifempty
+    create 0640 $ACTUAL_USER $ACTUAL_USER
+}
+EOF
+
+# Recargar systemd, habilitar e iniciar los servicios
 systemctl daemon-reload
-systemctl enable trading-bots-api
+systemctl enable trading-bots-supervisor trading-bots-api
+systemctl start trading-bots-supervisor
 systemctl start trading-bots-api
 
 # 5. Verificar que todo está funcionando
@@ -121,6 +174,8 @@ echo -e "Estado de Nginx:"
 systemctl status nginx --no-pager
 echo -e "\nEstado de la API:"
 systemctl status trading-bots-api --no-pager
+echo -e "\nEstado del supervisor de bots:"
+systemctl status trading-bots-supervisor --no-pager
 
 # Obtener la IP pública para las instrucciones
 PUBLIC_IP=$(curl -s ifconfig.me)
@@ -151,9 +206,9 @@ echo -e "\n${GREEN}Pasos siguientes:${NC}"
 echo -e "1. ${YELLOW}Configura tu dominio:${NC} En el panel de Hostinger, crea un registro A para $DOMAIN que apunte a $PUBLIC_IP"
 echo -e "2. ${YELLOW}Verifica la conexión:${NC} Espera unos minutos y prueba acceder a http://$DOMAIN/api/health"
 echo -e "3. ${YELLOW}Configura SSL:${NC} Si no se configuró automáticamente, ejecuta: sudo certbot --nginx -d $DOMAIN -d www.$DOMAIN"
-echo -e "4. ${YELLOW}Reinicia servicios:${NC} Si cambias la configuración, usa: sudo systemctl restart trading-bots-api nginx"
+echo -e "4. ${YELLOW}Actualiza la API sin cortes:${NC} Tras cambiar el código o la configuración, usa: sudo systemctl reload trading-bots-api"
 
 echo -e "\n${GREEN}Comandos útiles:${NC}"
-echo -e "- Ver logs de la API: ${YELLOW}journalctl -u trading-bots-api -f${NC}"
+echo -e "- Ver logs de la API: ${YELLOW}tail -f $API_DIR/api.log $API_DIR/gunicorn.log${NC}"
 echo -e "- Ver logs de Nginx: ${YELLOW}journalctl -u nginx -f${NC}"
 echo -e "- Verificar estado: ${YELLOW}systemctl status trading-bots-api nginx${NC}"
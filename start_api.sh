@@ -33,7 +33,19 @@ if [ -z "$VIRTUAL_ENV" ] && [ -z "$CONDA_PREFIX" ]; then
     fi
 fi
 
-# Verificar si ya hay una instancia de la API ejecutándose
+# Si gunicorn ya está en ejecución, recargar sin cortar conexiones
+GUNICORN_PIDFILE=${GUNICORN_PIDFILE:-${TMPDIR:-/tmp}/trading-bots-api.pid}
+if [ -f "$GUNICORN_PIDFILE" ] && kill -0 "$(cat "$GUNICORN_PIDFILE")" 2>/dev/null; then
+    echo -e "${YELLOW}La API ya se está ejecutando con gunicorn (PID: $(cat "$GUNICORN_PIDFILE"))${NC}"
+    read -p "¿Deseas recargarla sin cortes con el código actual? (s/n): " respuesta
+    if [[ "$respuesta" == "s" || "$respuesta" == "S" ]]; then
+        exec ./reload_api.sh
+    fi
+    echo -e "${YELLOW}Operación cancelada por el usuario.${NC}"
+    exit 0
+fi
+
+# Verificar si ya hay una instancia de la API ejecutándose (servidor de desarrollo)
 PID=$(ps aux | grep "[p]ython -m api.app" | awk '{print $2}')
 if [ ! -z "$PID" ]; then
     echo -e "${YELLOW}¡Advertencia! Ya hay una instancia de la API ejecutándose (PID: $PID)${NC}"
@@ -48,17 +60,27 @@ if [ ! -z "$PID" ]; then
     fi
 fi
 
+# Usar gunicorn (gunicorn.conf.py) si está instalado; si no, el servidor de desarrollo
+# (el script 'gunicorn' y no 'python -m gunicorn': la recarga con USR2 vuelve a
+# ejecutar el mismo comando y con -m fallaría la importación del módulo http)
+if command -v gunicorn &> /dev/null; then
+    START_CMD="gunicorn -c gunicorn.conf.py api.wsgi:app"
+else
+    echo -e "${YELLOW}gunicorn no está instalado. Se usará el servidor de desarrollo de Flask.${NC}"
+    START_CMD="python -m api.app"
+fi
+
 # Iniciar la API en segundo plano con screen
 if command -v screen &> /dev/null; then
     echo -e "${GREEN}Iniciando API en una sesión screen...${NC}"
-    screen -dmS trading-api bash -c "cd $(pwd) && python -m api.app"
+    screen -dmS trading-api bash -c "cd $(pwd) && $START_CMD"
     echo -e "${GREEN}API iniciada en segundo plano. Para ver los logs, ejecuta:${NC}"
     echo -e "${YELLOW}  screen -r trading-api${NC}"
     echo -e "${GREEN}Para salir de la sesión screen sin detener la API: Ctrl+A, luego D${NC}"
 else
     echo -e "${YELLOW}Screen no está instalado. Iniciando API en primer plano...${NC}"
     echo -e "${YELLOW}Presiona Ctrl+C para detener la API${NC}"
-    python -m api.app
+    $START_CMD
 fi
 
 echo -e "${GREEN}Para verificar que la API está funcionando, ejecuta:${NC}"
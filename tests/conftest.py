@@ -0,0 +1,53 @@
+"""
+Configuración común de las pruebas.
+
+Los archivos que la API escribe al importarse (historial de eventos, métricas,
+cola de webhooks, límites...) se redirigen a un directorio temporal, y el
+supervisor de los bots se ejecuta embebido en el proceso de las pruebas.
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import pytest
+
+# Raíz del proyecto importable también con 'pytest' (sin 'python -m')
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+# Debe definirse antes de importar la API
+RUNTIME_DIR = tempfile.mkdtemp(prefix='trading-bots-tests-')
+os.environ.update({
+    'BOT_SUPERVISOR_MODE': 'embedded',
+    'BOT_SUPERVISOR_SOCKET': os.path.join(RUNTIME_DIR, 'supervisor.sock'),
+    'RATE_LIMIT_ENABLED': 'false',
+    'JWT_SECRET': 'trading-bots-tests-secret-0123456789abcdef',
+    'EVENTS_DB': os.path.join(RUNTIME_DIR, 'events.db'),
+    'METRICS_DIR': os.path.join(RUNTIME_DIR, 'metrics'),
+    'WARM_START_PATH': os.path.join(RUNTIME_DIR, 'warm_start.json'),
+    'WORK_QUEUE_DIR': os.path.join(RUNTIME_DIR, 'spool'),
+})
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(RUNTIME_DIR, ignore_errors=True)
+
+@pytest.fixture(scope='session')
+def app():
+    """Aplicación de la API (la misma que sirve gunicorn)."""
+    from api.app import app
+    app.config['TESTING'] = True
+    return app
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture(scope='session')
+def auth_headers():
+    """Encabezado Authorization con un token de administrador."""
+    import jwt
+    from api.middleware.auth import jwt_secret
+    token = jwt.encode({'user_id': 'admin', 'role': 'admin'}, jwt_secret.get(), algorithm='HS256')
+    return {'Authorization': f"Bearer {token}"}
@@ -0,0 +1,85 @@
+"""Errores por elemento y validación del endpoint /api/batch."""
+
+import pytest
+from api.middleware.rate_limit import SharedBucketStore, rate_limiter
+from api.routes.batch_routes import batch_config
+
+@pytest.fixture
+def bot_id():
+    from api.routes.bot_routes import bot_service
+    return next(iter(bot_service.bots_config))
+
+def _batch(client, headers, *items):
+    response = client.post('/api/batch', headers=headers, json={"requests": list(items)})
+    return response, response.get_json()
+
+def test_path_query_is_merged_with_query_object(client, auth_headers):
+    response, body = _batch(client, auth_headers,
+                            {"id": "merged", "path": "/api/bots?fields=id,status", "query": {"fields": "id"}},
+                            {"id": "path", "path": "/api/bots?fields=id,status"})
+    assert response.status_code == 200
+    merged, path = body["data"]
+    assert merged["status"] == 200
+    assert all(set(bot) == {"id"} for bot in merged["body"]["data"])
+    assert path["status"] == 200
+    assert all(set(bot) == {"id", "status"} for bot in path["body"]["data"])
+
+def test_streaming_item_is_rejected_alone(client, auth_headers, bot_id):
+    response, body = _batch(client, auth_headers,
+                            {"id": "follow", "path": f"/api/bots/{bot_id}/logs?follow=1"},
+                            {"id": "logs", "path": f"/api/bots/{bot_id}/logs", "query": {"tail": 5}})
+    assert response.status_code == 200
+    follow, logs = body["data"]
+    assert follow["status"] == 400
+    assert follow["body"]["success"] is False
+    assert logs["status"] == 200
+    assert "next" in logs["body"]
+
+def test_item_errors_keep_their_status(client, auth_headers):
+    response, body = _batch(client, auth_headers,
+                            {"id": "missing", "path": "/api/bots/no_such_bot"},
+                            {"id": "unknown", "path": "/api/nothing/here"},
+                            {"id": "fields", "path": "/api/bots", "query": {"fields": "nope"}},
+                            {"id": "ok", "path": "/api/bots", "query": {"fields": "id"}})
+    assert response.status_code == 200
+    assert [(item["id"], item["status"]) for item in body["data"]] == [
+        ("missing", 404), ("unknown", 404), ("fields", 400), ("ok", 200)
+    ]
+
+@pytest.mark.parametrize("payload, status", [
+    ({}, 400),
+    ({"requests": []}, 400),
+    ({"requests": ["/api/bots"]}, 400),
+    ({"requests": [{"path": "/api/bots", "method": "DELETE"}]}, 400),
+    ({"requests": [{"path": "/health"}]}, 400),
+    ({"requests": [{"path": "/api/bots", "query": "fields=id"}]}, 400),
+    ({"requests": [{"path": "/api/batch", "method": "POST"}]}, 400),
+])
+def test_invalid_batch_is_rejected(client, auth_headers, payload, status):
+    response = client.post('/api/batch', headers=auth_headers, json=payload)
+    assert response.status_code == status
+    assert response.get_json()["success"] is False
+
+def test_batch_size_is_limited(client, auth_headers):
+    items = [{"path": "/api/bots"}] * (batch_config.max_items + 1)
+    response, _ = _batch(client, auth_headers, *items)
+    assert response.status_code == 413
+
+def test_batch_over_burst_is_rejected_without_charging(client, auth_headers, monkeypatch, tmp_path):
+    weight = rate_limiter.route_weight('/api/bots')
+    monkeypatch.setattr(rate_limiter, 'enabled', True)
+    monkeypatch.setattr(rate_limiter, 'capacity', 2 * weight)
+    monkeypatch.setattr(rate_limiter, 'store', SharedBucketStore(str(tmp_path / 'ratelimit.bin'), 16))
+
+    response, body = _batch(client, auth_headers, *[{"path": "/api/bots"}] * 3)
+    assert response.status_code == 413
+    assert body["max_cost"] == 2 * weight
+    assert "Retry-After" not in response.headers
+
+    # El lote rechazado no ha gastado tokens: uno que cabe se ejecuta
+    response, _ = _batch(client, auth_headers, *[{"path": "/api/bots"}] * 2)
+    assert response.status_code == 200
+
+def test_batch_requires_authentication(client):
+    response = client.post('/api/batch', json={"requests": [{"path": "/api/bots"}]})
+    assert response.status_code == 401
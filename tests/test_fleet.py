@@ -0,0 +1,269 @@
+"""
+FleetService contra agentes reales (api.agent) servidos en 127.0.0.1.
+
+Los agentes usan un servicio de bots en memoria para controlar sus
+respuestas y su latencia.
+"""
+
+import time
+import socket
+import threading
+import pytest
+from werkzeug.serving import make_server
+from api.agent import create_app
+from api.services.fleet import CircuitBreaker, FleetService, RemoteRejected
+
+TOKEN = "agent-test-token"
+
+class MemoryBotService:
+    """Servicio de bots en memoria con la interfaz que usa el agente."""
+
+    def __init__(self, bot_ids):
+        self.bots = {bot_id: {"id": bot_id, "name": bot_id, "status": "inactive"} for bot_id in bot_ids}
+        self.bots_config = dict.fromkeys(bot_ids, {})
+        self.version = 1
+        self.list_calls = 0
+        self.delay = 0.0
+        self.actions = []
+
+    def get_bots_version(self):
+        return (self.version,), None
+
+    def get_all_bots(self):
+        time.sleep(self.delay)
+        self.list_calls += 1
+        return [dict(bot) for bot in self.bots.values()]
+
+    def get_bot_version(self, bot_id, fields=None):
+        return (self.version, bot_id), None
+
+    def get_bot(self, bot_id, fields=None):
+        return dict(self.bots[bot_id])
+
+    def get_positions_version(self, bot_id):
+        return None
+
+    def get_bot_positions(self, bot_id, fields=None):
+        return []
+
+    def get_signals_version(self, bot_id):
+        return None
+
+    def get_bot_signals(self, bot_id):
+        return []
+
+    def _set_status(self, bot_id, status):
+        self.actions.append((bot_id, status))
+        self.bots[bot_id]["status"] = status
+        self.version += 1
+        return True
+
+    def start_bot(self, bot_id):
+        return self._set_status(bot_id, "active")
+
+    def stop_bot(self, bot_id):
+        return self._set_status(bot_id, "inactive")
+
+@pytest.fixture
+def start_agent():
+    """Arranca agentes en puertos libres de 127.0.0.1 y los detiene al terminar."""
+    servers = []
+
+    def start(bot_ids):
+        service = MemoryBotService(bot_ids)
+        server = make_server('127.0.0.1', 0, create_app({}, service, TOKEN), threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_port}", service
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+@pytest.fixture
+def fleet():
+    service = FleetService()
+    yield service
+    service.stop()
+
+def _configure(fleet, agents, **options):
+    fleet.configure({"fleet": dict({
+        "agents": {name: {"url": url, "token": TOKEN} for name, url in agents.items()},
+        "timeout_seconds": 1, "fresh_seconds": 5, "stale_seconds": 60,
+        "breaker_failures": 2, "breaker_reset_seconds": 0.2
+    }, **options)})
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def _settle(fleet):
+    """Espera a que terminen las revalidaciones en segundo plano."""
+    deadline = time.monotonic() + 5
+    while any(agent._inflight for agent in fleet.agents.values()):
+        assert time.monotonic() < deadline, "revalidación sin terminar"
+        time.sleep(0.01)
+
+def test_list_bots_merges_agents(fleet, start_agent):
+    url_a, _ = start_agent(["a_1", "a_2"])
+    url_b, _ = start_agent(["b_1"])
+    _configure(fleet, {"host-a": url_a, "host-b": url_b})
+
+    bots, hosts = fleet.list_bots()
+    assert sorted((bot["id"], bot["host"]) for bot in bots) == [("a_1", "host-a"), ("a_2", "host-a"),
+                                                                ("b_1", "host-b")]
+    assert {name: meta["state"] for name, meta in hosts.items()} == {"host-a": "fresh", "host-b": "fresh"}
+    assert fleet.owner("b_1") is fleet.agents["host-b"]
+    assert fleet.owner("nope") is None
+
+def test_fresh_copy_is_served_without_contacting_agent(fleet, start_agent):
+    url, service = start_agent(["a_1"])
+    _configure(fleet, {"host-a": url})
+
+    fleet.list_bots()
+    fleet.list_bots()
+    assert service.list_calls == 1
+
+def test_stale_copy_is_served_and_revalidated(fleet, start_agent):
+    url, service = start_agent(["a_1"])
+    _configure(fleet, {"host-a": url}, fresh_seconds=0.1)
+
+    fleet.list_bots()
+    service.bots["a_1"]["status"] = "active"
+    service.version += 1
+    time.sleep(0.15)
+
+    # Obsoleta: se devuelve la copia anterior y se refresca en segundo plano
+    bots, hosts = fleet.list_bots()
+    assert bots[0]["status"] == "inactive"
+    assert hosts["host-a"]["state"] == "stale"
+    _settle(fleet)
+
+    bots, hosts = fleet.list_bots()
+    assert bots[0]["status"] == "active"
+    assert hosts["host-a"]["state"] == "fresh"
+    assert service.list_calls == 2
+
+def test_unchanged_revalidation_uses_not_modified(fleet, start_agent):
+    url, service = start_agent(["a_1"])
+    _configure(fleet, {"host-a": url}, fresh_seconds=0.1)
+
+    fleet.list_bots()
+    time.sleep(0.15)
+    fleet.list_bots()
+    _settle(fleet)
+
+    # El agente respondió 304: no volvió a construir la lista
+    assert service.list_calls == 1
+    _, hosts = fleet.list_bots()
+    assert hosts["host-a"]["state"] == "fresh"
+
+def test_slow_agent_falls_back_to_expired_copy(fleet, start_agent):
+    url, service = start_agent(["a_1"])
+    _configure(fleet, {"host-a": url}, fresh_seconds=0.05, stale_seconds=0.05, timeout_seconds=0.2)
+
+    fleet.list_bots()
+    time.sleep(0.1)
+    service.delay = 1.0
+    service.version += 1
+    start = time.monotonic()
+    bots, hosts = fleet.list_bots()
+    assert time.monotonic() - start < 0.8
+    assert [bot["id"] for bot in bots] == ["a_1"]
+    assert hosts["host-a"]["state"] == "stale"
+    assert hosts["host-a"]["error"] == "Tiempo de espera agotado"
+    service.delay = 0.0
+    _settle(fleet)
+
+def test_slow_agent_without_copy_is_omitted(fleet, start_agent):
+    url_a, _ = start_agent(["a_1"])
+    url_b, slow = start_agent(["b_1"])
+    slow.delay = 1.0
+    _configure(fleet, {"host-a": url_a, "host-b": url_b}, timeout_seconds=0.2)
+
+    bots, hosts = fleet.list_bots()
+    assert [bot["id"] for bot in bots] == ["a_1"]
+    assert hosts["host-b"]["state"] == "error"
+    slow.delay = 0.0
+    _settle(fleet)
+
+def test_breaker_opens_and_probes_after_reset(fleet, start_agent):
+    url, _ = start_agent(["a_1"])
+    down_url = f"http://127.0.0.1:{_free_port()}"
+    _configure(fleet, {"host-a": url, "host-b": down_url})
+    down = fleet.agents["host-b"]
+
+    for _ in range(2):
+        _, hosts = fleet.list_bots()
+        assert hosts["host-b"]["state"] == "error"
+    assert down.breaker.state == "open"
+
+    # Abierto: no se contacta con el agente y el resto de la flota responde
+    bots, hosts = fleet.list_bots()
+    assert hosts["host-b"]["state"] == "open"
+    assert [bot["id"] for bot in bots] == ["a_1"]
+    assert fleet.status()["host-b"]["breaker"] == "open"
+
+    # Pasado el reset se permite una prueba; al fallar se vuelve a abrir
+    time.sleep(0.25)
+    _, hosts = fleet.list_bots()
+    assert hosts["host-b"]["state"] == "error"
+    assert down.breaker.state == "open"
+
+    # El agente vuelve a responder: la prueba cierra el circuito
+    down.url = url
+    time.sleep(0.25)
+    _, hosts = fleet.list_bots()
+    assert hosts["host-b"]["state"] == "fresh"
+    assert down.breaker.state == "closed"
+
+def test_action_is_forwarded_and_invalidates_copy(fleet, start_agent):
+    url, service = start_agent(["a_1"])
+    _configure(fleet, {"host-a": url})
+    agent = fleet.agents["host-a"]
+
+    fleet.list_bots()
+    result = fleet.action(agent, "a_1", "start")
+    assert result["success"] and result["data"]["status"] == "active"
+    assert service.actions == [("a_1", "active")]
+
+    bots, _ = fleet.list_bots()
+    assert bots[0]["status"] == "active"
+    assert service.list_calls == 2
+
+def test_wrong_token_is_rejected_without_opening_breaker(fleet, start_agent):
+    url, _ = start_agent(["a_1"])
+    fleet.configure({"fleet": {"agents": {"host-a": {"url": url, "token": "otro"}}, "breaker_failures": 1}})
+
+    bots, hosts = fleet.list_bots()
+    assert bots == []
+    assert hosts["host-a"]["state"] == "error"
+    assert fleet.agents["host-a"].breaker.state == "closed"
+    with pytest.raises(RemoteRejected) as error:
+        fleet.get(fleet.agents["host-a"], "a_1", "detail")
+    assert error.value.status_code == 401
+
+def test_circuit_breaker_half_open_allows_a_single_probe():
+    breaker = CircuitBreaker(failures=2, reset_seconds=0.05)
+    assert breaker.allow()
+    assert not breaker.record_failure()
+    assert breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    assert breaker.state == "half_open"
+    # Solo una prueba a la vez
+    assert not breaker.allow()
+    assert breaker.record_failure()
+    assert breaker.state == "open"
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.consecutive_failures == 0
+    assert breaker.allow()
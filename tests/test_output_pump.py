@@ -0,0 +1,87 @@
+"""Cursores del búfer de salida de los bots (LogBuffer)."""
+
+import threading
+from api.utils.output_pump import LogBuffer
+
+def _fill(buffer, count, start=1):
+    for i in range(start, start + count):
+        buffer.append('stdout', f"linea {i}", ts=1_700_000_000 + i)
+
+def test_empty_buffer_returns_cursor():
+    buffer = LogBuffer()
+    assert buffer.read() == ([], 0, 0)
+    assert buffer.read(after=0) == ([], 0, 0)
+
+def test_tail_returns_last_lines_and_cursor():
+    buffer = LogBuffer()
+    _fill(buffer, 10)
+    lines, next_seq, missed = buffer.read(tail=3)
+    assert [line["line"] for line in lines] == ["linea 8", "linea 9", "linea 10"]
+    assert [line["seq"] for line in lines] == [8, 9, 10]
+    assert next_seq == 10
+    assert missed == 0
+
+def test_after_returns_only_new_lines():
+    buffer = LogBuffer()
+    _fill(buffer, 5)
+    _, cursor, _ = buffer.read(tail=5)
+    assert buffer.read(after=cursor) == ([], cursor, 0)
+
+    _fill(buffer, 2, start=6)
+    lines, next_seq, missed = buffer.read(after=cursor)
+    assert [line["seq"] for line in lines] == [6, 7]
+    assert next_seq == 7
+    assert missed == 0
+
+def test_after_respects_limit():
+    buffer = LogBuffer()
+    _fill(buffer, 10)
+    lines, next_seq, _ = buffer.read(after=2, limit=3)
+    assert [line["seq"] for line in lines] == [3, 4, 5]
+    assert next_seq == 5
+    lines, next_seq, _ = buffer.read(after=next_seq, limit=3)
+    assert [line["seq"] for line in lines] == [6, 7, 8]
+
+def test_evicted_lines_are_reported_as_missed():
+    buffer = LogBuffer(max_lines=5)
+    _fill(buffer, 12)
+    lines, next_seq, missed = buffer.read(after=3)
+    # Se conservan las líneas 8-12: las 4-7 se han perdido
+    assert [line["seq"] for line in lines] == [8, 9, 10, 11, 12]
+    assert missed == 4
+    assert next_seq == 12
+
+def test_byte_limit_evicts_oldest_lines():
+    buffer = LogBuffer(max_lines=100, max_bytes=20)
+    for text in ("a" * 10, "b" * 10, "c" * 10):
+        buffer.append('stderr', text)
+    lines, _, _ = buffer.read()
+    assert [line["line"] for line in lines] == ["b" * 10, "c" * 10]
+    assert lines[0]["stream"] == "stderr"
+
+def test_cursor_ahead_of_buffer_reads_from_start():
+    # Cursor de un búfer anterior (el supervisor se reinició)
+    buffer = LogBuffer()
+    _fill(buffer, 3)
+    lines, next_seq, missed = buffer.read(after=500)
+    assert [line["seq"] for line in lines] == [1, 2, 3]
+    assert next_seq == 3
+    assert missed == 0
+
+def test_wait_wakes_up_on_new_line():
+    buffer = LogBuffer()
+    _fill(buffer, 2)
+    timer = threading.Timer(0.05, buffer.append, args=('stdout', 'nueva'))
+    timer.start()
+    try:
+        assert buffer.wait(after=2, timeout=5)
+    finally:
+        timer.join()
+    lines, _, _ = buffer.read(after=2)
+    assert [line["line"] for line in lines] == ["nueva"]
+
+def test_wait_times_out_without_new_lines():
+    buffer = LogBuffer()
+    _fill(buffer, 2)
+    assert not buffer.wait(after=2, timeout=0.05)
+    assert buffer.wait(after=1, timeout=0.05)
@@ -0,0 +1,32 @@
+"""Almacén compartido del limitador de solicitudes (SharedBucketStore)."""
+
+import os
+import pytest
+from api.middleware.rate_limit import SharedBucketStore
+
+def test_bucket_refills_up_to_capacity(tmp_path):
+    store = SharedBucketStore(str(tmp_path / 'ratelimit.bin'), 16)
+    assert store.consume("k", 3, 4, 1.0, now=100) == (True, 0, 1)
+    allowed, retry_after, _ = store.consume("k", 3, 4, 1.0, now=100)
+    assert not allowed and retry_after == 2
+    assert store.consume("k", 3, 4, 1.0, now=110) == (True, 0, 1)
+
+def test_store_is_created_in_missing_directory(tmp_path):
+    path = tmp_path / 'data' / 'ratelimit.bin'
+    SharedBucketStore(str(path), 16)
+    assert path.is_file()
+    assert path.stat().st_mode & 0o777 == 0o600
+
+def test_symlinked_store_is_refused(tmp_path):
+    target = tmp_path / 'target.bin'
+    target.write_bytes(b'')
+    link = tmp_path / 'ratelimit.bin'
+    os.symlink(target, link)
+    with pytest.raises(OSError):
+        SharedBucketStore(str(link), 16)
+    assert target.read_bytes() == b''
+
+def test_non_regular_store_is_refused(tmp_path):
+    os.mkfifo(tmp_path / 'ratelimit.bin')
+    with pytest.raises(OSError):
+        SharedBucketStore(str(tmp_path / 'ratelimit.bin'), 16)
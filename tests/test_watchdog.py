@@ -0,0 +1,119 @@
+"""Política de reinicio y corte por crash loop del vigilante de bots."""
+
+import time
+import threading
+import pytest
+from api.services.watchdog import BotWatchdog, RestartPolicy, parse_interval
+
+class FakeBotService:
+    """Servicio de bots mínimo: un bot cuyo proceso nunca sigue vivo."""
+
+    record_status_events = False
+
+    def __init__(self, supervision):
+        self.bots_config = {"bot": {"interval": "15m", "supervision": supervision}}
+        self.status = "inactive"
+        self.starts = 0
+
+    def get_status_snapshot(self, force=False):
+        return {"statuses": {"bot": self.status}}
+
+    def start_bot(self, bot_id):
+        self.starts += 1
+        return True
+
+    def stop_bot(self, bot_id, keep_watch=False):
+        return True
+
+def _policy(**overrides):
+    supervision = dict({"restart": True, "backoff_initial_seconds": 1, "backoff_multiplier": 2,
+                        "backoff_max_seconds": 10, "jitter": 0}, **overrides)
+    return RestartPolicy({"interval": "15m", "supervision": supervision})
+
+def test_backoff_grows_exponentially_up_to_max():
+    policy = _policy()
+    assert [policy.backoff(attempt) for attempt in range(6)] == [1, 2, 4, 8, 10, 10]
+
+def test_backoff_jitter_stays_within_bounds():
+    policy = _policy(jitter=0.2)
+    delays = [policy.backoff(2) for _ in range(200)]
+    assert all(3.2 <= delay <= 4.8 for delay in delays)
+    assert len(set(delays)) > 1
+
+def test_policy_defaults_and_liveness_from_interval():
+    policy = RestartPolicy({"interval": "15m", "supervision": {"liveness": {"type": "state_file"}}})
+    assert not policy.restart
+    assert policy.max_restarts == 5
+    assert policy.liveness_max_age == 3 * 15 * 60
+    assert parse_interval("4h") == 4 * 3600
+    assert parse_interval("x") is None
+
+def _wait_for_restart(watchdog):
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        if watchdog.status("bot")["state"] != "restarting":
+            return
+        time.sleep(0.01)
+    pytest.fail("el reinicio no terminó")
+
+def _crash(watchdog):
+    """Una caída detectada y, si se programa, su reinicio."""
+    watchdog.check_once()
+    if watchdog.status("bot")["state"] == "backoff":
+        watchdog.check_once()
+        _wait_for_restart(watchdog)
+        for thread in threading.enumerate():
+            if thread.name == "restart-bot":
+                thread.join(5)
+
+def test_crash_loop_stops_restarting_until_manual_start():
+    service = FakeBotService({"restart": True, "backoff_initial_seconds": 0, "jitter": 0,
+                              "max_restarts": 3, "restart_window_seconds": 600, "start_grace_seconds": 0})
+    watchdog = BotWatchdog(service)
+    watchdog.watch("bot")
+
+    for attempt in range(1, 4):
+        _crash(watchdog)
+        status = watchdog.status("bot")
+        assert status["state"] == "starting"
+        assert status["attempt"] == attempt
+        assert service.starts == attempt
+
+    _crash(watchdog)
+    status = watchdog.status("bot")
+    assert status["state"] == "crash_loop"
+    assert status["restarts_in_window"] == 3
+    assert status["events"][-1]["type"] == "crash_loop"
+
+    # En crash_loop el vigilante no vuelve a intentarlo
+    watchdog.check_once()
+    assert service.starts == 3
+
+    # Un inicio manual reinicia el retroceso y la ventana
+    watchdog.watch("bot")
+    status = watchdog.status("bot")
+    assert status["state"] == "starting"
+    assert status["attempt"] == 0
+    assert status["restarts_in_window"] == 0
+
+def test_backoff_delay_is_scheduled_before_restart():
+    service = FakeBotService({"restart": True, "backoff_initial_seconds": 30, "jitter": 0,
+                              "start_grace_seconds": 0})
+    watchdog = BotWatchdog(service)
+    watchdog.watch("bot")
+    watchdog.check_once()
+    status = watchdog.status("bot")
+    assert status["state"] == "backoff"
+    assert 29 <= status["next_restart_in"] <= 30
+    watchdog.check_once()
+    assert service.starts == 0
+
+def test_bot_without_restart_policy_is_marked_failed():
+    service = FakeBotService({"restart": False, "start_grace_seconds": 0})
+    watchdog = BotWatchdog(service)
+    watchdog.watch("bot")
+    watchdog.check_once()
+    status = watchdog.status("bot")
+    assert status["state"] == "failed"
+    assert not status["desired"]
+    assert service.starts == 0
@@ -0,0 +1,18 @@
+"""
+SDK asíncrono de la API de Trading Bots.
+
+    from trading_bots_sdk import AsyncAPIClient
+
+    async with AsyncAPIClient(token_file="auth_config.json") as client:
+        async for bots in client.poll(client.list_bots, interval=5):
+            ...
+"""
+
+from trading_bots_sdk.client import AsyncAPIClient, fan_out, load_token, DEFAULT_BASE_URL
+from trading_bots_sdk.errors import (
+    SDKError, TransportError, APIError, NotFoundError, AuthError, RateLimitError
+)
+from trading_bots_sdk.models import (
+    ResultList, LogLines, ResourceSamples, Events, Bot, Signal, Position, LogLine, ResourceSample,
+    Event, ActionResult, Health, Readiness, BatchResult, BotSnapshot
+)
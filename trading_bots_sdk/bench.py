@@ -0,0 +1,300 @@
+"""
+Generador de carga y medición de latencias sobre AsyncAPIClient.
+
+Dos modos:
+
+    concurrencia fija   N clientes en bucle cerrado (cada uno envía la
+                        siguiente solicitud al recibir la respuesta)
+    tasa fija           las solicitudes se programan a R por segundo aunque el
+                        servidor se retrase; la latencia se mide desde el
+                        instante programado para no ocultar las colas
+                        (coordinated omission)
+
+Los resultados se guardan como JSON para comparar dos ejecuciones con
+compare_results().
+"""
+
+import os
+import hmac
+import json
+import math
+import time
+import random
+import asyncio
+import hashlib
+import platform
+from datetime import datetime, timezone
+
+# Operaciones disponibles: nombre -> (método, plantilla de ruta)
+OPERATIONS = {
+    "health": ("GET", "/health"),
+    "list": ("GET", "/bots"),
+    "detail": ("GET", "/bots/{bot_id}"),
+    "signals": ("GET", "/bots/{bot_id}/signals"),
+    "positions": ("GET", "/bots/{bot_id}/positions"),
+    "webhooks": ("POST", "/webhooks/binance"),
+}
+
+DEFAULT_MIX = {"list": 3, "detail": 3, "signals": 2, "positions": 2, "webhooks": 1}
+
+# Límites superiores (ms) de los intervalos del histograma; el último es abierto
+HISTOGRAM_BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+# Métricas comparadas por compare_results: nombre -> True si más es mejor
+COMPARED_METRICS = {
+    "throughput": True, "error_rate": False, "p50_ms": False, "p90_ms": False,
+    "p99_ms": False, "max_ms": False,
+}
+
+def parse_mix(text):
+    """
+    Lee una mezcla de operaciones con pesos ('list=3,detail=2,webhooks=1').
+
+    Args:
+        text (str): Operaciones separadas por comas; el peso es opcional (1).
+
+    Returns:
+        dict: Operación -> peso.
+
+    Raises:
+        ValueError: Si una operación no existe o un peso no es válido.
+    """
+    mix = {}
+    for part in text.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        name, _, weight = part.partition('=')
+        if name not in OPERATIONS:
+            raise ValueError(f"Operación desconocida '{name}' (disponibles: {', '.join(OPERATIONS)})")
+        mix[name] = float(weight) if weight else 1.0
+        if mix[name] <= 0:
+            raise ValueError(f"El peso de '{name}' debe ser positivo")
+    if not mix:
+        raise ValueError("La mezcla de operaciones está vacía")
+    return mix
+
+def percentile(sorted_values, fraction):
+    """
+    Percentil por rango más cercano.
+
+    Args:
+        sorted_values (list): Valores ordenados.
+        fraction (float): Percentil entre 0 y 1.
+
+    Returns:
+        float: Valor del percentil (0 si no hay valores).
+    """
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+def _latency_stats(latencies_ms, elapsed, errors):
+    values = sorted(latencies_ms)
+    count = len(values)
+    return {
+        "requests": count,
+        "errors": errors,
+        "error_rate": round(errors / count, 4) if count else 0.0,
+        "throughput": round(count / elapsed, 2) if elapsed > 0 else 0.0,
+        "mean_ms": round(sum(values) / count, 3) if count else 0.0,
+        "p50_ms": round(percentile(values, 0.50), 3),
+        "p90_ms": round(percentile(values, 0.90), 3),
+        "p99_ms": round(percentile(values, 0.99), 3),
+        "max_ms": round(values[-1], 3) if values else 0.0,
+    }
+
+def _histogram(latencies_ms):
+    counts = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+    for value in latencies_ms:
+        for index, bound in enumerate(HISTOGRAM_BOUNDS_MS):
+            if value <= bound:
+                counts[index] += 1
+                break
+        else:
+            counts[-1] += 1
+    return [{"le_ms": bound, "count": count}
+            for bound, count in zip(list(HISTOGRAM_BOUNDS_MS) + [None], counts)]
+
+class LoadGenerator:
+    """Ejecuta una prueba de carga con una mezcla de operaciones ponderada."""
+
+    def __init__(self, client, bot_ids, mix=None, duration=10.0, concurrency=None, rate=None,
+                 webhook_secret=None):
+        """
+        Inicializa la prueba.
+
+        Args:
+            client (AsyncAPIClient): Cliente (se recomienda retries=0 para medir el servidor).
+            bot_ids (list): Bots sobre los que se reparten las operaciones por bot.
+            mix (dict, optional): Operación -> peso; por defecto DEFAULT_MIX.
+            duration (float): Segundos de carga.
+            concurrency (int, optional): Clientes en bucle cerrado.
+            rate (float, optional): Solicitudes por segundo (modo de tasa fija);
+                tiene prioridad sobre concurrency.
+            webhook_secret (str, optional): Secreto para firmar los webhooks de
+                Binance (por defecto BINANCE_WEBHOOK_SECRET).
+        """
+        self.client = client
+        self.bot_ids = list(bot_ids) or ["unknown"]
+        self.mix = dict(mix or DEFAULT_MIX)
+        self.duration = duration
+        self.rate = rate
+        self.concurrency = concurrency or (None if rate else 8)
+        self.webhook_secret = webhook_secret if webhook_secret is not None else os.getenv('BINANCE_WEBHOOK_SECRET', '')
+        self._names = list(self.mix)
+        self._weights = [self.mix[name] for name in self._names]
+        self._samples = []
+
+    def _next_operation(self, rng):
+        name = rng.choices(self._names, self._weights)[0]
+        method, template = OPERATIONS[name]
+        return name, method, template.format(bot_id=rng.choice(self.bot_ids))
+
+    def _webhook(self, sequence):
+        body = json.dumps({"event_type": "bench", "sequence": sequence}, separators=(',', ':'))
+        headers = {"Content-Type": "application/json"}
+        if self.webhook_secret:
+            headers["X-Binance-Signature"] = hmac.new(self.webhook_secret.encode('utf-8'),
+                                                      body.encode('utf-8'), hashlib.sha256).hexdigest()
+        return body, headers
+
+    async def _execute(self, name, method, path, sequence, scheduled=None):
+        start = time.perf_counter()
+        kwargs = {"accept": range(100, 600)}
+        if name == "webhooks":
+            body, headers = self._webhook(sequence)
+            kwargs.update(data=body, headers=headers, auth=False)
+        try:
+            status, _, _ = await self.client.request(method, path, **kwargs)
+            outcome = status
+        except Exception as e:
+            # Errores de transporte (TransportError, tiempos de espera...): se
+            # cuentan por tipo y la carga continúa
+            outcome = type(e).__name__
+        end = time.perf_counter()
+        origin = scheduled if scheduled is not None else start
+        self._samples.append((name, (end - origin) * 1000.0, outcome))
+
+    async def _closed_loop(self, worker, deadline):
+        rng = random.Random(worker)
+        sequence = 0
+        while time.perf_counter() < deadline:
+            name, method, path = self._next_operation(rng)
+            await self._execute(name, method, path, f"{worker}-{sequence}")
+            sequence += 1
+
+    async def _open_loop(self, deadline):
+        rng = random.Random(0)
+        interval = 1.0 / self.rate
+        start = time.perf_counter()
+        tasks = set()
+        sequence = 0
+        while True:
+            scheduled = start + sequence * interval
+            if scheduled >= deadline:
+                break
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            name, method, path = self._next_operation(rng)
+            task = asyncio.ensure_future(self._execute(name, method, path, sequence, scheduled))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            sequence += 1
+        if tasks:
+            await asyncio.gather(*tasks)
+
+    async def run(self):
+        """
+        Ejecuta la prueba.
+
+        Returns:
+            dict: Resultados (ver summarize()).
+        """
+        self._samples = []
+        started_at = datetime.now(timezone.utc).isoformat()
+        start = time.perf_counter()
+        deadline = start + self.duration
+        if self.rate:
+            await self._open_loop(deadline)
+        else:
+            await asyncio.gather(*(self._closed_loop(worker, deadline) for worker in range(self.concurrency)))
+        elapsed = time.perf_counter() - start
+        return self.summarize(elapsed, started_at)
+
+    def summarize(self, elapsed, started_at=None):
+        """
+        Calcula las estadísticas de las muestras recogidas.
+
+        Args:
+            elapsed (float): Segundos reales de la prueba.
+            started_at (str, optional): Momento de inicio (ISO 8601).
+
+        Returns:
+            dict: meta, summary, endpoints, errors y histogram.
+        """
+        def is_error(outcome):
+            return not isinstance(outcome, int) or outcome >= 400
+
+        by_endpoint = {}
+        errors = {}
+        for name, latency, outcome in self._samples:
+            by_endpoint.setdefault(name, []).append((latency, outcome))
+            if is_error(outcome):
+                key = f"{name} {outcome}"
+                errors[key] = errors.get(key, 0) + 1
+
+        all_latencies = [latency for _, latency, _ in self._samples]
+        total_errors = sum(errors.values())
+        return {
+            "meta": {
+                "started_at": started_at,
+                "base_url": self.client.base_url,
+                "mode": "rate" if self.rate else "concurrency",
+                "rate": self.rate,
+                "concurrency": self.concurrency,
+                "duration": self.duration,
+                "elapsed": round(elapsed, 3),
+                "mix": self.mix,
+                "bot_ids": self.bot_ids,
+                "client": platform.node(),
+            },
+            "summary": _latency_stats(all_latencies, elapsed, total_errors),
+            "endpoints": {
+                name: _latency_stats([latency for latency, _ in samples], elapsed,
+                                     sum(1 for _, outcome in samples if is_error(outcome)))
+                for name, samples in sorted(by_endpoint.items())
+            },
+            "errors": dict(sorted(errors.items(), key=lambda item: -item[1])),
+            "histogram": _histogram(all_latencies),
+        }
+
+def compare_results(before, after):
+    """
+    Compara dos resultados de LoadGenerator.
+
+    Args:
+        before (dict): Resultado de referencia.
+        after (dict): Resultado nuevo.
+
+    Returns:
+        list: Filas (ámbito, métrica, antes, después, variación en %,
+        empeora) para el total y cada operación presente en ambos.
+    """
+    scopes = [("total", before.get("summary", {}), after.get("summary", {}))]
+    for name in sorted(set(before.get("endpoints", {})) & set(after.get("endpoints", {}))):
+        scopes.append((name, before["endpoints"][name], after["endpoints"][name]))
+
+    rows = []
+    for scope, old, new in scopes:
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            old_value, new_value = old.get(metric, 0.0), new.get(metric, 0.0)
+            if old_value:
+                change = (new_value - old_value) / old_value * 100.0
+            else:
+                change = 0.0 if not new_value else float('inf')
+            worse = change < 0 if higher_is_better else change > 0
+            rows.append((scope, metric, old_value, new_value, round(change, 1), worse))
+    return rows
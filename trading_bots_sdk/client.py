@@ -0,0 +1,769 @@
+"""
+Cliente asíncrono de la API de Trading Bots.
+
+Una sola sesión aiohttp por cliente: las conexiones se reutilizan entre
+solicitudes (keep-alive) y su número está acotado por max_connections. Los
+errores de conexión, los 5xx y los 429 se reintentan con espera exponencial
+respetando Retry-After; los POST solo se reintentan si la API no llegó a
+procesarlos (fallo al conectar o 429).
+
+Ejemplo:
+    async with AsyncAPIClient(token=token) as client:
+        bots = await client.list_bots()
+        details = await client.fan_out(client.get_bot, [bot.id for bot in bots])
+"""
+
+import os
+import json
+import random
+import asyncio
+import logging
+
+import aiohttp
+
+from trading_bots_sdk.errors import TransportError, AuthError, APIError, RateLimitError, error_for_status
+from trading_bots_sdk.models import (
+    ResultList, LogLines, ResourceSamples, Events, Bot, Signal, Position, LogLine, ResourceSample,
+    Event, ActionResult, Health, Readiness, BatchResult, BotSnapshot
+)
+
+# Configurar logging
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_URL = f"http://{os.getenv('API_HOST', 'localhost')}:{os.getenv('API_PORT', '5000')}/api"
+
+# Estados que se reintentan; los 5xx solo en métodos idempotentes
+RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
+IDEMPOTENT_METHODS = frozenset(["GET", "HEAD", "OPTIONS"])
+
+# Elementos por solicitud a /api/batch (límite por defecto del servidor)
+BATCH_MAX_ITEMS = 50
+
+# Coste de cada elemento de watch_bots en el límite de solicitudes del
+# servidor (rate_limit.route_weights por defecto) y límite por defecto
+WATCH_ITEM_COSTS = {"bots": 2, "bot": 1, "positions": 2}
+DEFAULT_REQUESTS_PER_MINUTE = 60
+DEFAULT_BURST = 60
+
+# Campos que pide watch_bots (tabla de estado y PnL)
+WATCH_BOT_FIELDS = ("id", "name", "status", "balance", "profit_today", "profit_total", "win_rate")
+WATCH_POSITION_FIELDS = ("id", "profit_loss_usdt")
+
+# Segundos sin datos tras los que se da por perdida una conexión de follow_logs
+# (el servidor envía un latido cada 10 segundos por defecto)
+FOLLOW_READ_TIMEOUT = 60.0
+
+def load_token(path):
+    """
+    Lee el token JWT de un archivo con el formato de auth_config.json.
+
+    Args:
+        path (str): Ruta del archivo ({"jwt_token": "..."}).
+
+    Returns:
+        str: Token JWT.
+
+    Raises:
+        AuthError: Si el archivo no existe o no contiene un token válido.
+    """
+    try:
+        with open(path, 'r') as f:
+            token = json.load(f).get('jwt_token')
+    except (OSError, ValueError) as e:
+        raise AuthError(0, "Token no disponible", f"No se pudo leer {path}: {e}")
+    if not token or token == "TU_TOKEN_JWT_AQUI":
+        raise AuthError(0, "Token no disponible", f"Token JWT no configurado en {path}")
+    return token
+
+async def fan_out(func, items, concurrency=10, return_exceptions=True):
+    """
+    Aplica una corrutina a cada elemento con concurrencia acotada.
+
+    Args:
+        func (callable): Función asíncrona que recibe un elemento.
+        items (iterable): Elementos a procesar.
+        concurrency (int): Llamadas simultáneas como máximo.
+        return_exceptions (bool): Devolver las excepciones en su posición en
+            lugar de propagar la primera.
+
+    Returns:
+        list: Resultados en el orden de items.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run(item):
+        async with semaphore:
+            return await func(item)
+
+    return await asyncio.gather(*(run(item) for item in items), return_exceptions=return_exceptions)
+
+def _params(**values):
+    # aiohttp solo admite cadenas: se omiten los None y las listas se unen por comas
+    params = {}
+    for name, value in values.items():
+        if value is None:
+            continue
+        if isinstance(value, (list, tuple)):
+            value = ",".join(value)
+        elif isinstance(value, bool):
+            value = "true" if value else "false"
+        params[name] = str(value)
+    return params
+
+def _chunk_by_cost(items, costs, max_cost, max_items=BATCH_MAX_ITEMS):
+    """Reparte los elementos en lotes cuyo coste no supera max_cost (ni max_items elementos)."""
+    chunks, chunk, chunk_cost = [], [], 0
+    for item, cost in zip(items, costs):
+        if chunk and (chunk_cost + cost > max_cost or len(chunk) >= max_items):
+            chunks.append((chunk, chunk_cost))
+            chunk, chunk_cost = [], 0
+        chunk.append(item)
+        chunk_cost += cost
+    if chunk:
+        chunks.append((chunk, chunk_cost))
+    return chunks
+
+def _parse_list(model, payload, etag):
+    if "rows" in payload:
+        items = model.from_rows(payload.get("columns", []), payload["rows"])
+    else:
+        items = [model.from_dict(item) for item in payload.get("data", [])]
+    return ResultList(items, etag)
+
+class AsyncAPIClient:
+    """
+    Cliente asíncrono con un pool de conexiones persistentes.
+
+    Las consultas devuelven modelos (Bot, Signal...) en lugar del JSON; las
+    que aceptan if_none_match devuelven None si el recurso no ha cambiado
+    (304), lo que permite sondear con poll() sin volver a descargar el cuerpo.
+    """
+
+    def __init__(self, base_url=DEFAULT_BASE_URL, token=None, token_file=None, connect_timeout=3.05,
+                 read_timeout=10.0, retries=3, backoff_factor=0.5, max_retry_after=60.0,
+                 max_connections=10, concurrency=None):
+        """
+        Inicializa el cliente (la sesión se crea en la primera solicitud).
+
+        Args:
+            base_url (str): URL base de la API (terminada en /api).
+            token (str, optional): Token JWT.
+            token_file (str, optional): Archivo del que leer el token si no se
+                indica token (se lee una sola vez, en la primera solicitud autenticada).
+            connect_timeout (float): Segundos máximos para establecer una conexión.
+            read_timeout (float): Segundos máximos de espera entre datos de la respuesta.
+            retries (int): Reintentos ante errores de conexión, 5xx y 429.
+            backoff_factor (float): Espera base entre reintentos (se duplica en cada uno).
+            max_retry_after (float): Espera máxima aceptada de un Retry-After.
+            max_connections (int): Conexiones simultáneas como máximo.
+            concurrency (int, optional): Concurrencia por defecto de fan_out
+                (por defecto max_connections).
+        """
+        self.base_url = base_url.rstrip('/')
+        self.token = token
+        self.token_file = token_file
+        self.timeout = aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout)
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.max_retry_after = max_retry_after
+        self.max_connections = max_connections
+        self.concurrency = concurrency or max_connections
+        self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def close(self):
+        """Cierra la sesión y sus conexiones."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _get_session(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_connections, keepalive_timeout=30)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout,
+                                                  raise_for_status=False)
+        return self._session
+
+    def _auth_headers(self):
+        if self.token is None and self.token_file is not None:
+            self.token = load_token(self.token_file)
+        return {'Authorization': f'Bearer {self.token}'} if self.token else {}
+
+    def _backoff(self, attempt):
+        # Espera exponencial con jitter para no sincronizar a varios clientes
+        delay = self.backoff_factor * (2 ** attempt)
+        return delay * (0.5 + random.random() / 2)
+
+    def _retry_after(self, headers):
+        try:
+            return min(float(headers.get('Retry-After')), self.max_retry_after)
+        except (TypeError, ValueError):
+            return None
+
+    async def request(self, method, path, params=None, json_body=None, headers=None, auth=True,
+                      accept=(200,), data=None):
+        """
+        Envía una solicitud con reintentos y devuelve el cuerpo decodificado.
+
+        Args:
+            method (str): Método HTTP.
+            path (str): Ruta relativa a la URL base (ej. '/bots').
+            params (dict, optional): Parámetros de consulta.
+            json_body (optional): Cuerpo JSON.
+            headers (dict, optional): Encabezados adicionales.
+            auth (bool): Enviar el token JWT.
+            accept (tuple): Códigos de estado que no se consideran error.
+            data (optional): Cuerpo ya codificado (bytes o str), por ejemplo
+                cuando hay que firmarlo.
+
+        Returns:
+            tuple: (estado, encabezados, cuerpo JSON o texto).
+
+        Raises:
+            APIError: Si la API responde con un código no aceptado.
+            TransportError: Si no se pudo conectar tras los reintentos.
+        """
+        method = method.upper()
+        idempotent = method in IDEMPOTENT_METHODS
+        request_headers = dict(headers or {})
+        if auth:
+            request_headers.update(self._auth_headers())
+        url = f"{self.base_url}{path}"
+
+        attempt = 0
+        while True:
+            try:
+                async with self._get_session().request(method, url, params=params, json=json_body,
+                                                       data=data, headers=request_headers) as response:
+                    status = response.status
+                    response_headers = response.headers
+                    raw = await response.read()
+            except aiohttp.ClientConnectorError as e:
+                # No se llegó a enviar la solicitud: se puede reintentar cualquier método
+                if attempt < self.retries:
+                    logger.debug(f"Reintentando {method} {url} tras error de conexión: {e}")
+                    await asyncio.sleep(self._backoff(attempt))
+                    attempt += 1
+                    continue
+                raise TransportError(f"No se pudo conectar con {url}: {e}") from e
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if idempotent and attempt < self.retries:
+                    logger.debug(f"Reintentando {method} {url} tras error: {e!r}")
+                    await asyncio.sleep(self._backoff(attempt))
+                    attempt += 1
+                    continue
+                raise TransportError(f"Error en {method} {url}: {e!r}") from e
+
+            if (status in RETRY_STATUSES and status not in accept and attempt < self.retries
+                    and (idempotent or status == 429)):
+                delay = self._retry_after(response_headers)
+                logger.debug(f"Reintentando {method} {url} tras estado {status}")
+                await asyncio.sleep(delay if delay is not None else self._backoff(attempt))
+                attempt += 1
+                continue
+
+            if 'json' in response_headers.get('Content-Type', ''):
+                body = json.loads(raw) if raw else {}
+            else:
+                body = raw.decode('utf-8', errors='replace')
+            if status not in accept and status != 304:
+                payload = body if isinstance(body, dict) else {}
+                raise error_for_status(status, payload, self._retry_after(response_headers))
+            return status, response_headers, body
+
+    async def _get_resource(self, path, params, if_none_match):
+        headers = {'If-None-Match': if_none_match} if if_none_match else None
+        status, headers, body = await self.request('GET', path, params=params, headers=headers)
+        if status == 304:
+            return None, headers.get('ETag')
+        return body, headers.get('ETag')
+
+    async def health(self):
+        """
+        Estado general de la API.
+
+        Returns:
+            Health: Versión, entorno y tiempo en marcha.
+        """
+        _, _, body = await self.request('GET', '/health', auth=False)
+        return Health.from_dict(body)
+
+    async def live(self):
+        """
+        Sonda de vida.
+
+        Returns:
+            bool: True si el worker respondió.
+        """
+        await self.request('GET', '/health/live', auth=False)
+        return True
+
+    async def ready(self):
+        """
+        Sonda de disponibilidad (un 503 no se trata como error).
+
+        Returns:
+            Readiness: Resultado de las comprobaciones del worker que respondió.
+        """
+        _, _, body = await self.request('GET', '/health/ready', auth=False, accept=(200, 503))
+        return Readiness.from_dict(body)
+
+    async def list_bots(self, fields=None, if_none_match=None):
+        """
+        Lista los bots.
+
+        Args:
+            fields (list, optional): Campos a pedir (por defecto todos).
+            if_none_match (str, optional): ETag de la respuesta anterior.
+
+        Returns:
+            ResultList: Bots, o None si no han cambiado desde if_none_match.
+        """
+        body, etag = await self._get_resource('/bots', _params(fields=fields, format='compact'), if_none_match)
+        return None if body is None else _parse_list(Bot, body, etag)
+
+    async def get_bot(self, bot_id, fields=None, if_none_match=None):
+        """
+        Detalle de un bot.
+
+        Args:
+            bot_id (str): ID del bot.
+            fields (list, optional): Campos a pedir (por defecto todos).
+            if_none_match (str, optional): ETag de la respuesta anterior.
+
+        Returns:
+            Bot: Detalle del bot, o None si no ha cambiado desde if_none_match.
+
+        Raises:
+            NotFoundError: Si el bot no existe.
+        """
+        body, etag = await self._get_resource(f'/bots/{bot_id}', _params(fields=fields), if_none_match)
+        if body is None:
+            return None
+        bot = Bot.from_dict(body.get('data'))
+        bot.etag = etag
+        return bot
+
+    async def start_bot(self, bot_id):
+        """
+        Inicia un bot.
+
+        Args:
+            bot_id (str): ID del bot.
+
+        Returns:
+            ActionResult: Resultado de la operación.
+        """
+        _, _, body = await self.request('POST', f'/bots/{bot_id}/start')
+        return ActionResult(bot_id=bot_id, success=body.get('success'), message=body.get('message'),
+                            status=(body.get('data') or {}).get('status'))
+
+    async def stop_bot(self, bot_id):
+        """
+        Detiene un bot.
+
+        Args:
+            bot_id (str): ID del bot.
+
+        Returns:
+            ActionResult: Resultado de la operación.
+        """
+        _, _, body = await self.request('POST', f'/bots/{bot_id}/stop')
+        return ActionResult(bot_id=bot_id, success=body.get('success'), message=body.get('message'),
+                            status=(body.get('data') or {}).get('status'))
+
+    async def get_signals(self, bot_id, fields=None, since=None, if_none_match=None):
+        """
+        Señales recientes de un bot (las más recientes primero).
+
+        Args:
+            bot_id (str): ID del bot.
+            fields (list, optional): Campos a pedir (por defecto todos).
+            since (str, optional): Devolver solo las señales posteriores a este timestamp.
+            if_none_match (str, optional): ETag de la respuesta anterior.
+
+        Returns:
+            ResultList: Señales, o None si no han cambiado desde if_none_match.
+        """
+        params = _params(fields=fields, since=since, format='compact')
+        body, etag = await self._get_resource(f'/bots/{bot_id}/signals', params, if_none_match)
+        return None if body is None else _parse_list(Signal, body, etag)
+
+    async def get_positions(self, bot_id, fields=None, if_none_match=None):
+        """
+        Posiciones abiertas de un bot.
+
+        Args:
+            bot_id (str): ID del bot.
+            fields (list, optional): Campos a pedir (por defecto todos).
+            if_none_match (str, optional): ETag de la respuesta anterior.
+
+        Returns:
+            ResultList: Posiciones, o None si no han cambiado desde if_none_match.
+        """
+        params = _params(fields=fields, format='compact')
+        body, etag = await self._get_resource(f'/bots/{bot_id}/positions', params, if_none_match)
+        return None if body is None else _parse_list(Position, body, etag)
+
+    async def get_logs(self, bot_id, tail=100, after=None):
+        """
+        Salida reciente (stdout/stderr) de un bot.
+
+        Args:
+            bot_id (str): ID del bot.
+            tail (int): Últimas N líneas.
+            after (int, optional): Solo las líneas posteriores a este cursor
+                (el atributo 'next' de una lectura anterior).
+
+        Returns:
+            LogLines: Líneas, con 'next' (cursor) y 'missed' (líneas perdidas
+            por salir del búfer del servidor).
+        """
+        _, _, body = await self.request('GET', f'/bots/{bot_id}/logs', params=_params(tail=tail, after=after))
+        return LogLines([LogLine.from_dict(item) for item in body.get('data', [])],
+                        body.get('next', 0), body.get('missed', 0))
+
+    async def follow_logs(self, bot_id, tail=0):
+        """
+        Sigue la salida de un bot en tiempo real (GET /bots/<id>/logs?follow=1).
+
+        Cuando el servidor cierra el seguimiento (supervisor.follow_max_seconds)
+        se vuelve a conectar desde la última línea recibida.
+
+        Args:
+            bot_id (str): ID del bot.
+            tail (int): Líneas anteriores a mostrar antes de las nuevas.
+
+        Yields:
+            LogLine: Cada línea a medida que llega.
+
+        Raises:
+            APIError: Si la API responde con un error (ej. NotFoundError).
+            TransportError: Si se pierde la conexión.
+        """
+        url = f"{self.base_url}/bots/{bot_id}/logs"
+        timeout = aiohttp.ClientTimeout(sock_connect=self.timeout.sock_connect, sock_read=FOLLOW_READ_TIMEOUT)
+        after = None
+        while True:
+            params = _params(follow=1, after=after) if after is not None else _params(follow=1, tail=tail)
+            try:
+                async with self._get_session().get(url, params=params, headers=self._auth_headers(),
+                                                   timeout=timeout) as response:
+                    if response.status != 200:
+                        raw = await response.read()
+                        payload = json.loads(raw) if 'json' in response.headers.get('Content-Type', '') and raw else {}
+                        raise error_for_status(response.status, payload, self._retry_after(response.headers))
+                    async for raw in response.content:
+                        raw = raw.strip()
+                        # Las líneas vacías son latidos del servidor
+                        if not raw:
+                            continue
+                        item = json.loads(raw)
+                        if "missed" in item:
+                            logger.warning(f"Se perdieron {item['missed']} líneas de {bot_id}")
+                            continue
+                        after = item["seq"]
+                        yield LogLine.from_dict(item)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                raise TransportError(f"Error siguiendo los logs de {bot_id}: {e!r}") from e
+            # Sin líneas en la primera conexión: no repetir el tail al reconectar
+            tail = 0
+
+    async def get_resources(self, bot_id, window=300):
+        """
+        Consumo de recursos muestreado de un bot.
+
+        Args:
+            bot_id (str): ID del bot.
+            window (float): Segundos hacia atrás.
+
+        Returns:
+            ResourceSamples: Muestras, con 'summary' (último, media y máximo de
+            cada serie) y 'sampler' (coste del muestreo en el servidor).
+        """
+        _, _, body = await self.request('GET', f'/bots/{bot_id}/resources',
+                                        params=_params(window=window, format='compact'))
+        return ResourceSamples(ResourceSample.from_rows(body.get('columns', []), body.get('rows', [])),
+                               body.get('summary', {}), body.get('sampler', {}))
+
+    async def get_supervision(self, bot_id):
+        """
+        Estado del reinicio automático de un bot.
+
+        Args:
+            bot_id (str): ID del bot.
+
+        Returns:
+            dict: Política, estado ('running', 'backoff', 'crash_loop'...) y
+            eventos recientes de caída y reinicio.
+        """
+        _, _, body = await self.request('GET', f'/bots/{bot_id}/supervision')
+        return body.get('data', {})
+
+    async def get_events(self, bot_id=None, types=None, since=None, until=None, limit=100, cursor=None):
+        """
+        Historial de eventos, más recientes primero.
+
+        Sin bot_id devuelve los de todos los bots y la API (requiere rol de
+        administrador).
+
+        Args:
+            bot_id (str, optional): ID del bot.
+            types (list, optional): Tipos de evento ('status', 'restart'...).
+            since, until (str | float, optional): Ventana (epoch, ISO 8601 o relativo como '7d').
+            limit (int): Eventos por página.
+            cursor (str, optional): Atributo 'next' de la página anterior.
+
+        Returns:
+            Events: Eventos, con 'next' para pedir la página siguiente.
+        """
+        path = f'/bots/{bot_id}/events' if bot_id else '/events'
+        _, _, body = await self.request('GET', path, params=_params(
+            type=types, since=since, until=until, limit=limit, cursor=cursor, format='compact'))
+        return Events(Event.from_rows(body.get('columns', []), body.get('rows', [])), body.get('next'))
+
+    async def get_uptime(self, bot_id, since=None, until=None):
+        """
+        Disponibilidad de un bot en una ventana de tiempo.
+
+        Args:
+            bot_id (str): ID del bot.
+            since, until (str | float, optional): Ventana (por defecto las últimas 24 horas).
+
+        Returns:
+            dict: Segundos activos y observados, disponibilidad, caídas y reinicios.
+        """
+        _, _, body = await self.request('GET', f'/bots/{bot_id}/uptime', params=_params(since=since, until=until))
+        return body.get('data', {})
+
+    async def batch(self, requests):
+        """
+        Ejecuta varias solicitudes en una sola ida y vuelta (/api/batch).
+
+        Args:
+            requests (list): Elementos {"id", "method", "path", "query", "headers"}.
+
+        Returns:
+            list: BatchResult por elemento, en el mismo orden.
+        """
+        _, _, body = await self.request('POST', '/batch', json_body={"requests": list(requests)})
+        return [BatchResult.from_dict(item) for item in body.get('data', [])]
+
+    async def metrics(self):
+        """
+        Métricas agregadas en formato de exposición de Prometheus.
+
+        Returns:
+            str: Texto de las métricas.
+        """
+        _, _, body = await self.request('GET', '/metrics')
+        return body
+
+    async def fan_out(self, func, items, concurrency=None, return_exceptions=True):
+        """
+        Aplica una corrutina a cada elemento con la concurrencia del cliente.
+
+        Args:
+            func (callable): Función asíncrona que recibe un elemento (ej. self.get_bot).
+            items (iterable): Elementos a procesar.
+            concurrency (int, optional): Por defecto la concurrencia del cliente.
+            return_exceptions (bool): Devolver las excepciones en su posición.
+
+        Returns:
+            list: Resultados en el orden de items.
+        """
+        return await fan_out(func, items, concurrency or self.concurrency, return_exceptions)
+
+    async def status_all(self, bot_ids=None, concurrency=None):
+        """
+        Detalle de varios bots en paralelo.
+
+        Args:
+            bot_ids (list, optional): Bots a consultar; por defecto todos.
+            concurrency (int, optional): Solicitudes simultáneas.
+
+        Returns:
+            list: Tuplas (bot_id, Bot o excepción) en el orden de bot_ids.
+        """
+        if bot_ids is None:
+            bot_ids = [bot.id for bot in await self.list_bots(fields=["id"])]
+        results = await self.fan_out(self.get_bot, bot_ids, concurrency)
+        return list(zip(bot_ids, results))
+
+    async def poll(self, func, *args, interval=5.0, **kwargs):
+        """
+        Sondea una consulta con If-None-Match y produce solo los cambios.
+
+        Args:
+            func (callable): Consulta que acepta if_none_match (ej. self.list_bots).
+            *args: Argumentos de la consulta.
+            interval (float): Segundos entre sondeos.
+            **kwargs: Argumentos con nombre de la consulta.
+
+        Yields:
+            Resultado de la consulta cada vez que cambia (el primero siempre).
+        """
+        etag = None
+        while True:
+            result = await func(*args, if_none_match=etag, **kwargs)
+            if result is not None:
+                etag = result.etag
+                yield result
+            await asyncio.sleep(interval)
+
+    async def poll_signals(self, bot_id, interval=5.0, since=None):
+        """
+        Sondea las señales de un bot y produce solo las nuevas.
+
+        Combina un cursor 'since' (timestamp de la última señal vista) con
+        If-None-Match: mientras no haya señales nuevas la API responde 304.
+
+        Args:
+            bot_id (str): ID del bot.
+            interval (float): Segundos entre sondeos.
+            since (str, optional): Cursor inicial; por defecto se devuelven
+                primero las señales recientes.
+
+        Yields:
+            ResultList: Señales nuevas (no vacía), las más recientes primero.
+        """
+        etag = None
+        while True:
+            signals = await self.get_signals(bot_id, since=since, if_none_match=etag)
+            if signals is not None:
+                etag = signals.etag
+                if signals:
+                    since = max(signal.timestamp or "" for signal in signals)
+                    # El cursor cambia la consulta: la siguiente respuesta tiene otra ETag
+                    etag = None
+                    yield signals
+            await asyncio.sleep(interval)
+
+    async def watch_bots(self, bot_ids=None, interval=2.0, max_interval=30.0, backoff=1.5,
+                         positions_every=3, requests_per_minute=DEFAULT_REQUESTS_PER_MINUTE,
+                         burst=DEFAULT_BURST):
+        """
+        Vigila el estado y el PnL de varios bots y produce solo los cambios.
+
+        Cada ciclo es una única solicitud a /api/batch (o pocas, si hay muchos
+        bots) con el detalle de cada bot y su última ETag, de modo que lo que
+        no ha cambiado vuelve como 304 sin cuerpo; las posiciones se piden
+        cada positions_every ciclos. Mientras no hay cambios el intervalo
+        crece (hasta max_interval); con el primer cambio vuelve a interval.
+
+        El servidor cobra cada elemento con el peso de su ruta aunque responda
+        304, así que los lotes se reparten por coste (hasta burst) y se
+        espera lo necesario para no superar requests_per_minute. Si aun así
+        la API responde 429 se espera Retry-After y se sigue vigilando; si
+        rechaza un lote por costoso (413) se usa el máximo que indica.
+
+        Args:
+            bot_ids (list, optional): Bots a vigilar; por defecto todos (la
+                lista de bots también se vigila y se siguen las altas y bajas).
+            interval (float): Segundos entre sondeos cuando hay actividad.
+            max_interval (float): Segundos máximos entre sondeos en reposo.
+            backoff (float): Factor de crecimiento del intervalo en reposo.
+            positions_every (int): Ciclos entre consultas de las posiciones.
+            requests_per_minute (float): Límite del servidor (rate_limit.requests_per_minute).
+            burst (float): Ráfaga del servidor (rate_limit.burst).
+
+        Yields:
+            dict: bot_id -> BotSnapshot de los bots que han cambiado (el
+            primero contiene todos). Un bot dado de baja aparece con error.
+        """
+        follow_all = bot_ids is None
+        bot_ids = list(bot_ids or [])
+        etags = {}
+        snapshots = {}
+        changed = {}
+        delay = interval
+        cycle = 0
+        # Copia local del bucket del servidor: se espera a tener saldo antes de cada lote
+        refill = max(requests_per_minute, 1) / 60.0
+        loop = asyncio.get_running_loop()
+        tokens, refilled_at = float(burst), loop.time()
+        while True:
+            items = []
+            if follow_all:
+                items.append({"id": "bots", "path": "/api/bots", "query": {"fields": "id"}})
+            with_positions = cycle % max(1, positions_every) == 0
+            for bot_id in bot_ids:
+                items.append({"id": f"bot:{bot_id}", "path": f"/api/bots/{bot_id}",
+                              "query": {"fields": ",".join(WATCH_BOT_FIELDS)}})
+                if with_positions or bot_id not in snapshots:
+                    items.append({"id": f"positions:{bot_id}", "path": f"/api/bots/{bot_id}/positions",
+                                  "query": {"fields": ",".join(WATCH_POSITION_FIELDS)}})
+            for item in items:
+                if etags.get(item["id"]):
+                    item["headers"] = {"If-None-Match": etags[item["id"]]}
+            cycle += 1
+
+            costs = [WATCH_ITEM_COSTS[item["id"].split(":", 1)[0]] for item in items]
+            results = []
+            for chunk, cost in _chunk_by_cost(items, costs, burst):
+                now = loop.time()
+                tokens = min(float(burst), tokens + (now - refilled_at) * refill)
+                refilled_at = now
+                if tokens < cost:
+                    await asyncio.sleep((cost - tokens) / refill)
+                    tokens, refilled_at = float(cost), loop.time()
+                tokens -= cost
+                try:
+                    results.extend(await self.batch(chunk))
+                except RateLimitError as e:
+                    # Otro cliente comparte el límite: se espera y se sigue en el próximo ciclo
+                    wait = e.retry_after or delay
+                    logger.debug(f"watch_bots: límite de solicitudes superado, esperando {wait} s")
+                    delay = min(max(delay * backoff, wait), max_interval)
+                    tokens, refilled_at = 0.0, loop.time() + wait
+                    break
+                except APIError as e:
+                    max_cost = (e.payload or {}).get("max_cost")
+                    if e.status != 413 or not max_cost or max_cost >= burst:
+                        raise
+                    # Ráfaga del servidor menor que la supuesta: se reparte de nuevo
+                    burst = float(max_cost)
+                    tokens = min(tokens, burst)
+                    break
+
+            for result in results:
+                if result.status == 304:
+                    continue
+                etags[result.id] = (result.headers or {}).get('ETag')
+                body = result.body or {}
+                if result.id == "bots":
+                    if result.ok:
+                        listed = [bot["id"] for bot in body.get("data", [])]
+                        for bot_id in set(bot_ids) - set(listed):
+                            changed[bot_id] = BotSnapshot(bot_id=bot_id, error="Bot eliminado")
+                            snapshots.pop(bot_id, None)
+                        bot_ids = listed
+                    continue
+                kind, bot_id = result.id.split(":", 1)
+                if bot_id not in bot_ids:
+                    # Dado de baja en la lista de esta misma respuesta
+                    continue
+                snapshot = snapshots.setdefault(bot_id, BotSnapshot(bot_id=bot_id))
+                if not result.ok:
+                    snapshot.error = body.get("error") or f"HTTP {result.status}"
+                elif kind == "bot":
+                    snapshot.bot, snapshot.error = Bot.from_dict(body.get("data")), None
+                else:
+                    snapshot.positions = _parse_list(Position, body, etags[result.id])
+                changed[bot_id] = snapshot
+
+            # Un bot nuevo en la lista se consulta enseguida
+            if follow_all and any(bot_id not in snapshots for bot_id in bot_ids):
+                continue
+            if changed:
+                delay = interval
+                yield changed
+                changed = {}
+            else:
+                delay = min(delay * backoff, max_interval)
+            await asyncio.sleep(delay)
@@ -0,0 +1,60 @@
+"""
+Excepciones del SDK.
+"""
+
+class SDKError(Exception):
+    """Error base del SDK."""
+
+class TransportError(SDKError):
+    """No se pudo completar la solicitud (conexión, tiempo de espera) tras los reintentos."""
+
+class APIError(SDKError):
+    """
+    La API respondió con un código de error.
+
+    Attributes:
+        status (int): Código de estado HTTP.
+        error (str): Campo 'error' de la respuesta.
+        message (str): Campo 'message' de la respuesta, si existe.
+        payload (dict): Cuerpo JSON completo de la respuesta.
+        retry_after (float): Segundos indicados en Retry-After (429/503).
+    """
+
+    def __init__(self, status, error=None, message=None, payload=None, retry_after=None):
+        self.status = status
+        self.error = error or f"HTTP {status}"
+        self.message = message
+        self.payload = payload or {}
+        self.retry_after = retry_after
+        super().__init__(f"{self.error} ({status})" + (f": {message}" if message else ""))
+
+class NotFoundError(APIError):
+    """El recurso no existe (404)."""
+
+class AuthError(APIError):
+    """Token ausente, inválido o sin permisos (401/403)."""
+
+class RateLimitError(APIError):
+    """Límite de solicitudes superado (429) tras agotar los reintentos."""
+
+def error_for_status(status, payload, retry_after=None):
+    """
+    Construye la excepción adecuada para una respuesta de error.
+
+    Args:
+        status (int): Código de estado HTTP.
+        payload (dict): Cuerpo JSON de la respuesta (o {}).
+        retry_after (float, optional): Valor de Retry-After.
+
+    Returns:
+        APIError: Excepción a lanzar.
+    """
+    if status == 404:
+        cls = NotFoundError
+    elif status in (401, 403):
+        cls = AuthError
+    elif status == 429:
+        cls = RateLimitError
+    else:
+        cls = APIError
+    return cls(status, payload.get('error'), payload.get('message'), payload, retry_after)
@@ -0,0 +1,169 @@
+"""
+Objetos de resultado del SDK.
+
+Cada modelo expone los campos de la API como atributos. Los campos que no
+vienen en la respuesta (por ejemplo al usar fields=...) quedan a None, y las
+claves desconocidas se conservan en 'extra' para no perder datos si la API
+añade campos nuevos.
+"""
+
+class Model:
+    """Base de los modelos: construcción desde el JSON de la API y vuelta a dict."""
+
+    FIELDS = ()
+
+    def __init__(self, **values):
+        for name in self.FIELDS:
+            setattr(self, name, values.pop(name, None))
+        self.extra = values
+        # ETag de la respuesta de la que procede (solo en recursos individuales)
+        self.etag = None
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Crea el modelo a partir de un objeto JSON de la API.
+
+        Args:
+            data (dict): Objeto devuelto por la API.
+
+        Returns:
+            Model: Instancia del modelo.
+        """
+        return cls(**(data or {}))
+
+    @classmethod
+    def from_rows(cls, columns, rows):
+        """
+        Crea modelos a partir del formato compacto (?format=compact).
+
+        Args:
+            columns (list): Nombres de los campos.
+            rows (list): Filas con los valores en el orden de columns.
+
+        Returns:
+            list: Instancias del modelo.
+        """
+        return [cls(**dict(zip(columns, row))) for row in rows]
+
+    def to_dict(self):
+        """Devuelve el modelo como diccionario (campos no nulos y extra)."""
+        data = {name: getattr(self, name) for name in self.FIELDS if getattr(self, name) is not None}
+        data.update(self.extra)
+        return data
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        values = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.FIELDS
+                           if getattr(self, name) is not None)
+        return f"{type(self).__name__}({values})"
+
+class ResultList(list):
+    """Lista de modelos con la ETag de la respuesta."""
+
+    def __init__(self, items=(), etag=None):
+        super().__init__(items)
+        self.etag = etag
+
+class LogLines(ResultList):
+    """Líneas de salida de un bot con el cursor para la siguiente lectura."""
+
+    def __init__(self, items=(), next_seq=0, missed=0):
+        super().__init__(items)
+        self.next = next_seq
+        self.missed = missed
+
+class ResourceSamples(ResultList):
+    """Muestras de recursos de un bot con su resumen y el coste del muestreo."""
+
+    def __init__(self, items=(), summary=None, sampler=None):
+        super().__init__(items)
+        self.summary = summary or {}
+        self.sampler = sampler or {}
+
+class Events(ResultList):
+    """Eventos del historial con el cursor de la página siguiente (None en la última)."""
+
+    def __init__(self, items=(), next_cursor=None):
+        super().__init__(items)
+        self.next = next_cursor
+
+class Bot(Model):
+    """Bot de trading (lista y detalle); 'host' solo con agentes de otros hosts configurados."""
+
+    FIELDS = ("id", "name", "symbol", "interval", "status", "last_update", "host",
+              "balance", "profit_today", "profit_total", "trades_today", "trades_total", "win_rate")
+
+    @property
+    def is_active(self):
+        """True si el bot está en ejecución."""
+        return self.status in ("active", "running")
+
+class Signal(Model):
+    """Señal generada por un bot."""
+
+    FIELDS = ("timestamp", "type", "price", "strength", "indicators", "ml_prediction", "executed")
+
+class Position(Model):
+    """Posición abierta de un bot."""
+
+    FIELDS = ("id", "symbol", "type", "entry_price", "current_price", "quantity",
+              "value_usdt", "profit_loss", "profit_loss_usdt", "entry_time", "duration",
+              "stop_loss", "take_profit", "status")
+
+class LogLine(Model):
+    """Línea de salida (stdout/stderr) de un bot."""
+
+    FIELDS = ("seq", "ts", "stream", "line")
+
+class ResourceSample(Model):
+    """Muestra del consumo de recursos de un bot (ts en segundos epoch)."""
+
+    FIELDS = ("ts", "cpu_percent", "rss_bytes", "threads", "fds", "read_bps", "write_bps", "processes")
+
+class Event(Model):
+    """Evento del historial (cambio de estado, inicio, parada, reinicio, webhook, error)."""
+
+    FIELDS = ("id", "ts", "type", "bot_id", "data")
+
+class ActionResult(Model):
+    """Resultado de iniciar o detener un bot."""
+
+    FIELDS = ("bot_id", "success", "message", "status")
+
+class Health(Model):
+    """Respuesta de /api/health."""
+
+    FIELDS = ("status", "version", "uptime", "uptime_seconds", "environment")
+
+class Readiness(Model):
+    """Respuesta de /api/health/ready (también cuando la API responde 503)."""
+
+    FIELDS = ("status", "pid", "checked_seconds_ago", "failed", "checks")
+
+    @property
+    def ready(self):
+        """True si el worker que respondió está listo."""
+        return self.status == "ready"
+
+class BatchResult(Model):
+    """Resultado de un elemento de /api/batch."""
+
+    FIELDS = ("id", "status", "headers", "body")
+
+    @property
+    def ok(self):
+        """True si el elemento respondió 2xx o 304."""
+        return 200 <= (self.status or 0) < 300 or self.status == 304
+
+class BotSnapshot(Model):
+    """Estado de un bot en watch_bots(): detalle, posiciones abiertas y último error."""
+
+    FIELDS = ("bot_id", "bot", "positions", "error")
+
+    @property
+    def open_pnl(self):
+        """Suma del PnL no realizado (USDT) de las posiciones abiertas."""
+        return sum(position.profit_loss_usdt or 0.0 for position in self.positions or [])